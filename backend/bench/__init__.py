@@ -0,0 +1 @@
+"""오프라인 성능 측정 도구 (가짜 외부 API 서버와 부하 생성기)"""
@@ -0,0 +1,136 @@
+"""외부 API 요청/응답 기록(카세트) 저장소
+
+요청(메서드, 경로, JSON 본문)으로 키를 만들고, 키마다 <cassette_dir>/<provider>/<key>.json 파일 하나에
+기록된 응답 목록을 보관합니다. 응답은 상태 코드, 일부 헤더, 그리고 요청 시작부터의 시각(ms)이 붙은
+청크 목록으로 저장되므로 스트리밍 응답도 원래 속도대로 재생할 수 있습니다.
+인증 헤더는 저장하지 않지만 요청 본문(대화 내용)은 그대로 저장되므로 카세트를 외부에 공유하지 마세요.
+"""
+import base64
+import hashlib
+import json
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Optional
+
+# 재생할 때 의미가 있는 응답 헤더만 저장
+RECORDED_RESPONSE_HEADERS = {"content-type", "retry-after"}
+
+
+def request_key(method: str, path: str, body: bytes) -> str:
+    """요청을 구분하는 키 (JSON 본문은 키 순서와 공백을 정규화)"""
+    try:
+        normalized_body = json.dumps(json.loads(body), sort_keys=True, ensure_ascii=False) if body else ""
+    except ValueError:
+        normalized_body = body.decode("utf-8", errors="replace")
+    digest = hashlib.sha256(f"{method.upper()} {path}\n{normalized_body}".encode("utf-8")).hexdigest()
+    return digest[:24]
+
+
+def encode_chunk(data: bytes) -> dict:
+    """청크를 JSON에 저장할 수 있는 형태로 (텍스트면 그대로, 아니면 base64)"""
+    try:
+        return {"text": data.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"base64": base64.b64encode(data).decode("ascii")}
+
+
+def decode_chunk(chunk: dict) -> bytes:
+    if "text" in chunk:
+        return chunk["text"].encode("utf-8")
+    return base64.b64decode(chunk["base64"])
+
+
+class CassetteStore:
+    """provider별 카세트 파일을 읽고 쓰며, 재생 순서를 관리"""
+
+    def __init__(self, cassette_dir: str):
+        self.cassette_dir = cassette_dir
+        self._lock = threading.Lock()
+        # (provider, key) -> 카세트 내용
+        self._cassettes = {}
+        # (provider, method, path) -> 기록된 키 목록 (경로 기준 매칭용)
+        self._keys_by_path = defaultdict(list)
+        # 같은 키/경로를 여러 번 재생할 때의 다음 순번
+        self._cursors = defaultdict(int)
+        self._load()
+
+    def _load(self):
+        if not os.path.isdir(self.cassette_dir):
+            return
+        for provider in sorted(os.listdir(self.cassette_dir)):
+            provider_dir = os.path.join(self.cassette_dir, provider)
+            if not os.path.isdir(provider_dir):
+                continue
+            for filename in sorted(os.listdir(provider_dir)):
+                if not filename.endswith(".json"):
+                    continue
+                with open(os.path.join(provider_dir, filename), "r", encoding="utf-8") as f:
+                    cassette = json.load(f)
+                key = filename[:-len(".json")]
+                self._cassettes[(provider, key)] = cassette
+                request = cassette["request"]
+                self._keys_by_path[(provider, request["method"], request["path"])].append(key)
+
+    def _cassette_path(self, provider: str, key: str) -> str:
+        return os.path.join(self.cassette_dir, provider, f"{key}.json")
+
+    def find(self, provider: str, method: str, path: str, body: bytes, match: str = "body") -> Optional[dict]:
+        """재생할 응답을 찾음 (match="body"는 본문까지 일치, "path"는 같은 경로의 기록을 차례로 사용)"""
+        with self._lock:
+            if match == "path":
+                keys = self._keys_by_path.get((provider, method.upper(), path))
+                if not keys:
+                    return None
+                cursor_key = ("path", provider, method.upper(), path)
+                interactions = [
+                    interaction for key in keys for interaction in self._cassettes[(provider, key)]["interactions"]
+                ]
+            else:
+                key = request_key(method, path, body)
+                cassette = self._cassettes.get((provider, key))
+                if cassette is None:
+                    return None
+                cursor_key = ("body", provider, key)
+                interactions = cassette["interactions"]
+            if not interactions:
+                return None
+            # 같은 요청이 여러 번 기록됐으면 기록된 순서대로, 끝나면 처음부터 다시
+            index = self._cursors[cursor_key] % len(interactions)
+            self._cursors[cursor_key] += 1
+            return interactions[index]
+
+    def record(self, provider: str, method: str, path: str, body: bytes, interaction: dict) -> str:
+        """응답 하나를 카세트 파일에 추가하고 키를 반환"""
+        key = request_key(method, path, body)
+        with self._lock:
+            cassette = self._cassettes.get((provider, key))
+            if cassette is None:
+                try:
+                    request_body = json.loads(body) if body else None
+                except ValueError:
+                    request_body = body.decode("utf-8", errors="replace")
+                cassette = {
+                    "request": {"method": method.upper(), "path": path, "body": request_body},
+                    "interactions": [],
+                }
+                self._cassettes[(provider, key)] = cassette
+                self._keys_by_path[(provider, method.upper(), path)].append(key)
+            cassette["interactions"].append(dict(interaction, recorded_at=datetime.now().isoformat()))
+
+            cassette_path = self._cassette_path(provider, key)
+            os.makedirs(os.path.dirname(cassette_path), exist_ok=True)
+            temp_path = f"{cassette_path}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(cassette, f, ensure_ascii=False, indent=2)
+            os.replace(temp_path, cassette_path)
+        return key
+
+    def stats(self) -> dict:
+        with self._lock:
+            providers = defaultdict(lambda: {"requests": 0, "interactions": 0})
+            for (provider, _), cassette in self._cassettes.items():
+                providers[provider]["requests"] += 1
+                providers[provider]["interactions"] += len(cassette["interactions"])
+            return {"cassette_dir": self.cassette_dir, "providers": dict(providers)}
@@ -0,0 +1,307 @@
+"""벤치마크용 가짜 OpenAI / ElevenLabs 서버
+
+실제 API 대신 설정한 지연 시간 분포로 응답하는 로컬 서버입니다.
+- POST /v1/chat/completions: 첫 토큰까지 llm_latency 만큼 기다린 뒤 응답 (stream=true면 SSE로 토큰 단위 전송)
+- POST /v1/text-to-speech/{voice_id}: tts_latency 만큼 기다린 뒤 텍스트 길이에 비례하는 가짜 MP3 바이트 반환
+- GET /v1/models: 준비 상태 점검용
+- GET /stats: 받은 요청 수와 주입한 오류 수
+error_rate 비율의 요청은 429(Retry-After 포함)/500/503 중 하나로 실패시킵니다.
+
+지연 시간 분포 형식 (단위 ms):
+    200                 항상 200ms
+    uniform:100-400     100~400ms 균등 분포
+    lognormal:300,0.5   중앙값 300ms, sigma 0.5인 로그정규 분포 (긴 꼬리)
+
+사용 예:
+    python -m bench.fake_upstreams --port 9100 --llm-latency lognormal:800,0.4 --error-rate 0.02
+    OPENAI_BASE_URL=http://127.0.0.1:9100/v1 ELEVENLABS_BASE_URL=http://127.0.0.1:9100/v1 uvicorn main:app
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import time
+import uuid
+from collections import Counter
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+from session_store import estimate_tokens
+
+# 앱이 프롬프트에 넣는 JSON 응답 형식의 키로 어떤 엔드포인트의 호출인지 구분해 그럴듯한 응답을 만듦
+EVALUATION_KEYS = [
+    "symptom_location", "symptom_timing", "symptom_severity", "current_medication", "allergy_info",
+    "diagnosis_info", "prescription_info", "side_effects", "followup_plan", "emergency_plan",
+]
+DOCTOR_REPLIES = [
+    "그렇군요. 언제부터 그런 증상이 있으셨나요?",
+    "통증이 어느 정도인지 1부터 10까지로 말씀해 주시겠어요?",
+    "지금 드시고 계신 약이 있으신가요? 알레르기가 있으시면 같이 말씀해 주세요.",
+    "검사 결과를 보니 위염으로 보입니다. 약을 처방해 드릴 테니 하루 세 번 식후에 드세요.",
+    "약을 드시고 속이 더 쓰리거나 어지러우면 바로 다시 오세요. 일주일 뒤에 다시 뵙겠습니다.",
+]
+
+
+class LatencyDistribution:
+    """지연 시간 분포 (sample()은 초 단위 값을 반환)"""
+
+    def __init__(self, kind: str, params: tuple):
+        self.kind = kind
+        self.params = params
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyDistribution":
+        spec = spec.strip()
+        kind, _, value = spec.partition(":")
+        if not value:
+            kind, value = "const", kind
+        try:
+            if kind == "const":
+                return cls("const", (float(value),))
+            if kind == "uniform":
+                low, high = value.split("-")
+                return cls("uniform", (float(low), float(high)))
+            if kind == "lognormal":
+                median, sigma = value.split(",")
+                return cls("lognormal", (float(median), float(sigma)))
+        except ValueError:
+            pass
+        raise ValueError(f"지연 시간 분포 형식이 잘못되었습니다: {spec}")
+
+    def sample(self) -> float:
+        if self.kind == "const":
+            value_ms = self.params[0]
+        elif self.kind == "uniform":
+            value_ms = random.uniform(*self.params)
+        else:
+            median, sigma = self.params
+            value_ms = random.lognormvariate(math.log(median), sigma) if median > 0 else 0.0
+        return max(0.0, value_ms) / 1000
+
+    def __str__(self):
+        if self.kind == "const":
+            return f"{self.params[0]:g}"
+        if self.kind == "uniform":
+            return f"uniform:{self.params[0]:g}-{self.params[1]:g}"
+        return f"lognormal:{self.params[0]:g},{self.params[1]:g}"
+
+
+class FakeUpstreamSettings:
+    """가짜 서버의 지연 시간, 스트리밍 속도, 오류율 설정"""
+
+    def __init__(self, llm_latency: str = "lognormal:600,0.4", token_interval_ms: float = 15.0,
+                 chars_per_chunk: int = 2, tts_latency: str = "lognormal:700,0.3",
+                 tts_bytes_per_char: int = 600, error_rate: float = 0.0,
+                 error_statuses: tuple = (429, 500, 503), retry_after_seconds: float = 0.5):
+        # 첫 토큰까지의 지연 시간 (비스트리밍 요청은 여기에 전체 토큰 생성 시간이 더해짐)
+        self.llm_latency = LatencyDistribution.parse(llm_latency)
+        self.token_interval_ms = token_interval_ms
+        self.chars_per_chunk = chars_per_chunk
+        self.tts_latency = LatencyDistribution.parse(tts_latency)
+        self.tts_bytes_per_char = tts_bytes_per_char
+        self.error_rate = error_rate
+        self.error_statuses = error_statuses
+        self.retry_after_seconds = retry_after_seconds
+
+    def to_dict(self) -> dict:
+        return {
+            "llm_latency": str(self.llm_latency),
+            "token_interval_ms": self.token_interval_ms,
+            "chars_per_chunk": self.chars_per_chunk,
+            "tts_latency": str(self.tts_latency),
+            "tts_bytes_per_char": self.tts_bytes_per_char,
+            "error_rate": self.error_rate,
+            "error_statuses": list(self.error_statuses),
+        }
+
+
+def fake_completion_text(messages: list) -> str:
+    """프롬프트에 요청된 JSON 형식에 맞춘 가짜 응답 (형식이 없으면 의사 대사)
+
+    같은 프롬프트에는 항상 같은 응답을 주므로, 실행마다 이후 단계의 요청도 같아집니다.
+    """
+    prompt = "\n".join(str(message.get("content", "")) for message in messages)
+    rng = random.Random(hashlib.sha256(prompt.encode("utf-8")).hexdigest())
+    if '"grades"' in prompt:
+        return json.dumps({
+            "grades": {key: rng.choice(["상", "중", "하"]) for key in EVALUATION_KEYS},
+            "score_reasons": {key: "대화에서 관련 내용을 일부 언급했습니다." for key in EVALUATION_KEYS},
+            "improvement_tips": ["증상이 시작된 시기를 구체적으로 말해 보세요.", "복용 중인 약 이름을 미리 적어 가세요."],
+        }, ensure_ascii=False)
+    if '"completed_quests"' in prompt:
+        quest_ids = [line.split("ID:", 1)[1].split(",", 1)[0].strip() for line in prompt.splitlines() if "- ID:" in line]
+        return json.dumps({
+            "completed_quests": [
+                {"quest_id": quest_id, "status": rng.choice(["달성", "미달성"]), "reason": "대화에서 확인했습니다.", "suggestion": ""}
+                for quest_id in quest_ids
+            ]
+        }, ensure_ascii=False)
+    if '"cheatsheet"' in prompt:
+        return json.dumps({
+            "cheatsheet": {
+                "script": [{"title": key, "content": "저는 ____부터 ____가 아팠어요."} for key in EVALUATION_KEYS[:5]],
+                "listening": [{"title": key, "content": "선생님, ____에 대해 다시 설명해 주시겠어요?"} for key in EVALUATION_KEYS[5:]],
+            }
+        }, ensure_ascii=False)
+    if "{" in prompt and "JSON" in prompt:
+        return json.dumps({"summary": "가짜 분석 결과입니다.", "score": rng.randint(1, 10)}, ensure_ascii=False)
+    return rng.choice(DOCTOR_REPLIES)
+
+
+def create_app(settings: FakeUpstreamSettings) -> FastAPI:
+    app = FastAPI(title="Fake upstreams")
+    counts = Counter()
+
+    def injected_error(provider: str):
+        """error_rate 확률로 실제 API와 같은 형식의 오류 응답을 반환 (아니면 None)"""
+        if settings.error_rate <= 0 or random.random() >= settings.error_rate:
+            return None
+        status_code = random.choice(settings.error_statuses)
+        counts[f"{provider}_errors_{status_code}"] += 1
+        headers = {"Retry-After": f"{settings.retry_after_seconds:g}"} if status_code == 429 else {}
+        if provider == "openai":
+            body = {"error": {"message": "injected error", "type": "fake_error", "code": status_code}}
+        else:
+            body = {"detail": {"status": "injected_error", "message": "injected error"}}
+        return JSONResponse(status_code=status_code, content=body, headers=headers)
+
+    async def stream_chunks(completion_id: str, model: str, text: str, usage: dict, include_usage: bool):
+        created = int(time.time())
+
+        def event(choices: list, chunk_usage=None) -> str:
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": choices,
+                "usage": chunk_usage,
+            }
+            return f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+
+        yield event([{"index": 0, "delta": {"role": "assistant", "content": ""}, "finish_reason": None}])
+        for offset in range(0, len(text), settings.chars_per_chunk):
+            await asyncio.sleep(settings.token_interval_ms / 1000)
+            piece = text[offset:offset + settings.chars_per_chunk]
+            yield event([{"index": 0, "delta": {"content": piece}, "finish_reason": None}])
+        yield event([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        if include_usage:
+            yield event([], usage)
+        yield "data: [DONE]\n\n"
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        counts["chat_completions"] += 1
+        error_response = injected_error("openai")
+        if error_response is not None:
+            return error_response
+
+        await asyncio.sleep(settings.llm_latency.sample())
+        messages = body.get("messages", [])
+        text = fake_completion_text(messages)
+        model = body.get("model", "gpt-4o")
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        prompt_tokens = sum(estimate_tokens(str(message.get("content", ""))) for message in messages)
+        completion_tokens = estimate_tokens(text)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+        if body.get("stream"):
+            counts["chat_completions_stream"] += 1
+            include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+            return StreamingResponse(
+                stream_chunks(completion_id, model, text, usage, include_usage),
+                media_type="text/event-stream"
+            )
+
+        # 비스트리밍은 토큰 생성 시간만큼 더 기다린 뒤 한 번에 응답
+        chunk_count = math.ceil(len(text) / settings.chars_per_chunk)
+        await asyncio.sleep(chunk_count * settings.token_interval_ms / 1000)
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": "stop",
+            }],
+            "usage": usage,
+        }
+
+    @app.post("/v1/text-to-speech/{voice_id}")
+    async def text_to_speech(voice_id: str, request: Request):
+        body = await request.json()
+        counts["text_to_speech"] += 1
+        error_response = injected_error("elevenlabs")
+        if error_response is not None:
+            return error_response
+
+        await asyncio.sleep(settings.tts_latency.sample())
+        # MPEG 프레임 헤더처럼 보이는 바이트를 텍스트 길이에 비례해 채움
+        audio_size = max(1, len(body.get("text", ""))) * settings.tts_bytes_per_char
+        return Response(content=(b"\xff\xf3\x44\xc4" * (audio_size // 4 + 1))[:audio_size], media_type="audio/mpeg")
+
+    @app.get("/v1/models")
+    async def list_models():
+        counts["models"] += 1
+        return {"object": "list", "data": [{"id": "gpt-4o", "object": "model"}]}
+
+    @app.get("/stats")
+    async def get_stats():
+        return {"settings": settings.to_dict(), "counts": dict(counts)}
+
+    @app.post("/stats/reset")
+    async def reset_stats():
+        counts.clear()
+        return {"status": "success"}
+
+    return app
+
+
+def add_settings_arguments(parser: argparse.ArgumentParser):
+    """가짜 서버 설정 인자 (load_test에서도 같은 인자를 사용)"""
+    defaults = FakeUpstreamSettings()
+    parser.add_argument("--llm-latency", default=str(defaults.llm_latency), help="OpenAI 첫 토큰까지의 지연 시간 분포 (ms)")
+    parser.add_argument("--token-interval-ms", type=float, default=defaults.token_interval_ms, help="스트리밍 청크 간격 (ms)")
+    parser.add_argument("--chars-per-chunk", type=int, default=defaults.chars_per_chunk, help="스트리밍 청크당 글자 수")
+    parser.add_argument("--tts-latency", default=str(defaults.tts_latency), help="ElevenLabs 응답 지연 시간 분포 (ms)")
+    parser.add_argument("--tts-bytes-per-char", type=int, default=defaults.tts_bytes_per_char, help="글자당 가짜 오디오 바이트 수")
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate, help="오류(429/500/503)로 응답할 비율")
+    parser.add_argument("--seed", type=int, help="난수 시드 (지연 시간과 오류 재현용)")
+
+
+def settings_from_args(args) -> FakeUpstreamSettings:
+    return FakeUpstreamSettings(
+        llm_latency=args.llm_latency,
+        token_interval_ms=args.token_interval_ms,
+        chars_per_chunk=args.chars_per_chunk,
+        tts_latency=args.tts_latency,
+        tts_bytes_per_char=args.tts_bytes_per_char,
+        error_rate=args.error_rate,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="벤치마크용 가짜 OpenAI / ElevenLabs 서버")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    add_settings_arguments(parser)
+    args = parser.parse_args()
+
+    if args.seed is not None:
+        random.seed(args.seed)
+    uvicorn.run(create_app(settings_from_args(args)), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
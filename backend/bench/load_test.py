@@ -0,0 +1,406 @@
+"""참가자 시나리오 부하 테스트
+
+가짜 OpenAI / ElevenLabs 서버(bench.fake_upstreams)와 앱을 임시 작업 디렉토리에서 띄운 뒤,
+참가자 시나리오(로그인 → 채팅 턴 → 퀘스트 체크 → 평가 → 치트시트 생성/저장 → 기록 조회)를
+지정한 동시성으로 실행하고 엔드포인트별 처리량과 p50/p95/p99 응답 시간을 출력합니다.
+main.py의 성능 변경 전후를 외부 API 없이 같은 조건으로 비교하는 용도입니다.
+
+사용 예 (backend 디렉토리에서):
+    python -m bench.load_test --participants 50 --concurrency 10 --turns 6
+    python -m bench.load_test --llm-latency lognormal:1200,0.6 --error-rate 0.05 --json result.json
+    python -m bench.load_test --app-env LLM_CACHE_ENABLED=false --app-env UPSTREAM_OPENAI_CONCURRENCY=16
+    python -m bench.load_test --target http://127.0.0.1:8000   # 이미 실행 중인 앱 대상
+    python -m bench.load_test --cassettes cassettes/baseline --seed 1   # 기록된 실제 응답을 원래 속도로 재생
+
+--cassettes를 지정하면 가짜 서버 대신 bench.upstream_proxy를 띄웁니다. 재생(replay)은 요청 본문이
+같아야 맞으므로, 기록할 때와 같은 --seed/--participants/--turns로 실행하세요 (참가자 ID와 증상이 같아짐).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime
+
+import httpx
+
+from bench.fake_upstreams import add_settings_arguments
+from bench.upstream_proxy import add_proxy_arguments
+from turn_timings_report import percentile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# 서버가 유휴 연결을 닫는 순간 클라이언트가 같은 연결로 요청을 보내면 RemoteProtocolError가 나므로,
+# 클라이언트는 서버(uvicorn 기본 5초, 직접 띄우는 앱은 APP_KEEP_ALIVE_SECONDS)보다 먼저 유휴 연결을 버림
+CLIENT_KEEPALIVE_EXPIRY = 2.0
+APP_KEEP_ALIVE_SECONDS = 60
+
+PATIENT_MESSAGES = [
+    "안녕하세요, 배가 아파서 왔어요.",
+    "사흘 전부터 명치 쪽이 쓰리고 아파요.",
+    "밥을 먹고 나면 더 심해지는 것 같아요. 아플 때는 7 정도예요.",
+    "지금은 혈압약을 먹고 있어요. 알레르기는 없는 것 같아요.",
+    "위염이면 약은 얼마나 먹어야 하나요?",
+    "약 먹고 부작용이 생기면 어떻게 해야 하나요?",
+    "다음에는 언제 다시 와야 하나요?",
+    "밤에 갑자기 많이 아프면 응급실에 가야 하나요?",
+]
+SYMPTOMS = ["복통", "두통", "기침과 발열", "허리 통증", "어지러움"]
+QUESTS = [
+    {"id": "symptom_location", "title": "증상 위치 말하기", "description": "어디가 아픈지 말하기", "grade": "중"},
+    {"id": "symptom_timing", "title": "증상 시작 시기 말하기", "description": "언제부터 아픈지 말하기", "grade": "중"},
+    {"id": "current_medication", "title": "복용 중인 약 말하기", "description": "현재 먹는 약 말하기", "grade": "중"},
+    {"id": "prescription_info", "title": "처방약 정보 듣기", "description": "약 이름과 복용 방법 확인하기", "grade": "중"},
+]
+
+
+class RequestRecorder:
+    """엔드포인트별 응답 시간과 상태 코드를 모아 요약"""
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.status_codes = defaultdict(lambda: defaultdict(int))
+
+    async def request(self, client: httpx.AsyncClient, label: str, method: str, url: str, **kwargs):
+        """요청을 보내고 기록 (실패하면 None 반환, 예외는 올리지 않음)"""
+        start_time = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            status = response.status_code
+        except httpx.HTTPError as e:
+            response = None
+            status = type(e).__name__
+        self.latencies[label].append((time.perf_counter() - start_time) * 1000)
+        self.status_codes[label][str(status)] += 1
+        if response is None or response.status_code >= 400:
+            self.errors[label] += 1
+            return None
+        return response
+
+    def summary(self, wall_seconds: float) -> dict:
+        endpoints = {}
+        for label in sorted(self.latencies):
+            values = sorted(self.latencies[label])
+            endpoints[label] = {
+                "count": len(values),
+                "errors": self.errors[label],
+                "throughput_rps": round(len(values) / wall_seconds, 2) if wall_seconds else 0.0,
+                "mean_ms": round(sum(values) / len(values), 1),
+                "p50_ms": round(percentile(values, 0.50), 1),
+                "p95_ms": round(percentile(values, 0.95), 1),
+                "p99_ms": round(percentile(values, 0.99), 1),
+                "max_ms": round(values[-1], 1),
+                "status_codes": dict(self.status_codes[label]),
+            }
+        return endpoints
+
+
+async def run_participant(client: httpx.AsyncClient, recorder: RequestRecorder, participant_id: str,
+                          turns: int, think_time: float, fetch_audio: bool, rng: random.Random) -> bool:
+    """참가자 한 명의 시나리오를 실행 (모든 단계가 성공하면 True)"""
+    ok = True
+    session_id = f"session_{rng.randrange(10 ** 12, 10 ** 13)}_{rng.getrandbits(24):06x}"
+
+    response = await recorder.request(client, "POST /api/save-user-data", "POST", "/api/save-user-data", json={
+        "participantId": participant_id,
+        "symptoms": rng.choice(SYMPTOMS),
+        "consent": True,
+        "loginTime": datetime.now().isoformat(),
+    })
+    ok = ok and response is not None
+
+    conversation = []
+    for turn in range(turns):
+        if think_time > 0:
+            await asyncio.sleep(rng.uniform(0.5, 1.5) * think_time)
+        message = PATIENT_MESSAGES[turn % len(PATIENT_MESSAGES)]
+        response = await recorder.request(client, "POST /api/chat", "POST", "/api/chat", json={
+            "message": message,
+            "participantId": participant_id,
+            "sessionId": session_id,
+        })
+        if response is None:
+            ok = False
+            continue
+        chat_data = response.json()
+        # 프론트엔드와 같은 메시지 형식 (sender: user/bot)
+        conversation.append({"sender": "user", "content": message})
+        conversation.append({"sender": "bot", "content": chat_data.get("response", "")})
+        if fetch_audio and chat_data.get("audio_url"):
+            response = await recorder.request(client, "GET /api/audio", "GET", chat_data["audio_url"])
+            ok = ok and response is not None
+
+    response = await recorder.request(client, "POST /api/check-quests", "POST", "/api/check-quests", json={
+        "conversation_history": conversation,
+        "quests": QUESTS,
+        "participant_id": participant_id,
+        "session_id": session_id,
+    })
+    ok = ok and response is not None
+
+    response = await recorder.request(
+        client, "GET /api/logs", "GET", "/api/logs", params={"participant_id": participant_id}
+    )
+    logs = response.json().get("logs", []) if response is not None else []
+    ok = ok and response is not None
+
+    response = await recorder.request(client, "POST /api/evaluate", "POST", "/api/evaluate", json={
+        "logs": logs,
+        "participant_id": participant_id,
+        "evaluation_type": "conversation_based",
+    })
+    ok = ok and response is not None
+
+    response = await recorder.request(client, "POST /api/generate-cheatsheet", "POST", "/api/generate-cheatsheet", json={
+        "participant_id": participant_id,
+    })
+    if response is None:
+        ok = False
+    else:
+        response = await recorder.request(client, "POST /api/save-cheatsheet", "POST", "/api/save-cheatsheet", json={
+            "participant_id": participant_id,
+            "cheatsheet_data": response.json().get("cheatsheet", {}),
+            "timestamp": datetime.now().isoformat(),
+        })
+        ok = ok and response is not None
+
+    response = await recorder.request(
+        client, "GET /api/get-cheatsheet-history", "GET", f"/api/get-cheatsheet-history/{participant_id}"
+    )
+    return ok and response is not None
+
+
+async def run_load(target: str, participants: int, concurrency: int, turns: int, think_time: float,
+                   fetch_audio: bool, timeout: float, seed: int = None) -> dict:
+    recorder = RequestRecorder()
+    semaphore = asyncio.Semaphore(concurrency)
+    # 시드가 있으면 참가자 ID와 시나리오가 실행마다 같아짐 (카세트 재생용)
+    run_id = f"s{seed}" if seed is not None else uuid.uuid4().hex[:6]
+    limits = httpx.Limits(
+        max_connections=concurrency * 2, max_keepalive_connections=concurrency * 2,
+        keepalive_expiry=CLIENT_KEEPALIVE_EXPIRY
+    )
+
+    async with httpx.AsyncClient(base_url=target, timeout=timeout, limits=limits) as client:
+        async def participant_task(index: int) -> bool:
+            async with semaphore:
+                return await run_participant(
+                    client, recorder, f"bench_{run_id}_{index:05d}", turns, think_time, fetch_audio,
+                    random.Random(f"{run_id}:{index}")
+                )
+
+        start_time = time.perf_counter()
+        results = await asyncio.gather(*(participant_task(index) for index in range(participants)))
+        wall_seconds = time.perf_counter() - start_time
+
+    endpoints = recorder.summary(wall_seconds)
+    total_requests = sum(row["count"] for row in endpoints.values())
+    return {
+        "participants": participants,
+        "participants_failed": results.count(False),
+        "concurrency": concurrency,
+        "turns": turns,
+        "wall_seconds": round(wall_seconds, 2),
+        "total_requests": total_requests,
+        "throughput_rps": round(total_requests / wall_seconds, 2) if wall_seconds else 0.0,
+        "participants_per_minute": round(participants / wall_seconds * 60, 1) if wall_seconds else 0.0,
+        "endpoints": endpoints,
+    }
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_up(url: str, timeout: float, process: subprocess.Popen):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"프로세스가 종료되었습니다 (코드 {process.returncode}): {url}")
+        try:
+            if httpx.get(url, timeout=1).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"서버가 {timeout:.0f}초 안에 시작되지 않았습니다: {url}")
+
+
+def start_fake_upstreams(args, port: int, log_file) -> subprocess.Popen:
+    command = [
+        sys.executable, "-m", "bench.fake_upstreams", "--port", str(port),
+        "--llm-latency", args.llm_latency,
+        "--token-interval-ms", str(args.token_interval_ms),
+        "--chars-per-chunk", str(args.chars_per_chunk),
+        "--tts-latency", args.tts_latency,
+        "--tts-bytes-per-char", str(args.tts_bytes_per_char),
+        "--error-rate", str(args.error_rate),
+    ]
+    if args.seed is not None:
+        command += ["--seed", str(args.seed)]
+    return subprocess.Popen(command, cwd=BACKEND_DIR, stdout=log_file, stderr=subprocess.STDOUT)
+
+
+def start_upstream_proxy(args, port: int, log_file) -> subprocess.Popen:
+    command = [
+        sys.executable, "-m", "bench.upstream_proxy", "--port", str(port),
+        "--cassettes", os.path.abspath(args.cassettes),
+        "--mode", args.cassette_mode,
+        "--match", args.cassette_match,
+        "--speed", str(args.replay_speed),
+    ]
+    return subprocess.Popen(command, cwd=BACKEND_DIR, stdout=log_file, stderr=subprocess.STDOUT)
+
+
+def start_upstream(args, log_file) -> dict:
+    """가짜 서버 또는 기록/재생 프록시를 띄우고 앱이 사용할 주소들을 반환"""
+    url = f"http://127.0.0.1:{free_port()}"
+    port = int(url.rsplit(":", 1)[1])
+    if args.cassettes:
+        return {
+            "process": start_upstream_proxy(args, port, log_file),
+            "ready_url": f"{url}/_proxy/stats",
+            "stats_url": f"{url}/_proxy/stats",
+            "openai_base_url": f"{url}/openai",
+            "elevenlabs_base_url": f"{url}/elevenlabs",
+        }
+    return {
+        "process": start_fake_upstreams(args, port, log_file),
+        "ready_url": f"{url}/v1/models",
+        "stats_url": f"{url}/stats",
+        "openai_base_url": f"{url}/v1",
+        "elevenlabs_base_url": f"{url}/v1",
+    }
+
+
+def start_app(args, port: int, upstream: dict, workdir: str, log_file) -> subprocess.Popen:
+    """임시 작업 디렉토리에서 앱 실행 (logs/data/cache가 실제 데이터와 섞이지 않도록)"""
+    env = dict(os.environ)
+    env.update({
+        "OPENAI_BASE_URL": upstream["openai_base_url"],
+        "ELEVENLABS_BASE_URL": upstream["elevenlabs_base_url"],
+        "LOG_LEVEL": "WARNING",
+        "PYTHONPATH": BACKEND_DIR + os.pathsep + env.get("PYTHONPATH", ""),
+    })
+    # 실제 API로 기록할 때만 환경의 키를 사용
+    if not (args.cassettes and args.cassette_mode != "replay"):
+        env.update({"OPENAI_API_KEY": "bench-key", "ELEVENLABS_API_KEY": "bench-key"})
+    for item in args.app_env:
+        key, _, value = item.partition("=")
+        env[key] = value
+    command = [
+        sys.executable, "-m", "uvicorn", "main:app", "--app-dir", BACKEND_DIR,
+        "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning", "--no-access-log",
+        "--timeout-keep-alive", str(APP_KEEP_ALIVE_SECONDS),
+    ]
+    return subprocess.Popen(command, cwd=workdir, env=env, stdout=log_file, stderr=subprocess.STDOUT)
+
+
+def stop_process(process: subprocess.Popen):
+    if process.poll() is None:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def print_report(result: dict):
+    print(
+        f"참가자 {result['participants']}명 (실패 {result['participants_failed']}), 동시성 {result['concurrency']}, "
+        f"턴 {result['turns']}회, {result['wall_seconds']}초"
+    )
+    print(
+        f"전체 {result['total_requests']}건, {result['throughput_rps']} req/s, "
+        f"분당 참가자 {result['participants_per_minute']}명 (단위: ms)"
+    )
+    print(f"{'endpoint':<34}{'count':>7}{'errors':>8}{'rps':>8}{'mean':>9}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+    for label, row in result["endpoints"].items():
+        print(
+            f"{label:<34}{row['count']:>7}{row['errors']:>8}{row['throughput_rps']:>8.2f}{row['mean_ms']:>9.1f}"
+            f"{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}{row['max_ms']:>9.1f}"
+        )
+    upstream = result.get("upstream")
+    if upstream:
+        print(f"가짜 외부 API 호출: {json.dumps(upstream['counts'], ensure_ascii=False)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="가짜 외부 API를 사용한 참가자 시나리오 부하 테스트")
+    parser.add_argument("--participants", type=int, default=20, help="실행할 참가자 시나리오 수")
+    parser.add_argument("--concurrency", type=int, default=5, help="동시에 진행하는 참가자 수")
+    parser.add_argument("--turns", type=int, default=4, help="참가자당 채팅 턴 수")
+    parser.add_argument("--think-time-ms", type=float, default=0.0, help="채팅 턴 사이 평균 대기 시간 (ms)")
+    parser.add_argument("--no-audio", action="store_true", help="채팅 응답의 오디오 파일을 받지 않음")
+    parser.add_argument("--timeout", type=float, default=120.0, help="요청당 타임아웃 (초)")
+    parser.add_argument("--target", help="이미 실행 중인 앱 주소 (지정하면 앱과 가짜 서버를 띄우지 않음)")
+    parser.add_argument("--app-env", action="append", default=[], metavar="KEY=VALUE", help="앱에 넘길 환경변수 (반복 가능)")
+    parser.add_argument("--workdir", help="앱 작업 디렉토리 (기본값: 임시 디렉토리, 실행 후 삭제)")
+    parser.add_argument("--json", dest="json_path", help="결과를 JSON 파일로 저장")
+    parser.add_argument("--cassettes", help="가짜 서버 대신 기록/재생 프록시에 사용할 카세트 디렉토리")
+    add_settings_arguments(parser)
+    add_proxy_arguments(parser)
+    args = parser.parse_args()
+
+    load_kwargs = dict(
+        participants=args.participants,
+        concurrency=args.concurrency,
+        turns=args.turns,
+        think_time=args.think_time_ms / 1000,
+        fetch_audio=not args.no_audio,
+        timeout=args.timeout,
+        seed=args.seed,
+    )
+
+    if args.target:
+        result = asyncio.run(run_load(args.target.rstrip("/"), **load_kwargs))
+    else:
+        temp_dir = None
+        if args.workdir:
+            workdir = os.path.abspath(args.workdir)
+            os.makedirs(workdir, exist_ok=True)
+        else:
+            temp_dir = tempfile.TemporaryDirectory(prefix="nkvoice_bench_")
+            workdir = temp_dir.name
+        app_url = f"http://127.0.0.1:{free_port()}"
+        with open(os.path.join(workdir, "bench_servers.log"), "ab") as server_log:
+            upstream = start_upstream(args, server_log)
+            upstream_process = upstream["process"]
+            app_process = None
+            try:
+                wait_until_up(upstream["ready_url"], 30, upstream_process)
+                app_process = start_app(args, int(app_url.rsplit(":", 1)[1]), upstream, workdir, server_log)
+                wait_until_up(f"{app_url}/health", 60, app_process)
+                result = asyncio.run(run_load(app_url, **load_kwargs))
+                result["upstream"] = httpx.get(upstream["stats_url"], timeout=5).json()
+            except RuntimeError as e:
+                server_log.flush()
+                with open(server_log.name, "r", encoding="utf-8", errors="replace") as f:
+                    log_tail = f.readlines()[-20:]
+                print(f"{e}\n서버 로그 (마지막 20줄):\n{''.join(log_tail)}", file=sys.stderr)
+                return 1
+            finally:
+                if app_process is not None:
+                    stop_process(app_process)
+                stop_process(upstream_process)
+        if temp_dir is not None:
+            temp_dir.cleanup()
+
+    print_report(result)
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""JSON 직렬화 경로 마이크로 벤치마크 (표준 json 들여쓰기 vs serialization 계층)
+
+앱이 저장/응답하는 것과 같은 형태의 데이터(긴 채팅 세션, 치트시트 기록 목록, 피드백)로
+다음 세 경로를 이전 방식과 serialization 모듈 방식으로 각각 잽니다.
+- write: json.dump(indent=2, ensure_ascii=False) 파일 저장 vs write_json (압축 형식)
+- read: json.load vs read_json (각 방식으로 저장된 파일)
+- response: Starlette JSONResponse 본문 렌더링 vs FastJSONResponse
+응답 모델(response_model)이 있는 엔드포인트의 jsonable_encoder 단계는 두 방식이 같으므로 제외합니다.
+
+사용 예 (backend 디렉토리에서):
+    python -m bench.serialization_bench
+    python -m bench.serialization_bench --turns 200 --cheatsheets 100 --iterations 500
+    python -m bench.serialization_bench --json serialization_bench.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from fastapi.responses import JSONResponse
+
+import serialization
+from bench.synthetic_data import EVALUATION_KEYS, TreeWriter, make_evaluation, write_chat_session
+from turn_timings_report import percentile
+
+
+def build_payloads(turns: int, cheatsheets: int, seed: int, workdir: str) -> dict:
+    """벤치마크할 데이터: 이름 -> 객체"""
+    rng = random.Random(seed)
+    session_dir = os.path.join(workdir, "session")
+    os.makedirs(session_dir)
+    conversation_logs, now = write_chat_session(
+        TreeWriter(), session_dir, "bench_participant", "session_bench", time.time(), turns, 0, rng
+    )
+    with open(os.path.join(session_dir, "chat_session.json"), "r", encoding="utf-8") as f:
+        session_data = json.load(f)
+
+    history = []
+    for index in range(cheatsheets):
+        history.append({
+            "participant_id": "bench_participant",
+            "timestamp": datetime.fromtimestamp(now + index * 60).isoformat(),
+            "cheatsheet": {
+                "script": [{"title": key, "content": "저는 ____부터 ____가 아팠어요."} for key in EVALUATION_KEYS[:5]],
+                "listening": [{"title": key, "content": "선생님, ____에 대해 다시 설명해 주시겠어요?"} for key in EVALUATION_KEYS[5:]],
+            },
+        })
+
+    feedback = {
+        "participant_id": "bench_participant",
+        "session_id": "session_bench",
+        "evaluation_type": "conversation",
+        "timestamp": datetime.fromtimestamp(now).isoformat(),
+        "evaluation": make_evaluation(rng),
+        "conversation_logs": conversation_logs,
+    }
+    return {
+        "chat_session": session_data,
+        "cheatsheet_history": {"status": "success", "cheatsheets": history, "count": len(history)},
+        "feedback": feedback,
+    }
+
+
+def measure(fn, iterations: int) -> dict:
+    durations = []
+    for _ in range(iterations):
+        start_time = time.perf_counter()
+        fn()
+        durations.append((time.perf_counter() - start_time) * 1_000_000)
+    durations.sort()
+    return {
+        "mean_us": round(sum(durations) / len(durations), 1),
+        "p50_us": round(percentile(durations, 0.50), 1),
+        "p95_us": round(percentile(durations, 0.95), 1),
+    }
+
+
+def legacy_write(path: str, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+def legacy_read(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def run_payload(name: str, data, workdir: str, iterations: int) -> dict:
+    legacy_path = os.path.join(workdir, f"{name}_legacy.json")
+    fast_path = os.path.join(workdir, f"{name}_fast.json")
+    legacy_write(legacy_path, data)
+    serialization.write_json(fast_path, data, pretty=False)
+    if legacy_read(fast_path) != legacy_read(legacy_path):
+        raise RuntimeError(f"{name}: 두 방식의 저장 결과가 다릅니다.")
+
+    cases = {
+        "write": (lambda: legacy_write(legacy_path, data), lambda: serialization.write_json(fast_path, data, pretty=False)),
+        "read": (lambda: legacy_read(legacy_path), lambda: serialization.read_json(fast_path)),
+        "response": (lambda: JSONResponse(data).body, lambda: serialization.FastJSONResponse(data).body),
+    }
+    result = {
+        "bytes_legacy": os.path.getsize(legacy_path),
+        "bytes_fast": os.path.getsize(fast_path),
+        "bytes_response_legacy": len(JSONResponse(data).body),
+        "bytes_response_fast": len(serialization.FastJSONResponse(data).body),
+        "ops": {},
+    }
+    for op, (legacy_fn, fast_fn) in cases.items():
+        legacy = measure(legacy_fn, iterations)
+        fast = measure(fast_fn, iterations)
+        speedup = round(legacy["p50_us"] / fast["p50_us"], 2) if fast["p50_us"] else None
+        result["ops"][op] = {"legacy": legacy, "fast": fast, "speedup_p50": speedup}
+        print(
+            f"{name:<20}{op:<10}{legacy['p50_us']:>12.1f}{legacy['p95_us']:>12.1f}"
+            f"{fast['p50_us']:>12.1f}{fast['p95_us']:>12.1f}{speedup or 0:>10.2f}x",
+            flush=True
+        )
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON 직렬화 경로 마이크로 벤치마크")
+    parser.add_argument("--turns", type=int, default=120, help="채팅 세션/피드백의 턴 수")
+    parser.add_argument("--cheatsheets", type=int, default=50, help="치트시트 기록 개수")
+    parser.add_argument("--iterations", type=int, default=300, help="경로별 반복 횟수")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", dest="json_path", help="결과를 JSON 파일로 저장")
+    args = parser.parse_args()
+
+    print(f"직렬화 백엔드: {serialization.BACKEND}, 반복 {args.iterations}회 (단위: us)")
+    print(f"{'payload':<20}{'op':<10}{'json p50':>12}{'json p95':>12}{'fast p50':>12}{'fast p95':>12}{'speedup':>11}")
+    with tempfile.TemporaryDirectory(prefix="nkvoice_serialization_bench_") as workdir:
+        payloads = build_payloads(args.turns, args.cheatsheets, args.seed, workdir)
+        results = {name: run_payload(name, data, workdir, args.iterations) for name, data in payloads.items()}
+
+    print()
+    for name, result in results.items():
+        print(
+            f"{name:<20}파일 {result['bytes_legacy']:>9,} → {result['bytes_fast']:>9,} bytes, "
+            f"응답 {result['bytes_response_legacy']:>9,} → {result['bytes_response_fast']:>9,} bytes"
+        )
+
+    if args.json_path:
+        report = {
+            "timestamp": datetime.now().isoformat(),
+            "backend": serialization.BACKEND,
+            "turns": args.turns,
+            "cheatsheets": args.cheatsheets,
+            "iterations": args.iterations,
+            "payloads": results,
+        }
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+"""logs/ 및 data/ 조회 경로 마이크로 벤치마크
+
+synthetic_data로 만든 트리(또는 실제 트리 사본)를 대상으로 main.py의 조회 함수들을
+직접 호출해 경로별 소요 시간(p50/p95/p99)을 잽니다. HTTP 계층 없이 디렉토리 탐색과
+JSON 읽기 비용만 보므로, 파일 수가 늘어날 때 어떤 조회가 느려지는지 추적할 수 있습니다.
+
+- 참가자는 --seed로 고정된 표본을 쓰므로 같은 트리에서는 실행마다 같은 참가자를 조회합니다.
+- generate_cheatsheet는 LLM 호출이 포함되므로, 같은 프로세스에 지연 없는 가짜 OpenAI 서버를 띄우고
+  먼저 한 번 호출해 LLM 캐시를 채운 뒤 측정합니다 (측정값 = 파일 조회 + LLM 캐시 조회).
+- 운영체제 페이지 캐시는 비우지 않으므로 디스크가 아닌 메모리에 올라온 상태의 비용입니다.
+
+사용 예 (backend 디렉토리에서):
+    python -m bench.storage_bench --root /tmp/nkvoice_tree
+    python -m bench.storage_bench --root /tmp/nkvoice_tree --sample 50 --only get_logs,generate_cheatsheet
+    python -m bench.storage_bench --root /tmp/nkvoice_tree --history storage_bench_history.jsonl
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from turn_timings_report import percentile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile_summary(values: list, errors: int) -> dict:
+    values = sorted(values)
+    return {
+        "calls": len(values),
+        "errors": errors,
+        "mean_ms": round(sum(values) / len(values), 2) if values else 0.0,
+        "p50_ms": round(percentile(values, 0.50), 2),
+        "p95_ms": round(percentile(values, 0.95), 2),
+        "p99_ms": round(percentile(values, 0.99), 2),
+        "max_ms": round(values[-1], 2) if values else 0.0,
+    }
+
+
+def start_fake_openai() -> str:
+    """지연 없는 가짜 OpenAI 서버를 백그라운드 스레드에서 실행하고 base URL을 반환"""
+    import socket
+
+    import uvicorn
+
+    from bench.fake_upstreams import FakeUpstreamSettings, create_app
+
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    settings = FakeUpstreamSettings(llm_latency="0", token_interval_ms=0, tts_latency="0")
+    server = uvicorn.Server(uvicorn.Config(create_app(settings), host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, name="fake-openai", daemon=True).start()
+    deadline = time.time() + 10
+    while not server.started:
+        if time.time() > deadline:
+            raise RuntimeError("가짜 OpenAI 서버가 시작되지 않았습니다.")
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}/v1"
+
+
+def build_cases(main) -> dict:
+    """측정할 조회 경로: 이름 -> (participant_id, session_id)를 받는 코루틴 함수"""
+
+    async def find_latest_session(participant_id, session_id):
+        return main.find_latest_session(participant_id)
+
+    async def list_retry_sessions(participant_id, session_id):
+        return main.retry_session_store.list_session_files(participant_id)
+
+    return {
+        "find_latest_session": find_latest_session,
+        "get_conversation_logs": lambda pid, sid: main.get_conversation_logs(pid),
+        "get_feedback_by_participant": lambda pid, sid: main.get_feedback_by_participant(pid),
+        "get_feedback_by_session": lambda pid, sid: main.get_feedback_by_session(pid, sid),
+        "get_voice_analysis_by_participant": lambda pid, sid: main.get_voice_analysis_by_participant(pid),
+        "get_voice_analysis_by_session": lambda pid, sid: main.get_voice_analysis_by_session(pid, sid),
+        "get_cheatsheet_history": lambda pid, sid: main.get_cheatsheet_history(pid),
+        "list_retry_sessions": list_retry_sessions,
+        "get_logs": lambda pid, sid: main.get_logs(main.LogsRequest(userData={"name": pid, "participantId": pid})),
+        "get_feedback_legacy": lambda pid, sid: main.get_feedback(main.FeedbackRequest(userData={"name": pid})),
+        "generate_cheatsheet": lambda pid, sid: main.process_cheatsheet(main.CheatsheetRequest(participant_id=pid)),
+    }
+
+
+# LLM 캐시를 먼저 채워야 하는 경로
+WARMUP_CASES = {"generate_cheatsheet"}
+
+
+async def run_case(name: str, case, samples: list) -> dict:
+    durations = []
+    errors = 0
+    for participant_id, session_id in samples:
+        start_time = time.perf_counter()
+        try:
+            await case(participant_id, session_id)
+        except Exception:
+            errors += 1
+        durations.append((time.perf_counter() - start_time) * 1000)
+    return percentile_summary(durations, errors)
+
+
+async def run_benchmarks(main, participants: list, case_names: list, sample_size: int, seed: int) -> dict:
+    cases = build_cases(main)
+    results = {}
+    for name in case_names:
+        # 경로마다 고정 시드로 표본을 뽑아 실행 간 비교가 가능하도록 함
+        rng = random.Random(f"{seed}:{name}")
+        sampled = rng.sample(participants, min(sample_size, len(participants)))
+        samples = [(participant_id, main.find_latest_session(participant_id) or "") for participant_id in sampled]
+        if name in WARMUP_CASES:
+            await run_case(name, cases[name], samples)
+        results[name] = await run_case(name, cases[name], samples)
+        row = results[name]
+        print(
+            f"{name:<36}{row['calls']:>7}{row['errors']:>8}{row['mean_ms']:>10.2f}{row['p50_ms']:>10.2f}"
+            f"{row['p95_ms']:>10.2f}{row['p99_ms']:>10.2f}{row['max_ms']:>10.2f}",
+            flush=True
+        )
+    return results
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="logs/ 및 data/ 조회 경로 마이크로 벤치마크")
+    parser.add_argument("--root", required=True, help="logs/와 data/가 있는 디렉토리 (synthetic_data --root)")
+    parser.add_argument("--sample", type=int, default=200, help="경로별로 조회할 참가자 수")
+    parser.add_argument("--only", help="측정할 경로 이름 (쉼표로 구분)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json", dest="json_path", help="결과를 JSON 파일로 저장")
+    parser.add_argument("--history", help="결과를 한 줄씩 추가할 JSONL 파일 (실행 간 추이 비교용)")
+    args = parser.parse_args()
+
+    root = os.path.abspath(args.root)
+    # 아래에서 작업 디렉토리를 바꾸므로 출력 경로는 미리 절대 경로로 변환
+    json_path = os.path.abspath(args.json_path) if args.json_path else None
+    history_path = os.path.abspath(args.history) if args.history else None
+    log_dir = os.path.join(root, "logs")
+    if not os.path.isdir(log_dir):
+        print(f"logs 디렉토리가 없습니다: {log_dir}", file=sys.stderr)
+        return 1
+
+    # main은 작업 디렉토리 기준으로 logs/와 data/를 잡으므로 트리 루트로 이동한 뒤 import
+    cache_dir = tempfile.TemporaryDirectory(prefix="nkvoice_bench_cache_")
+    os.environ.update({
+        "OPENAI_API_KEY": "bench-key",
+        "OPENAI_BASE_URL": start_fake_openai(),
+        "LLM_CACHE_DIR": cache_dir.name,
+    })
+    os.environ.setdefault("LOG_LEVEL", "ERROR")
+    os.environ.setdefault("LLM_CACHE_MAX_MEMORY_ENTRIES", str(max(1000, args.sample * 4)))
+    os.environ.pop("ELEVENLABS_API_KEY", None)
+    os.chdir(root)
+    import main as app_main
+
+    participants = sorted(
+        name for name in os.listdir(log_dir) if os.path.isdir(os.path.join(log_dir, name))
+    )
+    if not participants:
+        print(f"참가자 디렉토리가 없습니다: {log_dir}", file=sys.stderr)
+        return 1
+
+    all_cases = list(build_cases(app_main))
+    case_names = args.only.split(",") if args.only else all_cases
+    unknown = [name for name in case_names if name not in all_cases]
+    if unknown:
+        print(f"알 수 없는 경로: {', '.join(unknown)} (가능한 값: {', '.join(all_cases)})", file=sys.stderr)
+        return 1
+
+    manifest = None
+    manifest_filepath = os.path.join(root, "manifest.json")
+    if os.path.exists(manifest_filepath):
+        with open(manifest_filepath, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+    data_entries = len(os.listdir(app_main.DATA_DIR)) if os.path.isdir(app_main.DATA_DIR) else 0
+    print(f"참가자 {len(participants)}명, data/ 항목 {data_entries}개, 경로별 표본 {args.sample}명 (단위: ms)")
+    print(f"{'path':<36}{'calls':>7}{'errors':>8}{'mean':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}")
+    results = asyncio.run(run_benchmarks(app_main, participants, case_names, args.sample, args.seed))
+
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "git_revision": git_revision(),
+        "root": root,
+        "participants": len(participants),
+        "data_entries": data_entries,
+        "sample": args.sample,
+        "seed": args.seed,
+        "manifest": manifest,
+        "paths": results,
+    }
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+    if history_path:
+        with open(history_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(report, ensure_ascii=False) + "\n")
+    cache_dir.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,372 @@
+"""운영 규모의 logs/ 및 data/ 트리를 만드는 합성 데이터 생성기
+
+앱이 실제로 쓰는 것과 같은 파일 이름/형식으로 다음을 만듭니다.
+- logs/<참가자>/user_info_*.json, cheatsheet_*.json
+- logs/<참가자>/session_*/chat_session.json (긴 세션은 요약 포함), feedback_*.json, voice_analysis_*.json, audio_*.mp3(선택)
+- data/user_data_<참가자>_*.json (로그인 기록과 이전 형식의 Retry 턴 파일, 일부는 *_feedback_* 파일)
+- data/retry_sessions/<참가자>/retry_session_*.jsonl
+파일 수정 시각은 파일 이름의 시각에 맞추며, 같은 --seed면 같은 트리가 만들어집니다.
+생성 조건과 파일 수는 <root>/manifest.json에 기록되어 storage_bench 결과와 함께 남습니다.
+
+사용 예 (backend 디렉토리에서):
+    python -m bench.synthetic_data --root /tmp/nkvoice_tree --participants 10000
+    python -m bench.synthetic_data --root /tmp/small_tree --participants 200 --turns 80 --legacy-retry-files 200
+"""
+import argparse
+import json
+import os
+import random
+import string
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+from session_store import RETRY_SESSIONS_DIRNAME, SESSION_FILENAME, TURN_TIMINGS_FILENAME
+
+PATIENT_LINES = [
+    "안녕하세요, 배가 아파서 왔어요.",
+    "사흘 전부터 명치 쪽이 쓰리고 아파요.",
+    "밥을 먹고 나면 더 심해지는 것 같아요.",
+    "지금은 혈압약을 먹고 있어요.",
+    "알레르기는 없는 것 같아요.",
+    "약은 하루에 몇 번 먹어야 하나요?",
+    "부작용이 생기면 어떻게 해야 하나요?",
+    "다음에는 언제 다시 와야 하나요?",
+]
+DOCTOR_LINES = [
+    "그렇군요. 언제부터 그런 증상이 있으셨나요?",
+    "통증이 어느 정도인지 1부터 10까지로 말씀해 주시겠어요?",
+    "지금 드시고 계신 약이 있으신가요?",
+    "검사 결과를 보니 위염으로 보입니다. 약을 처방해 드릴게요.",
+    "하루 세 번 식후 30분에 드시면 됩니다.",
+    "속이 더 쓰리거나 어지러우면 바로 다시 오세요.",
+    "일주일 뒤에 다시 뵙겠습니다.",
+]
+SYMPTOMS = ["복통", "두통", "기침과 발열", "허리 통증", "어지러움"]
+EVALUATION_KEYS = [
+    "symptom_location", "symptom_timing", "symptom_severity", "current_medication", "allergy_info",
+    "diagnosis_info", "prescription_info", "side_effects", "followup_plan", "emergency_plan",
+]
+# 앱의 SUMMARY_KEEP_RECENT_TURNS 기본값과 같게 최근 턴은 요약하지 않음
+SUMMARY_KEEP_RECENT_TURNS = 6
+
+
+def random_suffix(rng: random.Random, length: int = 9) -> str:
+    return "".join(rng.choice(string.ascii_lowercase + string.digits) for _ in range(length))
+
+
+def file_timestamp(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch).strftime("%Y%m%d_%H%M%S")
+
+
+class TreeWriter:
+    """파일을 쓰고 수정 시각을 맞추면서 종류별 파일 수와 바이트를 집계"""
+
+    def __init__(self):
+        self.counts = Counter()
+
+    def write_json(self, filepath: str, data, epoch: float, kind: str, indent=2):
+        self.write_text(filepath, json.dumps(data, ensure_ascii=False, indent=indent), epoch, kind)
+
+    def write_text(self, filepath: str, text: str, epoch: float, kind: str):
+        with open(filepath, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.utime(filepath, (epoch, epoch))
+        self.counts[kind] += 1
+        self.counts["bytes"] += len(text.encode("utf-8"))
+
+    def write_bytes(self, filepath: str, content: bytes, epoch: float, kind: str):
+        with open(filepath, "wb") as f:
+            f.write(content)
+        os.utime(filepath, (epoch, epoch))
+        self.counts[kind] += 1
+        self.counts["bytes"] += len(content)
+
+
+def make_evaluation(rng: random.Random) -> dict:
+    return {
+        "grades": {key: rng.choice(["상", "중", "하"]) for key in EVALUATION_KEYS},
+        "score_reasons": {key: "대화에서 관련 내용을 일부 언급했습니다." for key in EVALUATION_KEYS},
+        "improvement_tips": [f"개선 제안 {i + 1}" for i in range(rng.randint(2, 10))],
+    }
+
+
+def write_chat_session(writer: TreeWriter, session_dir: str, participant_id: str, session_id: str,
+                       start: float, turns: int, audio_bytes: int, rng: random.Random) -> tuple:
+    """chat_session.json(과 선택적으로 턴별 오디오)을 쓰고 (대화 로그, 마지막 시각)을 반환"""
+    messages = []
+    timing_records = []
+    conversation_logs = []
+    now = start
+    for _ in range(turns):
+        now += rng.uniform(10, 60)
+        audio_url = None
+        if audio_bytes:
+            audio_filename = f"audio_{file_timestamp(now)}.mp3"
+            writer.write_bytes(os.path.join(session_dir, audio_filename), b"\xff\xf3" * (audio_bytes // 2), now, "audio")
+            audio_url = f"/api/audio/{participant_id}/{session_id}/{audio_filename}"
+        user_message = rng.choice(PATIENT_LINES)
+        doctor_response = rng.choice(DOCTOR_LINES)
+        llm_total = rng.lognormvariate(6.5, 0.4)
+        tts = rng.lognormvariate(6.6, 0.3)
+        messages.append({
+            "timestamp": datetime.fromtimestamp(now).isoformat(),
+            "user_message": user_message,
+            "doctor_response": doctor_response,
+            "audio_url": audio_url,
+            "conversation_history_length": len(messages) * 2,
+            "prompt_history_length": min(len(messages) * 2, 20),
+            "speculative": False,
+        })
+        session_persist = rng.uniform(0.5, 5.0)
+        timing_records.append({
+            "timestamp": messages[-1]["timestamp"],
+            "turn": len(messages),
+            "timings_ms": {
+                "prompt_build": round(rng.uniform(0.1, 2.0), 1),
+                "llm_total": round(llm_total, 1),
+                "llm_first_token": round(llm_total * rng.uniform(0.2, 0.5), 1),
+                "tts": round(tts, 1),
+                "audio_write": round(rng.uniform(0.2, 3.0), 1),
+                "session_persist": round(session_persist, 1),
+                "total": round(llm_total + tts + 5 + session_persist, 1),
+            },
+        })
+        conversation_logs.append({
+            "user_message": user_message,
+            "bot_response": doctor_response,
+            "timestamp": messages[-1]["timestamp"],
+            "session_id": session_id,
+        })
+
+    session_data = {
+        "participantId": participant_id,
+        "sessionId": session_id,
+        "session_start": datetime.fromtimestamp(start).isoformat(),
+        "last_updated": datetime.fromtimestamp(now).isoformat(),
+        "messages": messages,
+        "total_messages": len(messages),
+    }
+    if turns > SUMMARY_KEEP_RECENT_TURNS * 2:
+        session_data["summary"] = {
+            "text": "환자는 며칠 전부터 명치 통증이 있었고, 혈압약을 복용 중이며 알레르기는 없다고 말했다.",
+            "covered_turns": turns - SUMMARY_KEEP_RECENT_TURNS,
+            "updated_at": datetime.fromtimestamp(now).isoformat(),
+        }
+    writer.write_json(os.path.join(session_dir, SESSION_FILENAME), session_data, now, "chat_session")
+    if timing_records:
+        writer.write_text(
+            os.path.join(session_dir, TURN_TIMINGS_FILENAME),
+            "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in timing_records),
+            now, "turn_timings"
+        )
+    return conversation_logs, now
+
+
+def generate_participant(log_dir: str, data_dir: str, participant_id: str, options: dict,
+                         rng: random.Random, writer: TreeWriter):
+    base_time = time.time() - rng.uniform(0, options["days"]) * 86400
+    now = base_time
+
+    participant_dir = os.path.join(log_dir, participant_id)
+    os.makedirs(participant_dir, exist_ok=True)
+    symptoms = rng.choice(SYMPTOMS)
+
+    for _ in range(rng.randint(1, options["sessions"])):
+        # 로그인할 때마다 user_info(logs)와 user_data(data) 파일이 하나씩 생김
+        login_time = datetime.fromtimestamp(now).isoformat()
+        writer.write_json(os.path.join(participant_dir, f"user_info_{file_timestamp(now)}.json"), {
+            "participantId": participant_id,
+            "symptoms": symptoms,
+            "consent": True,
+            "loginTime": login_time,
+            "logCreatedAt": login_time,
+        }, now, "user_info")
+        writer.write_json(os.path.join(data_dir, f"user_data_{participant_id}_{file_timestamp(now)}.json"), {
+            "participantId": participant_id,
+            "symptoms": symptoms,
+            "consent": True,
+            "loginTime": login_time,
+        }, now, "user_data_login")
+
+        session_id = f"session_{int(now * 1000)}_{random_suffix(rng)}"
+        session_dir = os.path.join(participant_dir, session_id)
+        os.makedirs(session_dir, exist_ok=True)
+        turns = max(1, int(rng.uniform(0.5, 1.0) * options["turns"]))
+        conversation_logs, now = write_chat_session(
+            writer, session_dir, participant_id, session_id, now, turns, options["audio_bytes"], rng
+        )
+
+        for _ in range(rng.randint(0, options["feedback_per_session"])):
+            now += rng.uniform(30, 600)
+            writer.write_json(os.path.join(session_dir, f"feedback_{file_timestamp(now)}.json"), {
+                "participant_id": participant_id,
+                "session_id": session_id,
+                "evaluation_type": "conversation_based",
+                "timestamp": datetime.fromtimestamp(now).isoformat(),
+                "evaluation": make_evaluation(rng),
+                "conversation_logs": conversation_logs,
+            }, now, "feedback")
+        for _ in range(rng.randint(0, options["voice_analysis_per_session"])):
+            now += rng.uniform(30, 600)
+            writer.write_json(os.path.join(session_dir, f"voice_analysis_{file_timestamp(now)}.json"), {
+                "participant_id": participant_id,
+                "session_id": session_id,
+                "analysis_type": "conversation",
+                "timestamp": datetime.fromtimestamp(now).isoformat(),
+                "analysis": {"fluency": rng.randint(1, 10), "clarity": rng.randint(1, 10), "summary": "발음이 대체로 분명합니다."},
+                "messages": [{"role": "user", "content": log["user_message"]} for log in conversation_logs],
+            }, now, "voice_analysis")
+        now += rng.uniform(3600, 3 * 86400)
+
+    # 이전 형식 Retry 로그: 턴마다 data/ 바로 아래 파일 하나 (일부는 피드백 파일)
+    for _ in range(rng.randint(0, options["legacy_retry_files"])):
+        now += rng.uniform(5, 120)
+        is_feedback = rng.random() < options["legacy_feedback_ratio"]
+        filename = f"user_data_{participant_id}_{'feedback_' if is_feedback else ''}{file_timestamp(now)}_{random_suffix(rng, 4)}.json"
+        legacy_data = {
+            "userData": {"name": participant_id, "participantId": participant_id},
+            "participant_id": participant_id,
+            "sessionType": "retry",
+            "timestamp": datetime.fromtimestamp(now).isoformat(),
+            "conversation": [
+                {"role": "user", "content": rng.choice(PATIENT_LINES)},
+                {"role": "assistant", "content": rng.choice(DOCTOR_LINES)},
+            ],
+        }
+        if is_feedback:
+            legacy_data["feedback"] = make_evaluation(rng)
+        writer.write_json(os.path.join(data_dir, filename), legacy_data, now, "user_data_retry")
+
+    # 현재 형식 Retry 세션: 세션당 JSONL 파일 하나
+    retry_dir = os.path.join(data_dir, RETRY_SESSIONS_DIRNAME, participant_id)
+    retry_sessions = rng.randint(0, options["retry_sessions"])
+    if retry_sessions:
+        os.makedirs(retry_dir, exist_ok=True)
+    for _ in range(retry_sessions):
+        session_id = f"retry_session_{int(now * 1000)}_{random_suffix(rng)}"
+        lines = [json.dumps({
+            "type": "session",
+            "sessionId": session_id,
+            "participant_id": participant_id,
+            "sessionType": "retry",
+            "userData": {"name": participant_id, "participantId": participant_id},
+            "session_start": datetime.fromtimestamp(now).isoformat(),
+        }, ensure_ascii=False)]
+        for _ in range(max(1, int(rng.uniform(0.5, 1.0) * options["retry_turns"]))):
+            now += rng.uniform(10, 60)
+            lines.append(json.dumps({
+                "type": "turn",
+                "timestamp": datetime.fromtimestamp(now).isoformat(),
+                "user": rng.choice(PATIENT_LINES),
+                "assistant": rng.choice(DOCTOR_LINES),
+            }, ensure_ascii=False))
+        writer.write_text(os.path.join(retry_dir, f"{session_id}.jsonl"), "\n".join(lines) + "\n", now, "retry_session")
+        now += rng.uniform(600, 86400)
+
+    for _ in range(rng.randint(0, options["cheatsheets"])):
+        now += rng.uniform(60, 86400)
+        writer.write_json(os.path.join(participant_dir, f"cheatsheet_{file_timestamp(now)}.json"), {
+            "participant_id": participant_id,
+            "timestamp": datetime.fromtimestamp(now).isoformat(),
+            "cheatsheet": {
+                "script": [{"title": key, "content": "저는 ____부터 ____가 아팠어요."} for key in EVALUATION_KEYS[:5]],
+                "listening": [{"title": key, "content": "선생님, ____에 대해 다시 설명해 주시겠어요?"} for key in EVALUATION_KEYS[5:]],
+            },
+        }, now, "cheatsheet")
+
+
+def generate_range(root: str, start_index: int, end_index: int, options: dict) -> dict:
+    """참가자 start_index~end_index-1을 생성 (프로세스 풀 작업 단위)"""
+    log_dir = os.path.join(root, "logs")
+    data_dir = os.path.join(root, "data")
+    writer = TreeWriter()
+    for index in range(start_index, end_index):
+        # 참가자마다 시드를 고정해 작업 분할과 상관없이 같은 트리가 나오도록 함
+        rng = random.Random(f"{options['seed']}:{index}")
+        generate_participant(log_dir, data_dir, participant_id_for(index, options), options, rng, writer)
+    return dict(writer.counts)
+
+
+def participant_id_for(index: int, options: dict) -> str:
+    return f"{options['prefix']}{index:05d}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="운영 규모의 logs/ 및 data/ 합성 트리 생성")
+    parser.add_argument("--root", required=True, help="트리를 만들 디렉토리 (logs/, data/가 생성됨)")
+    parser.add_argument("--participants", type=int, default=10000, help="참가자 수")
+    parser.add_argument("--prefix", default="P", help="참가자 ID 접두사")
+    parser.add_argument("--sessions", type=int, default=4, help="참가자당 최대 정규 세션 수")
+    parser.add_argument("--turns", type=int, default=40, help="세션당 최대 채팅 턴 수")
+    parser.add_argument("--feedback-per-session", type=int, default=3, help="세션당 최대 feedback_* 파일 수")
+    parser.add_argument("--voice-analysis-per-session", type=int, default=2, help="세션당 최대 voice_analysis_* 파일 수")
+    parser.add_argument("--legacy-retry-files", type=int, default=30, help="참가자당 최대 이전 형식 user_data_* Retry 파일 수")
+    parser.add_argument("--legacy-feedback-ratio", type=float, default=0.1, help="이전 형식 파일 중 feedback 파일 비율")
+    parser.add_argument("--retry-sessions", type=int, default=5, help="참가자당 최대 Retry 세션(JSONL) 수")
+    parser.add_argument("--retry-turns", type=int, default=20, help="Retry 세션당 최대 턴 수")
+    parser.add_argument("--cheatsheets", type=int, default=3, help="참가자당 최대 cheatsheet_* 파일 수")
+    parser.add_argument("--audio-bytes", type=int, default=0, help="턴별 가짜 오디오 파일 크기 (0이면 만들지 않음)")
+    parser.add_argument("--days", type=float, default=90, help="활동 시작 시각을 분산할 기간 (일)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="생성 프로세스 수")
+    args = parser.parse_args()
+
+    root = os.path.abspath(args.root)
+    if os.path.exists(os.path.join(root, "manifest.json")):
+        print(f"이미 생성된 트리가 있습니다: {root} (다른 --root를 지정하거나 먼저 삭제하세요)", file=sys.stderr)
+        return 1
+    os.makedirs(os.path.join(root, "logs"), exist_ok=True)
+    os.makedirs(os.path.join(root, "data", RETRY_SESSIONS_DIRNAME), exist_ok=True)
+
+    options = {
+        "prefix": args.prefix,
+        "sessions": args.sessions,
+        "turns": args.turns,
+        "feedback_per_session": args.feedback_per_session,
+        "voice_analysis_per_session": args.voice_analysis_per_session,
+        "legacy_retry_files": args.legacy_retry_files,
+        "legacy_feedback_ratio": args.legacy_feedback_ratio,
+        "retry_sessions": args.retry_sessions,
+        "retry_turns": args.retry_turns,
+        "cheatsheets": args.cheatsheets,
+        "audio_bytes": args.audio_bytes,
+        "days": args.days,
+        "seed": args.seed,
+    }
+
+    start_time = time.perf_counter()
+    counts = Counter()
+    chunk_size = max(1, min(500, args.participants // max(1, args.workers * 4) or 1))
+    ranges = [(start, min(start + chunk_size, args.participants)) for start in range(0, args.participants, chunk_size)]
+    if args.workers > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            futures = [executor.submit(generate_range, root, start, end, options) for start, end in ranges]
+            for done, future in enumerate(futures, 1):
+                counts.update(future.result())
+                print(f"\r{ranges[done - 1][1]}/{args.participants} 참가자 생성", end="", file=sys.stderr)
+    else:
+        for start, end in ranges:
+            counts.update(generate_range(root, start, end, options))
+            print(f"\r{end}/{args.participants} 참가자 생성", end="", file=sys.stderr)
+    print(file=sys.stderr)
+
+    manifest = {
+        "generated_at": datetime.now().isoformat(),
+        "participants": args.participants,
+        "options": options,
+        "files": {kind: count for kind, count in sorted(counts.items()) if kind != "bytes"},
+        "total_files": sum(count for kind, count in counts.items() if kind != "bytes"),
+        "total_mb": round(counts["bytes"] / 1024 / 1024, 1),
+        "elapsed_seconds": round(time.perf_counter() - start_time, 1),
+    }
+    with open(os.path.join(root, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    print(json.dumps(manifest, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
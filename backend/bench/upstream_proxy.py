@@ -0,0 +1,171 @@
+"""OpenAI / ElevenLabs 요청을 기록하고 재생하는 프록시
+
+앱의 OPENAI_BASE_URL / ELEVENLABS_BASE_URL을 이 프록시로 돌리면 모든 외부 API 호출
+(chat, evaluate_conversation, check_quests, generate_cheatsheet, TTS 등)이 프록시를 거칩니다.
+- record: 실제 API로 전달하면서 요청/응답과 청크별 도착 시각을 카세트에 저장
+- replay: 카세트에서만 응답 (원래 시각대로 청크를 보내므로 스트리밍/지연도 재현, 키와 네트워크 불필요)
+- auto: 카세트에 있으면 재생, 없으면 기록
+재생 매칭은 기본적으로 요청 본문까지 같아야 하며(--match body), 프롬프트가 바뀐 상태에서
+응답 파싱/지연만 보고 싶으면 같은 경로의 기록을 차례로 쓰는 --match path를 사용합니다.
+같은 요청이 여러 번 기록됐으면 기록된 순서대로 돌려주므로, 동시 요청의 순서가 기록 때와 달라지면
+이후 단계의 요청이 달라져 카세트에서 못 찾을 수 있습니다 (정확한 재현이 필요하면 동시성 1로 기록/재생).
+
+사용 예 (backend 디렉토리에서):
+    # 1. 실제 API로 기록
+    python -m bench.upstream_proxy --mode record --cassettes cassettes/baseline --port 9200
+    OPENAI_BASE_URL=http://127.0.0.1:9200/openai ELEVENLABS_BASE_URL=http://127.0.0.1:9200/elevenlabs uvicorn main:app
+    # 2. 키/네트워크 없이 재생
+    python -m bench.upstream_proxy --mode replay --cassettes cassettes/baseline --port 9200
+    # 또는 부하 테스트에서 바로 재생
+    python -m bench.load_test --cassettes cassettes/baseline --seed 1
+"""
+import argparse
+import asyncio
+import logging
+import time
+from collections import Counter
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from bench.cassettes import RECORDED_RESPONSE_HEADERS, CassetteStore, decode_chunk, encode_chunk, request_key
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_UPSTREAMS = {
+    "openai": "https://api.openai.com/v1",
+    "elevenlabs": "https://api.elevenlabs.io/v1",
+}
+# 실제 API로 전달할 요청 헤더 (카세트에는 저장하지 않음)
+FORWARDED_REQUEST_HEADERS = {
+    "authorization", "xi-api-key", "content-type", "accept", "openai-organization", "openai-project",
+}
+MODES = ("record", "replay", "auto")
+
+
+def elapsed_ms(start_time: float) -> float:
+    return round((time.perf_counter() - start_time) * 1000, 2)
+
+
+def create_app(store: CassetteStore, mode: str = "replay", match: str = "body", speed: float = 1.0,
+               upstreams: dict = None) -> FastAPI:
+    upstreams = upstreams or DEFAULT_UPSTREAMS
+    app = FastAPI(title="Upstream record/replay proxy")
+    counts = Counter()
+    client = httpx.AsyncClient(timeout=httpx.Timeout(120.0, connect=10.0))
+
+    @app.on_event("shutdown")
+    async def close_client():
+        await client.aclose()
+
+    async def replay(interaction: dict) -> StreamingResponse:
+        start_time = time.perf_counter()
+        # 응답 헤더가 도착하기까지의 시간부터 재현
+        await asyncio.sleep(interaction.get("headers_ms", 0) / 1000 * speed)
+
+        async def body():
+            for chunk in interaction["chunks"]:
+                delay = chunk["offset_ms"] / 1000 * speed - (time.perf_counter() - start_time)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                yield decode_chunk(chunk)
+
+        return StreamingResponse(body(), status_code=interaction["status_code"], headers=interaction["headers"])
+
+    async def record(provider: str, request: Request, api_path: str, body: bytes):
+        start_time = time.perf_counter()
+        headers = {name: value for name, value in request.headers.items() if name.lower() in FORWARDED_REQUEST_HEADERS}
+        upstream_request = client.build_request(request.method, f"{upstreams[provider]}{api_path}", content=body, headers=headers)
+        try:
+            upstream_response = await client.send(upstream_request, stream=True)
+        except httpx.HTTPError as e:
+            counts["upstream_errors"] += 1
+            logger.warning("외부 API 연결 실패 (%s %s): %s", provider, api_path, e)
+            return JSONResponse(status_code=502, content={"error": {"message": f"proxy upstream error: {type(e).__name__}"}})
+        headers_ms = elapsed_ms(start_time)
+        response_headers = {
+            name: value for name, value in upstream_response.headers.items() if name.lower() in RECORDED_RESPONSE_HEADERS
+        }
+
+        async def relay():
+            chunks = []
+            try:
+                # aiter_bytes는 gzip 등을 푼 바이트이므로 content-encoding 헤더는 전달하지 않음
+                async for data in upstream_response.aiter_bytes():
+                    chunks.append(dict(encode_chunk(data), offset_ms=elapsed_ms(start_time)))
+                    yield data
+            finally:
+                await upstream_response.aclose()
+            # 끝까지 받은 응답만 기록 (중간에 끊긴 응답은 재생해도 의미가 없음)
+            await asyncio.to_thread(store.record, provider, request.method, api_path, body, {
+                "status_code": upstream_response.status_code,
+                "headers": response_headers,
+                "headers_ms": headers_ms,
+                "total_ms": elapsed_ms(start_time),
+                "chunks": chunks,
+            })
+            counts["recorded"] += 1
+
+        return StreamingResponse(relay(), status_code=upstream_response.status_code, headers=response_headers)
+
+    @app.get("/_proxy/stats")
+    async def get_stats():
+        return {"mode": mode, "match": match, "speed": speed, "counts": dict(counts), "store": store.stats()}
+
+    @app.api_route("/{provider}/{path:path}", methods=["GET", "POST", "DELETE"])
+    async def proxy(provider: str, path: str, request: Request):
+        if provider not in upstreams:
+            return JSONResponse(status_code=404, content={"error": {"message": f"unknown provider: {provider}"}})
+        body = await request.body()
+        api_path = f"/{path}" + (f"?{request.url.query}" if request.url.query else "")
+
+        if mode in ("replay", "auto"):
+            interaction = store.find(provider, request.method, api_path, body, match=match)
+            if interaction is not None:
+                counts["replayed"] += 1
+                return await replay(interaction)
+            if mode == "replay":
+                # 404는 앱에서 재시도하지 않으므로 빠르게 실패함
+                counts["missed"] += 1
+                logger.warning("카세트에 없는 요청: %s %s %s (키 %s)", provider, request.method, api_path,
+                               request_key(request.method, api_path, body))
+                return JSONResponse(status_code=404, content={"error": {"message": "cassette not found", "type": "cassette_miss"}})
+        return await record(provider, request, api_path, body)
+
+    return app
+
+
+def add_proxy_arguments(parser: argparse.ArgumentParser):
+    """프록시 설정 인자 (load_test에서도 같은 인자를 사용)"""
+    parser.add_argument("--cassette-mode", choices=MODES, default="replay", help="record/replay/auto (기본값: replay)")
+    parser.add_argument("--cassette-match", choices=("body", "path"), default="body", help="재생할 기록을 고르는 기준")
+    parser.add_argument("--replay-speed", type=float, default=1.0, help="기록된 지연 시간에 곱할 배수 (0이면 지연 없이 재생)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OpenAI / ElevenLabs 기록/재생 프록시")
+    parser.add_argument("--cassettes", required=True, help="카세트 디렉토리")
+    parser.add_argument("--mode", dest="cassette_mode", choices=MODES, default="replay", help="record/replay/auto")
+    parser.add_argument("--match", dest="cassette_match", choices=("body", "path"), default="body", help="재생할 기록을 고르는 기준")
+    parser.add_argument("--speed", dest="replay_speed", type=float, default=1.0, help="기록된 지연 시간에 곱할 배수")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9200)
+    parser.add_argument("--openai-upstream", default=DEFAULT_UPSTREAMS["openai"], help="기록 시 OpenAI API 주소")
+    parser.add_argument("--elevenlabs-upstream", default=DEFAULT_UPSTREAMS["elevenlabs"], help="기록 시 ElevenLabs API 주소")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    store = CassetteStore(args.cassettes)
+    upstreams = {
+        "openai": args.openai_upstream.rstrip("/"),
+        "elevenlabs": args.elevenlabs_upstream.rstrip("/"),
+    }
+    logger.info("카세트 %s (%s 모드): %s", args.cassettes, args.cassette_mode, store.stats()["providers"])
+    app = create_app(store, args.cassette_mode, args.cassette_match, args.replay_speed, upstreams)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
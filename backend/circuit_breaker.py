@@ -0,0 +1,165 @@
+"""외부 API 서킷 브레이커
+
+(제공자, 엔드포인트)별로 최근 호출 결과를 보고, 실패율이나 느린 호출 비율이 임계값을 넘으면
+회로를 열어(open) 일정 시간 동안 호출하지 않고 바로 CircuitOpenError를 발생시킵니다.
+시간이 지나면 반열림(half-open) 상태에서 소수의 호출만 통과시켜 복구 여부를 확인하고,
+성공하면 닫고(closed) 실패하면 다시 엽니다. 장애 중에 요청마다 실패를 기다리며
+연결이 쌓이는 것을 막고, 호출하는 쪽이 바로 대체 응답을 줄 수 있게 합니다.
+"""
+import logging
+import time
+from collections import deque
+
+from upstream import UpstreamBusyError, get_status_code, is_retryable
+
+logger = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+# 메트릭용 상태 값
+STATE_VALUES = {STATE_CLOSED: 0, STATE_HALF_OPEN: 1, STATE_OPEN: 2}
+
+
+class CircuitOpenError(UpstreamBusyError):
+    """회로가 열려 있어 외부 API를 호출하지 않은 경우 (처리되지 않으면 503 + Retry-After)"""
+
+    def __init__(self, provider: str, endpoint: str, retry_after: float):
+        super().__init__(provider, f"{endpoint} 호출 차단 중 (외부 API 장애)", retry_after=retry_after)
+        self.endpoint = endpoint
+
+
+def is_upstream_failure(exc: BaseException) -> bool:
+    """회로 상태에 반영할 실패인지 (5xx, 429, 연결/타임아웃 오류 - 요청 자체의 4xx 오류는 제외)"""
+    if isinstance(exc, CircuitOpenError):
+        return False
+    if isinstance(exc, UpstreamBusyError):
+        # 내부 대기열 혼잡은 제외하고, 재시도를 모두 소진한 429만 실패로 봄
+        return get_status_code(exc.__cause__) == 429 if exc.__cause__ is not None else False
+    status_code = get_status_code(exc)
+    if status_code is not None:
+        return status_code >= 500 or status_code in (408, 429)
+    return is_retryable(exc)
+
+
+class CircuitBreaker:
+    """최근 호출 window개의 실패/느린 호출 비율로 열고 닫는 회로"""
+
+    def __init__(self, provider: str, endpoint: str, window: int = 20, min_calls: int = 10,
+                 failure_rate: float = 0.5, slow_call_seconds: float = 30.0, slow_call_rate: float = 0.8,
+                 open_seconds: float = 30.0, half_open_calls: int = 1):
+        self.provider = provider
+        self.endpoint = endpoint
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+
+        self.state = STATE_CLOSED
+        # (실패 여부, 느린 호출 여부)
+        self._results = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._half_open_in_flight = 0
+        self._half_open_successes = 0
+
+        self.opened = 0
+        self.rejected = 0
+
+    def retry_after(self) -> float:
+        return max(1.0, self.open_seconds - (time.monotonic() - self._opened_at))
+
+    def before_call(self):
+        """호출 전에 확인 (열려 있으면 CircuitOpenError)"""
+        if self.state == STATE_OPEN:
+            if time.monotonic() - self._opened_at < self.open_seconds:
+                self.rejected += 1
+                raise CircuitOpenError(self.provider, self.endpoint, self.retry_after())
+            self.state = STATE_HALF_OPEN
+            self._half_open_in_flight = 0
+            self._half_open_successes = 0
+            logger.info("회로 반열림: %s/%s (복구 확인 호출 허용)", self.provider, self.endpoint)
+        if self.state == STATE_HALF_OPEN:
+            if self._half_open_in_flight >= self.half_open_calls:
+                self.rejected += 1
+                raise CircuitOpenError(self.provider, self.endpoint, 1.0)
+            self._half_open_in_flight += 1
+
+    def record(self, failed: bool, duration: float):
+        """호출 결과 반영 (before_call을 통과한 호출마다 한 번)"""
+        slow = duration >= self.slow_call_seconds
+        if self.state == STATE_HALF_OPEN:
+            self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+            if failed or slow:
+                self._open("복구 확인 실패")
+                return
+            self._half_open_successes += 1
+            if self._half_open_successes >= self.half_open_calls:
+                self.state = STATE_CLOSED
+                self._results.clear()
+                logger.info("회로 닫힘: %s/%s (복구됨)", self.provider, self.endpoint)
+            return
+        if self.state == STATE_OPEN:
+            # 열리기 전에 시작된 호출의 결과는 반영하지 않음
+            return
+
+        self._results.append((failed, slow))
+        if len(self._results) < self.min_calls:
+            return
+        failures = sum(1 for failed_call, _ in self._results if failed_call)
+        slow_calls = sum(1 for _, slow_call in self._results if slow_call)
+        if failures / len(self._results) >= self.failure_rate:
+            self._open(f"실패율 {failures}/{len(self._results)}")
+        elif slow_calls / len(self._results) >= self.slow_call_rate:
+            self._open(f"느린 호출 {slow_calls}/{len(self._results)}")
+
+    def record_cancelled(self):
+        """결과 없이 취소된 호출 (반열림 상태의 확인 호출 자리만 반납)"""
+        if self.state == STATE_HALF_OPEN:
+            self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+
+    def _open(self, reason: str):
+        self.state = STATE_OPEN
+        self._opened_at = time.monotonic()
+        self._results.clear()
+        self.opened += 1
+        logger.warning("회로 열림: %s/%s (%s, %.0f초 동안 호출 차단)", self.provider, self.endpoint, reason, self.open_seconds)
+
+    def stats(self) -> dict:
+        failures = sum(1 for failed, _ in self._results if failed)
+        return {
+            "state": self.state,
+            "recent_calls": len(self._results),
+            "recent_failures": failures,
+            "opened": self.opened,
+            "rejected": self.rejected,
+            "retry_after": round(self.retry_after(), 1) if self.state == STATE_OPEN else None,
+        }
+
+
+class CircuitBreakers:
+    """(제공자, 엔드포인트)별 서킷 브레이커 보관 (처음 호출할 때 생성)"""
+
+    def __init__(self, enabled: bool = True, **breaker_kwargs):
+        self.enabled = enabled
+        self.breaker_kwargs = breaker_kwargs
+        self._breakers = {}
+
+    def get(self, provider: str, endpoint: str):
+        if not self.enabled:
+            return None
+        key = (provider, endpoint)
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = self._breakers[key] = CircuitBreaker(provider, endpoint, **self.breaker_kwargs)
+        return breaker
+
+    def items(self):
+        return list(self._breakers.items())
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "breakers": {f"{provider}:{endpoint}": breaker.stats() for (provider, endpoint), breaker in self._breakers.items()},
+        }
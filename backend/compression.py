@@ -0,0 +1,330 @@
+"""HTTP 응답 압축 미들웨어 (Accept-Encoding 협상, gzip/brotli)
+
+치트시트 기록, 세션 로그, 평가 결과처럼 한글 텍스트가 많은 JSON 응답은 ngrok을 거쳐 모바일
+데이터로 전송되므로, 클라이언트가 지원하는 인코딩(br > gzip)으로 압축해서 보냅니다.
+- 허용 목록의 콘텐츠 타입(JSON, NDJSON, 텍스트)만 압축하고 오디오(MP3/Opus) 등은 그대로 보냅니다.
+- COMPRESSION_MIN_SIZE보다 작은 응답, 이미 Content-Encoding이 있는 응답, 부분 응답(206)은 압축하지 않습니다.
+- NDJSON 스트리밍 응답은 청크마다 flush하므로 이벤트가 지연되지 않습니다.
+- 한 번에 만들어진 응답 본문은 (인코딩, 본문 해시)를 키로 압축 결과를 LRU 캐시에 보관하므로,
+  내용이 바뀌지 않는 기록(피드백, 음성 분석, 치트시트 페이지)을 반복 조회할 때는 다시 압축하지 않습니다.
+brotli 패키지가 없으면 gzip만 사용합니다.
+"""
+import gzip
+import hashlib
+import logging
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Optional
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+ENCODING_BROTLI = "br"
+ENCODING_GZIP = "gzip"
+
+DEFAULT_COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+    "text/",
+)
+# 압축하지 않는 상태 코드 (본문 없음 / 부분 응답)
+SKIP_STATUS_CODES = {204, 206, 304}
+
+
+def parse_accept_encoding(header: str) -> dict:
+    """Accept-Encoding 헤더를 {인코딩: q값}으로 변환 (잘못된 q값은 0으로 취급)"""
+    accepted = {}
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[token] = quality
+    return accepted
+
+
+def choose_encoding(header: str, available: tuple) -> Optional[str]:
+    """클라이언트가 허용한 인코딩 중 q값이 가장 높은 것 (같으면 available 순서 우선)"""
+    if not header:
+        return None
+    accepted = parse_accept_encoding(header)
+    best, best_quality = None, 0.0
+    for encoding in available:
+        quality = accepted.get(encoding, accepted.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class CompressionStats:
+    """압축 결과 집계 (메트릭 수집용, 인코딩별)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.responses = {}
+        self.bytes_in = {}
+        self.bytes_out = {}
+        self.skipped = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def record(self, encoding: str, original: int, compressed: int):
+        with self._lock:
+            self.responses[encoding] = self.responses.get(encoding, 0) + 1
+            self.bytes_in[encoding] = self.bytes_in.get(encoding, 0) + original
+            self.bytes_out[encoding] = self.bytes_out.get(encoding, 0) + compressed
+
+    def skip(self, reason: str):
+        with self._lock:
+            self.skipped[reason] = self.skipped.get(reason, 0) + 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            ratios = {
+                encoding: round(self.bytes_out[encoding] / self.bytes_in[encoding], 3)
+                for encoding in self.bytes_in if self.bytes_in[encoding]
+            }
+            return {
+                "responses": dict(self.responses),
+                "bytes_in": dict(self.bytes_in),
+                "bytes_out": dict(self.bytes_out),
+                "ratio": ratios,
+                "skipped": dict(self.skipped),
+                "cache_hits": self.cache_hits,
+                "cache_misses": self.cache_misses,
+            }
+
+
+class PrecompressedCache:
+    """(인코딩, 본문 해시) -> 압축된 본문 LRU 캐시 (전체 압축 바이트 수로 제한)"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def put(self, key: tuple, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = body
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._size, "max_bytes": self.max_bytes}
+
+
+class StreamCompressor:
+    """스트리밍 응답용 압축기 (청크마다 flush해서 바로 보낼 수 있는 바이트를 반환)"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == ENCODING_BROTLI:
+            self._compressor = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == ENCODING_BROTLI:
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == ENCODING_BROTLI:
+            return self._compressor.finish()
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    """Accept-Encoding에 따라 응답을 gzip/brotli로 압축하는 ASGI 미들웨어"""
+
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 5,
+                 compressible_types: tuple = DEFAULT_COMPRESSIBLE_TYPES, cache_max_bytes: int = 32 * 1024 * 1024,
+                 stats: Optional[CompressionStats] = None, cache: Optional[PrecompressedCache] = None,
+                 enabled: bool = True):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.compressible_types = compressible_types
+        self.enabled = enabled
+        self.stats = stats if stats is not None else CompressionStats()
+        self.cache = cache if cache is not None else PrecompressedCache(cache_max_bytes)
+        self.encodings = (ENCODING_BROTLI, ENCODING_GZIP) if brotli is not None else (ENCODING_GZIP,)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.enabled:
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = ""
+        for name, value in scope.get("headers", []):
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = choose_encoding(accept_encoding, self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = _CompressingResponder(self, encoding, send)
+        await self.app(scope, receive, responder)
+
+    def is_compressible(self, content_type: str) -> bool:
+        media_type = content_type.split(";", 1)[0].strip().lower()
+        return any(
+            media_type.startswith(allowed) if allowed.endswith("/") else media_type == allowed
+            for allowed in self.compressible_types
+        )
+
+    def compress_body(self, encoding: str, body: bytes) -> bytes:
+        """한 번에 만들어진 응답 본문 압축 (같은 본문은 캐시에서 재사용)"""
+        key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+        compressed = self.cache.get(key)
+        if compressed is not None:
+            self.stats.cache_hits += 1
+            return compressed
+        self.stats.cache_misses += 1
+        if encoding == ENCODING_BROTLI:
+            compressed = brotli.compress(body, quality=self.brotli_quality)
+        else:
+            compressed = gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+        self.cache.put(key, compressed)
+        return compressed
+
+
+class _CompressingResponder:
+    """응답 시작 메시지를 본문 첫 청크까지 보류했다가 압축 여부를 결정하는 send 래퍼"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start_message = None
+        self.mode = None  # None: 결정 전, "passthrough", "buffered", "stream"
+        self.compressor = None
+        self.original_bytes = 0
+        self.compressed_bytes = 0
+
+    async def __call__(self, message):
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            self.start_message = message
+            if not self._should_consider(message):
+                self.mode = "passthrough"
+                await self.send(message)
+            return
+        if message_type != "http.response.body" or self.mode == "passthrough":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.mode is None:
+            if not more_body:
+                await self._send_complete(body)
+                return
+            self.mode = "stream"
+            self.compressor = StreamCompressor(self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality)
+            headers = self._compressed_headers(content_length=None)
+            await self.send({**self.start_message, "headers": headers})
+
+        self.original_bytes += len(body)
+        chunk = self.compressor.compress(body) if body else b""
+        if not more_body:
+            chunk += self.compressor.finish()
+            self.compressed_bytes += len(chunk)
+            self.middleware.stats.record(self.encoding, self.original_bytes, self.compressed_bytes)
+        else:
+            self.compressed_bytes += len(chunk)
+        if chunk or not more_body:
+            await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    def _should_consider(self, message) -> bool:
+        if message.get("status", 200) in SKIP_STATUS_CODES:
+            return False
+        content_type = ""
+        for name, value in message.get("headers", []):
+            if name == b"content-encoding":
+                return False
+            if name == b"content-type":
+                content_type = value.decode("latin-1")
+        if not self.middleware.is_compressible(content_type):
+            self.middleware.stats.skip("content_type")
+            return False
+        return True
+
+    async def _send_complete(self, body: bytes):
+        if len(body) < self.middleware.minimum_size:
+            self.middleware.stats.skip("small")
+            await self.send(self.start_message)
+            await self.send({"type": "http.response.body", "body": body})
+            return
+        compressed = self.middleware.compress_body(self.encoding, body)
+        self.middleware.stats.record(self.encoding, len(body), len(compressed))
+        await self.send({**self.start_message, "headers": self._compressed_headers(content_length=len(compressed))})
+        await self.send({"type": "http.response.body", "body": compressed})
+
+    def _compressed_headers(self, content_length: Optional[int]) -> list:
+        headers = []
+        vary = None
+        for name, value in self.start_message.get("headers", []):
+            if name == b"content-length":
+                continue
+            if name == b"vary":
+                vary = value
+                continue
+            if name == b"etag" and not value.startswith(b"W/"):
+                # 압축된 표현은 원본과 바이트가 다르므로 약한 ETag로 변경
+                value = b"W/" + value
+            headers.append((name, value))
+        if vary is None:
+            vary = b"Accept-Encoding"
+        elif b"accept-encoding" not in vary.lower():
+            vary = vary + b", Accept-Encoding"
+        headers.append((b"vary", vary))
+        headers.append((b"content-encoding", self.encoding.encode("latin-1")))
+        if content_length is not None:
+            headers.append((b"content-length", str(content_length).encode("latin-1")))
+        return headers
+
+
+def compression_settings_from_env() -> dict:
+    """환경 변수에서 CompressionMiddleware 설정을 읽음"""
+    return {
+        "enabled": os.getenv("COMPRESSION_ENABLED", "true").lower() == "true",
+        "minimum_size": int(os.getenv("COMPRESSION_MIN_SIZE", "1024")),
+        "gzip_level": int(os.getenv("COMPRESSION_GZIP_LEVEL", "6")),
+        "brotli_quality": int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5")),
+    }
@@ -0,0 +1,69 @@
+"""저장된 JSON 기록을 사람이 읽기 쉬운 들여쓰기 형식으로 내보내는 도구
+
+앱은 logs/와 data/의 JSON 파일을 공백 없는 압축 형식으로 저장합니다. 연구자가 파일을 직접
+열어 볼 때는 이 도구로 디렉토리 구조를 그대로 유지한 들여쓰기 사본을 만듭니다.
+.json은 2칸 들여쓰기로 바꾸고, .jsonl(Retry 세션)은 한 줄에 한 기록 형식을 유지하며, 오디오 등 다른 파일은 복사하지 않습니다.
+
+사용 예:
+    python export_records.py logs exports/logs
+    python export_records.py logs exports/P001 --participant P001
+    python export_records.py data exports/data
+"""
+import argparse
+import os
+import shutil
+import sys
+
+from serialization import read_json, write_json
+
+
+def export_tree(source_dir: str, target_dir: str, participant: str = None) -> tuple:
+    """source_dir의 JSON 기록을 target_dir로 내보내고 (내보낸 파일 수, 읽지 못한 파일 수)를 반환"""
+    if participant:
+        source_dir = os.path.join(source_dir, participant)
+    exported = 0
+    failed = 0
+    for current_dir, _, filenames in os.walk(source_dir):
+        relative_dir = os.path.relpath(current_dir, source_dir)
+        for filename in sorted(filenames):
+            source_path = os.path.join(current_dir, filename)
+            target_path = os.path.join(target_dir, relative_dir, filename)
+            if filename.endswith(".json"):
+                try:
+                    data = read_json(source_path)
+                except (OSError, ValueError) as e:
+                    print(f"읽기 실패: {source_path} - {e}", file=sys.stderr)
+                    failed += 1
+                    continue
+                os.makedirs(os.path.dirname(target_path), exist_ok=True)
+                write_json(target_path, data, pretty=True)
+            elif filename.endswith(".jsonl"):
+                os.makedirs(os.path.dirname(target_path), exist_ok=True)
+                shutil.copyfile(source_path, target_path)
+            else:
+                continue
+            exported += 1
+    return exported, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="저장된 JSON 기록을 들여쓰기 형식으로 내보내기")
+    parser.add_argument("source", help="내보낼 디렉토리 (logs 또는 data)")
+    parser.add_argument("target", help="사본을 만들 디렉토리")
+    parser.add_argument("--participant", help="특정 참가자 ID만 내보내기 (source 아래 참가자 디렉토리)")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.source):
+        print(f"디렉토리가 없습니다: {args.source}", file=sys.stderr)
+        return 1
+    if os.path.abspath(args.target) == os.path.abspath(args.source):
+        print("source와 target은 다른 디렉토리여야 합니다.", file=sys.stderr)
+        return 1
+
+    exported, failed = export_tree(args.source, args.target, args.participant)
+    print(f"{exported}개 파일 내보냄 ({args.target}), 읽기 실패 {failed}개")
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+"""외부 API 헤징(hedged request) 정책
+
+응답이 최근 지연 시간의 분위수(기본 p90)보다 늦어지면 같은 요청을 한 번 더 보내고
+먼저 끝난 결과를 사용해 꼬리 지연을 줄입니다. 추가 요청은 예산(전체 호출 대비 비율)
+안에서만 보내므로 외부 API가 전반적으로 느려져도 호출 수가 두 배로 늘지 않습니다.
+실행 자체는 UpstreamScheduler.call(hedge=...)이 담당하고, 이 모듈은 임계값/예산/통계만 관리합니다.
+
+진 요청은 실제로 취소되지 않습니다. 스레드에서 실행 중인 동기 호출은 멈출 수 없으므로 외부 API 호출이
+끝날 때까지 계속 실행되고(토큰/요금도 그대로 발생), 그동안 제공자 슬롯도 차지합니다.
+그래서 아직 실행 중인 진 요청은 예산을 쓰고 있는 것으로 계산하고, 제공자 슬롯 사용률이
+max_utilization 이상이면 헤징하지 않습니다.
+"""
+from collections import deque
+from typing import Optional
+
+# 헤징 결과 (메트릭 outcome 라벨)
+HEDGE_OUTCOMES = ("hedge_won", "primary_won", "both_failed", "skipped_budget", "skipped_capacity")
+
+
+class HedgePolicy:
+    """(제공자, 엔드포인트)별 헤징 임계값과 예산"""
+
+    def __init__(self, quantile: float = 0.9, min_samples: int = 20, window: int = 200,
+                 min_delay: float = 0.05, max_delay: float = 10.0,
+                 budget_ratio: float = 0.1, budget_burst: float = 5.0, max_utilization: float = 0.75):
+        self.quantile = quantile
+        self.min_samples = min_samples
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.budget_ratio = budget_ratio
+        self.budget_burst = budget_burst
+        self.max_utilization = max_utilization
+
+        self._latencies = deque(maxlen=window)
+        # 호출마다 budget_ratio만큼 쌓이고 헤징 한 번에 1씩 쓰는 토큰 (최대 budget_burst)
+        self._budget = 0.0
+        self.calls = 0
+        self.hedged = 0
+        # 결과가 버려졌지만 스레드에서 아직 실행 중인 요청 수
+        self.losers_in_flight = 0
+        self.outcomes = dict.fromkeys(HEDGE_OUTCOMES, 0)
+
+    def hedge_delay(self) -> Optional[float]:
+        """헤징 요청을 보낼 대기 시간 (초, 표본이 부족하면 None = 헤징하지 않음)"""
+        if len(self._latencies) < self.min_samples:
+            return None
+        values = sorted(self._latencies)
+        index = min(len(values) - 1, int(self.quantile * len(values)))
+        return min(self.max_delay, max(self.min_delay, values[index]))
+
+    def observe(self, seconds: float):
+        self._latencies.append(seconds)
+
+    def record_call(self):
+        self.calls += 1
+        self._budget = min(self.budget_burst, self._budget + self.budget_ratio)
+
+    def try_spend(self) -> bool:
+        # 실행 중인 진 요청도 외부 API 호출을 쓰고 있으므로 예산에서 뺌
+        if self._budget - self.losers_in_flight < 1.0:
+            self.outcomes["skipped_budget"] += 1
+            return False
+        self._budget -= 1.0
+        self.hedged += 1
+        return True
+
+    def record_outcome(self, outcome: str):
+        self.outcomes[outcome] += 1
+
+    def loser_started(self):
+        self.losers_in_flight += 1
+
+    def loser_finished(self):
+        self.losers_in_flight -= 1
+
+    def stats(self) -> dict:
+        delay = self.hedge_delay()
+        return {
+            "calls": self.calls,
+            "hedged": self.hedged,
+            "hedge_rate": round(self.hedged / self.calls, 4) if self.calls else 0.0,
+            "hedge_delay_ms": round(delay * 1000, 1) if delay is not None else None,
+            "samples": len(self._latencies),
+            "budget": round(self._budget, 2),
+            "losers_in_flight": self.losers_in_flight,
+            "outcomes": dict(self.outcomes),
+        }
+
+
+class HedgingPolicies:
+    """헤징할 (제공자, 엔드포인트) 목록과 정책 객체 보관
+
+    targets는 "provider" 또는 "provider:endpoint" 목록 (예: ["elevenlabs", "openai:chat"])
+    """
+
+    def __init__(self, targets: list, **policy_kwargs):
+        self.targets = set(targets)
+        self.policy_kwargs = policy_kwargs
+        self._policies = {}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.targets)
+
+    def policy_for(self, provider: str, endpoint: str) -> Optional[HedgePolicy]:
+        if provider not in self.targets and f"{provider}:{endpoint}" not in self.targets:
+            return None
+        key = (provider, endpoint)
+        policy = self._policies.get(key)
+        if policy is None:
+            policy = self._policies[key] = HedgePolicy(**self.policy_kwargs)
+        return policy
+
+    def stats(self) -> dict:
+        return {
+            "targets": sorted(self.targets),
+            "policies": {f"{provider}:{endpoint}": policy.stats() for (provider, endpoint), policy in self._policies.items()},
+        }
+
+    def items(self):
+        return list(self._policies.items())
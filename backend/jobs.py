@@ -0,0 +1,242 @@
+"""오래 걸리는 LLM 작업(치트시트 생성, 대화 평가)을 위한 백그라운드 작업 큐
+
+작업은 로컬 워커 풀(asyncio 태스크)에서 정해진 개수만큼만 동시에 실행되고,
+상태가 바뀔 때마다 작업 기록이 JSON 파일로 저장됩니다.
+클라이언트는 작업 ID로 상태/결과를 조회하거나, 완료될 때까지 기다리거나(롱 폴링), 취소할 수 있습니다.
+"""
+import asyncio
+import logging
+import os
+import time
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from serialization import read_json, write_json
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+FINISHED_STATUSES = {JOB_SUCCEEDED, JOB_FAILED, JOB_CANCELLED}
+
+
+class JobQueueFullError(Exception):
+    """작업 대기열이 가득 찬 경우"""
+
+
+class JobManager:
+    """제한된 워커 수로 작업을 실행하고 작업 기록을 디스크에 보관하는 관리자"""
+
+    def __init__(self, jobs_dir: str, max_workers: int = 2, max_queue: int = 100,
+                 retention_seconds: int = 86400):
+        self.jobs_dir = jobs_dir
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retention_seconds = retention_seconds
+
+        self._handlers = {}
+        self._jobs = {}
+        self._tasks = {}
+        self._events = {}
+        self._cancel_requested = set()
+        self._queue = None
+        self._workers = []
+
+        os.makedirs(self.jobs_dir, exist_ok=True)
+
+    def register(self, job_type: str, handler):
+        """작업 종류별 실행 함수 등록 (handler: async def handler(payload: dict) -> dict)"""
+        self._handlers[job_type] = handler
+
+    async def start(self):
+        """워커를 시작하고, 이전 실행에서 끝나지 못한 작업은 실패로 정리"""
+        self._queue = asyncio.Queue()
+        self._recover_persisted_jobs()
+        self._workers = [
+            asyncio.create_task(self._worker(index)) for index in range(self.max_workers)
+        ]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, job_type: str, payload: dict, participant_id: str = "") -> dict:
+        if job_type not in self._handlers:
+            raise ValueError(f"알 수 없는 작업 종류: {job_type}")
+        if self._queue is None:
+            raise RuntimeError("작업 관리자가 시작되지 않았습니다.")
+        if self._queue.qsize() >= self.max_queue:
+            raise JobQueueFullError(job_type)
+
+        job = {
+            "job_id": uuid.uuid4().hex,
+            "job_type": job_type,
+            "participant_id": participant_id,
+            "status": JOB_QUEUED,
+            "created_at": datetime.now().isoformat(),
+            "started_at": None,
+            "finished_at": None,
+            "error": None,
+            "error_status_code": None,
+            "payload": payload,
+            "result": None,
+        }
+        self._prune_finished_jobs()
+        self._jobs[job["job_id"]] = job
+        self._events[job["job_id"]] = asyncio.Event()
+        self._persist(job)
+        self._queue.put_nowait(job["job_id"])
+        return job
+
+    def get(self, job_id: str) -> Optional[dict]:
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job
+        # 메모리에 없으면 (서버 재시작 등) 디스크 기록에서 조회
+        filepath = self._job_path(job_id)
+        if not os.path.exists(filepath):
+            return None
+        try:
+            return read_json(filepath)
+        except (OSError, ValueError):
+            return None
+
+    def cancel(self, job_id: str) -> Optional[dict]:
+        job = self._jobs.get(job_id)
+        if job is None:
+            return self.get(job_id)
+        if job["status"] == JOB_QUEUED:
+            # 대기 중인 작업은 워커가 꺼낼 때 건너뜀
+            self._finish(job, JOB_CANCELLED)
+        elif job["status"] == JOB_RUNNING:
+            task = self._tasks.get(job_id)
+            if task is not None:
+                self._cancel_requested.add(job_id)
+                task.cancel()
+        return job
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[dict]:
+        """작업이 끝나거나 timeout이 지날 때까지 기다린 뒤 작업 기록을 반환 (롱 폴링)"""
+        event = self._events.get(job_id)
+        if event is not None and timeout > 0:
+            try:
+                await asyncio.wait_for(event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.get(job_id)
+
+    def stats(self) -> dict:
+        counts = {}
+        for job in self._jobs.values():
+            counts[job["status"]] = counts.get(job["status"], 0) + 1
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue": self.max_queue,
+            "workers": self.max_workers,
+            "jobs": counts,
+        }
+
+    async def _worker(self, index: int):
+        while True:
+            job_id = await self._queue.get()
+            job = self._jobs.get(job_id)
+            try:
+                if job is None or job["status"] != JOB_QUEUED:
+                    continue
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: dict):
+        job["status"] = JOB_RUNNING
+        job["started_at"] = datetime.now().isoformat()
+        self._persist(job)
+        logger.info("작업 시작: %s (%s)", job['job_type'], job['job_id'], extra=self._log_fields(job))
+
+        handler = self._handlers[job["job_type"]]
+        task = asyncio.create_task(handler(job["payload"]))
+        self._tasks[job["job_id"]] = task
+        try:
+            job["result"] = await task
+            self._finish(job, JOB_SUCCEEDED)
+            logger.info("작업 완료: %s (%s)", job['job_type'], job['job_id'], extra=self._log_fields(job))
+        except asyncio.CancelledError:
+            if job["job_id"] not in self._cancel_requested:
+                # 워커 자체가 종료되는 경우
+                task.cancel()
+                self._finish(job, JOB_FAILED, error="서버가 종료되어 작업이 중단되었습니다.")
+                raise
+            self._finish(job, JOB_CANCELLED)
+            logger.info("작업 취소: %s (%s)", job['job_type'], job['job_id'], extra=self._log_fields(job))
+        except Exception as e:
+            detail = getattr(e, "detail", None) or str(e)
+            self._finish(job, JOB_FAILED, error=str(detail),
+                         error_status_code=getattr(e, "status_code", None))
+            logger.error("작업 실패: %s (%s) - %s", job['job_type'], job['job_id'], detail,
+                         extra=self._log_fields(job))
+        finally:
+            self._tasks.pop(job["job_id"], None)
+            self._cancel_requested.discard(job["job_id"])
+
+    def _finish(self, job: dict, status: str, error: Optional[str] = None,
+                error_status_code: Optional[int] = None):
+        job["status"] = status
+        job["finished_at"] = datetime.now().isoformat()
+        job["error"] = error
+        job["error_status_code"] = error_status_code
+        self._persist(job)
+        event = self._events.pop(job["job_id"], None)
+        if event is not None:
+            event.set()
+
+    def _prune_finished_jobs(self, max_in_memory: int = 1000):
+        # 끝난 작업은 디스크 기록만 남기고 메모리에서 오래된 것부터 제거
+        if len(self._jobs) < max_in_memory:
+            return
+        for job_id in list(self._jobs.keys()):
+            if len(self._jobs) < max_in_memory:
+                break
+            if self._jobs[job_id]["status"] in FINISHED_STATUSES:
+                del self._jobs[job_id]
+
+    @staticmethod
+    def _log_fields(job: dict) -> dict:
+        return {"job_id": job["job_id"], "job_type": job["job_type"], "participant_id": job["participant_id"]}
+
+    def _job_path(self, job_id: str) -> str:
+        # 경로 조작 방지를 위해 파일명에 쓸 수 있는 문자만 허용
+        safe_job_id = "".join(c for c in job_id if c.isalnum())
+        return os.path.join(self.jobs_dir, f"job_{safe_job_id}.json")
+
+    def _persist(self, job: dict):
+        filepath = self._job_path(job["job_id"])
+        try:
+            write_json(filepath, job, atomic=True)
+        except OSError as e:
+            logger.warning("작업 기록 저장 실패: %s - %s", job['job_id'], e)
+
+    def _recover_persisted_jobs(self):
+        now = time.time()
+        for filename in os.listdir(self.jobs_dir):
+            if not (filename.startswith("job_") and filename.endswith(".json")):
+                continue
+            filepath = os.path.join(self.jobs_dir, filename)
+            try:
+                if now - os.path.getmtime(filepath) > self.retention_seconds:
+                    os.remove(filepath)
+                    continue
+                job = read_json(filepath)
+            except (OSError, ValueError):
+                continue
+            if job.get("status") not in FINISHED_STATUSES:
+                job["status"] = JOB_FAILED
+                job["finished_at"] = datetime.now().isoformat()
+                job["error"] = "서버가 재시작되어 작업이 중단되었습니다."
+                self._persist(job)
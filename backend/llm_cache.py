@@ -0,0 +1,197 @@
+"""LLM 응답 캐시 (메모리 LRU + 디스크 저장소)
+
+동일한 입력(엔드포인트, 모델, 프롬프트, 샘플링 파라미터)에 대한 LLM 응답을
+메모리와 디스크에 저장해 두고, TTL이 지나지 않았다면 다시 호출하지 않고 바로 반환합니다.
+락은 메모리/인덱스 갱신에만 잡고 디스크 읽기·쓰기는 락 밖에서 하므로, 느린 디스크 I/O가
+다른 요청의 메모리 적중을 막지 않습니다. 디스크를 거칠 수 있는 get/set/clear는 이벤트 루프에서
+직접 부르지 말고 asyncio.to_thread로 호출하세요.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from serialization import read_json, write_json
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(endpoint: str, model: str, messages: list, params: dict) -> str:
+    """(엔드포인트, 모델, 프롬프트 해시, 샘플링 파라미터)로 캐시 키를 생성하는 함수"""
+    prompt_hash = hashlib.sha256(
+        json.dumps(messages, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+    key_source = json.dumps(
+        {"endpoint": endpoint, "model": model, "prompt": prompt_hash, "params": params},
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(key_source.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """메모리 LRU와 디스크 저장소를 함께 사용하는 LLM 응답 캐시"""
+
+    def __init__(self, cache_dir: str, ttl_seconds: int = 86400,
+                 max_memory_entries: int = 256, max_disk_entries: int = 5000,
+                 enabled: bool = True):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.enabled = enabled
+
+        # key -> (expires_at, value)
+        self._memory = OrderedDict()
+        # key -> 마지막 사용 시각 (디스크 LRU 판단용)
+        self._disk_index = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+        if self.enabled:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._load_disk_index()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    def _load_disk_index(self):
+        """기존 디스크 캐시 파일을 마지막 사용 시각 순으로 인덱싱"""
+        entries = []
+        for sub in os.listdir(self.cache_dir):
+            sub_dir = os.path.join(self.cache_dir, sub)
+            if not os.path.isdir(sub_dir):
+                continue
+            for filename in os.listdir(sub_dir):
+                if filename.endswith(".json"):
+                    filepath = os.path.join(sub_dir, filename)
+                    entries.append((os.path.getmtime(filepath), filename[:-5]))
+        for mtime, key in sorted(entries):
+            self._disk_index[key] = mtime
+
+    def get(self, key: str) -> Optional[str]:
+        """캐시에서 값을 조회 (없거나 만료되었으면 None)"""
+        if not self.enabled:
+            return None
+
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._memory[key]
+            if key not in self._disk_index:
+                self.misses += 1
+                return None
+
+        # 디스크 읽기는 락 밖에서 수행
+        data = self._read_disk(key)
+        if data is None or data.get("expires_at", 0) <= now:
+            with self._lock:
+                self._disk_index.pop(key, None)
+                self.misses += 1
+            if data is not None:
+                self._remove_files([key])
+            return None
+
+        value = data.get("value")
+        with self._lock:
+            # 디스크에 저장된 만료 시각을 그대로 사용 (메모리로 올릴 때 TTL을 늘리지 않음)
+            self._remember(key, data["expires_at"], value)
+            # 디스크 LRU 갱신
+            self._disk_index[key] = now
+            self._disk_index.move_to_end(key)
+            self.hits += 1
+        try:
+            os.utime(self._entry_path(key), None)
+        except OSError:
+            pass
+        return value
+
+    def set(self, key: str, value: str, endpoint: str = ""):
+        """캐시에 값을 저장 (메모리 + 디스크)"""
+        if not self.enabled:
+            return
+
+        now = time.time()
+        expires_at = now + self.ttl_seconds
+        with self._lock:
+            self._remember(key, expires_at, value)
+        if not self._write_disk(key, {
+            "key": key,
+            "endpoint": endpoint,
+            "created_at": now,
+            "expires_at": expires_at,
+            "value": value,
+        }):
+            return
+
+        evicted = []
+        with self._lock:
+            self._disk_index[key] = now
+            self._disk_index.move_to_end(key)
+            while len(self._disk_index) > self.max_disk_entries:
+                oldest_key, _ = self._disk_index.popitem(last=False)
+                evicted.append(oldest_key)
+        self._remove_files(evicted)
+
+    def clear(self):
+        """메모리와 디스크 캐시를 모두 비움"""
+        with self._lock:
+            self._memory.clear()
+            keys = list(self._disk_index.keys())
+            self._disk_index.clear()
+            self.hits = 0
+            self.misses = 0
+        self._remove_files(keys)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "memory_entries": len(self._memory),
+            "disk_entries": len(self._disk_index),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+    def _remember(self, key: str, expires_at: float, value: str):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _read_disk(self, key: str) -> Optional[dict]:
+        try:
+            return read_json(self._entry_path(key))
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key: str, data: dict) -> bool:
+        filepath = self._entry_path(key)
+        try:
+            os.makedirs(os.path.dirname(filepath), exist_ok=True)
+            write_json(filepath, data, pretty=False, atomic=True)
+        except OSError as e:
+            logger.warning("LLM 캐시 디스크 저장 실패: %s", e)
+            return False
+        return True
+
+    def _remove_files(self, keys: list):
+        for key in keys:
+            try:
+                os.remove(self._entry_path(key))
+            except OSError:
+                pass
@@ -0,0 +1,178 @@
+"""LLM 제공자 계층 (OpenAI / 로컬 OpenAI 호환 서버)
+
+채팅 완성, 스트리밍, JSON 모드를 같은 인터페이스로 제공하고, 엔드포인트마다 어떤 제공자를
+쓸지 환경변수로 고를 수 있게 합니다. 로컬 제공자는 llama.cpp 서버(llama-server), vLLM,
+Ollama 등 OpenAI 호환 /v1/chat/completions를 제공하는 서버와 통신합니다.
+
+- LLM_PROVIDER: 기본 제공자 (openai | local, 기본값 openai)
+- LLM_PROVIDER_<ENDPOINT>: 엔드포인트별 제공자 (예: LLM_PROVIDER_CHECK_QUESTS=local)
+- LOCAL_LLM_BASE_URL / LOCAL_LLM_MODEL / LOCAL_LLM_API_KEY: 로컬 서버 설정
+"""
+import logging
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+import openai
+
+logger = logging.getLogger(__name__)
+
+
+class LLMProviderError(Exception):
+    """설정되지 않았거나 알 수 없는 제공자를 사용하려는 경우"""
+
+
+class OpenAICompatibleProvider:
+    """OpenAI 호환 채팅 완성 API를 호출하는 제공자"""
+
+    def __init__(self, name: str, base_url: Optional[str], api_key: Optional[str], default_model: str,
+                 requires_api_key: bool = True, supports_stream_usage: bool = True,
+                 supports_json_mode: bool = True, timeout: float = 120.0):
+        self.name = name
+        self.base_url = base_url.rstrip("/") if base_url else None
+        self.api_key = api_key
+        self.default_model = default_model
+        self.requires_api_key = requires_api_key
+        self.supports_stream_usage = supports_stream_usage
+        self.supports_json_mode = supports_json_mode
+        self.timeout = timeout
+        self._client = None
+        self._lock = threading.Lock()
+
+    def is_configured(self) -> bool:
+        if self.requires_api_key:
+            return bool(self.api_key)
+        return bool(self.base_url)
+
+    def client(self):
+        """연결을 재사용하도록 클라이언트를 한 번만 생성 (재시도는 스케줄러가 담당하므로 끔)"""
+        with self._lock:
+            if self._client is None:
+                self._client = openai.OpenAI(
+                    api_key=self.api_key or "not-needed",
+                    base_url=self.base_url,
+                    max_retries=0,
+                    timeout=self.timeout
+                )
+            return self._client
+
+    def _request_kwargs(self, model: Optional[str], messages: list, temperature: float, max_tokens: int,
+                        json_mode: bool) -> dict:
+        kwargs = {
+            "model": model or self.default_model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }
+        if json_mode and self.supports_json_mode:
+            kwargs["response_format"] = {"type": "json_object"}
+        return kwargs
+
+    def complete(self, messages: list, temperature: float, max_tokens: int, model: Optional[str] = None,
+                 json_mode: bool = False):
+        """채팅 완성을 호출해 (응답 텍스트, usage)를 반환 (블로킹 호출이므로 스레드에서 실행)"""
+        response = self.client().chat.completions.create(
+            **self._request_kwargs(model, messages, temperature, max_tokens, json_mode)
+        )
+        return response.choices[0].message.content, getattr(response, "usage", None)
+
+    def stream(self, timings: dict, messages: list, temperature: float, max_tokens: int,
+               model: Optional[str] = None, json_mode: bool = False,
+               on_delta: Optional[Callable[[str], None]] = None):
+        """스트리밍으로 받아 (응답 텍스트, usage)를 반환하고 첫 토큰 수신 시각을 timings["first_token_at"]에 기록
+
+        on_delta를 넘기면 받은 조각마다 호출 (호출 스레드에서 실행되므로 이벤트 루프로 넘길 때는 call_soon_threadsafe 사용)
+        """
+        kwargs = self._request_kwargs(model, messages, temperature, max_tokens, json_mode)
+        if self.supports_stream_usage:
+            kwargs["stream_options"] = {"include_usage": True}
+        stream = self.client().chat.completions.create(stream=True, **kwargs)
+        parts = []
+        usage = None
+        first_token = True
+        for chunk in stream:
+            if getattr(chunk, "usage", None) is not None:
+                usage = chunk.usage
+            if chunk.choices and chunk.choices[0].delta.content:
+                if first_token:
+                    # 헤징으로 같은 요청이 둘 실행되면 먼저 도착한 첫 토큰 시각을 유지
+                    timings.setdefault("first_token_at", time.perf_counter())
+                    first_token = False
+                parts.append(chunk.choices[0].delta.content)
+                if on_delta is not None:
+                    on_delta(chunk.choices[0].delta.content)
+        return "".join(parts), usage
+
+    def info(self) -> dict:
+        return {
+            "name": self.name,
+            "configured": self.is_configured(),
+            "base_url": self.base_url,
+            "default_model": self.default_model,
+            "json_mode": self.supports_json_mode,
+        }
+
+
+def openai_provider_from_env() -> OpenAICompatibleProvider:
+    """OpenAI 제공자 (OPENAI_BASE_URL을 바꾸면 가짜 서버/기록 프록시로도 보낼 수 있음)"""
+    return OpenAICompatibleProvider(
+        "openai",
+        base_url=os.getenv("OPENAI_BASE_URL") or None,
+        api_key=os.getenv("OPENAI_API_KEY"),
+        default_model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
+        timeout=float(os.getenv("OPENAI_TIMEOUT_SECONDS", "120"))
+    )
+
+
+def local_provider_from_env() -> OpenAICompatibleProvider:
+    """로컬 OpenAI 호환 서버 제공자 (예: llama-server -m model.gguf --port 8080 → http://127.0.0.1:8080/v1)
+
+    llama.cpp 서버는 모델 이름을 무시하고 로드된 모델을 사용하므로 LOCAL_LLM_MODEL은 기록/캐시 키 구분용입니다.
+    서버가 stream_options나 response_format을 지원하지 않으면 해당 환경변수로 끌 수 있습니다.
+    """
+    return OpenAICompatibleProvider(
+        "local",
+        base_url=os.getenv("LOCAL_LLM_BASE_URL") or None,
+        api_key=os.getenv("LOCAL_LLM_API_KEY"),
+        default_model=os.getenv("LOCAL_LLM_MODEL", "local-model"),
+        requires_api_key=False,
+        supports_stream_usage=os.getenv("LOCAL_LLM_STREAM_USAGE", "true").lower() == "true",
+        supports_json_mode=os.getenv("LOCAL_LLM_JSON_MODE", "true").lower() == "true",
+        timeout=float(os.getenv("LOCAL_LLM_TIMEOUT_SECONDS", "120"))
+    )
+
+
+class LLMRouter:
+    """엔드포인트별로 사용할 LLM 제공자를 고르는 라우터"""
+
+    def __init__(self, providers: dict, default_provider: str = "openai", endpoint_providers: Optional[dict] = None):
+        self.providers = providers
+        self.default_provider = default_provider
+        self.endpoint_providers = endpoint_providers or {}
+        for endpoint, name in [("*", default_provider)] + list(self.endpoint_providers.items()):
+            if name not in providers:
+                raise LLMProviderError(f"알 수 없는 LLM 제공자: {name} (엔드포인트 {endpoint})")
+
+    @classmethod
+    def from_env(cls, providers: dict, endpoints: list) -> "LLMRouter":
+        default_provider = os.getenv("LLM_PROVIDER", "openai").lower()
+        endpoint_providers = {}
+        for endpoint in endpoints:
+            name = os.getenv(f"LLM_PROVIDER_{endpoint.upper()}")
+            if name:
+                endpoint_providers[endpoint] = name.lower()
+        return cls(providers, default_provider, endpoint_providers)
+
+    def provider_for(self, endpoint: str) -> OpenAICompatibleProvider:
+        return self.providers[self.endpoint_providers.get(endpoint, self.default_provider)]
+
+    def is_configured(self, endpoint: str) -> bool:
+        return self.provider_for(endpoint).is_configured()
+
+    def stats(self) -> dict:
+        return {
+            "default_provider": self.default_provider,
+            "endpoint_providers": dict(self.endpoint_providers),
+            "providers": {name: provider.info() for name, provider in self.providers.items()},
+        }
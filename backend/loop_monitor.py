@@ -0,0 +1,170 @@
+"""이벤트 루프 지연(lag) 감시
+
+하트비트 태스크가 interval마다 깨어나며 예정보다 얼마나 늦게 실행됐는지(스케줄링 지연)를 잽니다.
+별도 감시 스레드는 하트비트가 stall_threshold 이상 멈춰 있으면 그 순간 이벤트 루프 스레드의
+호출 스택과 실행 중인 태스크를 기록하므로, 어떤 핸들러의 어떤 동기 호출이 루프를 막았는지 알 수 있습니다.
+"""
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    """이벤트 루프 스케줄링 지연을 측정하고, 멈춤(stall) 발생 시 스택을 기록하는 감시기"""
+
+    def __init__(self, interval: float = 0.1, stall_threshold: float = 0.25, max_stalls: int = 50,
+                 handler_files: tuple = ("main.py",), ignore_functions: tuple = (), on_sample=None):
+        self.interval = interval
+        self.stall_threshold = stall_threshold
+        # 스택에서 "핸들러"로 표시할 프레임의 파일 이름
+        self.handler_files = handler_files
+        # 핸들러로 보지 않을 감싸기용 함수 (미들웨어, 라우트 래퍼 등)
+        self.ignore_functions = set(ignore_functions)
+        # on_sample(lag_seconds): 측정할 때마다 호출 (메트릭 기록용)
+        self.on_sample = on_sample
+
+        self.stalls = deque(maxlen=max_stalls)
+        self.stall_count = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.last_stall_at = None
+
+        self._loop = None
+        self._loop_thread_id = None
+        self._last_beat = None
+        self._captured_beat = None
+        self._lock = threading.Lock()
+        self._task = None
+        self._watchdog = None
+        self._stopped = threading.Event()
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.perf_counter()
+        self._stopped.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self):
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def current_lag(self) -> float:
+        """지금 이 순간 하트비트가 밀려 있는 시간 (초) - 루프가 멈춰 있으면 계속 커짐"""
+        if self._last_beat is None:
+            return 0.0
+        return max(self.last_lag, time.perf_counter() - self._last_beat - self.interval, 0.0)
+
+    def stats(self, include_stacks: bool = False) -> dict:
+        with self._lock:
+            stalls = list(self.stalls)
+        hidden_keys = {"beat"} if include_stacks else {"beat", "stack"}
+        stalls = [{key: value for key, value in stall.items() if key not in hidden_keys} for stall in stalls]
+        return {
+            "running": self._task is not None,
+            "interval_ms": round(self.interval * 1000, 1),
+            "stall_threshold_ms": round(self.stall_threshold * 1000, 1),
+            "current_lag_ms": round(self.current_lag() * 1000, 1),
+            "last_lag_ms": round(self.last_lag * 1000, 1),
+            "max_lag_ms": round(self.max_lag * 1000, 1),
+            "stall_count": self.stall_count,
+            "last_stall_at": self.last_stall_at,
+            "recent_stalls": stalls,
+        }
+
+    async def _heartbeat(self):
+        while True:
+            beat = time.perf_counter()
+            self._last_beat = beat
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - beat - self.interval)
+            self.last_lag = lag
+            self.max_lag = max(self.max_lag, lag)
+            if self.on_sample is not None:
+                self.on_sample(lag)
+            if lag >= self.stall_threshold:
+                self._finish_stall(beat, lag)
+
+    def _watch(self):
+        while not self._stopped.wait(self.interval):
+            beat = self._last_beat
+            if beat is None or beat == self._captured_beat:
+                continue
+            stalled_for = time.perf_counter() - beat - self.interval
+            if stalled_for >= self.stall_threshold:
+                self._captured_beat = beat
+                self._capture_stall(beat, stalled_for)
+
+    def _capture_stall(self, beat: float, stalled_for: float):
+        """루프가 멈춰 있는 동안 루프 스레드의 스택과 실행 중인 태스크를 기록"""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.extract_stack(frame) if frame is not None else []
+        handler = None
+        for frame_summary in reversed(stack):
+            if (os.path.basename(frame_summary.filename) in self.handler_files
+                    and frame_summary.name not in self.ignore_functions):
+                handler = frame_summary.name
+                break
+
+        task_name = None
+        try:
+            task = asyncio.current_task(self._loop)
+            if task is not None:
+                task_name = f"{task.get_name()} ({getattr(task.get_coro(), '__qualname__', '')})"
+        except RuntimeError:
+            pass
+
+        stall = {
+            "beat": beat,
+            "detected_at": datetime.now().isoformat(),
+            "duration_ms": round(stalled_for * 1000, 1),
+            "finished": False,
+            "handler": handler,
+            "blocking_call": f"{os.path.basename(stack[-1].filename)}:{stack[-1].lineno} {stack[-1].name}" if stack else None,
+            "task": task_name,
+            "stack": [
+                f"{os.path.basename(item.filename)}:{item.lineno} {item.name}" for item in stack[-30:]
+            ],
+        }
+        with self._lock:
+            self.stalls.append(stall)
+            self.stall_count += 1
+            self.last_stall_at = stall["detected_at"]
+        logger.warning(
+            "이벤트 루프 멈춤 감지: %.0fms 이상 (핸들러: %s, 호출: %s)", stalled_for * 1000, handler, stall["blocking_call"],
+            extra={"handler": handler, "task": task_name, "stack": stall["stack"][-8:]}
+        )
+
+    def _finish_stall(self, beat: float, lag: float):
+        """멈춤이 끝난 뒤 실제 지연 시간을 기록 (감시 스레드가 놓친 짧은 멈춤은 스택 없이 추가)"""
+        with self._lock:
+            for stall in reversed(self.stalls):
+                if stall.get("beat") == beat:
+                    stall["duration_ms"] = round(lag * 1000, 1)
+                    stall["finished"] = True
+                    return
+            self.stalls.append({
+                "beat": beat,
+                "detected_at": datetime.now().isoformat(),
+                "duration_ms": round(lag * 1000, 1),
+                "finished": True,
+                "handler": None,
+                "blocking_call": None,
+                "task": None,
+                "stack": [],
+            })
+            self.stall_count += 1
+            self.last_stall_at = self.stalls[-1]["detected_at"]
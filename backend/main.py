@@ -1,21 +1,160 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response, StreamingResponse
+from fastapi.routing import APIRoute
 from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 import uvicorn
 import os
 import requests
-import json
+import asyncio
+import contextvars
+import logging
+import time
+import uuid
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Optional
+from typing import Annotated, Callable, Optional
 from dotenv import load_dotenv
-import openai
+from llm_cache import LLMCache, make_cache_key
+from serialization import FastJSONResponse, dumps, read_json, write_json
+from compression import CompressionMiddleware, CompressionStats, PrecompressedCache, compression_settings_from_env
+from llm_providers import LLMRouter, openai_provider_from_env, local_provider_from_env
+from structured_output import (
+    EVALUATION_ITEMS, DEFAULT_GRADE, DEFAULT_SCORE_REASON, IncrementalJSONParser, VoiceAnalysisResult,
+    EvaluationResult, QuestCheckResult, CheatsheetResult, normalize_grade, parse_quest, parse_structured
+)
+from singleflight import SingleFlight, IdempotencyConflictError, make_request_key
+from jobs import JobManager, JobQueueFullError, JOB_SUCCEEDED, FINISHED_STATUSES
+from hedging import HedgingPolicies, HEDGE_OUTCOMES
+from circuit_breaker import CircuitBreakers, CircuitOpenError, is_upstream_failure, STATE_VALUES
+from upstream import UpstreamScheduler, UpstreamBusyError, PRIORITY_CHAT, PRIORITY_INTERACTIVE, PRIORITY_BATCH, PRIORITY_SPECULATIVE
+from warmup import OpeningTurnCache
+from record_index import RecordIndex, InvalidCursorError, paginate
+from session_store import SessionStore, RetrySessionStore, QuestStateStore, safe_path_component, build_history_window, session_messages_to_history
+from summarizer import ConversationSummarizer, session_messages_to_turns, evaluation_logs_to_turns, role_messages_to_turns, format_turns
+from structured_logging import setup_logging, shutdown_logging, request_id_var, logging_stats
+from metrics import MetricsRegistry, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from tracing import Tracer, span, record_span, current_trace
+from profiler import SamplingProfiler
+from loop_monitor import LoopLagMonitor
+from readiness import CachedProbe, disk_status, write_probe, http_probe
 
 # .env 파일 로드
 load_dotenv()
 
-app = FastAPI(title="NK Voice Backend", version="1.0.0")
+# 구조화 로깅 설정 (JSON Lines, 큐 기반 비동기 출력; 요청 단위 상세 로그는 LOG_LEVEL=DEBUG일 때만)
+setup_logging(
+    level=os.getenv("LOG_LEVEL", "INFO"),
+    log_file=os.getenv("LOG_FILE") or None,
+    max_queue=int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+)
+logger = logging.getLogger("nkvoice")
+
+# 메트릭 설정 (/metrics, Prometheus 텍스트 형식)
+metrics_registry = MetricsRegistry(namespace="nkvoice")
+http_requests = metrics_registry.counter(
+    "http_requests_total", "라우트별 HTTP 요청 수", ("method", "route", "status")
+)
+http_request_latency = metrics_registry.histogram(
+    "http_request_duration_seconds", "라우트별 HTTP 요청 처리 시간 (초)", ("method", "route")
+)
+http_in_flight = metrics_registry.gauge(
+    "http_requests_in_flight", "처리 중인 HTTP 요청 수", ("method",)
+)
+upstream_requests = metrics_registry.counter(
+    "upstream_requests_total", "외부 API 호출 수 (outcome: success/error/busy/circuit_open)", ("provider", "endpoint", "outcome")
+)
+upstream_latency = metrics_registry.histogram(
+    "upstream_request_duration_seconds", "외부 API 호출 시간 (대기열 대기와 재시도 포함, 초)", ("provider", "endpoint")
+)
+llm_tokens = metrics_registry.counter(
+    "llm_tokens_total", "OpenAI 응답의 usage 기준 토큰 사용량", ("endpoint", "model", "kind")
+)
+tts_bytes = metrics_registry.counter(
+    "tts_audio_bytes_total", "ElevenLabs로 생성한 음성 바이트 수", ("endpoint",)
+)
+file_io_latency = metrics_registry.histogram(
+    "file_io_duration_seconds", "세션/캐시/오디오 파일 읽기·쓰기 시간 (초)", ("operation",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+event_loop_lag = metrics_registry.histogram(
+    "event_loop_lag_seconds", "이벤트 루프 스케줄링 지연 (초)",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+
+# 이벤트 루프 지연 감시 (동기 호출로 루프가 멈추면 당시 핸들러와 스택을 기록)
+loop_monitor = LoopLagMonitor(
+    interval=float(os.getenv("LOOP_LAG_INTERVAL_MS", "100")) / 1000,
+    stall_threshold=float(os.getenv("LOOP_STALL_THRESHOLD_MS", "250")) / 1000,
+    ignore_functions=("request_context_middleware", "traced_route_handler", "timed_endpoint"),
+    on_sample=lambda lag: event_loop_lag.observe(lag)
+)
+
+# 요청 트레이싱 (Chrome Trace Event Format 파일) / 샘플링 프로파일러 - 기본값은 꺼짐, 관리자 API로 변경 가능
+TRACE_DIR = os.path.abspath(os.getenv("TRACE_DIR", "traces"))
+tracer = Tracer(
+    trace_dir=TRACE_DIR,
+    sample_rate=float(os.getenv("TRACE_SAMPLE_RATE", "0"))
+)
+profiler = SamplingProfiler(
+    output_dir=TRACE_DIR,
+    sample_rate=float(os.getenv("PROFILE_SAMPLE_RATE", "0")),
+    interval_ms=float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+)
+
+@contextmanager
+def timed_io(operation: str):
+    """파일 I/O 구간을 메트릭(file_io_duration_seconds)과 트레이스 span에 함께 기록"""
+    with span(operation), file_io_latency.time(operation=operation):
+        yield
+
+# 트레이싱 중인 요청의 핸들러 실행 구간 (TracedRoute가 요청 파싱/핸들러/직렬화 span을 나누는 데 사용)
+endpoint_timing_var = contextvars.ContextVar("endpoint_timing", default=None)
+
+class TracedRoute(APIRoute):
+    """트레이싱 대상 요청의 라우트 처리를 요청 파싱 / 핸들러 / 응답 직렬화 span으로 나눠 기록하는 APIRoute"""
+
+    def get_route_handler(self):
+        endpoint_call = self.dependant.call
+        if asyncio.iscoroutinefunction(endpoint_call):
+            async def timed_endpoint(*args, **kwargs):
+                timing = endpoint_timing_var.get()
+                if timing is None:
+                    return await endpoint_call(*args, **kwargs)
+                timing["start"] = time.perf_counter()
+                try:
+                    return await endpoint_call(*args, **kwargs)
+                finally:
+                    timing["end"] = time.perf_counter()
+
+            self.dependant.call = timed_endpoint
+
+        route_path = self.path
+        route_handler = super().get_route_handler()
+
+        async def traced_route_handler(request):
+            if current_trace() is None:
+                return await route_handler(request)
+            start_time = time.perf_counter()
+            timing = {}
+            token = endpoint_timing_var.set(timing)
+            try:
+                return await route_handler(request)
+            finally:
+                endpoint_timing_var.reset(token)
+                end_time = time.perf_counter()
+                if "end" in timing:
+                    record_span("request_parse", start_time, timing["start"], route=route_path)
+                    record_span("handler", timing["start"], timing["end"], route=route_path)
+                    record_span("response_serialize", timing["end"], end_time, route=route_path)
+                else:
+                    record_span("route", start_time, end_time, route=route_path)
+
+        return traced_route_handler
+
+app = FastAPI(title="NK Voice Backend", version="1.0.0", default_response_class=FastJSONResponse)
+app.router.route_class = TracedRoute
 
 # CORS 설정
 app.add_middleware(
@@ -26,6 +165,57 @@ app.add_middleware(
     allow_headers=["*"],  # ngrok-skip-browser-warning 헤더 포함
 )
 
+# 응답 압축 (Accept-Encoding 협상, JSON/NDJSON/텍스트만 - 오디오는 압축하지 않음)
+compression_stats = CompressionStats()
+compression_cache = PrecompressedCache(
+    max_bytes=int(os.getenv("COMPRESSION_CACHE_MB", "32")) * 1024 * 1024
+)
+app.add_middleware(
+    CompressionMiddleware,
+    stats=compression_stats,
+    cache=compression_cache,
+    **compression_settings_from_env()
+)
+
+@app.middleware("http")
+async def request_context_middleware(request, call_next):
+    """요청마다 상관관계 ID를 부여하고 처리 결과를 한 줄로 기록"""
+    request_id = request.headers.get("x-request-id") or uuid.uuid4().hex[:16]
+    token = request_id_var.set(request_id)
+    start_time = time.perf_counter()
+    status_code = 500
+    http_in_flight.inc(method=request.method)
+    trace_handle = tracer.start(f"{request.method} {request.url.path}", request_id=request_id)
+    profiling = profiler.should_profile()
+    if profiling:
+        profiler.begin()
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        response.headers["X-Request-ID"] = request_id
+        return response
+    finally:
+        duration = time.perf_counter() - start_time
+        # 경로 파라미터(참가자 ID 등)로 라벨이 늘어나지 않도록 라우트 템플릿 사용
+        route = request.scope.get("route")
+        route_path = getattr(route, "path", None) or request.scope.get("root_path") or "unmatched"
+        http_in_flight.dec(method=request.method)
+        http_requests.inc(method=request.method, route=route_path, status=str(status_code))
+        http_request_latency.observe(duration, method=request.method, route=route_path)
+        if profiling:
+            profiler.end()
+        tracer.finish(trace_handle, route=route_path, status_code=status_code)
+        logger.info(
+            "요청 처리: %s %s", request.method, request.url.path,
+            extra={
+                "method": request.method,
+                "path": request.url.path,
+                "status_code": status_code,
+                "duration_ms": round(duration * 1000, 1),
+            }
+        )
+        request_id_var.reset(token)
+
 # Pydantic 모델
 class NumberRequest(BaseModel):
     number: float
@@ -38,12 +228,20 @@ class SquareResponse(BaseModel):
 class HealthResponse(BaseModel):
     status: str
     message: str
+    event_loop: Optional[dict] = None
+
+class ReadinessResponse(BaseModel):
+    ready: bool
+    failed_checks: list
+    checks: dict
 
 class UserData(BaseModel):
     participantId: str
     symptoms: str
     consent: bool
     loginTime: str
+    # 로그인 시 클라이언트가 만든 첫 채팅 세션 ID (첫 턴 미리 생성에 사용)
+    sessionId: Optional[str] = None
 
 class UserDataResponse(BaseModel):
     success: bool
@@ -54,46 +252,76 @@ class ChatRequest(BaseModel):
     message: str
     participantId: str
     sessionId: str
-    conversationHistory: Optional[list] = []
+    # 서버가 세션 기록을 관리하므로 생략 가능 (서버 기록이 없을 때만 사용)
+    conversationHistory: Optional[list] = None
 
 class ChatResponse(BaseModel):
     response: str
     success: bool
     audio_url: Optional[str] = None
+    # 외부 API 장애로 음성 없이 텍스트로만 응답한 경우
+    degraded: bool = False
+
+class SessionBundleResponse(BaseModel):
+    status: str
+    participant_id: str
+    session_id: Optional[str] = None
+    logs: list
+    # 저장된 평가/음성 분석이 없으면 None
+    evaluation: Optional[dict] = None
+    evaluation_timestamp: Optional[str] = None
+    # 평가가 세션의 마지막 메시지 이후에 저장되었는지 (False면 다시 평가해야 함)
+    evaluation_is_current: bool = False
+    voice_analysis: Optional[dict] = None
+    voice_analysis_timestamp: Optional[str] = None
+    audio_urls: list
+    quests: Optional[dict] = None
+    message: str
 
 class LogsResponse(BaseModel):
     status: str
     logs: list
     message: str
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
 
 class VoiceAnalysisRequest(BaseModel):
     messages: list
     participant_id: str
     analysis_type: str
+    bypass_cache: bool = False
 
 class VoiceAnalysisResponse(BaseModel):
     status: str
     analysis: dict
     message: str
+    # 외부 API 장애로 기본값을 돌려준 경우 (저장되지 않으므로 나중에 다시 요청해야 함)
+    provisional: bool = False
 
 class EvaluationRequest(BaseModel):
     logs: list
     participant_id: str
     evaluation_type: str
+    bypass_cache: bool = False
 
 class EvaluationResponse(BaseModel):
     status: str
     evaluation: dict
     message: str
+    # 외부 API 장애로 기본 평가를 돌려준 경우 (저장되지 않으므로 나중에 다시 요청해야 함)
+    provisional: bool = False
 
 class RetryChatRequest(BaseModel):
     message: str
     userData: dict
     sessionType: str = "retry"
+    # 없으면 서버가 새 Retry 세션을 만들고 응답으로 돌려줌
+    sessionId: Optional[str] = None
 
 class RetryChatResponse(BaseModel):
     response: str
     success: bool
+    sessionId: Optional[str] = None
 
 class FeedbackRequest(BaseModel):
     userData: dict
@@ -105,20 +333,27 @@ class FeedbackResponse(BaseModel):
 
 class LogsRequest(BaseModel):
     userData: dict
+    # 최신순 페이지 크기 (RECORD_PAGE_MAX_LIMIT까지), 다음 페이지는 응답의 next_cursor로 요청
+    limit: int = Field(10, ge=1)
+    cursor: Optional[str] = None
 
 class QuestCheckRequest(BaseModel):
     conversation_history: list
     quests: list
     participant_id: str
     session_id: str
+    bypass_cache: bool = False
 
 class QuestCheckResponse(BaseModel):
     status: str
     completed_quests: list
     message: str
+    # 외부 API 장애로 평가하지 못한 경우
+    provisional: bool = False
 
 class CheatsheetRequest(BaseModel):
     participant_id: str
+    bypass_cache: bool = False
 
 class CheatsheetResponse(BaseModel):
     status: str
@@ -141,40 +376,544 @@ class GetCheatsheetHistoryResponse(BaseModel):
     status: str
     cheatsheets: list
     message: str
+    # limit을 준 요청에서 다음 페이지가 있으면 커서, 없으면 None
+    next_cursor: Optional[str] = None
+    total: int = 0
+
+class JobResponse(BaseModel):
+    status: str
+    job: dict
+    message: str
+
+class TracingSettingsRequest(BaseModel):
+    trace_sample_rate: Optional[float] = None
+    profile_sample_rate: Optional[float] = None
+    profile_interval_ms: Optional[float] = None
+
+class CacheStatsResponse(BaseModel):
+    status: str
+    stats: dict
+    message: str
 
 # 로그 디렉토리 생성 (절대 경로 사용)
 LOG_DIR = os.path.abspath("logs")
 if not os.path.exists(LOG_DIR):
     os.makedirs(LOG_DIR, exist_ok=True)
-    print(f"📁 로그 디렉토리 생성: {LOG_DIR}")
+    logger.info("로그 디렉토리 생성: %s", LOG_DIR)
 
 # 데이터 디렉토리 생성 (절대 경로 사용)
 DATA_DIR = os.path.abspath("data")
 if not os.path.exists(DATA_DIR):
     os.makedirs(DATA_DIR, exist_ok=True)
-    print(f"📁 데이터 디렉토리 생성: {DATA_DIR}")
+    logger.info("데이터 디렉토리 생성: %s", DATA_DIR)
 
 # 정적 파일 서빙 설정 (logs 폴더를 /static으로 마운트)
 # 디렉토리가 생성된 후에 마운트
 app.mount("/static", StaticFiles(directory="logs"), name="static")
-print(f"📁 정적 파일 서빙 설정: logs -> /static")
+logger.info("정적 파일 서빙 설정: logs -> /static")
+
+# 의사 역할 프롬프트 (/api/chat)
+DOCTOR_SYSTEM_PROMPT = """당신은 50대 남성의 경험 많은 내과 의사입니다. 환자와의 대화에서 다음 사항을 지켜주세요:
+
+1. 무심한 듯한 말투로 대화하세요.
+2. 환자의 증상을 파악하기 위한 질문을 하세요.
+3. 환자에게 향후 조치에 대해 간단하게만 알려주세요.
+4. 의학용어는 쉽게 설명하되, 간결하게 하세요.
+5. 길게 말하지 말고, 존대말로 하세요.
+
+환자의 메시지에 대해 의사로서 적절한 응답을 해주세요."""
+
+# LLM 응답 캐시 설정 (메모리 + 디스크, TTL/LRU 제한)
+LLM_CACHE_DIR = os.path.abspath(os.getenv("LLM_CACHE_DIR", os.path.join("cache", "llm")))
+llm_cache = LLMCache(
+    cache_dir=LLM_CACHE_DIR,
+    ttl_seconds=int(os.getenv("LLM_CACHE_TTL_SECONDS", "86400")),
+    max_memory_entries=int(os.getenv("LLM_CACHE_MAX_MEMORY_ENTRIES", "256")),
+    max_disk_entries=int(os.getenv("LLM_CACHE_MAX_DISK_ENTRIES", "5000")),
+    enabled=os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+)
+logger.info("LLM 응답 캐시 설정: %s (활성화: %s)", LLM_CACHE_DIR, llm_cache.enabled)
+
+# 중복 요청 병합 (single-flight) 설정
+single_flight = SingleFlight(
+    idempotency_ttl_seconds=int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "600"))
+)
+
+# 외부 API 호출 스케줄러 설정 (제공자별 동시성 제한 + 우선순위 대기열 + 재시도)
+upstream = UpstreamScheduler(
+    max_retries=int(os.getenv("UPSTREAM_MAX_RETRIES", "3")),
+    backoff_base=float(os.getenv("UPSTREAM_BACKOFF_BASE_SECONDS", "0.5")),
+    backoff_max=float(os.getenv("UPSTREAM_BACKOFF_MAX_SECONDS", "20"))
+)
+upstream.add_provider(
+    "openai",
+    max_concurrency=int(os.getenv("UPSTREAM_OPENAI_CONCURRENCY", "8")),
+    max_queue=int(os.getenv("UPSTREAM_OPENAI_QUEUE_SIZE", "100")),
+    queue_timeout=float(os.getenv("UPSTREAM_OPENAI_QUEUE_TIMEOUT_SECONDS", "30"))
+)
+upstream.add_provider(
+    "local",
+    max_concurrency=int(os.getenv("UPSTREAM_LOCAL_CONCURRENCY", "2")),
+    max_queue=int(os.getenv("UPSTREAM_LOCAL_QUEUE_SIZE", "100")),
+    queue_timeout=float(os.getenv("UPSTREAM_LOCAL_QUEUE_TIMEOUT_SECONDS", "60"))
+)
+upstream.add_provider(
+    "elevenlabs",
+    max_concurrency=int(os.getenv("UPSTREAM_ELEVENLABS_CONCURRENCY", "4")),
+    max_queue=int(os.getenv("UPSTREAM_ELEVENLABS_QUEUE_SIZE", "50")),
+    queue_timeout=float(os.getenv("UPSTREAM_ELEVENLABS_QUEUE_TIMEOUT_SECONDS", "20"))
+)
+
+# 헤징 설정 (지정한 제공자/엔드포인트 호출이 최근 p90보다 늦으면 같은 요청을 한 번 더 보냄, 기본값: 사용 안 함)
+# 예: UPSTREAM_HEDGE_TARGETS=elevenlabs,openai:chat
+hedging = HedgingPolicies(
+    [target.strip() for target in os.getenv("UPSTREAM_HEDGE_TARGETS", "").split(",") if target.strip()],
+    quantile=float(os.getenv("UPSTREAM_HEDGE_QUANTILE", "0.9")),
+    min_samples=int(os.getenv("UPSTREAM_HEDGE_MIN_SAMPLES", "20")),
+    min_delay=float(os.getenv("UPSTREAM_HEDGE_MIN_DELAY_MS", "50")) / 1000,
+    max_delay=float(os.getenv("UPSTREAM_HEDGE_MAX_DELAY_MS", "10000")) / 1000,
+    budget_ratio=float(os.getenv("UPSTREAM_HEDGE_BUDGET_RATIO", "0.1")),
+    max_utilization=float(os.getenv("UPSTREAM_HEDGE_MAX_UTILIZATION", "0.75"))
+)
+if hedging.enabled:
+    logger.info("외부 API 헤징 대상: %s", ", ".join(sorted(hedging.targets)))
+
+# 서킷 브레이커 설정 (제공자/엔드포인트별로 실패나 느린 호출이 많으면 일정 시간 호출을 차단하고 대체 응답 사용)
+circuit_breakers = CircuitBreakers(
+    enabled=os.getenv("CIRCUIT_BREAKER_ENABLED", "true").lower() == "true",
+    window=int(os.getenv("CIRCUIT_BREAKER_WINDOW", "20")),
+    min_calls=int(os.getenv("CIRCUIT_BREAKER_MIN_CALLS", "10")),
+    failure_rate=float(os.getenv("CIRCUIT_BREAKER_FAILURE_RATE", "0.5")),
+    slow_call_seconds=float(os.getenv("CIRCUIT_BREAKER_SLOW_CALL_SECONDS", "30")),
+    slow_call_rate=float(os.getenv("CIRCUIT_BREAKER_SLOW_CALL_RATE", "0.8")),
+    open_seconds=float(os.getenv("CIRCUIT_BREAKER_OPEN_SECONDS", "30")),
+    half_open_calls=int(os.getenv("CIRCUIT_BREAKER_HALF_OPEN_CALLS", "1"))
+)
+
+# LLM 제공자 설정 (엔드포인트별로 OpenAI 또는 로컬 OpenAI 호환 서버 선택)
+LLM_ENDPOINTS = [
+    "chat", "summarize", "retry_chat", "analyze_voice", "evaluate_conversation", "check_quests", "generate_cheatsheet"
+]
+llm_router = LLMRouter.from_env(
+    {"openai": openai_provider_from_env(), "local": local_provider_from_env()},
+    LLM_ENDPOINTS
+)
+logger.info(
+    "LLM 제공자 설정: 기본 %s, 엔드포인트별 %s",
+    llm_router.default_provider,
+    llm_router.endpoint_providers or "없음"
+)
+
+# 채팅 세션 저장소 (세션 기록을 서버가 보관, 프롬프트는 토큰 예산 안의 최근 대화만 사용)
+session_store = SessionStore(
+    log_dir=LOG_DIR,
+    max_sessions=int(os.getenv("SESSION_CACHE_MAX_SESSIONS", "500"))
+)
+CHAT_HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "1500"))
+
+# Retry 채팅 세션 저장소 (세션당 JSONL 파일 하나에 턴을 이어서 기록)
+retry_session_store = RetrySessionStore(
+    data_dir=DATA_DIR,
+    max_sessions=int(os.getenv("SESSION_CACHE_MAX_SESSIONS", "500"))
+)
+
+# 세션별 퀘스트 체크 결과 (세션 번들 API에서 함께 제공)
+quest_state_store = QuestStateStore(data_dir=DATA_DIR)
+
+# 참가자별 기록 메타데이터 인덱스 (치트시트 기록/로그 목록을 페이지 단위로 읽기 위한 시각/크기/제목 목록)
+RECORD_INDEX_DIR = os.path.join(DATA_DIR, "record_index")
+RECORD_PAGE_MAX_LIMIT = int(os.getenv("RECORD_PAGE_MAX_LIMIT", "100"))
+
+def describe_cheatsheet(filepath: str) -> dict:
+    data = read_json(filepath)
+    script = (data.get("cheatsheet") or {}).get("script") or []
+    first_item = script[0] if script and isinstance(script[0], dict) else {}
+    return {"timestamp": data.get("timestamp", ""), "title": first_item.get("title", "")}
+
+def retry_session_metadata(retry_session: dict) -> dict:
+    turns = retry_session["turns"]
+    header = retry_session["header"]
+    return {
+        "timestamp": turns[-1].get("timestamp", "") if turns else header.get("session_start", ""),
+        "title": header.get("sessionType", "unknown"),
+        "turns": len(turns),
+        "source": "retry_session"
+    }
+
+def describe_legacy_log(filepath: str) -> dict:
+    data = read_json(filepath)
+    return {"timestamp": data.get("timestamp", ""), "title": data.get("sessionType", "unknown"), "source": "legacy"}
+
+def log_sort_key(entry: dict) -> list:
+    return [entry.get("timestamp") or "", entry["name"]]
+
+cheatsheet_index = RecordIndex(
+    "cheatsheets", RECORD_INDEX_DIR,
+    directory_for=session_store.participant_dir,
+    matches=lambda participant_id, filename: filename.startswith("cheatsheet_") and filename.endswith(".json"),
+    describe=describe_cheatsheet,
+    # 파일 이름에 저장 시각이 들어 있으므로 이름 역순 = 최신순
+    sort_key=lambda entry: [entry["name"]]
+)
+retry_session_index = RecordIndex(
+    "retry_sessions", RECORD_INDEX_DIR,
+    directory_for=retry_session_store.participant_dir,
+    matches=lambda participant_id, filename: filename.endswith(".jsonl"),
+    describe=lambda filepath: retry_session_metadata(RetrySessionStore.read_file(filepath)),
+    sort_key=log_sort_key
+)
+# 이전 형식(턴마다 파일 하나) Retry 로그는 data/ 바로 아래에 모든 참가자의 파일이 섞여 있음
+# (로그인할 때마다 data/ 수정 시각이 바뀌므로 공유 디렉토리로 두고 save_user_data에서 인덱스를 갱신)
+legacy_log_index = RecordIndex(
+    "legacy_logs", RECORD_INDEX_DIR,
+    directory_for=lambda participant_id: DATA_DIR,
+    matches=lambda participant_id, filename: filename.startswith(f"user_data_{participant_id}_") and filename.endswith(".json"),
+    describe=describe_legacy_log,
+    sort_key=log_sort_key,
+    shared_directory=True
+)
+
+# 대화 요약 설정 (오래된 턴은 요약, 최근 턴만 원문으로 프롬프트에 포함)
+SUMMARY_REFRESH_EVERY_TURNS = int(os.getenv("SUMMARY_REFRESH_EVERY_TURNS", "6"))
+SUMMARY_KEEP_RECENT_TURNS = int(os.getenv("SUMMARY_KEEP_RECENT_TURNS", "6"))
+
+# 로그인 시 첫 진료 턴 미리 생성 설정
+opening_turns = OpeningTurnCache(
+    ttl_seconds=int(os.getenv("SPECULATIVE_OPENING_TTL_SECONDS", "600")),
+    similarity_threshold=float(os.getenv("SPECULATIVE_OPENING_SIMILARITY", "0.85")),
+    enabled=os.getenv("SPECULATIVE_OPENING_ENABLED", "false").lower() == "true"
+)
+
+# 백그라운드 작업 큐 설정 (치트시트 생성, 대화 평가)
+JOBS_DIR = os.path.join(DATA_DIR, "jobs")
+job_manager = JobManager(
+    jobs_dir=JOBS_DIR,
+    max_workers=int(os.getenv("JOB_WORKERS", "2")),
+    max_queue=int(os.getenv("JOB_QUEUE_SIZE", "100")),
+    retention_seconds=int(os.getenv("JOB_RETENTION_SECONDS", "86400"))
+)
+
+@app.on_event("startup")
+async def start_loop_monitor():
+    """서버 시작 시 이벤트 루프 지연 감시 시작"""
+    await loop_monitor.start()
+
+@app.on_event("shutdown")
+async def stop_loop_monitor():
+    await loop_monitor.stop()
+
+@app.on_event("startup")
+async def start_job_manager():
+    """서버 시작 시 백그라운드 작업 워커 실행"""
+    await job_manager.start()
+    logger.info("백그라운드 작업 워커 시작: %s개 (%s)", job_manager.max_workers, JOBS_DIR)
+
+@app.on_event("shutdown")
+async def stop_job_manager():
+    """서버 종료 시 백그라운드 작업 워커 정리"""
+    await job_manager.stop()
+
+@app.on_event("shutdown")
+async def flush_logs():
+    """서버 종료 시 큐에 남은 로그를 모두 출력"""
+    shutdown_logging()
+
+@app.exception_handler(UpstreamBusyError)
+async def upstream_busy_handler(request, exc: UpstreamBusyError):
+    """외부 API 혼잡 시 500 대신 503 + Retry-After로 응답"""
+    logger.warning("외부 API 혼잡: %s", exc)
+    return FastJSONResponse(
+        status_code=503,
+        content={"detail": f"요청이 많아 잠시 후 다시 시도해주세요. ({exc.reason})"},
+        headers={"Retry-After": str(max(1, int(exc.retry_after)))}
+    )
 
 def ensure_directory_exists(directory_path):
     """디렉토리가 존재하지 않으면 생성하는 안전한 함수"""
     try:
         if not os.path.exists(directory_path):
             os.makedirs(directory_path, exist_ok=True)
-            print(f"📁 디렉토리 생성: {directory_path}")
+            logger.info("디렉토리 생성: %s", directory_path)
         return True
     except Exception as e:
-        print(f"❌ 디렉토리 생성 실패: {directory_path} - {str(e)}")
+        logger.error("디렉토리 생성 실패: %s - %s", directory_path, str(e))
         return False
 
+async def call_upstream(provider: str, endpoint: str, fn, *args, priority: int = PRIORITY_BATCH,
+                        hedgeable: bool = True, can_retry: Optional[Callable[[], bool]] = None, **kwargs):
+    """스케줄러를 통해 외부 API를 호출하고 호출 시간/결과를 메트릭과 서킷 브레이커에 기록하는 함수
+
+    회로가 열려 있으면 호출하지 않고 바로 CircuitOpenError(UpstreamBusyError)를 발생시킴
+    hedgeable=False면 헤징 대상이어도 한 번만 호출 (스트리밍 조각을 클라이언트에 바로 넘기는 호출 등)
+    can_retry는 스케줄러의 재시도 전 확인 함수 (UpstreamScheduler.call 참고)
+    """
+    breaker = circuit_breakers.get(provider, endpoint)
+    if breaker is not None:
+        try:
+            breaker.before_call()
+        except CircuitOpenError:
+            upstream_requests.inc(provider=provider, endpoint=endpoint, outcome="circuit_open")
+            raise
+    
+    start_time = time.perf_counter()
+    outcome = "error"
+    # 회로에 반영할 결과 (None이면 취소/내부 혼잡이라 반영하지 않음)
+    failed = None
+    try:
+        with span(f"{provider}:{endpoint}", provider=provider, endpoint=endpoint):
+            # 버려질 수 있는 미리 생성 작업은 헤징하지 않음
+            hedge = hedging.policy_for(provider, endpoint) if hedgeable and priority != PRIORITY_SPECULATIVE else None
+            result = await upstream.call(
+                provider, fn, *args, priority=priority, hedge=hedge, can_retry=can_retry, **kwargs
+            )
+        outcome = "success"
+        failed = False
+        return result
+    except UpstreamBusyError as e:
+        outcome = "busy"
+        failed = True if is_upstream_failure(e) else None
+        raise
+    except Exception as e:
+        failed = is_upstream_failure(e)
+        raise
+    finally:
+        duration = time.perf_counter() - start_time
+        upstream_latency.observe(duration, provider=provider, endpoint=endpoint)
+        upstream_requests.inc(provider=provider, endpoint=endpoint, outcome=outcome)
+        if breaker is not None:
+            if failed is None:
+                breaker.record_cancelled()
+            else:
+                breaker.record(failed, duration)
+
+def elapsed_ms(start_time: float, end_time: Optional[float] = None) -> float:
+    """perf_counter 기준 경과 시간 (ms, 소수점 한 자리)"""
+    return round(((end_time or time.perf_counter()) - start_time) * 1000, 1)
+
+def require_llm(endpoint: str):
+    """엔드포인트가 사용할 LLM 제공자가 설정되어 있는지 확인하는 함수"""
+    provider = llm_router.provider_for(endpoint)
+    if not provider.is_configured():
+        if provider.name == "openai":
+            raise HTTPException(status_code=500, detail="OpenAI API 키가 설정되지 않았습니다.")
+        raise HTTPException(status_code=500, detail=f"LLM 제공자({provider.name})가 설정되지 않았습니다.")
+    return provider
+
+async def complete_chat(endpoint: str, messages: list, temperature: float, max_tokens: int,
+                        model: Optional[str] = None, use_cache: bool = False, bypass_cache: bool = False,
+                        priority: int = PRIORITY_BATCH, timings: Optional[dict] = None,
+                        json_mode: bool = False, on_delta: Optional[Callable[[str], None]] = None) -> str:
+    """엔드포인트에 지정된 LLM 제공자로 채팅 완성을 호출하고 응답 텍스트를 반환하는 함수 (분석용 엔드포인트는 캐시 사용)
+
+    model을 생략하면 제공자의 기본 모델을 사용하고, json_mode면 JSON 객체 응답을 요청합니다.
+    timings를 넘기면 스트리밍으로 호출하고 첫 토큰 수신 시각을 timings["first_token_at"]에 기록
+    on_delta를 넘기면 스트리밍으로 호출하고 받은 조각마다 호출 (캐시 적중 시 전체 텍스트로 한 번 호출)
+    """
+    provider = require_llm(endpoint)
+    model = model or provider.default_model
+    
+    cache_key = None
+    if use_cache:
+        cache_params = {
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+        # 기존 OpenAI 캐시 항목의 키가 바뀌지 않도록 기본값이 아닐 때만 키에 포함
+        if provider.name != "openai":
+            cache_params["provider"] = provider.name
+        if json_mode:
+            cache_params["json_mode"] = True
+        cache_key = make_cache_key(endpoint, model, messages, cache_params)
+        if not bypass_cache:
+            with timed_io("llm_cache_get"):
+                cached_text = await asyncio.to_thread(llm_cache.get, cache_key)
+            if cached_text is not None:
+                logger.debug("LLM 캐시 적중: %s", endpoint)
+                if on_delta is not None:
+                    on_delta(cached_text)
+                return cached_text
+    
+    request_kwargs = {
+        "messages": messages,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+        "model": model,
+        "json_mode": json_mode
+    }
+    if on_delta is not None:
+        # 조각이 이미 클라이언트로 나가므로 헤징(같은 요청 두 번 실행)하지 않고,
+        # 조각을 하나라도 넘긴 뒤의 오류는 재시도하지 않음 (처음부터 다시 받으면 파서에 조각이 중복됨)
+        delta_state = {"emitted": False}
+        
+        def forward_delta(content: str):
+            delta_state["emitted"] = True
+            on_delta(content)
+        
+        result_text, usage = await call_upstream(
+            provider.name, endpoint, provider.stream, timings if timings is not None else {},
+            priority=priority, hedgeable=False, can_retry=lambda: not delta_state["emitted"],
+            on_delta=forward_delta, **request_kwargs
+        )
+    elif timings is not None:
+        result_text, usage = await call_upstream(
+            provider.name, endpoint, provider.stream, timings, priority=priority, **request_kwargs
+        )
+    else:
+        result_text, usage = await call_upstream(
+            provider.name, endpoint, provider.complete, priority=priority, **request_kwargs
+        )
+    
+    if usage is not None:
+        llm_tokens.inc(usage.prompt_tokens or 0, endpoint=endpoint, model=model, kind="prompt")
+        llm_tokens.inc(usage.completion_tokens or 0, endpoint=endpoint, model=model, kind="completion")
+    
+    # 우회 요청이어도 새 결과로 캐시를 갱신
+    if cache_key is not None and result_text:
+        with timed_io("llm_cache_set"):
+            await asyncio.to_thread(llm_cache.set, cache_key, result_text, endpoint=endpoint)
+    
+    return result_text
+
+# 벤치마크/테스트에서 가짜 서버로 바꿀 수 있도록 환경변수로 설정 (OpenAI는 OPENAI_BASE_URL 사용)
+ELEVENLABS_BASE_URL = os.getenv("ELEVENLABS_BASE_URL", "https://api.elevenlabs.io/v1").rstrip("/")
+
+def request_elevenlabs_audio(text: str) -> bytes:
+    """ElevenLabs TTS를 호출해 MP3 바이트를 반환하는 함수 (실패 시 HTTPError)"""
+    elevenlabs_api_key = os.getenv("ELEVENLABS_API_KEY")
+    # ElevenLabs Voice ID 환경변수에서 가져오기
+    voice_id = os.getenv("ELEVENLABS_VOICE_ID", "BNr4zvrC1bGIdIstzjFQ")
+    elevenlabs_url = f"{ELEVENLABS_BASE_URL}/text-to-speech/{voice_id}"
+    
+    headers = {
+        "Accept": "audio/mpeg",
+        "Content-Type": "application/json",
+        "xi-api-key": elevenlabs_api_key
+    }
+    
+    data = {
+        "text": text,
+        "model_id": "eleven_multilingual_v2",
+        "voice_settings": {
+            "stability": 0.5,
+            "similarity_boost": 0.5
+        }
+    }
+    
+    audio_response = requests.post(elevenlabs_url, json=data, headers=headers, timeout=60)
+    audio_response.raise_for_status()
+    return audio_response.content
+
+async def synthesize_speech(text: str, priority: int = PRIORITY_CHAT, endpoint: str = "chat") -> Optional[bytes]:
+    """의사 응답 음성을 생성하는 함수 (API 키가 없으면 None)"""
+    if not os.getenv("ELEVENLABS_API_KEY"):
+        return None
+    audio_content = await call_upstream("elevenlabs", endpoint, request_elevenlabs_audio, text, priority=priority)
+    tts_bytes.inc(len(audio_content), endpoint=endpoint)
+    return audio_content
+
+async def summarize_conversation(previous_summary: str, turns: list) -> str:
+    """이전 요약과 새 대화 턴을 합쳐 누적 요약문을 생성하는 함수"""
+    prompt = f"""
+다음은 환자용 의료 진료 연습 대화의 일부입니다. 이전 요약과 새 대화를 합쳐 하나의 간결한 요약으로 정리해주세요.
+
+증상 위치, 시작 시기, 증상 강도, 복용 중인 약, 알레르기, 진단명과 근거, 처방약과 복용 방법,
+부작용과 주의사항, 재방문 계획, 증상 악화 시 대처 방법에 관한 정보는 누가 말했는지와 함께 빠짐없이 남겨주세요.
+
+이전 요약:
+{previous_summary or "없음"}
+
+새 대화:
+{format_turns(turns)}
+
+요약문만 답해주세요.
+"""
+    return await complete_chat(
+        "summarize",
+        messages=[
+            {"role": "system", "content": "당신은 진료 대화를 정확하고 간결하게 요약하는 전문가입니다."},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.2,
+        max_tokens=600,
+        use_cache=True,
+        priority=PRIORITY_BATCH
+    )
+
+summarizer = ConversationSummarizer(
+    summarize_conversation,
+    refresh_every_turns=SUMMARY_REFRESH_EVERY_TURNS,
+    keep_recent_turns=SUMMARY_KEEP_RECENT_TURNS
+)
+
+def find_latest_session(participant_id: str) -> Optional[str]:
+    """참가자의 가장 최근 세션 폴더 이름을 찾는 함수 (폴더명 기준 정렬)"""
+    participant_dir = session_store.participant_dir(participant_id)
+    if not os.path.exists(participant_dir):
+        return None
+    with span("directory_lookup", path=participant_dir):
+        session_folders = [
+            item for item in os.listdir(participant_dir)
+            if item.startswith('session_') and os.path.isdir(os.path.join(participant_dir, item))
+        ]
+    if not session_folders:
+        return None
+    return sorted(session_folders, reverse=True)[0]
+
+def refresh_session_summary(participant_id: str, session_id: str):
+    """세션 턴 수가 갱신 주기에 도달했으면 백그라운드에서 요약을 갱신하는 함수"""
+    session_data = session_store.load(participant_id, session_id)
+    if not session_data:
+        return
+    turns = session_messages_to_turns(session_data.get("messages", []))
+    summary_state = session_data.get("summary")
+    if not summarizer.needs_refresh(len(turns), summary_state):
+        return
+    
+    def save_summary(new_state: dict):
+        # 요약하는 동안 추가된 메시지를 잃지 않도록 최신 세션 데이터에 반영
+        current_data = session_store.load(participant_id, session_id)
+        if current_data is None:
+            return
+        current_data["summary"] = new_state
+        session_store.save(participant_id, session_id, current_data)
+    
+    summarizer.schedule_refresh((participant_id, session_id), turns, summary_state, save_summary)
+
+async def generate_opening_turn(symptoms: str) -> dict:
+    """제출된 증상을 첫 메시지로 가정하고 의사 응답을 미리 생성하는 함수 (음성은 적중한 경우에만 채팅 턴에서 생성)"""
+    doctor_response = (await complete_chat(
+        "chat",
+        messages=[
+            {"role": "system", "content": DOCTOR_SYSTEM_PROMPT},
+            {"role": "user", "content": symptoms}
+        ],
+        temperature=0.7,
+        max_tokens=500,
+        priority=PRIORITY_SPECULATIVE
+    )).strip()
+    
+    logger.info("첫 턴 미리 생성 완료")
+    return {"doctor_response": doctor_response}
+
+async def run_single_flight(endpoint: str, participant_id: str, session_id: str, request: BaseModel,
+                            handler, idempotency_key: Optional[str] = None):
+    """동일 참가자/세션/본문의 동시 중복 요청을 하나의 처리로 병합하는 함수"""
+    request_key = make_request_key(endpoint, participant_id, session_id, body=request.dict())
+    scoped_idempotency_key = f"{endpoint}:{participant_id}:{idempotency_key}" if idempotency_key else None
+    try:
+        return await single_flight.do(
+            request_key,
+            lambda: handler(request),
+            idempotency_key=scoped_idempotency_key
+        )
+    except IdempotencyConflictError:
+        raise HTTPException(status_code=409, detail="같은 Idempotency-Key가 다른 요청 내용으로 사용되었습니다.")
+
 def save_user_log(user_data: UserData):
     """참가자 ID별로 로그를 저장하는 함수"""
     try:
         # 참가자 ID로 폴더 생성
-        participant_dir = os.path.join(LOG_DIR, user_data.participantId)
+        participant_dir = session_store.participant_dir(user_data.participantId)
         if not ensure_directory_exists(participant_dir):
             return False
         
@@ -193,14 +932,14 @@ def save_user_log(user_data: UserData):
         }
         
         # JSON 파일로 저장
-        with open(log_filepath, 'w', encoding='utf-8') as f:
-            json.dump(log_data, f, ensure_ascii=False, indent=2)
+        with span("json_dump", path=log_filepath):
+            write_json(log_filepath, log_data)
         
-        print(f"✅ 로그 저장 완료: {log_filepath}")
+        logger.info("로그 저장 완료: %s", log_filepath)
         return True
         
     except Exception as e:
-        print(f"❌ 로그 저장 실패: {str(e)}")
+        logger.error("로그 저장 실패: %s", str(e))
         return False
 
 @app.post("/api/save-user-data", response_model=UserDataResponse)
@@ -208,15 +947,19 @@ async def save_user_data(user_data: UserData):
     """사용자 데이터를 저장하는 API"""
     try:
         # 참가자 ID로 파일명 생성
-        filename = f"data/user_data_{user_data.participantId}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        filename = f"user_data_{user_data.participantId}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
         
         # 데이터를 JSON 파일로 저장
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(user_data.dict(), f, ensure_ascii=False, indent=2)
+        write_json(os.path.join(DATA_DIR, filename), user_data.dict())
+        legacy_log_index.record(user_data.participantId, filename)
         
         # 로그 저장
         log_saved = save_user_log(user_data)
         
+        # 첫 채팅 턴 응답을 백그라운드에서 미리 생성 (로그인 시 만든 채팅 세션 ID가 있을 때만)
+        if user_data.sessionId and llm_router.is_configured("chat"):
+            opening_turns.start(user_data.participantId, user_data.sessionId, user_data.symptoms, generate_opening_turn)
+        
         return UserDataResponse(
             success=True,
             message="사용자 데이터가 성공적으로 저장되었습니다." + (" 로그도 저장되었습니다." if log_saved else " 로그 저장에 실패했습니다."),
@@ -232,11 +975,127 @@ async def health_check():
     log_status = "OK" if os.path.exists(LOG_DIR) else "ERROR"
     data_status = "OK" if os.path.exists(DATA_DIR) else "ERROR"
     
+    # 이벤트 루프가 지금 밀려 있으면 DEGRADED
+    loop_stats = loop_monitor.stats()
+    loop_degraded = loop_stats["current_lag_ms"] >= loop_stats["stall_threshold_ms"]
+    
     return HealthResponse(
-        status="OK",
-        message=f"Backend 서버가 정상적으로 작동중입니다. 로그 디렉토리: {log_status}, 데이터 디렉토리: {data_status}"
+        status="DEGRADED" if loop_degraded else "OK",
+        message=f"Backend 서버가 정상적으로 작동중입니다. 로그 디렉토리: {log_status}, 데이터 디렉토리: {data_status}, 이벤트 루프 지연: {loop_stats['current_lag_ms']}ms",
+        event_loop=loop_stats
     )
 
+# 준비 상태 점검 기준 (하나라도 넘으면 /ready가 503을 반환)
+READY_MIN_DISK_FREE_MB = float(os.getenv("READY_MIN_DISK_FREE_MB", "500"))
+READY_MAX_INODE_USED_RATIO = float(os.getenv("READY_MAX_INODE_USED_RATIO", "0.95"))
+READY_MAX_WRITE_PROBE_MS = float(os.getenv("READY_MAX_WRITE_PROBE_MS", "500"))
+READY_MAX_LOOP_LAG_MS = float(os.getenv("READY_MAX_LOOP_LAG_MS", "500"))
+# 외부 API 점검 실패를 준비 실패로 볼지 여부 (기본값: 정보로만 표시)
+READY_REQUIRE_PROVIDERS = os.getenv("READY_REQUIRE_PROVIDERS", "false").lower() == "true"
+
+def probe_openai() -> dict:
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        return {"configured": False, "reachable": None, "status_code": None, "latency_ms": None, "error": None}
+    base_url = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1").rstrip("/")
+    return dict(http_probe(f"{base_url}/models", {"Authorization": f"Bearer {api_key}"}, timeout=3), configured=True)
+
+def probe_elevenlabs() -> dict:
+    api_key = os.getenv("ELEVENLABS_API_KEY")
+    if not api_key:
+        return {"configured": False, "reachable": None, "status_code": None, "latency_ms": None, "error": None}
+    return dict(http_probe(f"{ELEVENLABS_BASE_URL}/models", {"xi-api-key": api_key}, timeout=3), configured=True)
+
+def probe_local_llm() -> dict:
+    provider = llm_router.providers["local"]
+    if not provider.is_configured():
+        return {"configured": False, "reachable": None, "status_code": None, "latency_ms": None, "error": None}
+    headers = {"Authorization": f"Bearer {provider.api_key}"} if provider.api_key else {}
+    return dict(http_probe(f"{provider.base_url}/models", headers, timeout=3), configured=True)
+
+PROVIDER_PROBE_TTL_SECONDS = float(os.getenv("READY_PROVIDER_PROBE_TTL_SECONDS", "30"))
+provider_probes = {
+    "openai": CachedProbe("openai", probe_openai, ttl_seconds=PROVIDER_PROBE_TTL_SECONDS),
+    "local_llm": CachedProbe("local_llm", probe_local_llm, ttl_seconds=PROVIDER_PROBE_TTL_SECONDS),
+    "elevenlabs": CachedProbe("elevenlabs", probe_elevenlabs, ttl_seconds=PROVIDER_PROBE_TTL_SECONDS),
+}
+
+def check_storage() -> dict:
+    """로그 디렉토리 디스크 상태와 쓰기 지연 점검 (스레드에서 실행)"""
+    disk = disk_status(LOG_DIR)
+    try:
+        write_ms = round(write_probe(LOG_DIR) * 1000, 1)
+        write_error = None
+    except OSError as e:
+        write_ms = None
+        write_error = str(e)
+    return {
+        "disk": dict(
+            disk,
+            ok=disk["free_mb"] >= READY_MIN_DISK_FREE_MB
+            and (disk["inode_used_ratio"] is None or disk["inode_used_ratio"] <= READY_MAX_INODE_USED_RATIO)
+        ),
+        "write_probe": {
+            "ok": write_error is None and write_ms <= READY_MAX_WRITE_PROBE_MS,
+            "latency_ms": write_ms,
+            "error": write_error,
+        },
+    }
+
+@app.get("/ready", response_model=ReadinessResponse)
+async def readiness_check():
+    """로드밸런서용 준비 상태 점검 API (디스크, 쓰기 지연, 이벤트 루프, 외부 API, 대기열, 캐시)"""
+    checks = {}
+    try:
+        checks.update(await asyncio.wait_for(asyncio.to_thread(check_storage), READY_MAX_WRITE_PROBE_MS / 1000 * 4))
+    except asyncio.TimeoutError:
+        checks["write_probe"] = {"ok": False, "latency_ms": None, "error": "Timeout"}
+    
+    loop_lag_ms = round(loop_monitor.current_lag() * 1000, 1)
+    checks["event_loop"] = {
+        "ok": loop_lag_ms <= READY_MAX_LOOP_LAG_MS,
+        "lag_ms": loop_lag_ms,
+        "max_lag_ms": round(loop_monitor.max_lag * 1000, 1),
+        "stall_count": loop_monitor.stall_count,
+    }
+    
+    for name, probe in provider_probes.items():
+        result = await probe.result()
+        ok = result["reachable"] is not False or not READY_REQUIRE_PROVIDERS
+        checks[f"provider_{name}"] = dict(result, ok=ok)
+    
+    # 대기열이 가득 차면 새 요청도 503으로 거절되므로 다른 인스턴스로 보내는 편이 나음
+    upstream_providers = upstream.stats()["providers"]
+    checks["upstream_queues"] = {
+        "ok": all(stats["queued"] < stats["max_queue"] for stats in upstream_providers.values()),
+        "providers": {
+            name: {"active": stats["active"], "queued": stats["queued"], "max_queue": stats["max_queue"]}
+            for name, stats in upstream_providers.items()
+        },
+    }
+    job_stats = job_manager.stats()
+    checks["job_queue"] = {
+        "ok": job_stats["queue_depth"] < job_stats["max_queue"],
+        "queue_depth": job_stats["queue_depth"],
+        "max_queue": job_stats["max_queue"],
+    }
+    
+    llm_cache_stats = llm_cache.stats()
+    checks["caches"] = {
+        "ok": True,
+        "llm_cache_memory_entries": llm_cache_stats["memory_entries"],
+        "llm_cache_disk_entries": llm_cache_stats["disk_entries"],
+        "session_cache_entries": session_store.stats()["cached_sessions"],
+        "retry_session_cache_entries": retry_session_store.stats()["cached_sessions"],
+        "idempotency_entries": single_flight.stats()["idempotency_entries"],
+    }
+    
+    failed_checks = [name for name, check in checks.items() if not check["ok"]]
+    response = ReadinessResponse(ready=not failed_checks, failed_checks=failed_checks, checks=checks)
+    if failed_checks:
+        return FastJSONResponse(status_code=503, content=response.dict())
+    return response
+
 @app.get("/env-info")
 async def env_info():
     """환경변수 정보 확인 API"""
@@ -246,6 +1105,7 @@ async def env_info():
         "elevenlabs_voice_id": os.getenv("ELEVENLABS_VOICE_ID", "BNr4zvrC1bGIdIstzjFQ"),
         "openai_api_key_length": len(os.getenv("OPENAI_API_KEY", "")),
         "elevenlabs_api_key_length": len(os.getenv("ELEVENLABS_API_KEY", "")),
+        "llm_providers": llm_router.stats(),
         "log_directory": LOG_DIR,
         "log_directory_exists": os.path.exists(LOG_DIR),
         "data_directory": DATA_DIR,
@@ -253,115 +1113,295 @@ async def env_info():
         "current_working_directory": os.getcwd()
     }
 
-@app.post("/api/chat", response_model=ChatResponse)
-async def chat_with_doctor(request: ChatRequest):
-    """의사와의 채팅 API"""
-    try:
-        # OpenAI API 키 확인
-        openai_api_key = os.getenv("OPENAI_API_KEY")
-        if not openai_api_key:
-            raise HTTPException(status_code=500, detail="OpenAI API 키가 설정되지 않았습니다.")
-        
-        # OpenAI 클라이언트 설정
-        openai.api_key = openai_api_key
-        
-        # 의사 역할 프롬프트
-        system_prompt = """당신은 50대 남성의 경험 많은 내과 의사입니다. 환자와의 대화에서 다음 사항을 지켜주세요:
+@app.get("/api/llm-cache", response_model=CacheStatsResponse)
+async def get_llm_cache_stats():
+    """LLM 응답 캐시 상태 조회 API"""
+    return CacheStatsResponse(
+        status="success",
+        stats=llm_cache.stats(),
+        message="LLM 캐시 상태를 가져왔습니다."
+    )
 
-1. 무심한 듯한 말투로 대화하세요.
-2. 환자의 증상을 파악하기 위한 질문을 하세요.
-3. 환자에게 향후 조치에 대해 간단하게만 알려주세요.
-4. 의학용어는 쉽게 설명하되, 간결하게 하세요.
-5. 길게 말하지 말고, 존대말로 하세요.
+@app.get("/api/compression-status", response_model=CacheStatsResponse)
+async def get_compression_status():
+    """응답 압축 상태 조회 API (인코딩별 압축 전후 크기, 미리 압축된 본문 캐시)"""
+    return CacheStatsResponse(
+        status="success",
+        stats=dict(compression_stats.snapshot(), cache=compression_cache.stats()),
+        message="응답 압축 상태를 가져왔습니다."
+    )
 
-환자의 메시지에 대해 의사로서 적절한 응답을 해주세요."""
+@app.get("/api/upstream-status", response_model=CacheStatsResponse)
+async def get_upstream_status():
+    """외부 API 호출 스케줄러 상태 조회 API (동시 호출 수, 대기열 길이, 재시도 횟수, 헤징)"""
+    return CacheStatsResponse(
+        status="success",
+        stats=dict(upstream.stats(), hedging=hedging.stats(), circuit_breakers=circuit_breakers.stats()),
+        message="외부 API 호출 상태를 가져왔습니다."
+    )
+
+def collect_component_metrics() -> list:
+    """캐시/스케줄러/작업 큐 등 각 구성 요소의 상태를 스크랩 시점에 메트릭으로 변환"""
+    cache_stats = {
+        "llm": llm_cache.stats(),
+        "session": session_store.stats(),
+        "opening_turn": opening_turns.stats(),
+    }
+    hit_ratios = []
+    for name, stats in cache_stats.items():
+        total = stats["hits"] + stats["misses"]
+        hit_ratios.append(({"cache": name}, stats["hits"] / total if total else 0.0))
+    
+    upstream_stats = upstream.stats()
+    providers = upstream_stats["providers"]
+    flight_stats = single_flight.stats()
+    job_stats = job_manager.stats()
+    hedge_policies = hedging.items()
+    breakers = circuit_breakers.items()
+    llm_cache_stats = cache_stats["llm"]
+    compression = compression_stats.snapshot()
+    
+    return [
+        ("cache_hits_total", "counter", "캐시 적중 수",
+         [({"cache": name}, stats["hits"]) for name, stats in cache_stats.items()]),
+        ("cache_misses_total", "counter", "캐시 미스 수",
+         [({"cache": name}, stats["misses"]) for name, stats in cache_stats.items()]),
+        ("cache_hit_ratio", "gauge", "서버 시작 이후 캐시 적중률", hit_ratios),
+        ("llm_cache_entries", "gauge", "LLM 응답 캐시 항목 수",
+         [({"tier": "memory"}, llm_cache_stats["memory_entries"]), ({"tier": "disk"}, llm_cache_stats["disk_entries"])]),
+        ("single_flight_coalesced_total", "counter", "진행 중인 요청에 합쳐진 중복 요청 수",
+         [({}, flight_stats["coalesced"])]),
+        ("single_flight_replayed_total", "counter", "Idempotency-Key로 재사용된 응답 수",
+         [({}, flight_stats["replayed"])]),
+        ("upstream_active", "gauge", "제공자별 실행 중인 외부 API 호출 수",
+         [({"provider": name}, stats["active"]) for name, stats in providers.items()]),
+        ("upstream_queued", "gauge", "제공자별 대기 중인 외부 API 호출 수",
+         [({"provider": name}, stats["queued"]) for name, stats in providers.items()]),
+        ("upstream_abandoned", "gauge", "결과를 버렸지만 스레드에서 아직 실행 중인 외부 API 호출 수 (슬롯 사용 중)",
+         [({"provider": name}, stats["abandoned"]) for name, stats in providers.items()]),
+        ("upstream_rejected_total", "counter", "대기열이 가득 차 거절된 외부 API 호출 수",
+         [({"provider": name}, stats["rejected"]) for name, stats in providers.items()]),
+        ("upstream_queue_timeouts_total", "counter", "대기 시간이 초과된 외부 API 호출 수",
+         [({"provider": name}, stats["timed_out"]) for name, stats in providers.items()]),
+        ("upstream_retries_total", "counter", "외부 API 재시도 수", [({}, upstream_stats["retries"])]),
+        ("upstream_hedged_total", "counter", "임계값을 넘겨 추가로 보낸 헤징 요청 수",
+         [({"provider": provider, "endpoint": endpoint}, policy.hedged) for (provider, endpoint), policy in hedge_policies]),
+        ("upstream_hedge_outcomes_total", "counter", "헤징 결과 (hedge_won: 추가 요청이 먼저 끝남, skipped_*: 예산/슬롯 부족으로 생략)",
+         [({"provider": provider, "endpoint": endpoint, "outcome": outcome}, policy.outcomes[outcome])
+          for (provider, endpoint), policy in hedge_policies for outcome in HEDGE_OUTCOMES]),
+        ("upstream_hedge_delay_seconds", "gauge", "현재 헤징 임계값 (초, 표본이 부족하면 생략)",
+         [({"provider": provider, "endpoint": endpoint}, policy.hedge_delay())
+          for (provider, endpoint), policy in hedge_policies if policy.hedge_delay() is not None]),
+        ("circuit_breaker_state", "gauge", "서킷 브레이커 상태 (0: closed, 1: half_open, 2: open)",
+         [({"provider": provider, "endpoint": endpoint}, STATE_VALUES[breaker.state]) for (provider, endpoint), breaker in breakers]),
+        ("circuit_breaker_opened_total", "counter", "서킷 브레이커가 열린 횟수",
+         [({"provider": provider, "endpoint": endpoint}, breaker.opened) for (provider, endpoint), breaker in breakers]),
+        ("circuit_breaker_rejected_total", "counter", "회로가 열려 호출하지 않고 차단한 수",
+         [({"provider": provider, "endpoint": endpoint}, breaker.rejected) for (provider, endpoint), breaker in breakers]),
+        ("http_compressed_responses_total", "counter", "인코딩별 압축해서 보낸 응답 수",
+         [({"encoding": encoding}, count) for encoding, count in compression["responses"].items()]),
+        ("http_compression_bytes_total", "counter", "압축 전/후 응답 본문 바이트 수",
+         [({"encoding": encoding, "stage": "original"}, count) for encoding, count in compression["bytes_in"].items()]
+         + [({"encoding": encoding, "stage": "compressed"}, count) for encoding, count in compression["bytes_out"].items()]),
+        ("http_compression_skipped_total", "counter", "압축하지 않은 응답 수 (content_type: 허용 목록 밖, small: 최소 크기 미만)",
+         [({"reason": reason}, count) for reason, count in compression["skipped"].items()]),
+        ("http_compression_cache_hits_total", "counter", "미리 압축된 본문을 재사용한 응답 수",
+         [({}, compression["cache_hits"])]),
+        ("job_queue_depth", "gauge", "대기 중인 백그라운드 작업 수", [({}, job_stats["queue_depth"])]),
+        ("jobs", "gauge", "메모리에 있는 상태별 백그라운드 작업 수",
+         [({"status": status}, count) for status, count in job_stats["jobs"].items()]),
+        ("log_records_dropped_total", "counter", "로그 큐가 가득 차 버려진 로그 수",
+         [({}, logging_stats()["dropped"])]),
+        ("event_loop_lag_current_seconds", "gauge", "현재 이벤트 루프 지연 (초)",
+         [({}, loop_monitor.current_lag())]),
+        ("event_loop_lag_max_seconds", "gauge", "서버 시작 이후 최대 이벤트 루프 지연 (초)",
+         [({}, loop_monitor.max_lag)]),
+        ("event_loop_stalls_total", "counter", "임계값을 넘은 이벤트 루프 멈춤 횟수",
+         [({}, loop_monitor.stall_count)]),
+    ]
+
+metrics_registry.register_collector(collect_component_metrics)
+
+@app.get("/metrics")
+async def get_metrics():
+    """Prometheus 형식 메트릭 API"""
+    return Response(content=metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+def require_admin(admin_token: Optional[str]):
+    """ADMIN_TOKEN이 설정되어 있으면 X-Admin-Token 헤더가 일치하는지 확인"""
+    expected_token = os.getenv("ADMIN_TOKEN")
+    if expected_token and admin_token != expected_token:
+        raise HTTPException(status_code=403, detail="관리자 권한이 필요합니다.")
+
+def tracing_status() -> dict:
+    return {"tracing": tracer.stats(), "profiler": profiler.stats()}
+
+@app.get("/api/admin/tracing", response_model=CacheStatsResponse)
+async def get_tracing_settings(x_admin_token: Optional[str] = Header(None)):
+    """트레이싱/프로파일러 설정과 상태 조회 API"""
+    require_admin(x_admin_token)
+    return CacheStatsResponse(
+        status="success",
+        stats=tracing_status(),
+        message="트레이싱 설정을 가져왔습니다."
+    )
+
+@app.post("/api/admin/tracing", response_model=CacheStatsResponse)
+async def update_tracing_settings(request: TracingSettingsRequest, x_admin_token: Optional[str] = Header(None)):
+    """재배포 없이 트레이싱/프로파일러 샘플링 비율을 바꾸는 API (0이면 꺼짐)"""
+    require_admin(x_admin_token)
+    for value in (request.trace_sample_rate, request.profile_sample_rate):
+        if value is not None and not 0 <= value <= 1:
+            raise HTTPException(status_code=400, detail="샘플링 비율은 0과 1 사이여야 합니다.")
+    if request.profile_interval_ms is not None and request.profile_interval_ms <= 0:
+        raise HTTPException(status_code=400, detail="샘플링 간격은 0보다 커야 합니다.")
+    
+    if request.trace_sample_rate is not None:
+        tracer.sample_rate = request.trace_sample_rate
+    if request.profile_sample_rate is not None:
+        profiler.sample_rate = request.profile_sample_rate
+    if request.profile_interval_ms is not None:
+        profiler.interval_ms = request.profile_interval_ms
+    logger.info("트레이싱 설정 변경: 트레이스 %s, 프로파일 %s", tracer.sample_rate, profiler.sample_rate)
+    return CacheStatsResponse(
+        status="success",
+        stats=tracing_status(),
+        message="트레이싱 설정을 변경했습니다."
+    )
+
+@app.get("/api/admin/loop-stalls", response_model=CacheStatsResponse)
+async def get_loop_stalls(x_admin_token: Optional[str] = Header(None)):
+    """최근 이벤트 루프 멈춤 기록 조회 API (멈춘 순간의 핸들러와 호출 스택 포함)"""
+    require_admin(x_admin_token)
+    return CacheStatsResponse(
+        status="success",
+        stats=loop_monitor.stats(include_stacks=True),
+        message="이벤트 루프 멈춤 기록을 가져왔습니다."
+    )
+
+@app.get("/api/admin/profile")
+async def get_profile(dump: bool = False, reset: bool = False, x_admin_token: Optional[str] = Header(None)):
+    """누적된 프로파일을 folded stack 텍스트로 반환 (dump=true면 파일로도 저장, reset=true면 초기화)"""
+    require_admin(x_admin_token)
+    folded = profiler.folded()
+    headers = {}
+    if dump:
+        headers["X-Profile-File"] = await asyncio.to_thread(profiler.dump)
+    if reset:
+        profiler.reset()
+    return Response(content=folded, media_type="text/plain", headers=headers)
+
+@app.delete("/api/llm-cache", response_model=CacheStatsResponse)
+async def clear_llm_cache():
+    """LLM 응답 캐시를 비우는 API"""
+    await asyncio.to_thread(llm_cache.clear)
+    logger.info("LLM 캐시 초기화 완료")
+    return CacheStatsResponse(
+        status="success",
+        stats=llm_cache.stats(),
+        message="LLM 캐시를 비웠습니다."
+    )
+
+@app.post("/api/chat", response_model=ChatResponse)
+async def chat_with_doctor(request: ChatRequest, idempotency_key: Optional[str] = Header(None)):
+    """의사와의 채팅 API (동시 중복 요청은 하나의 처리 결과를 공유)"""
+    return await run_single_flight(
+        "chat", request.participantId, request.sessionId, request,
+        process_chat, idempotency_key
+    )
 
-        # 대화 기록 구성
+async def process_chat(request: ChatRequest):
+    """의사와의 채팅을 처리하는 함수"""
+    # 턴 단계별 소요 시간 (ms) - 느린 턴의 원인(LLM/TTS/디스크)을 나중에 확인하기 위해 메시지와 함께 저장
+    turn_start = time.perf_counter()
+    timings_ms = {}
+    try:
+        # LLM 제공자 설정 확인
+        require_llm("chat")
+        
+        # 서버가 보관한 세션 기록 사용 (서버 기록이 없으면 클라이언트가 보낸 기록으로 대체)
+        with timed_io("session_load"):
+            session_data = session_store.load(request.participantId, request.sessionId)
+        session_messages = session_data.get("messages", []) if session_data else []
+        summary_state = session_data.get("summary") if session_data else None
+        covered_turns = summary_state.get("covered_turns", 0) if summary_state else 0
+        
+        # 요약에 반영된 앞쪽 턴은 요약문으로 대체하고 나머지만 원문으로 사용
+        history = session_messages_to_history(session_messages[covered_turns:])
+        if not session_messages and request.conversationHistory:
+            history = request.conversationHistory
+        
+        # 대화 기록 구성 (의사 역할 프롬프트 + 요약 + 토큰 예산 안의 최근 대화 + 현재 메시지)
+        history_window = build_history_window(history, CHAT_HISTORY_TOKEN_BUDGET)
         messages_for_api = [
-            {"role": "system", "content": system_prompt}
+            {"role": "system", "content": DOCTOR_SYSTEM_PROMPT}
         ]
-        
-        # 이전 대화 기록 추가
-        if request.conversationHistory:
-            messages_for_api.extend(request.conversationHistory)
-        
-        # 현재 사용자 메시지 추가
+        if summary_state and summary_state.get("text"):
+            messages_for_api.append({"role": "system", "content": f"지금까지의 대화 요약: {summary_state['text']}"})
+        messages_for_api.extend(history_window)
         messages_for_api.append({"role": "user", "content": request.message})
+        timings_ms["prompt_build"] = elapsed_ms(turn_start)
         
-        print(f"📝 대화 기록 길이: {len(messages_for_api)}")
-        print(f"📝 최근 대화: {request.conversationHistory[-3:] if request.conversationHistory else '없음'}")
-        
-        # ChatGPT API 호출
-        client = openai.OpenAI(api_key=openai_api_key)
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=messages_for_api,
-            max_tokens=500,
-            temperature=0.7
-        )
+        logger.debug("대화 기록 길이: 요약 %s턴 + 최근 %s개 중 %s개 사용", covered_turns, len(history), len(history_window))
         
-        # 응답 추출
-        doctor_response = response.choices[0].message.content.strip()
+        # 첫 턴이면 로그인 시 미리 생성해 둔 응답 사용 시도
+        speculative_turn = None
+        if not session_messages and not any(msg.get("role") == "user" for msg in history):
+            speculative_turn = await opening_turns.take(request.participantId, request.sessionId, request.message)
         
-        # 참가자별 디렉토리 생성 (먼저 생성)
-        participant_dir = os.path.join(LOG_DIR, request.participantId)
-        ensure_directory_exists(participant_dir)
+        if speculative_turn:
+            doctor_response = speculative_turn["doctor_response"]
+            logger.debug("미리 생성한 첫 턴 응답 사용: %s", request.participantId)
+        else:
+            # ChatGPT API 호출 (실시간 채팅은 최우선 처리)
+            llm_start = time.perf_counter()
+            llm_timings = {}
+            doctor_response = (await complete_chat(
+                "chat",
+                messages=messages_for_api,
+                temperature=0.7,
+                max_tokens=500,
+                priority=PRIORITY_CHAT,
+                timings=llm_timings
+            )).strip()
+            timings_ms["llm_total"] = elapsed_ms(llm_start)
+            if "first_token_at" in llm_timings:
+                timings_ms["llm_first_token"] = elapsed_ms(llm_start, llm_timings["first_token_at"])
         
         # 세션별 디렉토리 생성
-        session_dir = os.path.join(participant_dir, request.sessionId)
+        session_dir = session_store.session_dir(request.participantId, request.sessionId)
         ensure_directory_exists(session_dir)
         
-        # 세션 파일명 생성 (세션ID.json)
-        session_filename = f"chat_session.json"
-        session_filepath = os.path.join(session_dir, session_filename)
-        
-        # 기존 세션 파일이 있는지 확인
-        existing_session = session_filepath if os.path.exists(session_filepath) else None
-        
-        # ElevenLabs 음성 생성
-        elevenlabs_api_key = os.getenv("ELEVENLABS_API_KEY")
+        # ElevenLabs 음성 생성 (장애로 회로가 열려 있으면 기다리지 않고 텍스트로만 응답)
         audio_url = None
-        
-        if elevenlabs_api_key:
-            try:
-                # ElevenLabs Voice ID 환경변수에서 가져오기
-                voice_id = os.getenv("ELEVENLABS_VOICE_ID", "BNr4zvrC1bGIdIstzjFQ")
-                elevenlabs_url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
+        degraded = False
+        try:
+            tts_start = time.perf_counter()
+            audio_content = await synthesize_speech(doctor_response)
+            if audio_content is not None:
+                timings_ms["tts"] = elapsed_ms(tts_start)
+            
+            if audio_content is not None:
+                # 오디오 파일 저장 (세션별 디렉토리에)
+                audio_filename = f"audio_{datetime.now().strftime('%Y%m%d_%H%M%S')}.mp3"
+                audio_filepath = os.path.join(session_dir, audio_filename)
                 
-                headers = {
-                    "Accept": "audio/mpeg",
-                    "Content-Type": "application/json",
-                    "xi-api-key": elevenlabs_api_key
-                }
+                audio_write_start = time.perf_counter()
+                with timed_io("audio_write"):
+                    with open(audio_filepath, 'wb') as f:
+                        f.write(audio_content)
+                timings_ms["audio_write"] = elapsed_ms(audio_write_start)
                 
-                data = {
-                    "text": doctor_response,
-                    "model_id": "eleven_multilingual_v2",
-                    "voice_settings": {
-                        "stability": 0.5,
-                        "similarity_boost": 0.5
-                    }
-                }
+                # 오디오 URL 생성 (전용 API 엔드포인트 사용)
+                audio_url = f"/api/audio/{request.participantId}/{request.sessionId}/{audio_filename}"
                 
-                audio_response = requests.post(elevenlabs_url, json=data, headers=headers)
+                logger.debug("ElevenLabs 음성 생성 완료: %s", audio_filepath)
                 
-                if audio_response.status_code == 200:
-                    # 오디오 파일 저장 (세션별 디렉토리에)
-                    audio_filename = f"audio_{datetime.now().strftime('%Y%m%d_%H%M%S')}.mp3"
-                    audio_filepath = os.path.join(session_dir, audio_filename)
-                    
-                    with open(audio_filepath, 'wb') as f:
-                        f.write(audio_response.content)
-                    
-                    # 오디오 URL 생성 (전용 API 엔드포인트 사용)
-                    audio_url = f"/api/audio/{request.participantId}/{request.sessionId}/{audio_filename}"
-                    
-                    print(f"✅ ElevenLabs 음성 생성 완료: {audio_filepath}")
-                else:
-                    print(f"⚠️ ElevenLabs API 오류: {audio_response.status_code}")
-                    
-            except Exception as e:
-                print(f"⚠️ ElevenLabs 음성 생성 실패: {str(e)}")
+        except CircuitOpenError:
+            degraded = True
+        except Exception as e:
+            degraded = should_degrade(e)
+            logger.warning("ElevenLabs 음성 생성 실패: %s", str(e))
         
         # 대화 세션 로그 구성
         current_message = {
@@ -369,29 +1409,19 @@ async def chat_with_doctor(request: ChatRequest):
             "user_message": request.message,
             "doctor_response": doctor_response,
             "audio_url": audio_url,
-            "conversation_history_length": len(request.conversationHistory) if request.conversationHistory else 0
+            "conversation_history_length": covered_turns * 2 + len(history),
+            "prompt_history_length": len(history_window),
+            "speculative": bool(speculative_turn),
+            "degraded": degraded
         }
         
-        # 기존 세션이 있으면 로드하고 새 메시지 추가
-        if existing_session:
-            try:
-                with open(existing_session, 'r', encoding='utf-8') as f:
-                    session_data = json.load(f)
-                session_data["messages"].append(current_message)
-                session_data["last_updated"] = datetime.now().isoformat()
-                session_data["total_messages"] = len(session_data["messages"])
-                
-                print(f"📝 기존 세션에 메시지 추가: {existing_session}")
-            except Exception as e:
-                print(f"⚠️ 기존 세션 로드 실패: {str(e)}")
-                session_data = {
-                    "participantId": request.participantId,
-                    "sessionId": request.sessionId,
-                    "session_start": datetime.now().isoformat(),
-                    "last_updated": datetime.now().isoformat(),
-                    "messages": [current_message],
-                    "total_messages": 1
-                }
+        # 기존 세션이 있으면 새 메시지 추가
+        if session_data and isinstance(session_data.get("messages"), list):
+            session_data["messages"].append(current_message)
+            session_data["last_updated"] = datetime.now().isoformat()
+            session_data["total_messages"] = len(session_data["messages"])
+            
+            logger.debug("기존 세션에 메시지 추가: %s", request.sessionId)
         else:
             # 새 세션 생성
             session_data = {
@@ -402,23 +1432,43 @@ async def chat_with_doctor(request: ChatRequest):
                 "messages": [current_message],
                 "total_messages": 1
             }
-            print(f"📝 새 세션 생성: {session_filename}")
+            logger.info("새 세션 생성: %s", request.sessionId)
         
-        # 세션 파일 저장
-        target_filepath = existing_session if existing_session else session_filepath
-        with open(target_filepath, 'w', encoding='utf-8') as f:
-            json.dump(session_data, f, ensure_ascii=False, indent=2)
+        # 세션 파일 저장 (메모리 세션 캐시도 함께 갱신)
+        persist_start = time.perf_counter()
+        with timed_io("session_save"):
+            session_filepath = session_store.save(request.participantId, request.sessionId, session_data)
+        timings_ms["session_persist"] = elapsed_ms(persist_start)
+        timings_ms["total"] = elapsed_ms(turn_start)
         
-        print(f"✅ 대화 세션 저장 완료: {target_filepath} (총 {session_data['total_messages']}개 메시지)")
+        logger.debug("대화 세션 저장 완료: %s (총 %s개 메시지)", session_filepath, session_data['total_messages'])
+        
+        # 단계별 소요 시간은 저장 시간까지 포함해 별도 파일에 추가 (turn_timings_report에서 집계)
+        try:
+            with timed_io("turn_timings_append"):
+                session_store.append_turn_timings(request.participantId, request.sessionId, {
+                    "timestamp": current_message["timestamp"],
+                    "turn": session_data["total_messages"],
+                    "timings_ms": timings_ms
+                })
+        except OSError as e:
+            logger.warning("턴 소요 시간 기록 실패: %s", e)
+        
+        # N턴마다 오래된 대화 요약을 백그라운드에서 갱신
+        refresh_session_summary(request.participantId, request.sessionId)
         
         return ChatResponse(
             response=doctor_response,
             success=True,
-            audio_url=audio_url
+            audio_url=audio_url,
+            degraded=degraded
         )
         
+    except UpstreamBusyError:
+        # 혼잡 응답(503)은 전용 핸들러에서 처리
+        raise
     except Exception as e:
-        print(f"❌ 채팅 API 오류: {str(e)}")
+        logger.error("채팅 API 오류: %s", str(e))
         raise HTTPException(status_code=500, detail=f"채팅 처리 중 오류가 발생했습니다: {str(e)}")
 
 @app.get("/api/logs", response_model=LogsResponse)
@@ -427,49 +1477,43 @@ async def get_conversation_logs(participant_id: str):
     try:
         logs = []
         
-        print(f"🔍 참가자 ID로 로그 조회: {participant_id}")
-        print(f"📁 로그 디렉토리 경로: {LOG_DIR}")
-        print(f"📁 로그 디렉토리 존재 여부: {os.path.exists(LOG_DIR)}")
+        logger.debug("참가자 ID로 로그 조회: %s", participant_id)
+        logger.debug("로그 디렉토리 경로: %s", LOG_DIR)
+        logger.debug("로그 디렉토리 존재 여부: %s", os.path.exists(LOG_DIR))
         
         if participant_id:
             # 참가자별 세션 폴더 확인
-            participant_dir = os.path.join(LOG_DIR, participant_id)
-            print(f"📁 참가자 디렉토리: {participant_dir}")
+            participant_dir = session_store.participant_dir(participant_id)
+            logger.debug("참가자 디렉토리: %s", participant_dir)
             
             if os.path.exists(participant_dir):
-                print(f"✅ 참가자 디렉토리 존재: {participant_dir}")
+                logger.debug("참가자 디렉토리 존재: %s", participant_dir)
                 
-                # 디렉토리 내용 전체 확인
-                try:
-                    all_items = os.listdir(participant_dir)
-                    print(f"📂 참가자 디렉토리 내용: {all_items}")
-                except Exception as e:
-                    print(f"❌ 디렉토리 읽기 오류: {e}")
-                    
                 # 세션 폴더들을 찾아서 가장 최근 세션 선택
                 session_folders = []
-                for item in os.listdir(participant_dir):
-                    item_path = os.path.join(participant_dir, item)
-                    if os.path.isdir(item_path) and item.startswith('session_'):
-                        session_folders.append(item)
+                with span("directory_lookup", path=participant_dir):
+                    for item in os.listdir(participant_dir):
+                        item_path = os.path.join(participant_dir, item)
+                        if os.path.isdir(item_path) and item.startswith('session_'):
+                            session_folders.append(item)
                 
-                print(f"📂 발견된 세션 폴더들: {session_folders}")
+                logger.debug("발견된 세션 폴더들: %s", session_folders)
                 
                 if session_folders:
                     # 가장 최근 세션 선택 (폴더명 기준으로 정렬)
                     latest_session = sorted(session_folders, reverse=True)[0]
                     session_path = os.path.join(participant_dir, latest_session)
                     
-                    print(f"📁 최근 세션 폴더: {latest_session}")
+                    logger.debug("최근 세션 폴더: %s", latest_session)
                     
                     # chat_session.json 파일 확인
                     chat_file = os.path.join(session_path, "chat_session.json")
                     if os.path.exists(chat_file):
                         try:
-                            with open(chat_file, 'r', encoding='utf-8') as f:
-                                session_data = json.load(f)
-                                print(f"📄 세션 데이터 로드: {len(session_data.get('messages', []))}개 메시지")
-                                print(f"📄 세션 데이터 키들: {list(session_data.keys())}")
+                            with span("json_load", path=chat_file):
+                                session_data = read_json(chat_file)
+                                logger.debug("세션 데이터 로드: %s개 메시지", len(session_data.get('messages', [])))
+                                logger.debug("세션 데이터 키들: %s", list(session_data.keys()))
                                 
                                 if 'messages' in session_data:
                                     for msg in session_data['messages']:
@@ -480,22 +1524,22 @@ async def get_conversation_logs(participant_id: str):
                                             'session_id': session_data.get('sessionId', '')
                                         }
                                         logs.append(log_entry)
-                                        print(f"📝 메시지 로드: {log_entry['user_message'][:20]}...")
-                                    print(f"📝 세션에서 {len(session_data['messages'])}개 메시지 로드")
+                                        logger.debug("메시지 로드: %s...", log_entry['user_message'][:20])
+                                    logger.debug("세션에서 %s개 메시지 로드", len(session_data['messages']))
                                 else:
-                                    print(f"⚠️ 세션에 messages 필드가 없습니다: {session_data.keys()}")
+                                    logger.warning("세션에 messages 필드가 없습니다: %s", session_data.keys())
                         except Exception as e:
-                            print(f"세션 파일 읽기 오류: {e}")
+                            logger.warning("세션 파일 읽기 오류: %s", e)
                     else:
-                        print(f"⚠️ chat_session.json 파일이 없습니다: {chat_file}")
+                        logger.warning("chat_session.json 파일이 없습니다: %s", chat_file)
                 else:
-                    print(f"⚠️ 세션 폴더를 찾을 수 없습니다: {participant_dir}")
+                    logger.warning("세션 폴더를 찾을 수 없습니다: %s", participant_dir)
             else:
-                print(f"⚠️ 참가자 디렉토리가 존재하지 않습니다: {participant_dir}")
+                logger.warning("참가자 디렉토리가 존재하지 않습니다: %s", participant_dir)
         else:
-            print("⚠️ 참가자 ID가 제공되지 않았습니다.")
+            logger.warning("참가자 ID가 제공되지 않았습니다.")
         
-        print(f"📊 최종 로드된 로그 개수: {len(logs)}")
+        logger.debug("최종 로드된 로그 개수: %s", len(logs))
         return LogsResponse(
             status="success",
             logs=logs,
@@ -503,17 +1547,103 @@ async def get_conversation_logs(participant_id: str):
         )
         
     except Exception as e:
-        print(f"❌ 로그 조회 오류: {e}")
+        logger.error("로그 조회 오류: %s", e)
         raise HTTPException(status_code=500, detail="Internal server error")
 
+# 외부 API 장애로 분석 결과를 만들지 못했을 때 보여줄 안내 (임시 결과의 details에 사용)
+PROVISIONAL_NOTICE = "분석 서비스에 일시적으로 연결할 수 없어 기본 결과를 보여드립니다. 잠시 후 다시 시도해주세요."
+
+def should_degrade(exc: BaseException) -> bool:
+    """대체 응답으로 넘어갈 외부 API 오류인지 (회로 차단, 또는 재시도를 소진한 장애)"""
+    return isinstance(exc, CircuitOpenError) or is_upstream_failure(exc)
+
+def default_voice_analysis(details: str) -> dict:
+    """음성 분석 결과를 파싱하지 못했거나 만들지 못했을 때 사용하는 기본 분석"""
+    return {
+        "summary": "자연스럽고 편안한 대화를 이어가셨습니다.",
+        "details": details,
+        "communication_style": "자연스러운 대화",
+        "strengths": ["자연스러운 대화"],
+        "areas_for_improvement": []
+    }
+
+def default_evaluation() -> dict:
+    """평가 결과를 파싱하지 못했거나 만들지 못했을 때 사용하는 기본 평가 (모든 항목 '중')"""
+    return {
+        "grades": {item: DEFAULT_GRADE for item in EVALUATION_ITEMS},
+        "score_reasons": {item: DEFAULT_SCORE_REASON for item in EVALUATION_ITEMS},
+        "improvement_tips": ["더 많은 정보를 제공해주세요."]
+    }
+
+def default_cheatsheet() -> dict:
+    """치트시트 응답에서 JSON을 찾지 못했을 때 사용하는 기본 치트시트"""
+    return {
+        "script": [
+            {"title": "증상 위치", "content": "어디가 아픈지 구체적으로 말씀드리겠습니다."},
+            {"title": "증상 시작 시기", "content": "언제부터 아픈지 정확히 말씀드리겠습니다."}
+        ],
+        "listening": [
+            {"title": "진단명과 근거", "content": "진단명과 그 근거를 설명드리겠습니다."},
+            {"title": "처방약 정보", "content": "처방약의 이름과 복용 방법을 설명드리겠습니다."}
+        ]
+    }
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+def ndjson_line(data: dict) -> bytes:
+    return dumps(data) + b"\n"
+
+def structured_stream_response(run, to_events) -> StreamingResponse:
+    """LLM 응답을 받는 중에 완성된 JSON 값을 이벤트로 먼저 보내는 NDJSON 스트리밍 응답
+
+    run: on_delta 콜백을 받아 최종 응답 모델을 반환하는 코루틴 함수 (process_evaluation 등)
+    to_events: IncrementalJSONParser가 꺼낸 (경로, 값)을 이벤트 dict 목록으로 바꾸는 함수
+    마지막 줄은 {"event": "result", ...최종 응답} 또는 {"event": "error", "status_code", "detail"}
+    """
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue()
+    
+    def on_delta(text: str):
+        # 스트리밍 조각은 스케줄러의 작업 스레드에서 호출됨
+        loop.call_soon_threadsafe(queue.put_nowait, text)
+    
+    async def body():
+        parser = IncrementalJSONParser()
+        task = asyncio.create_task(run(on_delta))
+        # 작업 스레드가 넘긴 조각이 모두 큐에 들어간 뒤에 종료 표시가 들어감
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+        try:
+            while (text := await queue.get()) is not None:
+                for path, value in parser.feed(text):
+                    for event in to_events(path, value):
+                        yield ndjson_line(event)
+            try:
+                result = task.result()
+            except HTTPException as e:
+                yield ndjson_line({"event": "error", "status_code": e.status_code, "detail": e.detail})
+            except UpstreamBusyError as e:
+                logger.warning("외부 API 혼잡: %s", e)
+                yield ndjson_line({
+                    "event": "error",
+                    "status_code": 503,
+                    "detail": f"요청이 많아 잠시 후 다시 시도해주세요. ({e.reason})",
+                    "retry_after": max(1, int(e.retry_after))
+                })
+            else:
+                yield ndjson_line({"event": "result", **result.model_dump()})
+        finally:
+            # 클라이언트가 연결을 끊으면 LLM 호출도 취소
+            if not task.done():
+                task.cancel()
+    
+    return StreamingResponse(body(), media_type=NDJSON_MEDIA_TYPE)
+
 @app.post("/api/analyze-voice", response_model=VoiceAnalysisResponse)
 async def analyze_voice(request: VoiceAnalysisRequest):
     """사용자 음성/대화 스타일을 분석하는 엔드포인트"""
     try:
-        # OpenAI API 키 확인
-        openai_api_key = os.getenv('OPENAI_API_KEY')
-        if not openai_api_key:
-            raise HTTPException(status_code=500, detail="OpenAI API 키가 설정되지 않았습니다.")
+        # LLM 제공자 설정 확인
+        require_llm("analyze_voice")
         
         # 사용자 메시지들을 하나의 텍스트로 결합
         combined_messages = " ".join(request.messages)
@@ -543,132 +1673,135 @@ async def analyze_voice(request: VoiceAnalysisRequest):
 }}
 """
         
-        # OpenAI API 호출 (버전 호환성을 위한 처리)
+        # OpenAI API 호출 (동일 입력은 캐시에서 응답)
+        # 외부 API 장애 시에는 실패를 기다리지 않고 임시 결과로 응답 (저장하지 않음)
+        provisional = False
         try:
-            # 최신 버전 (v1.0+)
-            client = openai.OpenAI(api_key=openai_api_key)
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
+            analysis_text = await complete_chat(
+                "analyze_voice",
                 messages=[
                     {"role": "system", "content": "당신은 대화 분석 전문가입니다. 환자의 대화 스타일을 분석하고, 긍정적인 면을 구체적으로 칭찬해주세요."},
                     {"role": "user", "content": analysis_prompt}
                 ],
                 temperature=0.7,
-                max_tokens=1000
-            )
-        except AttributeError:
-            # 구버전 (v0.x)
-            openai.api_key = openai_api_key
-            response = openai.ChatCompletion.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "당신은 의료 진료 연습을 위한 대화 분석 전문가입니다. 환자의 대화 스타일을 객관적이고 건설적으로 분석해주세요."},
-                    {"role": "user", "content": "analysis_prompt"}
-                ],
-                temperature=0.7,
-                max_tokens=1000
+                max_tokens=1000,
+                use_cache=True,
+                bypass_cache=request.bypass_cache,
+                json_mode=True
             )
-        
-        # 응답 파싱 (버전 호환성)
-        try:
-            # 최신 버전 (v1.0+)
-            analysis_text = response.choices[0].message.content
-        except AttributeError:
-            # 구버전 (v0.x)
-            analysis_text = response.choices[0].message.content
-        
-        try:
-            # JSON 파싱 시도
-            import re
-            json_match = re.search(r'\{.*\}', analysis_text, re.DOTALL)
-            if json_match:
-                analysis_data = json.loads(json_match.group())
-            else:
-                # JSON 파싱 실패 시 기본 형식 사용
-                analysis_data = {
-                    "summary": "자연스럽고 편안한 대화를 이어가셨습니다.",
-                    "details": analysis_text,
-                    "communication_style": "자연스러운 대화",
-                    "strengths": ["자연스러운 대화"],
-                    "areas_for_improvement": []
-                }
-        except json.JSONDecodeError:
-            # JSON 파싱 오류 시 기본 형식 사용
-            analysis_data = {
-                "summary": "자연스럽고 편안한 대화를 이어가셨습니다.",
-                "details": analysis_text,
-                "communication_style": "자연스러운 대화",
-                "strengths": ["자연스러운 대화"],
-                "areas_for_improvement": []
-            }
-        
-        # 음성 분석 데이터를 세션 폴더에 저장
-        try:
-            # 참가자별 디렉토리 확인
-            participant_dir = os.path.join(LOG_DIR, request.participant_id)
-            if not os.path.exists(participant_dir):
-                os.makedirs(participant_dir)
-            
-            # 가장 최근 세션 폴더 찾기
-            session_folders = []
-            if os.path.exists(participant_dir):
-                for item in os.listdir(participant_dir):
-                    item_path = os.path.join(participant_dir, item)
-                    if os.path.isdir(item_path) and item.startswith('session_'):
-                        session_folders.append(item)
-            
-            if session_folders:
-                # 가장 최근 세션 선택
-                latest_session = sorted(session_folders, reverse=True)[0]
-                session_dir = os.path.join(participant_dir, latest_session)
-                
-                # 음성 분석 파일명 생성
-                voice_analysis_filename = f"voice_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-                voice_analysis_filepath = os.path.join(session_dir, voice_analysis_filename)
+        except Exception as e:
+            if not should_degrade(e):
+                raise
+            logger.warning("음성 분석 임시 결과로 응답: %s", e)
+            analysis_text = PROVISIONAL_NOTICE
+            provisional = True
+        
+        # 스키마로 검증 (깨진 필드는 로컬에서 복구, JSON 객체가 아예 없으면 기본 형식 사용)
+        analysis_data = parse_structured(analysis_text, VoiceAnalysisResult)
+        if analysis_data is None:
+            analysis_data = default_voice_analysis(analysis_text)
+        
+        if not provisional:
+            # 음성 분석 데이터를 세션 폴더에 저장
+            try:
+                # 참가자별 디렉토리 확인
+                participant_dir = session_store.participant_dir(request.participant_id)
+                if not os.path.exists(participant_dir):
+                    os.makedirs(participant_dir)
                 
-                voice_analysis_data = {
-                    "participant_id": request.participant_id,
-                    "session_id": latest_session,
-                    "analysis_type": request.analysis_type,
-                    "timestamp": datetime.now().isoformat(),
-                    "analysis": analysis_data,
-                    "messages": request.messages  # 분석된 메시지들도 함께 저장
-                }
+                # 가장 최근 세션 폴더 찾기
+                session_folders = []
+                if os.path.exists(participant_dir):
+                    for item in os.listdir(participant_dir):
+                        item_path = os.path.join(participant_dir, item)
+                        if os.path.isdir(item_path) and item.startswith('session_'):
+                            session_folders.append(item)
                 
-                with open(voice_analysis_filepath, 'w', encoding='utf-8') as f:
-                    json.dump(voice_analysis_data, f, ensure_ascii=False, indent=2)
+                if session_folders:
+                    # 가장 최근 세션 선택
+                    latest_session = sorted(session_folders, reverse=True)[0]
+                    session_dir = os.path.join(participant_dir, latest_session)
                     
-                print(f"✅ 음성 분석 데이터 저장: {voice_analysis_filepath}")
-            else:
-                print(f"⚠️ 세션 폴더를 찾을 수 없습니다: {participant_dir}")
-                
-        except Exception as e:
-            print(f"⚠️ 음성 분석 저장 실패: {e}")
+                    # 음성 분석 파일명 생성
+                    voice_analysis_filename = f"voice_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+                    voice_analysis_filepath = os.path.join(session_dir, voice_analysis_filename)
+                    
+                    voice_analysis_data = {
+                        "participant_id": request.participant_id,
+                        "session_id": latest_session,
+                        "analysis_type": request.analysis_type,
+                        "timestamp": datetime.now().isoformat(),
+                        "analysis": analysis_data,
+                        "messages": request.messages  # 분석된 메시지들도 함께 저장
+                    }
+                    
+                    write_json(voice_analysis_filepath, voice_analysis_data)
+                        
+                    logger.info("음성 분석 데이터 저장: %s", voice_analysis_filepath)
+                else:
+                    logger.warning("세션 폴더를 찾을 수 없습니다: %s", participant_dir)
+                    
+            except Exception as e:
+                logger.warning("음성 분석 저장 실패: %s", e)
         
         return VoiceAnalysisResponse(
             status="success",
             analysis=analysis_data,
-            message="음성 분석이 완료되었습니다."
+            message="임시 분석 결과입니다. 잠시 후 다시 시도해주세요." if provisional else "음성 분석이 완료되었습니다.",
+            provisional=provisional
         )
         
+    except UpstreamBusyError:
+        # 혼잡 응답(503)은 전용 핸들러에서 처리
+        raise
     except Exception as e:
-        print(f"❌ 음성 분석 오류: {e}")
+        logger.error("음성 분석 오류: %s", e)
         raise HTTPException(status_code=500, detail=f"음성 분석 중 오류가 발생했습니다: {str(e)}")
 
 @app.post("/api/evaluate", response_model=EvaluationResponse)
-async def evaluate_conversation(request: EvaluationRequest):
-    """대화 내용을 기반으로 가이드라인 준수도를 평가하는 엔드포인트"""
+async def evaluate_conversation(request: EvaluationRequest, idempotency_key: Optional[str] = Header(None)):
+    """대화 내용을 기반으로 가이드라인 준수도를 평가하는 엔드포인트 (동시 중복 요청 병합)"""
+    return await run_single_flight(
+        "evaluate", request.participant_id, request.evaluation_type, request,
+        process_evaluation, idempotency_key
+    )
+
+def evaluation_stream_events(path: tuple, value) -> list:
+    """평가 응답에서 완성된 등급/근거/팁을 스트리밍 이벤트로 변환"""
+    if len(path) == 2 and path[0] == "grades" and path[1] in EVALUATION_ITEMS:
+        return [{"event": "grade", "item": path[1], "grade": normalize_grade(value)}]
+    if len(path) == 2 and path[0] == "score_reasons" and path[1] in EVALUATION_ITEMS and isinstance(value, str):
+        return [{"event": "score_reason", "item": path[1], "reason": value}]
+    if len(path) == 2 and path[0] == "improvement_tips" and isinstance(value, str):
+        return [{"event": "improvement_tip", "index": path[1], "tip": value}]
+    return []
+
+@app.post("/api/evaluate/stream")
+async def evaluate_conversation_stream(request: EvaluationRequest):
+    """평가 결과를 NDJSON으로 스트리밍하는 엔드포인트 (항목별 등급이 완성되는 대로 전송, 마지막 줄은 전체 결과)"""
+    # 설정 오류는 스트리밍을 시작하기 전에 일반 오류 응답으로 반환
+    require_llm("evaluate_conversation")
+    return structured_stream_response(
+        lambda on_delta: process_evaluation(request, on_delta=on_delta),
+        evaluation_stream_events
+    )
+
+async def process_evaluation(request: EvaluationRequest, on_delta: Optional[Callable[[str], None]] = None):
+    """대화 내용을 기반으로 가이드라인 준수도를 평가하는 함수 (on_delta: 스트리밍 응답 조각 콜백)"""
     try:
-        # OpenAI API 키 확인
-        openai_api_key = os.getenv('OPENAI_API_KEY')
-        if not openai_api_key:
-            raise HTTPException(status_code=500, detail="OpenAI API 키가 설정되지 않았습니다.")
-        
-        # 대화 로그를 텍스트로 변환
-        conversation_text = ""
-        for log in request.logs:
-            conversation_text += f"환자: {log.get('user_message', '')}\n"
-            conversation_text += f"의사: {log.get('bot_response', '')}\n\n"
+        # LLM 제공자 설정 확인
+        require_llm("evaluate_conversation")
+        
+        # 대화 로그를 텍스트로 변환 (긴 대화는 오래된 턴을 요약해 프롬프트 크기 제한)
+        turns = evaluation_logs_to_turns(request.logs)
+        summary_state = None
+        latest_session = find_latest_session(request.participant_id)
+        if latest_session:
+            session_data = session_store.load(request.participant_id, latest_session)
+            # 같은 세션의 로그일 때만 세션에 저장된 요약을 재사용
+            if session_data and len(session_data.get("messages", [])) == len(turns):
+                summary_state = session_data.get("summary")
+        conversation_text = await summarizer.condense(turns, summary_state)
         
         # 평가 기준 정의
         evaluation_criteria = """
@@ -747,188 +1880,124 @@ async def evaluate_conversation(request: EvaluationRequest):
 }}
 """
         
-        # OpenAI API 호출 (버전 호환성을 위한 처리)
+        # OpenAI API 호출 (동일 입력은 캐시에서 응답)
+        # 외부 API 장애 시에는 실패를 기다리지 않고 임시 평가로 응답 (저장하지 않음)
+        provisional = False
         try:
-            # 최신 버전 (v1.0+)
-            client = openai.OpenAI(api_key=openai_api_key)
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
+            evaluation_text = await complete_chat(
+                "evaluate_conversation",
                 messages=[
                     {"role": "system", "content": "당신은 환자용 의료 진료 연습을 위한 평가 전문가입니다. 객관적이고 건설적인 평가를 제공해주세요."},
                     {"role": "user", "content": evaluation_prompt}
                 ],
                 temperature=0.7,
-                max_tokens=2000
-            )
-        except AttributeError:
-            # 구버전 (v0.x)
-            openai.api_key = openai_api_key
-            response = openai.ChatCompletion.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "당신은 환자용 의료 진료 연습을 위한 평가 전문가입니다. 객관적이고 건설적인 평가를 제공해주세요."},
-                    {"role": "user", "content": "analysis_prompt"}
-                ],
-                temperature=0.7,
-                max_tokens=2000
+                max_tokens=2000,
+                use_cache=True,
+                bypass_cache=request.bypass_cache,
+                json_mode=True,
+                on_delta=on_delta
             )
-        
-        # 응답 파싱 (버전 호환성)
-        try:
-            # 최신 버전 (v1.0+)
-            evaluation_text = response.choices[0].message.content
-        except AttributeError:
-            # 구버전 (v0.x)
-            evaluation_text = response.choices[0].message.content
-        
-        try:
-            # JSON 파싱 시도
-            import re
-            json_match = re.search(r'\{.*\}', evaluation_text, re.DOTALL)
-            if json_match:
-                evaluation_data = json.loads(json_match.group())
-            else:
-                # JSON 파싱 실패 시 기본 형식 사용
-                evaluation_data = {
-                    "grades": {
-                        "symptom_location": "중",
-                        "symptom_timing": "중",
-                        "symptom_severity": "중",
-                        "current_medication": "중",
-                        "allergy_info": "중",
-                        "diagnosis_info": "중",
-                        "prescription_info": "중",
-                        "side_effects": "중",
-                        "followup_plan": "중",
-                        "emergency_plan": "중"
-                    },
-                    "score_reasons": {
-                        "symptom_location": "평가 정보가 없습니다.",
-                        "symptom_timing": "평가 정보가 없습니다.",
-                        "symptom_severity": "평가 정보가 없습니다.",
-                        "current_medication": "평가 정보가 없습니다.",
-                        "allergy_info": "평가 정보가 없습니다.",
-                        "diagnosis_info": "평가 정보가 없습니다.",
-                        "prescription_info": "평가 정보가 없습니다.",
-                        "side_effects": "평가 정보가 없습니다.",
-                        "followup_plan": "평가 정보가 없습니다.",
-                        "emergency_plan": "평가 정보가 없습니다."
-                    },
-                    "improvement_tips": ["더 많은 정보를 제공해주세요."]
-                }
-        except json.JSONDecodeError:
-            # JSON 파싱 오류 시 기본 형식 사용
-            evaluation_data = {
-                "grades": {
-                    "symptom_location": "중",
-                    "symptom_timing": "중",
-                    "symptom_severity": "중",
-                    "current_medication": "중",
-                    "allergy_info": "중",
-                    "diagnosis_info": "중",
-                    "prescription_info": "중",
-                    "side_effects": "중",
-                    "followup_plan": "중",
-                    "emergency_plan": "중"
-                },
-                "score_reasons": {
-                    "symptom_location": "평가 정보가 없습니다.",
-                    "symptom_timing": "평가 정보가 없습니다.",
-                    "symptom_severity": "평가 정보가 없습니다.",
-                    "current_medication": "평가 정보가 없습니다.",
-                    "allergy_info": "평가 정보가 없습니다.",
-                    "diagnosis_info": "평가 정보가 없습니다.",
-                    "prescription_info": "평가 정보가 없습니다.",
-                    "side_effects": "평가 정보가 없습니다.",
-                    "followup_plan": "평가 정보가 없습니다.",
-                    "emergency_plan": "평가 정보가 없습니다."
-                },
-                "improvement_tips": ["더 많은 정보를 제공해주세요."]
-            }
-        
-        # 피드백 데이터를 세션 폴더에 저장
-        try:
-            # 참가자별 디렉토리 확인
-            participant_dir = os.path.join(LOG_DIR, request.participant_id)
-            if not os.path.exists(participant_dir):
-                os.makedirs(participant_dir)
-            
-            # 가장 최근 세션 폴더 찾기
-            session_folders = []
-            if os.path.exists(participant_dir):
-                for item in os.listdir(participant_dir):
-                    item_path = os.path.join(participant_dir, item)
-                    if os.path.isdir(item_path) and item.startswith('session_'):
-                        session_folders.append(item)
-            
-            if session_folders:
-                # 가장 최근 세션 선택
-                latest_session = sorted(session_folders, reverse=True)[0]
-                session_dir = os.path.join(participant_dir, latest_session)
-                
-                # 피드백 파일명 생성
-                feedback_filename = f"feedback_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-                feedback_filepath = os.path.join(session_dir, feedback_filename)
+        except Exception as e:
+            if not should_degrade(e):
+                raise
+            logger.warning("평가 임시 결과로 응답: %s", e)
+            evaluation_text = ""
+            provisional = True
+        
+        # 스키마로 검증 (빠지거나 잘못된 등급은 '중'으로 채움, JSON 객체가 아예 없으면 기본 평가 사용)
+        evaluation_data = parse_structured(evaluation_text, EvaluationResult)
+        if evaluation_data is None:
+            logger.warning("평가 응답에서 JSON을 찾지 못해 기본 평가 사용")
+            evaluation_data = default_evaluation()
+        
+        if not provisional:
+            # 피드백 데이터를 세션 폴더에 저장
+            try:
+                # 참가자별 디렉토리 확인
+                participant_dir = session_store.participant_dir(request.participant_id)
+                if not os.path.exists(participant_dir):
+                    os.makedirs(participant_dir)
                 
-                feedback_data = {
-                    "participant_id": request.participant_id,
-                    "session_id": latest_session,
-                    "evaluation_type": request.evaluation_type,
-                    "timestamp": datetime.now().isoformat(),
-                    "evaluation": evaluation_data,
-                    "conversation_logs": request.logs  # 대화 로그도 함께 저장
-                }
+                # 가장 최근 세션 폴더 찾기
+                session_folders = []
+                if os.path.exists(participant_dir):
+                    for item in os.listdir(participant_dir):
+                        item_path = os.path.join(participant_dir, item)
+                        if os.path.isdir(item_path) and item.startswith('session_'):
+                            session_folders.append(item)
                 
-                with open(feedback_filepath, 'w', encoding='utf-8') as f:
-                    json.dump(feedback_data, f, ensure_ascii=False, indent=2)
+                if session_folders:
+                    # 가장 최근 세션 선택
+                    latest_session = sorted(session_folders, reverse=True)[0]
+                    session_dir = os.path.join(participant_dir, latest_session)
                     
-                print(f"✅ 피드백 데이터 저장: {feedback_filepath}")
-            else:
-                print(f"⚠️ 세션 폴더를 찾을 수 없습니다: {participant_dir}")
-                
-        except Exception as e:
-            print(f"⚠️ 피드백 저장 실패: {e}")
+                    # 피드백 파일명 생성
+                    feedback_filename = f"feedback_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+                    feedback_filepath = os.path.join(session_dir, feedback_filename)
+                    
+                    feedback_data = {
+                        "participant_id": request.participant_id,
+                        "session_id": latest_session,
+                        "evaluation_type": request.evaluation_type,
+                        "timestamp": datetime.now().isoformat(),
+                        "evaluation": evaluation_data,
+                        "conversation_logs": request.logs  # 대화 로그도 함께 저장
+                    }
+                    
+                    write_json(feedback_filepath, feedback_data)
+                        
+                    logger.info("피드백 데이터 저장: %s", feedback_filepath)
+                else:
+                    logger.warning("세션 폴더를 찾을 수 없습니다: %s", participant_dir)
+                    
+            except Exception as e:
+                logger.warning("피드백 저장 실패: %s", e)
         
         return EvaluationResponse(
             status="success",
             evaluation=evaluation_data,
-            message="평가가 완료되었습니다."
+            message="임시 평가 결과입니다. 잠시 후 다시 시도해주세요." if provisional else "평가가 완료되었습니다.",
+            provisional=provisional
         )
         
+    except UpstreamBusyError:
+        # 혼잡 응답(503)은 전용 핸들러에서 처리
+        raise
     except Exception as e:
-        print(f"❌ 평가 오류: {e}")
+        logger.error("평가 오류: %s", e)
         raise HTTPException(status_code=500, detail=f"평가 중 오류가 발생했습니다: {str(e)}")
 
 @app.get("/api/audio/{participant_id}/{session_id}/{filename}")
 async def get_audio_file(participant_id: str, session_id: str, filename: str):
     """오디오 파일을 제공하는 API"""
     try:
-        audio_filepath = os.path.join(LOG_DIR, participant_id, session_id, filename)
-        
-        print(f"🔍 오디오 파일 요청: {audio_filepath}")
-        print(f"🔍 참가자 ID: {participant_id}")
-        print(f"🔍 세션 ID: {session_id}")
-        print(f"🔍 파일명: {filename}")
-        
-        if not os.path.exists(audio_filepath):
-            print(f"❌ 오디오 파일 없음: {audio_filepath}")
-            # 디렉토리 구조 확인
-            session_dir = os.path.join(LOG_DIR, participant_id, session_id)
-            if os.path.exists(session_dir):
-                files_in_dir = os.listdir(session_dir)
-                print(f"📁 세션 디렉토리 내 파일들: {files_in_dir}")
-            else:
-                print(f"📁 세션 디렉토리 없음: {session_dir}")
-                participant_dir = os.path.join(LOG_DIR, participant_id)
-                if os.path.exists(participant_dir):
-                    sessions_in_dir = os.listdir(participant_dir)
-                    print(f"📁 참가자 디렉토리 내 세션들: {sessions_in_dir}")
+        audio_filepath = os.path.join(session_store.session_dir(participant_id, session_id), safe_path_component(filename))
+        
+        logger.debug("오디오 파일 요청: %s", audio_filepath)
+        logger.debug("참가자 ID: %s", participant_id)
+        logger.debug("세션 ID: %s", session_id)
+        logger.debug("파일명: %s", filename)
+        
+        with span("directory_lookup", path=audio_filepath):
+            audio_exists = os.path.exists(audio_filepath)
+        if not audio_exists:
+            logger.warning("오디오 파일 없음: %s", audio_filepath)
+            # 디렉토리 구조 확인 (디버그 로그가 켜져 있을 때만 디렉토리를 읽음)
+            if logger.isEnabledFor(logging.DEBUG):
+                session_dir = session_store.session_dir(participant_id, session_id)
+                if os.path.exists(session_dir):
+                    logger.debug("세션 디렉토리 내 파일들: %s", os.listdir(session_dir))
+                else:
+                    logger.debug("세션 디렉토리 없음: %s", session_dir)
+                    participant_dir = session_store.participant_dir(participant_id)
+                    if os.path.exists(participant_dir):
+                        logger.debug("참가자 디렉토리 내 세션들: %s", os.listdir(participant_dir))
             
             raise HTTPException(status_code=404, detail="오디오 파일을 찾을 수 없습니다.")
         
         # 파일 크기 확인
         file_size = os.path.getsize(audio_filepath)
-        print(f"✅ 오디오 파일 찾음: {audio_filepath} (크기: {file_size} bytes)")
+        logger.debug("오디오 파일 찾음: %s (크기: %s bytes)", audio_filepath, file_size)
         
         # ngrok 환경에 최적화된 헤더
         headers = {
@@ -947,7 +2016,7 @@ async def get_audio_file(participant_id: str, session_id: str, filename: str):
         if filename.endswith('.mp3'):
             headers["Content-Type"] = "audio/mpeg"
         
-        print(f"🎵 오디오 파일 전송 시작: {filename}")
+        logger.debug("오디오 파일 전송 시작: %s", filename)
         
         response = FileResponse(
             path=audio_filepath,
@@ -956,14 +2025,14 @@ async def get_audio_file(participant_id: str, session_id: str, filename: str):
             headers=headers
         )
         
-        print(f"✅ 오디오 파일 응답 생성 완료: {filename}")
+        logger.debug("오디오 파일 응답 생성 완료: %s", filename)
         return response
         
     except HTTPException:
         # HTTPException은 그대로 전달
         raise
     except Exception as e:
-        print(f"❌ 오디오 파일 제공 오류: {str(e)}")
+        logger.error("오디오 파일 제공 오류: %s", str(e))
         raise HTTPException(status_code=500, detail=f"오디오 파일 제공 중 오류가 발생했습니다: {str(e)}")
 
 # HEAD 요청 처리를 위한 별도 엔드포인트 추가
@@ -971,18 +2040,17 @@ async def get_audio_file(participant_id: str, session_id: str, filename: str):
 async def head_audio_file(participant_id: str, session_id: str, filename: str):
     """오디오 파일 헤더 정보만 제공하는 API (HEAD 요청용)"""
     try:
-        audio_filepath = os.path.join(LOG_DIR, participant_id, session_id, filename)
+        audio_filepath = os.path.join(session_store.session_dir(participant_id, session_id), safe_path_component(filename))
         
-        print(f"🔍 오디오 파일 HEAD 요청: {audio_filepath}")
+        logger.debug("오디오 파일 HEAD 요청: %s", audio_filepath)
         
         if not os.path.exists(audio_filepath):
-            print(f"❌ 오디오 파일 없음: {audio_filepath}")
+            logger.warning("오디오 파일 없음: %s", audio_filepath)
             raise HTTPException(status_code=404, detail="오디오 파일을 찾을 수 없습니다.")
         
         file_size = os.path.getsize(audio_filepath)
-        print(f"✅ 오디오 파일 HEAD 응답: {audio_filepath} (크기: {file_size} bytes)")
+        logger.debug("오디오 파일 HEAD 응답: %s (크기: %s bytes)", audio_filepath, file_size)
         
-        from fastapi import Response
         return Response(
             status_code=200,
             headers={
@@ -998,14 +2066,13 @@ async def head_audio_file(participant_id: str, session_id: str, filename: str):
     except HTTPException:
         raise
     except Exception as e:
-        print(f"❌ 오디오 파일 HEAD 요청 오류: {str(e)}")
+        logger.error("오디오 파일 HEAD 요청 오류: %s", str(e))
         raise HTTPException(status_code=500, detail=f"오디오 파일 헤더 요청 중 오류가 발생했습니다: {str(e)}")
 
 # OPTIONS 요청 처리를 위한 별도 엔드포인트 추가
 @app.options("/api/audio/{participant_id}/{session_id}/{filename}")
 async def options_audio_file(participant_id: str, session_id: str, filename: str):
     """오디오 파일 OPTIONS 요청 처리 (CORS preflight)"""
-    from fastapi import Response
     return Response(
         status_code=200,
         headers={
@@ -1020,12 +2087,10 @@ async def options_audio_file(participant_id: str, session_id: str, filename: str
 async def retry_chat(request: RetryChatRequest):
     """Retry 페이지용 채팅 API"""
     try:
-        print(f"🔄 Retry 채팅 요청: {request.userData.get('name', 'Unknown')}")
+        logger.debug("Retry 채팅 요청: %s", request.userData.get('name', 'Unknown'))
         
-        # OpenAI API 키 확인
-        openai_api_key = os.getenv('OPENAI_API_KEY')
-        if not openai_api_key:
-            raise HTTPException(status_code=500, detail="OpenAI API 키가 설정되지 않았습니다.")
+        # LLM 제공자 설정 확인
+        require_llm("retry_chat")
         
         # 시스템 프롬프트 설정 (재연습용)
         system_prompt = """당신은 50대 남성의 경험 많은 내과 의사입니다. 환자와의 대화에서 다음 사항을 지켜주세요:
@@ -1053,69 +2118,86 @@ async def retry_chat(request: RetryChatRequest):
 10. emergency_plan: 증상 악화 시 언제 다시 와야 하는지
 """
         
+        # participant_id 우선, 없으면 name 사용
+        user_identifier = request.userData.get('participantId', request.userData.get('name', 'Unknown'))
+        session_id = request.sessionId or f"retry_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}"
+        
+        # 서버가 보관한 Retry 세션 기록으로 이전 대화 구성
+        with timed_io("retry_session_load"):
+            retry_session = retry_session_store.load(user_identifier, session_id)
+        history = []
+        for turn in (retry_session["turns"] if retry_session else []):
+            history.append({"role": "user", "content": f"환자: {turn.get('user', '')}"})
+            history.append({"role": "assistant", "content": turn.get('assistant', '')})
+        history_window = build_history_window(history, CHAT_HISTORY_TOKEN_BUDGET)
+        
         # 사용자 메시지에 컨텍스트 추가
         user_message = f"환자: {request.message}"
         
-        # OpenAI API 호출
-        client = openai.OpenAI(api_key=openai_api_key)
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_message}
-            ],
+        # OpenAI API 호출 (실시간 채팅은 최우선 처리)
+        bot_response = (await complete_chat(
+            "retry_chat",
+            messages=[{"role": "system", "content": system_prompt}]
+                + history_window
+                + [{"role": "user", "content": user_message}],
+            temperature=0.7,
             max_tokens=500,
-            temperature=0.7
-        )
+            priority=PRIORITY_CHAT
+        )).strip()
         
-        bot_response = response.choices[0].message.content.strip()
-        
-        # 대화 로그 저장
+        # 대화 로그 저장 (세션 파일 끝에 이번 턴만 추가)
         try:
-            # participant_id 우선, 없으면 name 사용
-            user_identifier = request.userData.get('participantId', request.userData.get('name', 'Unknown'))
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            log_filename = f"user_data_{user_identifier}_{timestamp}.json"
-            log_filepath = os.path.join(DATA_DIR, log_filename)
-            
-            log_data = {
-                "userData": request.userData,
-                "participant_id": user_identifier,  # 명시적으로 participant_id 저장
-                "sessionType": request.sessionType,
-                "timestamp": datetime.now().isoformat(),
-                "conversation": [
-                    {"role": "user", "content": request.message},
-                    {"role": "assistant", "content": bot_response}
-                ]
-            }
+            with timed_io("retry_session_append"):
+                session_filepath = retry_session_store.append_turn(
+                    user_identifier,
+                    session_id,
+                    turn={
+                        "timestamp": datetime.now().isoformat(),
+                        "user": request.message,
+                        "assistant": bot_response
+                    },
+                    header={
+                        "userData": request.userData,
+                        "participant_id": user_identifier,  # 명시적으로 participant_id 저장
+                        "sessionId": session_id,
+                        "sessionType": request.sessionType,
+                        "session_start": datetime.now().isoformat()
+                    }
+                )
             
-            with open(log_filepath, 'w', encoding='utf-8') as f:
-                json.dump(log_data, f, ensure_ascii=False, indent=2)
-                
-            print(f"✅ Retry 대화 로그 저장: {log_filename}")
+            retry_session_index.record(
+                user_identifier,
+                os.path.basename(session_filepath),
+                retry_session_metadata(retry_session_store.load(user_identifier, session_id))
+            )
+            logger.debug("Retry 대화 로그 저장: %s", session_filepath)
             
         except Exception as e:
-            print(f"⚠️ 로그 저장 실패: {e}")
+            logger.warning("로그 저장 실패: %s", e)
         
         return RetryChatResponse(
             response=bot_response,
-            success=True
+            success=True,
+            sessionId=session_id
         )
         
+    except UpstreamBusyError:
+        # 혼잡 응답(503)은 전용 핸들러에서 처리
+        raise
     except Exception as e:
-        print(f"❌ Retry 채팅 오류: {e}")
+        logger.error("Retry 채팅 오류: %s", e)
         raise HTTPException(status_code=500, detail=f"채팅 중 오류가 발생했습니다: {str(e)}")
 
 @app.get("/api/get-feedback/{participant_id}", response_model=EvaluationResponse)
 async def get_feedback_by_participant(participant_id: str):
     """참가자 ID로 피드백 데이터를 가져오는 API"""
     try:
-        print(f"📋 피드백 요청: {participant_id}")
+        logger.debug("피드백 요청: %s", participant_id)
         
         # 참가자별 디렉토리 확인
-        participant_dir = os.path.join(LOG_DIR, participant_id)
+        participant_dir = session_store.participant_dir(participant_id)
         if not os.path.exists(participant_dir):
-            print(f"⚠️ 참가자 디렉토리가 없습니다: {participant_dir}")
+            logger.warning("참가자 디렉토리가 없습니다: %s", participant_dir)
             return EvaluationResponse(
                 status="success",
                 evaluation={
@@ -1156,7 +2238,7 @@ async def get_feedback_by_participant(participant_id: str):
                 session_folders.append(item)
         
         if not session_folders:
-            print(f"⚠️ 세션 폴더가 없습니다: {participant_dir}")
+            logger.warning("세션 폴더가 없습니다: %s", participant_dir)
             return EvaluationResponse(
                 status="success",
                 evaluation={
@@ -1199,7 +2281,7 @@ async def get_feedback_by_participant(participant_id: str):
                 feedback_files.append(filename)
         
         if not feedback_files:
-            print(f"⚠️ 피드백 파일이 없습니다: {session_dir}")
+            logger.warning("피드백 파일이 없습니다: %s", session_dir)
             return EvaluationResponse(
                 status="success",
                 evaluation={
@@ -1236,8 +2318,7 @@ async def get_feedback_by_participant(participant_id: str):
         latest_feedback = sorted(feedback_files, reverse=True)[0]
         feedback_filepath = os.path.join(session_dir, latest_feedback)
         
-        with open(feedback_filepath, 'r', encoding='utf-8') as f:
-            feedback_data = json.load(f)
+        feedback_data = read_json(feedback_filepath)
         
         return EvaluationResponse(
             status="success",
@@ -1246,19 +2327,19 @@ async def get_feedback_by_participant(participant_id: str):
         )
         
     except Exception as e:
-        print(f"❌ 피드백 가져오기 오류: {e}")
+        logger.error("피드백 가져오기 오류: %s", e)
         raise HTTPException(status_code=500, detail=f"피드백 가져오기 중 오류가 발생했습니다: {str(e)}")
 
 @app.get("/api/get-voice-analysis/{participant_id}", response_model=VoiceAnalysisResponse)
 async def get_voice_analysis_by_participant(participant_id: str):
     """참가자 ID로 음성 분석 데이터를 가져오는 API"""
     try:
-        print(f"📋 음성 분석 요청: {participant_id}")
+        logger.debug("음성 분석 요청: %s", participant_id)
         
         # 참가자별 디렉토리 확인
-        participant_dir = os.path.join(LOG_DIR, participant_id)
+        participant_dir = session_store.participant_dir(participant_id)
         if not os.path.exists(participant_dir):
-            print(f"⚠️ 참가자 디렉토리가 없습니다: {participant_dir}")
+            logger.warning("참가자 디렉토리가 없습니다: %s", participant_dir)
             return VoiceAnalysisResponse(
                 status="success",
                 analysis={
@@ -1279,7 +2360,7 @@ async def get_voice_analysis_by_participant(participant_id: str):
                 session_folders.append(item)
         
         if not session_folders:
-            print(f"⚠️ 세션 폴더가 없습니다: {participant_dir}")
+            logger.warning("세션 폴더가 없습니다: %s", participant_dir)
             return VoiceAnalysisResponse(
                 status="success",
                 analysis={
@@ -1302,7 +2383,7 @@ async def get_voice_analysis_by_participant(participant_id: str):
                 voice_analysis_files.append(filename)
         
         if not voice_analysis_files:
-            print(f"⚠️ 음성 분석 파일이 없습니다: {session_dir}")
+            logger.warning("음성 분석 파일이 없습니다: %s", session_dir)
             return VoiceAnalysisResponse(
                 status="success",
                 analysis={
@@ -1319,8 +2400,7 @@ async def get_voice_analysis_by_participant(participant_id: str):
         latest_analysis = sorted(voice_analysis_files, reverse=True)[0]
         analysis_filepath = os.path.join(session_dir, latest_analysis)
         
-        with open(analysis_filepath, 'r', encoding='utf-8') as f:
-            analysis_data = json.load(f)
+        analysis_data = read_json(analysis_filepath)
         
         return VoiceAnalysisResponse(
             status="success",
@@ -1329,19 +2409,19 @@ async def get_voice_analysis_by_participant(participant_id: str):
         )
         
     except Exception as e:
-        print(f"❌ 음성 분석 가져오기 오류: {e}")
+        logger.error("음성 분석 가져오기 오류: %s", e)
         raise HTTPException(status_code=500, detail=f"음성 분석 가져오기 중 오류가 발생했습니다: {str(e)}")
 
 @app.get("/api/get-feedback/{participant_id}/{session_id}", response_model=EvaluationResponse)
 async def get_feedback_by_session(participant_id: str, session_id: str):
     """특정 세션의 피드백 데이터를 가져오는 API"""
     try:
-        print(f"📋 세션별 피드백 요청: {participant_id}/{session_id}")
+        logger.debug("세션별 피드백 요청: %s/%s", participant_id, session_id)
         
         # 세션 디렉토리 확인
-        session_dir = os.path.join(LOG_DIR, participant_id, session_id)
+        session_dir = session_store.session_dir(participant_id, session_id)
         if not os.path.exists(session_dir):
-            print(f"⚠️ 세션 디렉토리가 없습니다: {session_dir}")
+            logger.warning("세션 디렉토리가 없습니다: %s", session_dir)
             return EvaluationResponse(
                 status="success",
                 evaluation={
@@ -1381,7 +2461,7 @@ async def get_feedback_by_session(participant_id: str, session_id: str):
                 feedback_files.append(filename)
         
         if not feedback_files:
-            print(f"⚠️ 피드백 파일이 없습니다: {session_dir}")
+            logger.warning("피드백 파일이 없습니다: %s", session_dir)
             return EvaluationResponse(
                 status="success",
                 evaluation={
@@ -1418,8 +2498,7 @@ async def get_feedback_by_session(participant_id: str, session_id: str):
         latest_feedback = sorted(feedback_files, reverse=True)[0]
         feedback_filepath = os.path.join(session_dir, latest_feedback)
         
-        with open(feedback_filepath, 'r', encoding='utf-8') as f:
-            feedback_data = json.load(f)
+        feedback_data = read_json(feedback_filepath)
         
         return EvaluationResponse(
             status="success",
@@ -1428,19 +2507,19 @@ async def get_feedback_by_session(participant_id: str, session_id: str):
         )
         
     except Exception as e:
-        print(f"❌ 세션별 피드백 가져오기 오류: {e}")
+        logger.error("세션별 피드백 가져오기 오류: %s", e)
         raise HTTPException(status_code=500, detail=f"세션별 피드백 가져오기 중 오류가 발생했습니다: {str(e)}")
 
 @app.get("/api/get-voice-analysis/{participant_id}/{session_id}", response_model=VoiceAnalysisResponse)
 async def get_voice_analysis_by_session(participant_id: str, session_id: str):
     """특정 세션의 음성 분석 데이터를 가져오는 API"""
     try:
-        print(f"📋 세션별 음성 분석 요청: {participant_id}/{session_id}")
+        logger.debug("세션별 음성 분석 요청: %s/%s", participant_id, session_id)
         
         # 세션 디렉토리 확인
-        session_dir = os.path.join(LOG_DIR, participant_id, session_id)
+        session_dir = session_store.session_dir(participant_id, session_id)
         if not os.path.exists(session_dir):
-            print(f"⚠️ 세션 디렉토리가 없습니다: {session_dir}")
+            logger.warning("세션 디렉토리가 없습니다: %s", session_dir)
             return VoiceAnalysisResponse(
                 status="success",
                 analysis={
@@ -1460,7 +2539,7 @@ async def get_voice_analysis_by_session(participant_id: str, session_id: str):
                 voice_analysis_files.append(filename)
         
         if not voice_analysis_files:
-            print(f"⚠️ 음성 분석 파일이 없습니다: {session_dir}")
+            logger.warning("음성 분석 파일이 없습니다: %s", session_dir)
             return VoiceAnalysisResponse(
                 status="success",
                 analysis={
@@ -1477,8 +2556,7 @@ async def get_voice_analysis_by_session(participant_id: str, session_id: str):
         latest_analysis = sorted(voice_analysis_files, reverse=True)[0]
         analysis_filepath = os.path.join(session_dir, latest_analysis)
         
-        with open(analysis_filepath, 'r', encoding='utf-8') as f:
-            analysis_data = json.load(f)
+        analysis_data = read_json(analysis_filepath)
         
         return VoiceAnalysisResponse(
             status="success",
@@ -1487,22 +2565,113 @@ async def get_voice_analysis_by_session(participant_id: str, session_id: str):
         )
         
     except Exception as e:
-        print(f"❌ 세션별 음성 분석 가져오기 오류: {e}")
+        logger.error("세션별 음성 분석 가져오기 오류: %s", e)
         raise HTTPException(status_code=500, detail=f"세션별 음성 분석 가져오기 중 오류가 발생했습니다: {str(e)}")
 
+def session_messages_to_logs(session_data: dict) -> list:
+    """chat_session.json의 메시지를 /api/logs와 같은 대화 로그 형식으로 변환"""
+    return [
+        {
+            'user_message': msg.get('user_message', ''),
+            'bot_response': msg.get('doctor_response', ''),
+            'timestamp': msg.get('timestamp', ''),
+            'session_id': session_data.get('sessionId', '')
+        }
+        for msg in session_data.get('messages', [])
+    ]
+
+def read_latest_record(session_dir: str, filenames: list, prefix: str) -> Optional[dict]:
+    """세션 폴더의 파일 목록에서 prefix로 시작하는 가장 최근 JSON 기록을 읽음"""
+    candidates = sorted(
+        (filename for filename in filenames if filename.startswith(prefix) and filename.endswith('.json')),
+        reverse=True
+    )
+    for filename in candidates:
+        filepath = os.path.join(session_dir, filename)
+        try:
+            with timed_io("session_bundle_read"):
+                return read_json(filepath)
+        except (OSError, ValueError) as e:
+            logger.warning("세션 기록 읽기 실패: %s - %s", filepath, e)
+    return None
+
+def build_session_bundle(participant_id: str, session_id: Optional[str]) -> SessionBundleResponse:
+    """세션 폴더를 한 번만 조회해 피드백 화면에 필요한 기록을 모음 (session_id가 없으면 최근 세션)"""
+    if session_id is None:
+        session_id = find_latest_session(participant_id)
+    session_dir = session_store.session_dir(participant_id, session_id) if session_id else None
+    if not session_dir or not os.path.isdir(session_dir):
+        logger.warning("세션 폴더를 찾을 수 없습니다: %s/%s", participant_id, session_id)
+        return SessionBundleResponse(
+            status="success",
+            participant_id=participant_id,
+            session_id=session_id,
+            logs=[],
+            audio_urls=[],
+            message="세션 기록이 없습니다."
+        )
+    
+    with span("directory_lookup", path=session_dir):
+        filenames = os.listdir(session_dir)
+    session_data = session_store.load(participant_id, session_id) or {}
+    logs = session_messages_to_logs(session_data)
+    
+    # 오디오 파일이 남아 있는 턴만 URL 제공
+    existing_files = set(filenames)
+    audio_urls = []
+    for index, msg in enumerate(session_data.get('messages', [])):
+        audio_url = msg.get('audio_url')
+        if audio_url and audio_url.rsplit('/', 1)[-1] in existing_files:
+            audio_urls.append({"turn": index, "timestamp": msg.get('timestamp', ''), "url": audio_url})
+    
+    feedback_data = read_latest_record(session_dir, filenames, 'feedback_') or {}
+    analysis_data = read_latest_record(session_dir, filenames, 'voice_analysis_') or {}
+    evaluation_timestamp = feedback_data.get('timestamp')
+    last_message_at = session_data.get('last_updated') or (logs[-1]['timestamp'] if logs else '')
+    
+    return SessionBundleResponse(
+        status="success",
+        participant_id=participant_id,
+        session_id=session_id,
+        logs=logs,
+        evaluation=feedback_data.get('evaluation'),
+        evaluation_timestamp=evaluation_timestamp,
+        evaluation_is_current=bool(evaluation_timestamp) and evaluation_timestamp >= last_message_at,
+        voice_analysis=analysis_data.get('analysis'),
+        voice_analysis_timestamp=analysis_data.get('timestamp'),
+        audio_urls=audio_urls,
+        quests=quest_state_store.load(participant_id, session_id),
+        message=f"세션 기록을 가져왔습니다. (대화 {len(logs)}개)"
+    )
+
+@app.get("/api/session-bundle/{participant_id}", response_model=SessionBundleResponse)
+async def get_latest_session_bundle(participant_id: str):
+    """참가자의 최근 세션 기록(대화, 평가, 음성 분석, 오디오, 퀘스트)을 한 번에 가져오는 API"""
+    try:
+        return await asyncio.to_thread(build_session_bundle, participant_id, None)
+    except Exception as e:
+        logger.error("세션 번들 가져오기 오류: %s", e)
+        raise HTTPException(status_code=500, detail=f"세션 기록 가져오기 중 오류가 발생했습니다: {str(e)}")
+
+@app.get("/api/session-bundle/{participant_id}/{session_id}", response_model=SessionBundleResponse)
+async def get_session_bundle(participant_id: str, session_id: str):
+    """특정 세션의 기록(대화, 평가, 음성 분석, 오디오, 퀘스트)을 한 번에 가져오는 API"""
+    try:
+        return await asyncio.to_thread(build_session_bundle, participant_id, session_id)
+    except Exception as e:
+        logger.error("세션 번들 가져오기 오류: %s", e)
+        raise HTTPException(status_code=500, detail=f"세션 기록 가져오기 중 오류가 발생했습니다: {str(e)}")
+
 @app.post("/get-feedback", response_model=FeedbackResponse)
 async def get_feedback(request: FeedbackRequest):
     """사용자의 피드백 데이터를 가져오는 API (기존 호환성 유지)"""
     try:
-        print(f"📋 피드백 요청: {request.userData.get('name', 'Unknown')}")
+        logger.debug("피드백 요청: %s", request.userData.get('name', 'Unknown'))
         
         user_name = request.userData.get('name', 'Unknown')
         
-        # 최근 피드백 파일 찾기
-        feedback_files = []
-        for filename in os.listdir(DATA_DIR):
-            if filename.startswith(f"user_data_{user_name}_") and "feedback" in filename:
-                feedback_files.append(filename)
+        # 최근 피드백 파일 찾기 (기록 인덱스에서 이 참가자의 파일만 확인)
+        feedback_files = [entry["name"] for entry in legacy_log_index.entries(user_name) if "feedback" in entry["name"]]
         
         if not feedback_files:
             # 기본 피드백 데이터 반환
@@ -1532,8 +2701,7 @@ async def get_feedback(request: FeedbackRequest):
         latest_feedback = sorted(feedback_files)[-1]
         feedback_filepath = os.path.join(DATA_DIR, latest_feedback)
         
-        with open(feedback_filepath, 'r', encoding='utf-8') as f:
-            feedback_data = json.load(f)
+        feedback_data = read_json(feedback_filepath)
         
         return FeedbackResponse(
             status="success",
@@ -1542,71 +2710,125 @@ async def get_feedback(request: FeedbackRequest):
         )
         
     except Exception as e:
-        print(f"❌ 피드백 가져오기 오류: {e}")
+        logger.error("피드백 가져오기 오류: %s", e)
         raise HTTPException(status_code=500, detail=f"피드백 가져오기 중 오류가 발생했습니다: {str(e)}")
 
+def read_log_entry(entry: dict) -> dict:
+    """인덱스 항목에 해당하는 Retry 로그 파일을 읽어 로그 목록 형식으로 변환"""
+    if entry["source"] == "retry_session":
+        retry_session = retry_session_store.read_file(entry["path"])
+        messages = []
+        for turn in retry_session['turns']:
+            messages.append({'sender': 'user', 'content': turn.get('user', '')})
+            messages.append({'sender': 'bot', 'content': turn.get('assistant', '')})
+        return {
+            'timestamp': entry['timestamp'],
+            'messages': messages,
+            'sessionType': retry_session['header'].get('sessionType', 'unknown'),
+            'sessionId': retry_session['header'].get('sessionId', '')
+        }
+    
+    # 이전 형식(턴마다 파일 하나) 로그
+    log_data = read_json(entry["path"])
+    messages = []
+    for msg in log_data.get('conversation', []):
+        messages.append({
+            'sender': 'user' if msg['role'] == 'user' else 'bot',
+            'content': msg['content']
+        })
+    return {
+        'timestamp': log_data.get('timestamp', ''),
+        'messages': messages,
+        'sessionType': log_data.get('sessionType', 'unknown')
+    }
+
 @app.post("/get-logs", response_model=LogsResponse)
-async def get_logs(request: LogsRequest):
-    """사용자의 대화 로그를 가져오는 API"""
+async def get_logs(request: LogsRequest,
+                   response_format: Annotated[str, Query(alias="format", pattern="^(json|ndjson)$")] = "json"):
+    """사용자의 대화 로그를 가져오는 API
+
+    Retry 세션 파일과 이전 형식 로그를 메타데이터 인덱스로 합쳐 최신순으로 limit개만 읽습니다.
+    다음 페이지는 next_cursor를 cursor로 보내 요청하고, format=ndjson이면 로그를 읽는 대로 한 줄씩 보냅니다.
+    """
     try:
-        print(f"📋 로그 요청: {request.userData.get('name', 'Unknown')}")
+        logger.debug("로그 요청: %s", request.userData.get('name', 'Unknown'))
         
         user_name = request.userData.get('name', 'Unknown')
+        limit = min(request.limit, RECORD_PAGE_MAX_LIMIT)
+        
+        # Retry 세션 파일(세션당 파일 하나)과 이전 형식 로그의 메타데이터를 합쳐 최신순 정렬
+        entries = []
+        with span("record_index", kind="logs"):
+            user_identifiers = {user_name, request.userData.get('participantId', user_name)}
+            for user_identifier in user_identifiers:
+                directory = retry_session_store.participant_dir(user_identifier)
+                for entry in retry_session_index.entries(user_identifier):
+                    entries.append(dict(entry, path=os.path.join(directory, entry["name"])))
+            for entry in legacy_log_index.entries(user_name):
+                entries.append(dict(entry, path=os.path.join(DATA_DIR, entry["name"])))
+            entries.sort(key=log_sort_key, reverse=True)
+            page, next_cursor = paginate(entries, log_sort_key, limit, request.cursor)
+        
+        def load_logs():
+            for entry in page:
+                try:
+                    yield read_log_entry(entry)
+                except Exception as e:
+                    logger.warning("로그 파일 읽기 실패 %s: %s", entry["name"], e)
         
-        # 사용자 관련 로그 파일들 찾기
-        log_files = []
-        for filename in os.listdir(DATA_DIR):
-            if filename.startswith(f"user_data_{user_name}_") and filename.endswith('.json'):
-                log_files.append(filename)
-        
-        logs = []
-        for filename in sorted(log_files, reverse=True)[:10]:  # 최근 10개만
-            try:
-                log_filepath = os.path.join(DATA_DIR, filename)
-                with open(log_filepath, 'r', encoding='utf-8') as f:
-                    log_data = json.load(f)
-                
-                # 대화 메시지 추출
-                messages = []
-                if 'conversation' in log_data:
-                    for msg in log_data['conversation']:
-                        messages.append({
-                            'sender': 'user' if msg['role'] == 'user' else 'bot',
-                            'content': msg['content']
-                        })
-                
-                logs.append({
-                    'timestamp': log_data.get('timestamp', ''),
-                    'messages': messages,
-                    'sessionType': log_data.get('sessionType', 'unknown')
-                })
-                
-            except Exception as e:
-                print(f"⚠️ 로그 파일 읽기 실패 {filename}: {e}")
-                continue
+        if response_format == "ndjson":
+            def stream_logs():
+                for log in load_logs():
+                    yield ndjson_line({"event": "log", "log": log})
+                yield page_end_line(next_cursor, len(entries))
+            return StreamingResponse(stream_logs(), media_type=NDJSON_MEDIA_TYPE)
         
+        logs = list(load_logs())
         return LogsResponse(
             status="success",
             logs=logs,
-            message=f"총 {len(logs)}개의 로그를 가져왔습니다."
+            message=f"총 {len(logs)}개의 로그를 가져왔습니다.",
+            next_cursor=next_cursor,
+            total=len(entries)
         )
         
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        print(f"❌ 로그 가져오기 오류: {e}")
+        logger.error("로그 가져오기 오류: %s", e)
         raise HTTPException(status_code=500, detail=f"로그 가져오기 중 오류가 발생했습니다: {str(e)}")
 
 @app.post("/api/check-quests", response_model=QuestCheckResponse)
 async def check_quests(request: QuestCheckRequest):
     """LLM을 사용하여 퀘스트 달성 여부를 체크하는 API"""
+    return await process_quest_check(request)
+
+def quest_stream_events(path: tuple, value) -> list:
+    """퀘스트 응답에서 완성된 퀘스트 결과를 스트리밍 이벤트로 변환 (quest_id가 없는 항목은 제외)"""
+    if len(path) == 2 and path[0] == "completed_quests":
+        quest = parse_quest(value)
+        if quest is not None:
+            return [{"event": "quest", "quest": quest}]
+    return []
+
+@app.post("/api/check-quests/stream")
+async def check_quests_stream(request: QuestCheckRequest):
+    """퀘스트 체크 결과를 NDJSON으로 스트리밍하는 API (퀘스트별 결과가 완성되는 대로 전송, 마지막 줄은 전체 결과)"""
+    require_llm("check_quests")
+    return structured_stream_response(
+        lambda on_delta: process_quest_check(request, on_delta=on_delta),
+        quest_stream_events
+    )
+
+async def process_quest_check(request: QuestCheckRequest, on_delta: Optional[Callable[[str], None]] = None):
+    """퀘스트 달성 여부를 체크하는 함수 (on_delta: 스트리밍 응답 조각 콜백)"""
     try:
-        print(f"🔍 퀘스트 체크 요청: 세션 {request.session_id}, 참가자 {request.participant_id}")
-        print(f"📝 대화 길이: {len(request.conversation_history)}개 메시지")
-        print(f"🎯 체크할 퀘스트: {len(request.quests)}개")
+        logger.debug("퀘스트 체크 요청: 세션 %s, 참가자 %s", request.session_id, request.participant_id)
+        logger.debug("대화 길이: %s개 메시지", len(request.conversation_history))
+        logger.debug("체크할 퀘스트: %s개", len(request.quests))
         
-        # OpenAI API 키 확인
-        openai_api_key = os.getenv("OPENAI_API_KEY")
-        if not openai_api_key:
-            raise HTTPException(status_code=500, detail="OpenAI API 키가 설정되지 않았습니다.")
+        # LLM 제공자 설정 확인
+        require_llm("check_quests")
         
         # 대화 내용을 텍스트로 변환
         conversation_text = ""
@@ -1650,44 +2872,64 @@ async def check_quests(request: QuestCheckRequest):
 }}
 """
         
-        # OpenAI API 호출
-        client = openai.OpenAI(api_key=openai_api_key)
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "당신은 환자의 의료 진료 상황 연습을 위한 퀘스트 평가 전문가입니다. 객관적이고 정확한 평가를 제공해주세요. 퀘스트 ID는 정확히 제공된 ID를 사용해야 합니다. 이것은 환자 입장에서 수행하는 것입니다."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,
-            max_tokens=1000
-        )
+        # OpenAI API 호출 (동일 입력은 캐시에서 응답)
+        # 외부 API 장애 시에는 달성한 퀘스트 없음으로 응답 (다음 턴의 체크에서 다시 평가됨)
+        provisional = False
+        try:
+            result_text = await complete_chat(
+                "check_quests",
+                messages=[
+                    {"role": "system", "content": "당신은 환자의 의료 진료 상황 연습을 위한 퀘스트 평가 전문가입니다. 객관적이고 정확한 평가를 제공해주세요. 퀘스트 ID는 정확히 제공된 ID를 사용해야 합니다. 이것은 환자 입장에서 수행하는 것입니다."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.3,
+                max_tokens=1000,
+                use_cache=True,
+                bypass_cache=request.bypass_cache,
+                priority=PRIORITY_INTERACTIVE,
+                json_mode=True,
+                on_delta=on_delta
+            )
+        except Exception as e:
+            if not should_degrade(e):
+                raise
+            logger.warning("퀘스트 체크 임시 결과로 응답: %s", e)
+            result_text = ""
+            provisional = True
         
         # 응답 파싱
-        try:
-            result_text = response.choices[0].message.content
-            print(f"🤖 LLM 응답: {result_text}")
-            
-            import re
-            json_match = re.search(r'\{.*\}', result_text, re.DOTALL)
-            if json_match:
-                result_data = json.loads(json_match.group())
-                completed_quests = result_data.get('completed_quests', [])
-                print(f"✅ 파싱된 퀘스트 결과: {len(completed_quests)}개")
-            else:
-                completed_quests = []
-                print("⚠️ JSON 파싱 실패")
-        except json.JSONDecodeError as e:
+        logger.debug("LLM 응답: %s", result_text)
+        # 항목별로 검증해 quest_id가 없는 항목만 버림
+        result_data = parse_structured(result_text, QuestCheckResult)
+        if result_data is not None:
+            completed_quests = result_data["completed_quests"]
+            logger.debug("파싱된 퀘스트 결과: %s개", len(completed_quests))
+        else:
             completed_quests = []
-            print(f"❌ JSON 파싱 오류: {e}")
+            logger.warning("퀘스트 응답에서 JSON을 찾지 못함")
+        
+        # 임시 결과가 아니면 세션의 퀘스트 상태에 누적
+        if not provisional:
+            try:
+                with timed_io("quest_state_save"):
+                    quest_state_store.merge(
+                        request.participant_id, request.session_id, completed_quests, datetime.now().isoformat()
+                    )
+            except Exception as e:
+                logger.warning("퀘스트 상태 저장 실패: %s", e)
         
         return QuestCheckResponse(
             status="success",
             completed_quests=completed_quests,
-            message="퀘스트 체크가 완료되었습니다."
+            message="퀘스트 체크를 잠시 후 다시 시도합니다." if provisional else "퀘스트 체크가 완료되었습니다.",
+            provisional=provisional
         )
         
+    except UpstreamBusyError:
+        # 혼잡 응답(503)은 전용 핸들러에서 처리
+        raise
     except Exception as e:
-        print(f"❌ 퀘스트 체크 오류: {e}")
+        logger.error("퀘스트 체크 오류: %s", e)
         raise HTTPException(status_code=500, detail=f"퀘스트 체크 중 오류가 발생했습니다: {str(e)}")
 
 @app.post("/api/save-cheatsheet", response_model=SaveCheatsheetResponse)
@@ -1695,10 +2937,10 @@ async def save_cheatsheet(request: SaveCheatsheetRequest):
     """치트시트를 저장하는 API"""
     try:
         participant_id = request.participant_id
-        print(f"💾 치트시트 저장 시작: {participant_id}")
+        logger.debug("치트시트 저장 시작: %s", participant_id)
         
         # 참가자별 디렉토리 확인
-        participant_dir = os.path.join(LOG_DIR, participant_id)
+        participant_dir = session_store.participant_dir(participant_id)
         if not os.path.exists(participant_dir):
             os.makedirs(participant_dir)
         
@@ -1714,10 +2956,10 @@ async def save_cheatsheet(request: SaveCheatsheetRequest):
             "cheatsheet": request.cheatsheet_data
         }
         
-        with open(cheatsheet_filepath, 'w', encoding='utf-8') as f:
-            json.dump(cheatsheet_data, f, ensure_ascii=False, indent=2)
+        write_json(cheatsheet_filepath, cheatsheet_data)
+        cheatsheet_index.record(participant_id, cheatsheet_filename)
         
-        print(f"✅ 치트시트 저장 완료: {cheatsheet_filepath}")
+        logger.info("치트시트 저장 완료: %s", cheatsheet_filepath)
         
         return SaveCheatsheetResponse(
             status="success",
@@ -1725,153 +2967,146 @@ async def save_cheatsheet(request: SaveCheatsheetRequest):
         )
         
     except Exception as e:
-        print(f"❌ 치트시트 저장 오류: {e}")
+        logger.error("치트시트 저장 오류: %s", e)
         raise HTTPException(status_code=500, detail=f"치트시트 저장 중 오류가 발생했습니다: {str(e)}")
 
+def page_end_line(next_cursor: Optional[str], total: int) -> bytes:
+    """NDJSON 목록 응답의 마지막 줄 (다음 페이지 커서와 전체 개수)"""
+    return ndjson_line({"event": "end", "next_cursor": next_cursor, "total": total})
+
 @app.get("/api/get-cheatsheet-history/{participant_id}", response_model=GetCheatsheetHistoryResponse)
-async def get_cheatsheet_history(participant_id: str):
-    """참가자의 치트시트 히스토리를 가져오는 API"""
+async def get_cheatsheet_history(participant_id: str,
+                                 limit: Annotated[Optional[int], Query(ge=1, le=RECORD_PAGE_MAX_LIMIT)] = None,
+                                 cursor: Optional[str] = None,
+                                 response_format: Annotated[str, Query(alias="format", pattern="^(json|ndjson)$")] = "json"):
+    """참가자의 치트시트 히스토리를 가져오는 API
+
+    limit을 주면 최신순으로 limit개만 읽어 보내고 next_cursor로 다음 페이지를 요청합니다 (생략하면 전체).
+    format=ndjson이면 치트시트를 읽는 대로 한 줄({"event": "cheatsheet", ...})씩 보내고 마지막 줄에 다음 커서를 보냅니다.
+    """
     try:
-        print(f"📋 치트시트 히스토리 요청: {participant_id}")
+        logger.debug("치트시트 히스토리 요청: %s", participant_id)
         
-        # 참가자별 디렉토리 확인
-        participant_dir = os.path.join(LOG_DIR, participant_id)
-        if not os.path.exists(participant_dir):
-            return GetCheatsheetHistoryResponse(
-                status="success",
-                cheatsheets=[],
-                message="치트시트 히스토리가 없습니다."
-            )
+        # 메타데이터 인덱스로 이번 페이지에 보여줄 파일만 고름
+        with span("record_index", kind="cheatsheets"):
+            page, next_cursor, total = cheatsheet_index.page(participant_id, limit, cursor)
+        participant_dir = session_store.participant_dir(participant_id)
         
-        # 치트시트 파일들 찾기
-        cheatsheet_files = []
-        for filename in os.listdir(participant_dir):
-            if filename.startswith('cheatsheet_') and filename.endswith('.json'):
-                cheatsheet_files.append(filename)
+        def load_cheatsheets():
+            for entry in page:
+                filepath = os.path.join(participant_dir, entry["name"])
+                try:
+                    with span("json_load", path=filepath):
+                        yield read_json(filepath)
+                except Exception as e:
+                    logger.warning("치트시트 파일 읽기 실패 %s: %s", entry["name"], e)
         
-        if not cheatsheet_files:
-            return GetCheatsheetHistoryResponse(
-                status="success",
-                cheatsheets=[],
-                message="치트시트 히스토리가 없습니다."
-            )
-        
-        # 치트시트 데이터 로드
-        cheatsheets = []
-        for filename in sorted(cheatsheet_files, reverse=True):
-            filepath = os.path.join(participant_dir, filename)
-            try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    cheatsheet_data = json.load(f)
-                    cheatsheets.append(cheatsheet_data)
-            except Exception as e:
-                print(f"⚠️ 치트시트 파일 읽기 실패 {filename}: {e}")
-                continue
+        if response_format == "ndjson":
+            def stream_cheatsheets():
+                for cheatsheet_data in load_cheatsheets():
+                    yield ndjson_line({"event": "cheatsheet", "cheatsheet": cheatsheet_data})
+                yield page_end_line(next_cursor, total)
+            return StreamingResponse(stream_cheatsheets(), media_type=NDJSON_MEDIA_TYPE)
         
+        cheatsheets = list(load_cheatsheets())
         return GetCheatsheetHistoryResponse(
             status="success",
             cheatsheets=cheatsheets,
-            message=f"총 {len(cheatsheets)}개의 치트시트를 가져왔습니다."
+            message=f"총 {len(cheatsheets)}개의 치트시트를 가져왔습니다." if cheatsheets else "치트시트 히스토리가 없습니다.",
+            next_cursor=next_cursor,
+            total=total
         )
         
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        print(f"❌ 치트시트 히스토리 가져오기 오류: {e}")
+        logger.error("치트시트 히스토리 가져오기 오류: %s", e)
         raise HTTPException(status_code=500, detail=f"치트시트 히스토리 가져오기 중 오류가 발생했습니다: {str(e)}")
 
 @app.post("/api/generate-cheatsheet", response_model=CheatsheetResponse)
-async def generate_cheatsheet(request: CheatsheetRequest):
-    """참가자의 대화 기록을 바탕으로 맞춤형 진료 스크립트를 생성하는 API"""
+async def generate_cheatsheet(request: CheatsheetRequest, idempotency_key: Optional[str] = Header(None)):
+    """참가자의 대화 기록을 바탕으로 맞춤형 진료 스크립트를 생성하는 API (동시 중복 요청 병합)"""
+    return await run_single_flight(
+        "generate_cheatsheet", request.participant_id, "", request,
+        process_cheatsheet, idempotency_key
+    )
+
+async def process_cheatsheet(request: CheatsheetRequest):
+    """참가자의 대화 기록을 바탕으로 맞춤형 진료 스크립트를 생성하는 함수"""
     try:
         participant_id = request.participant_id
-        print(f"📋 치트시트 생성 시작: {participant_id}")
+        logger.debug("치트시트 생성 시작: %s", participant_id)
         
-        # OpenAI API 키 확인
-        openai_api_key = os.getenv('OPENAI_API_KEY')
-        if not openai_api_key:
-            raise HTTPException(status_code=500, detail="OpenAI API 키가 설정되지 않았습니다.")
+        # LLM 제공자 설정 확인
+        require_llm("generate_cheatsheet")
         
         conversation_text = ""
         
         # 1. 정규 채팅 세션 데이터 수집 (logs 디렉토리)
-        participant_dir = os.path.join(LOG_DIR, participant_id)
+        participant_dir = session_store.participant_dir(participant_id)
         if os.path.exists(participant_dir):
             # 세션 디렉토리 찾기
             session_dirs = [d for d in os.listdir(participant_dir) if d.startswith('session_')]
             if session_dirs:
                 # 최신 세션 선택
                 latest_session = max(session_dirs, key=lambda x: os.path.getctime(os.path.join(participant_dir, x)))
-                logs_filepath = os.path.join(participant_dir, latest_session, "chat_session.json")
+                logs_data = session_store.load(participant_id, latest_session)
                 
-                if os.path.exists(logs_filepath):
-                    # 로그 파일 읽기
-                    with open(logs_filepath, 'r', encoding='utf-8') as f:
-                        logs_data = json.load(f)
-                    
-                    # 정규 세션 대화 내용 추출
-                    for message in logs_data.get('messages', []):
-                        if message.get('user_message'):
-                            conversation_text += f"환자: {message['user_message']}\n"
-                        if message.get('doctor_response'):
-                            conversation_text += f"의사: {message['doctor_response']}\n"
+                if logs_data:
+                    # 정규 세션 대화 내용 추출 (세션 요약 + 최근 턴)
+                    session_turns = session_messages_to_turns(logs_data.get('messages', []))
+                    conversation_text += await summarizer.condense(session_turns, logs_data.get('summary'))
                     
-                    print(f"✅ 정규 세션 대화 데이터 로드: {len(logs_data.get('messages', []))}개 메시지")
+                    logger.debug("정규 세션 대화 데이터 로드: %s개 메시지", len(logs_data.get('messages', [])))
         
         # 2. Retry 채팅 데이터 수집 (data 디렉토리)
-        retry_conversation_text = ""
-        retry_files = []
-        
-        # participant_id와 매칭되는 retry 파일들 찾기
-        if os.path.exists(DATA_DIR):
-            for filename in os.listdir(DATA_DIR):
-                # participant_id로 시작하거나 파일 내용에서 participant_id가 매칭되는 파일 찾기
-                if filename.startswith(f"user_data_{participant_id}_") and filename.endswith('.json'):
-                    retry_files.append(filename)
-                elif filename.startswith("user_data_") and filename.endswith('.json'):
-                    # 파일 내용을 확인하여 participant_id 매칭
-                    try:
-                        temp_filepath = os.path.join(DATA_DIR, filename)
-                        with open(temp_filepath, 'r', encoding='utf-8') as f:
-                            temp_data = json.load(f)
-                        if temp_data.get('participant_id') == participant_id:
-                            retry_files.append(filename)
-                    except:
-                        continue
-        
-        # 최신 retry 파일들 처리 (최근 5개)
-        retry_files.sort(reverse=True)
+        retry_turns = []
+        # 이전 형식 Retry 파일은 기록 인덱스에서 이 참가자의 파일만 찾음 (data/ 전체를 읽지 않음)
+        retry_files = [entry["name"] for entry in legacy_log_index.entries(participant_id)]
+        
+        # Retry 세션 파일 처리 (최근 5개 세션, 세션당 파일 하나)
+        retry_session_files = retry_session_store.list_session_files(participant_id)[:5]
+        for session_filepath in reversed(retry_session_files):
+            try:
+                retry_session = retry_session_store.read_file(session_filepath)
+                for turn in retry_session['turns']:
+                    retry_turns.append({"user": turn.get('user', ''), "doctor": turn.get('assistant', '')})
+            except Exception as e:
+                logger.warning("Retry 세션 파일 읽기 실패 %s: %s", session_filepath, e)
+                continue
+        if retry_session_files:
+            logger.debug("Retry 세션 데이터 로드: %s개 세션", len(retry_session_files))
+        
+        # 이전 형식 retry 파일들 처리 (최근 5개, 인덱스가 최신순으로 정렬되어 있음)
         for filename in retry_files[:5]:
             try:
                 retry_filepath = os.path.join(DATA_DIR, filename)
-                with open(retry_filepath, 'r', encoding='utf-8') as f:
-                    retry_data = json.load(f)
+                retry_data = read_json(retry_filepath)
                 
                 # retry 대화 내용 추출
                 if 'conversation' in retry_data:
-                    for msg in retry_data['conversation']:
-                        if msg['role'] == 'user':
-                            retry_conversation_text += f"환자: {msg['content']}\n"
-                        elif msg['role'] == 'assistant':
-                            retry_conversation_text += f"의사: {msg['content']}\n"
+                    retry_turns.extend(role_messages_to_turns(retry_data['conversation']))
             except Exception as e:
-                print(f"⚠️ Retry 파일 읽기 실패 {filename}: {e}")
+                logger.warning("Retry 파일 읽기 실패 %s: %s", filename, e)
                 continue
         
-        if retry_conversation_text:
+        if retry_turns:
+            # 긴 Retry 대화도 오래된 턴은 요약
+            retry_conversation_text = await summarizer.condense(retry_turns)
             conversation_text += "\n--- Retry 연습 대화 ---\n" + retry_conversation_text
-            print(f"✅ Retry 대화 데이터 로드: {len(retry_files[:5])}개 파일")
+            if retry_files:
+                logger.debug("Retry 대화 데이터 로드: %s개 파일", len(retry_files[:5]))
         
         # 최종 대화 데이터 상태 로깅
         total_chars = len(conversation_text)
-        print(f"📊 총 대화 데이터 크기: {total_chars}자")
+        logger.debug("총 대화 데이터 크기: %s자", total_chars)
         
         # 대화 데이터가 없는 경우
         if not conversation_text.strip():
-            print(f"⚠️ 대화 데이터 없음 - participant_id: {participant_id}")
-            print(f"⚠️ LOG_DIR 상태: {os.path.exists(LOG_DIR)}")
-            print(f"⚠️ DATA_DIR 상태: {os.path.exists(DATA_DIR)}")
-            if os.path.exists(DATA_DIR):
-                data_files = [f for f in os.listdir(DATA_DIR) if f.startswith(f"user_data_{participant_id}_")]
-                print(f"⚠️ 참가자 관련 데이터 파일: {data_files}")
+            logger.warning("대화 데이터 없음 - participant_id: %s", participant_id)
+            logger.debug("LOG_DIR 상태: %s", os.path.exists(LOG_DIR))
+            logger.debug("DATA_DIR 상태: %s", os.path.exists(DATA_DIR))
+            logger.debug("참가자 관련 데이터 파일: %s", retry_files)
             raise HTTPException(status_code=404, detail="대화 로그를 찾을 수 없습니다.")
         
         # LLM 프롬프트 구성
@@ -1923,55 +3158,29 @@ async def generate_cheatsheet(request: CheatsheetRequest):
 }}
 """
         
-        # OpenAI API 호출
-        client = openai.OpenAI(api_key=openai_api_key)
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
+        # OpenAI API 호출 (동일 입력은 캐시에서 응답)
+        result_text = await complete_chat(
+            "generate_cheatsheet",
             messages=[
                 {"role": "system", "content": "당신은 환자를 위한 진료 시에 사용할 스크립트 생성 전문가입니다. 북한이탈주민의 특성을 고려하여 실용적이고 구체적인 스크립트를 제공해주세요."},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.7,
-            max_tokens=1500
-            )
+            max_tokens=1500,
+            use_cache=True,
+            bypass_cache=request.bypass_cache,
+            json_mode=True
+        )
         
         # 응답 파싱
-        try:
-            result_text = response.choices[0].message.content
-            print(f"🤖 LLM 응답: {result_text}")
-            
-            import re
-            json_match = re.search(r'\{.*\}', result_text, re.DOTALL)
-            if json_match:
-                result_data = json.loads(json_match.group())
-                cheatsheet_data = result_data.get('cheatsheet', {})
-                print(f"✅ 파싱된 치트시트: {len(cheatsheet_data.get('script', []))}개 스크립트")
-            else:
-                # 기본 치트시트 생성
-                cheatsheet_data = {
-                    "script": [
-                        {"title": "증상 위치", "content": "어디가 아픈지 구체적으로 말씀드리겠습니다."},
-                        {"title": "증상 시작 시기", "content": "언제부터 아픈지 정확히 말씀드리겠습니다."}
-                    ],
-                    "listening": [
-                        {"title": "진단명과 근거", "content": "진단명과 그 근거를 설명드리겠습니다."},
-                        {"title": "처방약 정보", "content": "처방약의 이름과 복용 방법을 설명드리겠습니다."}
-                    ]
-                }
-                print("⚠️ JSON 파싱 실패, 기본 치트시트 사용")
-        except json.JSONDecodeError as e:
-            # 기본 치트시트 생성
-            cheatsheet_data = {
-                "script": [
-                    {"title": "증상 위치", "content": "어디가 아픈지 구체적으로 말씀드리겠습니다."},
-                    {"title": "증상 시작 시기", "content": "언제부터 아픈지 정확히 말씀드리겠습니다."}
-                ],
-                "listening": [
-                    {"title": "진단명과 근거", "content": "진단명과 그 근거를 설명드리겠습니다."},
-                    {"title": "처방약 정보", "content": "처방약의 이름과 복용 방법을 설명드리겠습니다."}
-                ]
-            }
-            print(f"❌ JSON 파싱 오류: {e}, 기본 치트시트 사용")
+        logger.debug("LLM 응답: %s", result_text)
+        result_data = parse_structured(result_text, CheatsheetResult)
+        if result_data is not None and (result_data["cheatsheet"]["script"] or result_data["cheatsheet"]["listening"]):
+            cheatsheet_data = result_data["cheatsheet"]
+            logger.debug("파싱된 치트시트: %s개 스크립트", len(cheatsheet_data["script"]))
+        else:
+            cheatsheet_data = default_cheatsheet()
+            logger.warning("치트시트 응답 파싱 실패, 기본 치트시트 사용")
         
         return CheatsheetResponse(
             status="success",
@@ -1979,27 +3188,108 @@ async def generate_cheatsheet(request: CheatsheetRequest):
             message="진료 스크립트가 성공적으로 생성되었습니다."
         )
         
+    except UpstreamBusyError:
+        # 혼잡 응답(503)은 전용 핸들러에서 처리
+        raise
     except Exception as e:
-        print(f"❌ 치트시트 생성 오류: {e}")
+        logger.error("치트시트 생성 오류: %s", e)
         raise HTTPException(status_code=500, detail=f"치트시트 생성 중 오류가 발생했습니다: {str(e)}")
 
+async def run_cheatsheet_job(payload: dict) -> dict:
+    """백그라운드 작업: 치트시트 생성"""
+    result = await process_cheatsheet(CheatsheetRequest(**payload))
+    return result.dict()
+
+async def run_evaluation_job(payload: dict) -> dict:
+    """백그라운드 작업: 대화 평가"""
+    result = await process_evaluation(EvaluationRequest(**payload))
+    return result.dict()
+
+job_manager.register("generate_cheatsheet", run_cheatsheet_job)
+job_manager.register("evaluate", run_evaluation_job)
+
+def job_view(job: dict) -> dict:
+    """작업 기록에서 클라이언트에 보여줄 필드만 추리는 함수 (요청 본문 제외)"""
+    return {key: value for key, value in job.items() if key != "payload"}
+
+def submit_job(job_type: str, request: BaseModel, participant_id: str) -> JobResponse:
+    """작업을 대기열에 넣고 작업 ID를 응답하는 함수"""
+    try:
+        job = job_manager.submit(job_type, request.dict(), participant_id=participant_id)
+    except JobQueueFullError:
+        raise HTTPException(status_code=503, detail="작업 대기열이 가득 찼습니다. 잠시 후 다시 시도해주세요.",
+                            headers={"Retry-After": "10"})
+    logger.info("작업 등록: %s (%s) - %s", job_type, job['job_id'], participant_id)
+    return JobResponse(
+        status="success",
+        job=job_view(job),
+        message="작업이 등록되었습니다. 작업 ID로 상태를 조회해주세요."
+    )
+
+@app.post("/api/jobs/generate-cheatsheet", response_model=JobResponse, status_code=202)
+async def submit_cheatsheet_job(request: CheatsheetRequest):
+    """치트시트 생성을 백그라운드 작업으로 등록하는 API"""
+    return submit_job("generate_cheatsheet", request, request.participant_id)
+
+@app.post("/api/jobs/evaluate", response_model=JobResponse, status_code=202)
+async def submit_evaluation_job(request: EvaluationRequest):
+    """대화 평가를 백그라운드 작업으로 등록하는 API"""
+    return submit_job("evaluate", request, request.participant_id)
+
+@app.get("/api/jobs/{job_id}", response_model=JobResponse)
+async def get_job_status(job_id: str, wait: float = 0):
+    """작업 상태 조회 API (wait 초만큼 완료를 기다리는 롱 폴링 지원)"""
+    job = await job_manager.wait(job_id, min(max(wait, 0), 60))
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return JobResponse(
+        status="success",
+        job=job_view(job),
+        message=f"작업 상태: {job['status']}"
+    )
+
+@app.get("/api/jobs/{job_id}/result")
+async def get_job_result(job_id: str):
+    """완료된 작업의 결과를 원래 API 응답 형식 그대로 반환하는 API"""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    if job["status"] not in FINISHED_STATUSES:
+        return FastJSONResponse(
+            status_code=202,
+            content={"status": job["status"], "detail": "작업이 아직 진행 중입니다."},
+            headers={"Retry-After": "2"}
+        )
+    if job["status"] != JOB_SUCCEEDED:
+        raise HTTPException(
+            status_code=job.get("error_status_code") or (409 if job["status"] == "cancelled" else 500),
+            detail=job.get("error") or f"작업이 {job['status']} 상태로 종료되었습니다."
+        )
+    return job["result"]
+
+@app.delete("/api/jobs/{job_id}", response_model=JobResponse)
+async def cancel_job(job_id: str):
+    """대기 중이거나 실행 중인 작업을 취소하는 API"""
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return JobResponse(
+        status="success",
+        job=job_view(job),
+        message="작업 취소를 요청했습니다."
+    )
+
 if __name__ == "__main__":
     # 환경변수 확인
-    print("🔑 환경변수 상태:")
-    print(f"   OpenAI API Key: {'✅ 설정됨' if os.getenv('OPENAI_API_KEY') else '❌ 설정되지 않음'}")
-    print(f"   ElevenLabs API Key: {'✅ 설정됨' if os.getenv('ELEVENLABS_API_KEY') else '❌ 설정되지 않음'}")
-    print(f"   ElevenLabs Voice ID: {os.getenv('ELEVENLABS_VOICE_ID', 'BNr4zvrC1bGIdIstzjFQ')}")
-    print()
-    
-    print("📁 로그 디렉토리:")
-    print(f"   로그 폴더: {os.path.abspath(LOG_DIR)}")
-    print(f"   데이터 폴더: {os.path.abspath(DATA_DIR)}")
-    print()
-    
-    print("🚀 FastAPI 서버가 포트 8000에서 실행중입니다.")
-    print("📖 API 문서: http://localhost:8000/docs")
-    print("🔍 환경변수 확인: http://localhost:8000/env-info")
-    print("💡 ngrok은 별도 터미널에서 'ngrok start'로 실행하세요")
+    logger.info(
+        "환경변수 상태: OpenAI API Key %s, ElevenLabs API Key %s, ElevenLabs Voice ID %s",
+        '설정됨' if os.getenv('OPENAI_API_KEY') else '설정되지 않음',
+        '설정됨' if os.getenv('ELEVENLABS_API_KEY') else '설정되지 않음',
+        os.getenv('ELEVENLABS_VOICE_ID', 'BNr4zvrC1bGIdIstzjFQ')
+    )
+    logger.info("로그 폴더: %s, 데이터 폴더: %s", os.path.abspath(LOG_DIR), os.path.abspath(DATA_DIR))
+    logger.info("FastAPI 서버가 포트 8000에서 실행중입니다. API 문서: http://localhost:8000/docs, 환경변수 확인: http://localhost:8000/env-info")
+    logger.info("ngrok은 별도 터미널에서 'ngrok start'로 실행하세요")
     
     # uvicorn으로 서버 시작
     uvicorn.run(
@@ -0,0 +1,188 @@
+"""Prometheus 텍스트 형식으로 내보내는 간단한 메트릭 레지스트리
+
+카운터/게이지/히스토그램을 라벨별로 메모리에 누적하고, /metrics 요청 시
+Prometheus exposition format(text/plain; version=0.0.4)으로 직렬화합니다.
+캐시 적중률이나 대기열 길이처럼 다른 객체가 이미 들고 있는 값은 수집 함수(collector)로
+스크랩 시점에 읽어옵니다.
+"""
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+# 기본 지연 시간 버킷 (초) - 수 ms짜리 파일 I/O부터 수십 초짜리 LLM 호출까지
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def escape_label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{escape_label_value(value)}"' for key, value in labels.items()) + "}"
+
+
+def format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    """라벨 조합별 값을 보관하는 메트릭의 공통 부분"""
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: 라벨이 맞지 않습니다 ({sorted(labels)} != {sorted(self.labelnames)})")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> list:
+        """(이름 접미사, 라벨 dict, 값) 목록"""
+        with self._lock:
+            items = list(self._values.items())
+        return [("", dict(zip(self.labelnames, key)), value) for key, value in items]
+
+
+class Counter(Metric):
+    metric_type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    metric_type = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # [버킷별 개수..., 합계, 전체 개수]
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """with 블록 실행 시간을 초 단위로 기록"""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start_time, **labels)
+
+    def samples(self) -> list:
+        with self._lock:
+            items = [(key, list(state)) for key, state in self._values.items()]
+        result = []
+        for key, state in items:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for index, bound in enumerate(self.buckets):
+                cumulative += state[index]
+                result.append(("_bucket", dict(labels, le=format_value(bound)), cumulative))
+            result.append(("_bucket", dict(labels, le="+Inf"), state[-1]))
+            result.append(("_sum", labels, state[-2]))
+            result.append(("_count", labels, state[-1]))
+        return result
+
+
+class MetricsRegistry:
+    """메트릭과 수집 함수를 모아 Prometheus 텍스트로 직렬화하는 레지스트리"""
+
+    def __init__(self, namespace: str = ""):
+        self.namespace = namespace
+        self._metrics = {}
+        self._collectors = []
+
+    def _full_name(self, name: str) -> str:
+        return f"{self.namespace}_{name}" if self.namespace else name
+
+    def _register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"이미 등록된 메트릭입니다: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple = ()) -> Counter:
+        return self._register(Counter(self._full_name(name), documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple = ()) -> Gauge:
+        return self._register(Gauge(self._full_name(name), documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple = (),
+                  buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(self._full_name(name), documentation, labelnames, buckets))
+
+    def register_collector(self, collect):
+        """collect() -> [(이름, 타입, 설명, [(라벨 dict, 값), ...]), ...] 형태의 수집 함수 등록"""
+        self._collectors.append(collect)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.metric_type}")
+            for suffix, labels, value in metric.samples():
+                lines.append(f"{metric.name}{suffix}{format_labels(labels)} {format_value(value)}")
+
+        for collect in self._collectors:
+            try:
+                families = collect()
+            except Exception:
+                # 수집 함수 하나가 실패해도 나머지 메트릭은 내보냄
+                continue
+            for name, metric_type, documentation, samples in families:
+                full_name = self._full_name(name)
+                lines.append(f"# HELP {full_name} {documentation}")
+                lines.append(f"# TYPE {full_name} {metric_type}")
+                for labels, value in samples:
+                    lines.append(f"{full_name}{format_labels(labels)} {format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def get(self, name: str) -> Optional[Metric]:
+        return self._metrics.get(self._full_name(name))
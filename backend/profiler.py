@@ -0,0 +1,119 @@
+"""관리자가 켜고 끄는 샘플링 프로파일러 (flame graph용 folded stack 출력)
+
+일부 요청(profile_sample_rate 비율)이 처리되는 동안 별도 스레드가 interval마다
+모든 스레드의 호출 스택을 찍어 "스레드;파일:함수;... 개수" 형식(folded stacks)으로 누적합니다.
+결과는 flamegraph.pl, speedscope 등에 그대로 넣어 flame graph로 볼 수 있습니다.
+프로파일 대상 요청이 없을 때는 샘플러 스레드가 아무것도 하지 않습니다.
+"""
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+# 대기 중인 스레드의 스택은 플레임 그래프를 가리기만 하므로 제외
+IDLE_LEAF_FUNCTIONS = {
+    ("threading.py", "wait"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+}
+
+
+def frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class SamplingProfiler:
+    """프로파일 대상 요청이 있는 동안 스레드 스택을 주기적으로 샘플링"""
+
+    def __init__(self, output_dir: str, sample_rate: float = 0.0, interval_ms: float = 5.0,
+                 max_depth: int = 64):
+        self.output_dir = output_dir
+        self.sample_rate = sample_rate
+        self.interval_ms = interval_ms
+        self.max_depth = max_depth
+
+        self._stacks = Counter()
+        self._active = 0
+        self._lock = threading.Lock()
+        self._thread = None
+
+        self.samples = 0
+        self.profiled_requests = 0
+
+    def should_profile(self) -> bool:
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def begin(self):
+        with self._lock:
+            self._active += 1
+            self.profiled_requests += 1
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._sample_loop, name="sampling-profiler", daemon=True)
+                self._thread.start()
+
+    def end(self):
+        with self._lock:
+            self._active = max(0, self._active - 1)
+
+    def folded(self) -> str:
+        """누적된 스택을 folded 형식 텍스트로 반환 (많이 찍힌 스택 순)"""
+        with self._lock:
+            items = self._stacks.most_common()
+        return "".join(f"{stack} {count}\n" for stack, count in items)
+
+    def reset(self):
+        with self._lock:
+            self._stacks.clear()
+            self.samples = 0
+            self.profiled_requests = 0
+
+    def dump(self) -> str:
+        """현재까지의 결과를 output_dir에 .folded 파일로 저장하고 경로를 반환"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        profile_filepath = os.path.join(
+            self.output_dir, f"profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}.folded"
+        )
+        with open(profile_filepath, "w", encoding="utf-8") as f:
+            f.write(self.folded())
+        return profile_filepath
+
+    def stats(self) -> dict:
+        return {
+            "sample_rate": self.sample_rate,
+            "interval_ms": self.interval_ms,
+            "active_requests": self._active,
+            "profiled_requests": self.profiled_requests,
+            "samples": self.samples,
+            "unique_stacks": len(self._stacks),
+        }
+
+    def _sample_loop(self):
+        own_thread_id = threading.get_ident()
+        while True:
+            time.sleep(self.interval_ms / 1000)
+            if self._active == 0:
+                if self.sample_rate <= 0:
+                    # 꺼진 상태면 스레드 종료 (다시 켜지면 begin에서 새로 시작)
+                    return
+                continue
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            collected = []
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread_id:
+                    continue
+                if (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in IDLE_LEAF_FUNCTIONS:
+                    continue
+                labels = []
+                while frame is not None and len(labels) < self.max_depth:
+                    labels.append(frame_label(frame))
+                    frame = frame.f_back
+                labels.append(thread_names.get(thread_id, str(thread_id)))
+                collected.append(";".join(reversed(labels)))
+            with self._lock:
+                self._stacks.update(collected)
+                self.samples += 1
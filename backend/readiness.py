@@ -0,0 +1,113 @@
+"""준비 상태(readiness) 점검 도구
+
+로드밸런서가 성능이 떨어진 인스턴스로 트래픽을 보내지 않도록 디스크 여유 공간/inode,
+쓰기 지연, 외부 API 도달 가능 여부를 확인합니다.
+외부 API 점검은 결과를 ttl 동안 캐시하고, 만료되면 이전 결과를 돌려주면서 백그라운드로 갱신하므로
+/ready 요청 자체는 외부 호출을 기다리지 않습니다 (최초 한 번 제외).
+"""
+import asyncio
+import os
+import shutil
+import time
+import uuid
+from datetime import datetime
+
+import requests
+
+
+def disk_status(path: str) -> dict:
+    """경로가 있는 파일시스템의 여유 공간과 inode 사용률"""
+    usage = shutil.disk_usage(path)
+    status = {
+        "path": path,
+        "total_mb": round(usage.total / 1024 / 1024, 1),
+        "free_mb": round(usage.free / 1024 / 1024, 1),
+        "free_ratio": round(usage.free / usage.total, 4) if usage.total else 0.0,
+        "inodes_total": None,
+        "inodes_free": None,
+        "inode_used_ratio": None,
+    }
+    if hasattr(os, "statvfs"):
+        stat = os.statvfs(path)
+        # 일부 파일시스템은 inode 수를 0으로 보고함 (제한 없음)
+        if stat.f_files:
+            status["inodes_total"] = stat.f_files
+            status["inodes_free"] = stat.f_ffree
+            status["inode_used_ratio"] = round(1 - stat.f_ffree / stat.f_files, 4)
+    return status
+
+
+def write_probe(directory: str) -> float:
+    """작은 파일을 쓰고 fsync한 뒤 지우는 데 걸린 시간 (초)"""
+    probe_filepath = os.path.join(directory, f".ready_probe_{uuid.uuid4().hex}")
+    start_time = time.perf_counter()
+    try:
+        with open(probe_filepath, "w", encoding="utf-8") as f:
+            f.write("ok")
+            f.flush()
+            os.fsync(f.fileno())
+    finally:
+        if os.path.exists(probe_filepath):
+            os.remove(probe_filepath)
+    return time.perf_counter() - start_time
+
+
+def http_probe(url: str, headers: dict, timeout: float) -> dict:
+    """HTTP GET으로 외부 API 도달 가능 여부와 지연 시간을 확인 (5xx/연결 실패만 도달 불가로 봄)"""
+    start_time = time.perf_counter()
+    try:
+        response = requests.get(url, headers=headers, timeout=timeout)
+        return {
+            "reachable": response.status_code < 500,
+            "status_code": response.status_code,
+            "latency_ms": round((time.perf_counter() - start_time) * 1000, 1),
+            "error": None,
+        }
+    except requests.RequestException as e:
+        return {
+            "reachable": False,
+            "status_code": None,
+            "latency_ms": round((time.perf_counter() - start_time) * 1000, 1),
+            "error": type(e).__name__,
+        }
+
+
+class CachedProbe:
+    """외부 점검 결과를 ttl 동안 캐시하고, 만료 시 이전 결과를 주면서 백그라운드로 갱신"""
+
+    def __init__(self, name: str, probe, ttl_seconds: float = 30.0, timeout: float = 5.0):
+        # probe() -> dict (동기 함수, 스레드에서 실행)
+        self.name = name
+        self.probe = probe
+        self.ttl_seconds = ttl_seconds
+        self.timeout = timeout
+
+        self._result = None
+        self._checked_at = 0.0
+        self._refresh_task = None
+
+    async def result(self) -> dict:
+        expired = self._result is None or time.time() - self._checked_at > self.ttl_seconds
+        if expired and self._refresh_task is None:
+            self._refresh_task = asyncio.create_task(self._refresh())
+            self._refresh_task.add_done_callback(self._clear_refresh_task)
+        if self._result is None:
+            # 최초 점검은 결과가 있어야 하므로 기다림
+            await asyncio.shield(self._refresh_task)
+        return dict(self._result, checked_at=datetime.fromtimestamp(self._checked_at).isoformat(),
+                    age_seconds=round(time.time() - self._checked_at, 1))
+
+    async def _refresh(self):
+        try:
+            result = await asyncio.wait_for(asyncio.to_thread(self.probe), self.timeout)
+        except asyncio.TimeoutError:
+            result = {"reachable": False, "status_code": None, "latency_ms": None, "error": "Timeout"}
+        except Exception as e:
+            result = {"reachable": False, "status_code": None, "latency_ms": None, "error": type(e).__name__}
+        self._result = result
+        self._checked_at = time.time()
+
+    def _clear_refresh_task(self, task: asyncio.Task):
+        self._refresh_task = None
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,212 @@
+"""참가자별 기록 메타데이터 인덱스와 커서 페이지네이션
+
+치트시트 기록, Retry 세션처럼 참가자마다 파일이 계속 쌓이는 기록에 대해 파일 이름, 시각, 크기,
+제목만 모은 작은 인덱스를 data/record_index/<종류>/<참가자>.json에 보관합니다.
+목록 조회는 인덱스로 정렬/페이지 계산을 하고 실제로 보여줄 파일만 읽으므로, 기록이 많은
+참가자도 한 페이지를 읽는 비용은 페이지 크기에만 비례합니다.
+
+앱이 기록을 쓸 때 record()로 인덱스를 갱신하고, 그 밖의 경로로 파일이 생기거나 지워진 경우는
+기록 디렉토리의 수정 시각이 인덱스에 적힌 값과 다를 때 디렉토리를 다시 훑어 새 파일만 읽어 맞춥니다.
+여러 참가자의 파일이 한 디렉토리에 섞여 있는 경우(shared_directory)는 다른 참가자의 파일이 생길 때마다
+수정 시각이 바뀌므로 이를 보지 않고, 인덱스가 없을 때 한 번만 훑은 뒤로는 record()로만 갱신합니다.
+"""
+import base64
+import binascii
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from serialization import dumps, loads, read_json, write_json
+from session_store import safe_path_component
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidCursorError(ValueError):
+    """페이지 커서를 해석할 수 없는 경우 (400)"""
+
+
+def encode_cursor(sort_key: list) -> str:
+    """마지막으로 보낸 항목의 정렬 키를 불투명한 커서 문자열로 변환"""
+    return base64.urlsafe_b64encode(dumps(sort_key)).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_key = loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, binascii.Error, UnicodeEncodeError) as e:
+        raise InvalidCursorError(f"잘못된 커서입니다: {cursor}") from e
+    if not isinstance(sort_key, list):
+        raise InvalidCursorError(f"잘못된 커서입니다: {cursor}")
+    return sort_key
+
+
+def paginate(entries: list, sort_key: Callable[[dict], list], limit: Optional[int] = None,
+             cursor: Optional[str] = None) -> tuple:
+    """최신순으로 정렬된 entries에서 커서 다음 limit개와 다음 페이지 커서를 반환 (limit이 없으면 전부)"""
+    if cursor:
+        after = decode_cursor(cursor)
+        entries = [entry for entry in entries if sort_key(entry) < after]
+    if limit is None or len(entries) <= limit:
+        return entries, None
+    page = entries[:limit]
+    return page, encode_cursor(sort_key(page[-1]))
+
+
+def _mtime_ns(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class RecordIndex:
+    """한 종류의 기록(예: 치트시트)에 대한 참가자별 메타데이터 인덱스
+
+    directory_for(participant_id): 기록 파일이 있는 디렉토리
+    matches(participant_id, filename): 인덱스에 넣을 파일인지 (여러 참가자가 한 디렉토리를 쓰는 경우 구분)
+    describe(filepath): 파일을 읽어 {"timestamp", "title", ...} 메타데이터를 만드는 함수
+    sort_key(entry): 최신순 정렬 키 (클수록 최신, 커서에 그대로 들어가므로 JSON 값 목록)
+    shared_directory: 여러 참가자가 한 디렉토리를 쓰는 경우 (디렉토리 수정 시각으로 다시 훑지 않으므로
+        앱 밖에서 추가된 파일은 인덱스 파일을 지워야 반영됨)
+    """
+
+    def __init__(self, kind: str, index_dir: str, directory_for: Callable[[str], str],
+                 matches: Callable[[str, str], bool], describe: Callable[[str], dict],
+                 sort_key: Callable[[dict], list], max_cached: int = 1000, shared_directory: bool = False):
+        self.kind = kind
+        self.index_dir = os.path.join(index_dir, kind)
+        self.directory_for = directory_for
+        self.matches = matches
+        self.describe = describe
+        self.sort_key = sort_key
+        self.max_cached = max_cached
+        self.shared_directory = shared_directory
+
+        # participant_id -> (디렉토리 mtime, 인덱스 파일 mtime, 최신순 항목 목록)
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.rebuilds = 0
+
+        os.makedirs(self.index_dir, exist_ok=True)
+
+    def index_path(self, participant_id: str) -> str:
+        return os.path.join(self.index_dir, f"{safe_path_component(participant_id)}.json")
+
+    def entries(self, participant_id: str) -> list:
+        """참가자의 기록 메타데이터 목록 (최신순)"""
+        directory = self.directory_for(participant_id)
+        dir_mtime = self._directory_version(directory)
+        if dir_mtime is None:
+            return []
+        index_path = self.index_path(participant_id)
+        index_mtime = _mtime_ns(index_path)
+
+        with self._lock:
+            cached = self._cache.get(participant_id)
+            if cached is not None and cached[0] == dir_mtime and cached[1] == index_mtime:
+                self._cache.move_to_end(participant_id)
+                self.hits += 1
+                return cached[2]
+
+        stored = self._read_index(index_path)
+        if stored.get("dir_mtime_ns") != dir_mtime:
+            stored = self._rebuild(participant_id, directory, dir_mtime, stored.get("entries", {}))
+            index_mtime = _mtime_ns(index_path)
+        return self._remember(participant_id, dir_mtime, index_mtime, stored["entries"])
+
+    def record(self, participant_id: str, filename: str, metadata: Optional[dict] = None):
+        """앱이 기록 파일을 쓴 뒤 호출 (metadata를 생략하면 파일을 읽어 만듦)"""
+        directory = self.directory_for(participant_id)
+        filepath = os.path.join(directory, filename)
+        try:
+            entry = self._entry(filepath, filename, metadata)
+        except (OSError, ValueError) as e:
+            logger.warning("기록 인덱스 갱신 실패: %s - %s", filepath, e)
+            return
+        # 다른 경로로 추가된 파일이 있으면 먼저 맞춘 뒤 이번 파일을 반영
+        entries = {item["name"]: item for item in self.entries(participant_id)}
+        entries[filename] = entry
+        dir_mtime = self._directory_version(directory)
+        index_path = self.index_path(participant_id)
+        self._write_index(index_path, dir_mtime, entries)
+        self._remember(participant_id, dir_mtime, _mtime_ns(index_path), entries)
+
+    def page(self, participant_id: str, limit: Optional[int] = None, cursor: Optional[str] = None) -> tuple:
+        """(이번 페이지 항목, 다음 페이지 커서, 전체 개수)"""
+        entries = self.entries(participant_id)
+        page, next_cursor = paginate(entries, self.sort_key, limit, cursor)
+        return page, next_cursor, len(entries)
+
+    def stats(self) -> dict:
+        return {
+            "cached_participants": len(self._cache),
+            "hits": self.hits,
+            "rebuilds": self.rebuilds,
+        }
+
+    def _directory_version(self, directory: str) -> Optional[int]:
+        """인덱스를 다시 맞춰야 하는지 판단하는 디렉토리 버전 (없으면 None)"""
+        dir_mtime = _mtime_ns(directory)
+        if dir_mtime is None or not self.shared_directory:
+            return dir_mtime
+        # 공유 디렉토리는 수정 시각 대신 고정 값 사용 (인덱스가 없을 때만 다시 훑음)
+        return 0
+
+    def _entry(self, filepath: str, filename: str, metadata: Optional[dict]) -> dict:
+        stat = os.stat(filepath)
+        entry = dict(metadata) if metadata is not None else self.describe(filepath)
+        entry.update({"name": filename, "size": stat.st_size, "mtime": stat.st_mtime})
+        return entry
+
+    def _rebuild(self, participant_id: str, directory: str, dir_mtime: int, known: dict) -> dict:
+        """디렉토리를 훑어 인덱스를 맞춤 (크기와 수정 시각이 같은 파일은 다시 읽지 않음)"""
+        self.rebuilds += 1
+        entries = {}
+        try:
+            filenames = [filename for filename in os.listdir(directory) if self.matches(participant_id, filename)]
+        except OSError:
+            filenames = []
+        for filename in filenames:
+            filepath = os.path.join(directory, filename)
+            try:
+                stat = os.stat(filepath)
+                entry = known.get(filename)
+                if entry is None or entry.get("size") != stat.st_size or entry.get("mtime") != stat.st_mtime:
+                    entry = self._entry(filepath, filename, None)
+            except (OSError, ValueError) as e:
+                logger.warning("기록 메타데이터 읽기 실패: %s - %s", filepath, e)
+                continue
+            entries[filename] = entry
+        self._write_index(self.index_path(participant_id), dir_mtime, entries)
+        logger.debug("기록 인덱스 재구성: %s/%s (%s개)", self.kind, participant_id, len(entries))
+        return {"dir_mtime_ns": dir_mtime, "entries": entries}
+
+    @staticmethod
+    def _read_index(index_path: str) -> dict:
+        try:
+            stored = read_json(index_path)
+        except (OSError, ValueError):
+            return {}
+        return stored if isinstance(stored, dict) else {}
+
+    def _write_index(self, index_path: str, dir_mtime: Optional[int], entries: dict):
+        try:
+            write_json(index_path, {"dir_mtime_ns": dir_mtime, "entries": entries}, pretty=False, atomic=True)
+        except OSError as e:
+            logger.warning("기록 인덱스 저장 실패: %s - %s", index_path, e)
+
+    def _remember(self, participant_id: str, dir_mtime: int, index_mtime: Optional[int], entries) -> list:
+        values = entries.values() if isinstance(entries, dict) else entries
+        ordered = sorted(values, key=self.sort_key, reverse=True)
+        with self._lock:
+            self._cache[participant_id] = (dir_mtime, index_mtime, ordered)
+            self._cache.move_to_end(participant_id)
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+        return ordered
@@ -0,0 +1,71 @@
+"""JSON 직렬화 계층 (저장 파일과 HTTP 응답)
+
+orjson이 설치되어 있으면 orjson으로, 없으면 표준 json으로 같은 형식의 결과를 만듭니다.
+디스크 기록은 기본적으로 공백 없는 압축 형식으로 저장하고(STORAGE_JSON_PRETTY=true면 들여쓰기),
+사람이 읽을 사본이 필요하면 export_records로 들여쓰기한 사본을 만듭니다.
+읽기는 두 형식을 모두 지원하므로 기존의 들여쓰기 파일도 그대로 읽힙니다.
+"""
+import json
+import os
+import threading
+from typing import Any, Optional
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+BACKEND = "orjson" if orjson is not None else "json"
+# 저장 파일을 들여쓰기 형식으로 쓸지 (디버깅용, 기본값은 압축 형식)
+STORAGE_PRETTY = os.getenv("STORAGE_JSON_PRETTY", "false").lower() == "true"
+
+
+def _default(obj):
+    """표준 json 경로에서 datetime 등을 orjson과 같이 ISO 문자열로 변환"""
+    if hasattr(obj, "isoformat"):
+        return obj.isoformat()
+    raise TypeError(f"JSON으로 직렬화할 수 없는 값: {type(obj).__name__}")
+
+
+def dumps(obj: Any, pretty: bool = False) -> bytes:
+    """UTF-8 JSON 바이트로 직렬화 (한글은 이스케이프하지 않음, pretty면 2칸 들여쓰기)"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    if pretty:
+        return json.dumps(obj, ensure_ascii=False, indent=2, default=_default).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+def loads(data) -> Any:
+    """JSON 바이트/문자열을 파싱 (오류는 json.JSONDecodeError, 즉 ValueError)"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def read_json(path: str) -> Any:
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def write_json(path: str, obj: Any, pretty: Optional[bool] = None, atomic: bool = False):
+    """JSON 파일 저장 (pretty를 생략하면 STORAGE_JSON_PRETTY 설정, atomic이면 임시 파일에 쓴 뒤 교체)"""
+    data = dumps(obj, pretty=STORAGE_PRETTY if pretty is None else pretty)
+    # 여러 스레드가 같은 파일을 동시에 저장해도 임시 파일이 겹치지 않도록 스레드별 이름 사용
+    target_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp" if atomic else path
+    with open(target_path, "wb") as f:
+        f.write(data)
+    if atomic:
+        os.replace(target_path, path)
+
+
+class FastJSONResponse(JSONResponse):
+    """dumps로 본문을 만드는 JSON 응답 (앱의 기본 응답 클래스)"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
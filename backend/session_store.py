@@ -0,0 +1,341 @@
+"""서버가 관리하는 채팅 세션 저장소
+
+세션 기록(chat_session.json)을 디스크에서 한 번 읽어 들인 뒤 크기가 제한된 메모리 캐시(LRU)에 보관합니다.
+클라이언트는 새 메시지와 세션 ID만 보내면 되고, 서버는 이 기록에서 토큰 예산에 맞는
+최근 대화 구간만 잘라 프롬프트를 구성합니다.
+load()는 캐시 항목의 사본을 반환하므로, 호출한 쪽이 고친 내용은 save()가 성공해야 캐시에 반영됩니다.
+"""
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from serialization import dumps, loads, read_json, write_json
+
+logger = logging.getLogger(__name__)
+
+SESSION_FILENAME = "chat_session.json"
+# 턴별 단계 소요 시간 (세션 저장 시간까지 포함해야 하므로 세션 파일과 따로 한 줄씩 추가)
+TURN_TIMINGS_FILENAME = "turn_timings.jsonl"
+
+# 한국어 기준 대략적인 글자 수 / 토큰 비율 (정확한 토크나이저 없이 예산을 잡기 위한 추정치)
+CHARS_PER_TOKEN = 1.5
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """텍스트의 토큰 수를 대략적으로 추정하는 함수"""
+    return int(len(text or "") / CHARS_PER_TOKEN) + MESSAGE_OVERHEAD_TOKENS
+
+
+def session_messages_to_history(messages: list) -> list:
+    """세션 파일의 메시지 기록을 OpenAI 형식(role/content) 대화 기록으로 변환"""
+    history = []
+    for msg in messages:
+        if msg.get("user_message"):
+            history.append({"role": "user", "content": msg["user_message"]})
+        if msg.get("doctor_response"):
+            history.append({"role": "assistant", "content": msg["doctor_response"]})
+    return history
+
+
+def copy_session(session_data: dict) -> dict:
+    """세션 데이터 사본 (메시지 항목은 추가만 하고 고치지 않으므로 목록까지만 복사)"""
+    return {key: list(value) if isinstance(value, list) else value for key, value in session_data.items()}
+
+
+def build_history_window(history: list, max_tokens: int) -> list:
+    """최근 대화부터 거슬러 올라가며 토큰 예산 안에 들어가는 구간만 반환"""
+    window = []
+    used_tokens = 0
+    for msg in reversed(history):
+        tokens = estimate_tokens(msg.get("content", ""))
+        if window and used_tokens + tokens > max_tokens:
+            break
+        window.append(msg)
+        used_tokens += tokens
+    window.reverse()
+    # 의사 응답으로 시작하는 구간은 맥락이 어색하므로 첫 환자 메시지부터 사용
+    while len(window) > 1 and window[0].get("role") != "user":
+        window.pop(0)
+    return window
+
+
+class SessionStore:
+    """참가자/세션별 채팅 기록을 디스크와 메모리 LRU 캐시로 관리하는 저장소"""
+
+    def __init__(self, log_dir: str, max_sessions: int = 500):
+        self.log_dir = log_dir
+        self.max_sessions = max_sessions
+
+        # (participant_id, session_id) -> session_data
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    def participant_dir(self, participant_id: str) -> str:
+        return self._resolve(participant_id)
+
+    def session_dir(self, participant_id: str, session_id: str) -> str:
+        return self._resolve(participant_id, session_id)
+
+    def _resolve(self, *components: str) -> str:
+        """클라이언트가 보낸 ID로 log_dir 아래 경로를 만듦 (경로 구분자, ".." 등은 제거)
+
+        정리한 이름과 다른 이름으로 이미 만들어진 디렉토리가 있으면 그 디렉토리를 계속 사용합니다
+        (한 단계짜리 이름일 때만이므로 log_dir 밖을 가리키지 않음).
+        """
+        safe_path = os.path.join(self.log_dir, *(safe_path_component(component) for component in components))
+        if all(is_plain_path_component(component) for component in components):
+            legacy_path = os.path.join(self.log_dir, *components)
+            if legacy_path != safe_path and os.path.isdir(legacy_path):
+                return legacy_path
+        return safe_path
+
+    def session_path(self, participant_id: str, session_id: str) -> str:
+        return os.path.join(self.session_dir(participant_id, session_id), SESSION_FILENAME)
+
+    def load(self, participant_id: str, session_id: str) -> Optional[dict]:
+        """세션 데이터를 캐시에서 가져오고, 없으면 디스크에서 읽어 캐시에 보관 (사본 반환)"""
+        key = (participant_id, session_id)
+        with self._lock:
+            session_data = self._sessions.get(key)
+            if session_data is not None:
+                self._sessions.move_to_end(key)
+                self.hits += 1
+                return copy_session(session_data)
+            self.misses += 1
+
+        session_filepath = self.session_path(participant_id, session_id)
+        if not os.path.exists(session_filepath):
+            return None
+        try:
+            session_data = read_json(session_filepath)
+        except (OSError, ValueError) as e:
+            logger.warning("세션 파일 로드 실패: %s - %s", session_filepath, e)
+            return None
+
+        self._remember(key, session_data)
+        return copy_session(session_data)
+
+    def save(self, participant_id: str, session_id: str, session_data: dict) -> str:
+        """세션 데이터를 디스크에 저장하고, 저장에 성공하면 캐시를 갱신"""
+        session_filepath = self.session_path(participant_id, session_id)
+        os.makedirs(os.path.dirname(session_filepath), exist_ok=True)
+        write_json(session_filepath, session_data)
+        self._remember((participant_id, session_id), copy_session(session_data))
+        return session_filepath
+
+    def append_turn_timings(self, participant_id: str, session_id: str, record: dict) -> str:
+        """턴 소요 시간 기록을 세션의 turn_timings.jsonl 끝에 추가"""
+        timings_filepath = os.path.join(self.session_dir(participant_id, session_id), TURN_TIMINGS_FILENAME)
+        with open(timings_filepath, "ab") as f:
+            f.write(dumps(record) + b"\n")
+        return timings_filepath
+
+    def history(self, participant_id: str, session_id: str) -> list:
+        """세션의 전체 대화 기록 (role/content 형식)"""
+        session_data = self.load(participant_id, session_id)
+        if not session_data:
+            return []
+        return session_messages_to_history(session_data.get("messages", []))
+
+    def stats(self) -> dict:
+        return {
+            "cached_sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def _remember(self, key: tuple, session_data: dict):
+        with self._lock:
+            self._sessions[key] = session_data
+            self._sessions.move_to_end(key)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+
+RETRY_SESSIONS_DIRNAME = "retry_sessions"
+
+
+def safe_path_component(value: str) -> str:
+    """파일 경로에 쓸 수 있도록 참가자/세션 ID에서 경로 구분자 등을 제거"""
+    cleaned = "".join(c for c in str(value) if c.isalnum() or c in "-_.")
+    return cleaned.strip(".") or "unknown"
+
+
+def is_plain_path_component(value: str) -> bool:
+    """상위 디렉토리로 벗어나지 않는 한 단계짜리 이름인지 (이전에 정리 없이 만든 디렉토리 확인용)"""
+    value = str(value)
+    if value in ("", ".", "..") or "\x00" in value:
+        return False
+    return not any(sep and sep in value for sep in ("/", "\\", os.sep, os.altsep))
+
+
+class RetrySessionStore:
+    """Retry 채팅 세션을 세션당 하나의 JSONL 파일(헤더 + 턴별 한 줄)로 보관하는 저장소
+
+    턴마다 새 파일을 만드는 대신 같은 파일 끝에 한 줄씩 추가하므로,
+    나중에 로그/치트시트를 만들 때도 세션당 파일 하나만 읽으면 됩니다.
+    """
+
+    def __init__(self, data_dir: str, max_sessions: int = 500):
+        self.root_dir = os.path.join(data_dir, RETRY_SESSIONS_DIRNAME)
+        self.max_sessions = max_sessions
+
+        # (participant_id, session_id) -> {"header": dict, "turns": list}
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    def participant_dir(self, participant_id: str) -> str:
+        return os.path.join(self.root_dir, safe_path_component(participant_id))
+
+    def session_path(self, participant_id: str, session_id: str) -> str:
+        return os.path.join(
+            self.participant_dir(participant_id), f"{safe_path_component(session_id)}.jsonl"
+        )
+
+    def load(self, participant_id: str, session_id: str) -> Optional[dict]:
+        """세션 기록을 캐시에서 가져오고, 없으면 JSONL 파일을 읽어 캐시에 보관"""
+        key = (participant_id, session_id)
+        with self._lock:
+            record = self._sessions.get(key)
+            if record is not None:
+                self._sessions.move_to_end(key)
+                return record
+
+        session_filepath = self.session_path(participant_id, session_id)
+        if not os.path.exists(session_filepath):
+            return None
+        record = self.read_file(session_filepath)
+        self._remember(key, record)
+        return record
+
+    @staticmethod
+    def read_file(session_filepath: str) -> dict:
+        """JSONL 세션 파일을 {"header", "turns"} 형태로 읽는 함수 (깨진 줄은 건너뜀)"""
+        record = {"header": {}, "turns": []}
+        with open(session_filepath, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = loads(line)
+                except ValueError:
+                    continue
+                if entry.get("type") == "session":
+                    record["header"] = entry
+                elif entry.get("type") == "turn":
+                    record["turns"].append(entry)
+        return record
+
+    def append_turn(self, participant_id: str, session_id: str, turn: dict, header: dict) -> str:
+        """턴 하나를 세션 파일 끝에 추가 (새 세션이면 헤더를 먼저 기록)"""
+        session_filepath = self.session_path(participant_id, session_id)
+        record = self.load(participant_id, session_id)
+        lines = []
+        if record is None:
+            record = {"header": dict(header, type="session"), "turns": []}
+            lines.append(record["header"])
+        turn = dict(turn, type="turn")
+        lines.append(turn)
+
+        os.makedirs(os.path.dirname(session_filepath), exist_ok=True)
+        with open(session_filepath, "ab") as f:
+            for entry in lines:
+                f.write(dumps(entry) + b"\n")
+
+        record["turns"].append(turn)
+        self._remember((participant_id, session_id), record)
+        return session_filepath
+
+    def list_session_files(self, participant_id: str) -> list:
+        """참가자의 Retry 세션 파일 경로 목록 (최근 수정 순)"""
+        participant_dir = self.participant_dir(participant_id)
+        if not os.path.isdir(participant_dir):
+            return []
+        filepaths = [
+            os.path.join(participant_dir, filename)
+            for filename in os.listdir(participant_dir)
+            if filename.endswith(".jsonl")
+        ]
+        return sorted(filepaths, key=os.path.getmtime, reverse=True)
+
+    def stats(self) -> dict:
+        return {
+            "cached_sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+        }
+
+    def _remember(self, key: tuple, record: dict):
+        with self._lock:
+            self._sessions[key] = record
+            self._sessions.move_to_end(key)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+
+QUEST_STATE_DIRNAME = "quest_state"
+# 한 번 달성한 퀘스트는 이후 체크에서 미달성으로 판단되어도 달성 상태를 유지 (Retry 화면과 같은 규칙)
+ACHIEVED_QUEST_STATUSES = ("달성", "완전히 달성")
+
+
+class QuestStateStore:
+    """세션별 퀘스트 체크 결과를 data/quest_state/<참가자>/<세션>.json에 누적하는 저장소
+
+    퀘스트 체크는 턴마다 호출되므로 퀘스트 ID별로 마지막 결과만 남기고,
+    피드백 화면은 세션 번들 API로 이 상태를 함께 받아 다시 체크하지 않습니다.
+    """
+
+    def __init__(self, data_dir: str):
+        self.root_dir = os.path.join(data_dir, QUEST_STATE_DIRNAME)
+        self._lock = threading.Lock()
+        os.makedirs(self.root_dir, exist_ok=True)
+
+    def state_path(self, participant_id: str, session_id: str) -> str:
+        return os.path.join(
+            self.root_dir, safe_path_component(participant_id), f"{safe_path_component(session_id)}.json"
+        )
+
+    def load(self, participant_id: str, session_id: str) -> Optional[dict]:
+        state_filepath = self.state_path(participant_id, session_id)
+        if not os.path.exists(state_filepath):
+            return None
+        try:
+            return read_json(state_filepath)
+        except (OSError, ValueError) as e:
+            logger.warning("퀘스트 상태 파일 로드 실패: %s - %s", state_filepath, e)
+            return None
+
+    def merge(self, participant_id: str, session_id: str, results: list, timestamp: str) -> dict:
+        """이번 체크 결과를 누적 상태에 반영하고 저장"""
+        state_filepath = self.state_path(participant_id, session_id)
+        with self._lock:
+            state = self.load(participant_id, session_id) or {
+                "participant_id": participant_id,
+                "session_id": session_id,
+                "quests": {},
+            }
+            quests = state["quests"]
+            for result in results:
+                quest_id = str(result.get("quest_id", ""))
+                if not quest_id:
+                    continue
+                previous = quests.get(quest_id)
+                if previous and previous.get("achieved") and result.get("status") not in ACHIEVED_QUEST_STATUSES:
+                    continue
+                quests[quest_id] = dict(
+                    result, achieved=result.get("status") in ACHIEVED_QUEST_STATUSES, checked_at=timestamp
+                )
+            state["completed_count"] = sum(1 for quest in quests.values() if quest["achieved"])
+            state["last_updated"] = timestamp
+            os.makedirs(os.path.dirname(state_filepath), exist_ok=True)
+            write_json(state_filepath, state, atomic=True)
+        return state
@@ -0,0 +1,104 @@
+"""중복 요청 병합 (single-flight) 및 멱등성 키 재생
+
+같은 키로 동시에 들어온 요청은 처음 시작된 작업 하나만 실행하고 그 결과를 함께 받습니다.
+클라이언트가 멱등성 키(Idempotency-Key)를 보내면 완료된 결과를 일정 시간 보관했다가
+같은 키로 다시 요청했을 때 작업을 다시 실행하지 않고 저장된 결과를 돌려줍니다.
+"""
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Optional
+
+
+class IdempotencyConflictError(Exception):
+    """같은 멱등성 키가 다른 요청 본문과 함께 재사용된 경우"""
+
+
+def make_request_key(*parts, body: dict) -> str:
+    """참가자, 세션, 요청 본문 해시로 중복 판별 키를 생성하는 함수"""
+    body_hash = hashlib.sha256(
+        json.dumps(body, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8")
+    ).hexdigest()
+    return ":".join([str(part) for part in parts] + [body_hash])
+
+
+class SingleFlight:
+    """진행 중인 동일 작업을 공유하고, 멱등성 키로 완료된 결과를 재생하는 클래스"""
+
+    def __init__(self, idempotency_ttl_seconds: int = 600, max_idempotency_entries: int = 1000):
+        self.idempotency_ttl_seconds = idempotency_ttl_seconds
+        self.max_idempotency_entries = max_idempotency_entries
+
+        # key -> 진행 중인 asyncio.Task
+        self._inflight = {}
+        # 멱등성 키 -> (만료 시각, 요청 키, 결과)
+        self._completed = OrderedDict()
+
+        self.coalesced = 0
+        self.replayed = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable], idempotency_key: Optional[str] = None):
+        """key가 같은 작업이 이미 진행 중이면 그 결과를 기다리고, 아니면 새로 실행"""
+        if idempotency_key:
+            replay = self._lookup_completed(idempotency_key, key)
+            if replay is not None:
+                self.replayed += 1
+                return replay[0]
+            # 멱등성 키가 있으면 본문이 조금 달라도 같은 작업으로 취급하지 않도록 키에 포함
+            flight_key = f"idem:{idempotency_key}"
+            task = self._inflight.get(flight_key)
+            if task is not None and getattr(task, "request_key", key) != key:
+                raise IdempotencyConflictError(idempotency_key)
+        else:
+            flight_key = key
+
+        task = self._inflight.get(flight_key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            task.request_key = key
+            self._inflight[flight_key] = task
+            task.add_done_callback(
+                lambda t: self._on_done(flight_key, key, idempotency_key, t)
+            )
+        else:
+            self.coalesced += 1
+
+        # 요청 하나가 취소되어도 공유 작업은 계속 진행되도록 shield 사용
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        return {
+            "inflight": len(self._inflight),
+            "idempotency_entries": len(self._completed),
+            "coalesced": self.coalesced,
+            "replayed": self.replayed,
+        }
+
+    def _on_done(self, flight_key: str, key: str, idempotency_key: Optional[str], task: asyncio.Task):
+        self._inflight.pop(flight_key, None)
+        if task.cancelled():
+            return
+        # 대기자가 없어도 "exception was never retrieved" 경고가 나지 않도록 조회
+        if task.exception() is not None:
+            return
+        if idempotency_key:
+            self._completed[idempotency_key] = (
+                time.time() + self.idempotency_ttl_seconds, key, task.result()
+            )
+            self._completed.move_to_end(idempotency_key)
+            while len(self._completed) > self.max_idempotency_entries:
+                self._completed.popitem(last=False)
+
+    def _lookup_completed(self, idempotency_key: str, key: str):
+        entry = self._completed.get(idempotency_key)
+        if entry is None:
+            return None
+        expires_at, stored_key, result = entry
+        if expires_at <= time.time():
+            del self._completed[idempotency_key]
+            return None
+        if stored_key != key:
+            raise IdempotencyConflictError(idempotency_key)
+        return (result,)
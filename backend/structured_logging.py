@@ -0,0 +1,122 @@
+"""구조화 로깅 (JSON Lines, 큐 기반 비동기 핸들러, 요청별 상관관계 ID)
+
+요청 처리 경로에서는 로그 레코드를 메모리 큐에 넣기만 하고, 실제 포맷/출력은
+별도 리스너 스레드가 담당하므로 로그 출력이 응답 지연으로 이어지지 않습니다.
+각 로그 줄은 JSON 객체 하나이며, 요청 중에 남긴 로그에는 request_id가 함께 기록됩니다.
+"""
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+from datetime import datetime, timezone
+from typing import Optional
+
+# 현재 처리 중인 요청의 상관관계 ID (asyncio 태스크/스레드로 자동 전파됨)
+request_id_var = contextvars.ContextVar("request_id", default=None)
+
+# LogRecord 기본 속성 (extra로 넘긴 필드만 골라내기 위해 사용)
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "request_id"}
+
+
+class RequestIdFilter(logging.Filter):
+    """로그를 남긴 시점의 request_id를 레코드에 붙이는 필터 (큐에 넣기 전에 실행)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """로그 레코드를 한 줄짜리 JSON으로 변환"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["request_id"] = request_id
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """큐가 가득 차면 기다리지 않고 로그를 버리는 QueueHandler"""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # 메시지 인자와 예외는 호출 시점에 문자열로 고정 (extra 필드는 그대로 유지)
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_queue_handler: Optional[NonBlockingQueueHandler] = None
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def setup_logging(level: str = "INFO", log_file: Optional[str] = None, max_queue: int = 10000):
+    """루트 로거를 큐 핸들러 + JSON 리스너(stdout, 선택적으로 파일)로 구성"""
+    global _queue_handler, _listener
+    if _listener is not None:
+        return
+
+    formatter = JsonFormatter()
+    handlers = [logging.StreamHandler(sys.stdout)]
+    if log_file:
+        handlers.append(logging.handlers.WatchedFileHandler(log_file, encoding="utf-8"))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    _queue_handler = NonBlockingQueueHandler(queue.Queue(maxsize=max_queue))
+    _queue_handler.addFilter(RequestIdFilter())
+
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+    root_logger.addHandler(_queue_handler)
+    root_logger.setLevel(level.upper())
+
+    _listener = logging.handlers.QueueListener(_queue_handler.queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging():
+    """큐에 남은 로그를 모두 출력하고 리스너 스레드를 종료"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def logging_stats() -> dict:
+    return {
+        "level": logging.getLevelName(logging.getLogger().level),
+        "queued": _queue_handler.queue.qsize() if _queue_handler is not None else 0,
+        "dropped": _queue_handler.dropped if _queue_handler is not None else 0,
+    }
@@ -0,0 +1,384 @@
+"""LLM JSON 응답 파싱 (스키마 검증, 스트리밍 중 부분 파싱, 로컬 복구)
+
+분석/평가/퀘스트/치트시트 엔드포인트는 JSON 모드로 응답을 받고, 이 모듈의 Pydantic 모델로
+검증합니다. 응답이 조금 깨져 있어도(코드 블록, 끝 쉼표, 잘린 응답, 잘못된 등급 값 등)
+다시 요청하지 않고 로컬에서 고친 뒤, 그래도 맞지 않는 필드만 기본값으로 채웁니다.
+IncrementalJSONParser는 스트리밍으로 받는 중에 완성된 값(등급 하나, 퀘스트 하나)을 바로 꺼내
+클라이언트에 먼저 보낼 수 있게 합니다.
+"""
+import json
+import logging
+from typing import List, Optional, Type
+
+from pydantic import BaseModel, Field, ValidationError, field_validator
+
+logger = logging.getLogger(__name__)
+
+EVALUATION_ITEMS = (
+    "symptom_location", "symptom_timing", "symptom_severity", "current_medication", "allergy_info",
+    "diagnosis_info", "prescription_info", "side_effects", "followup_plan", "emergency_plan",
+)
+GRADES = ("상", "중", "하")
+DEFAULT_GRADE = "중"
+DEFAULT_SCORE_REASON = "평가 정보가 없습니다."
+
+
+def normalize_grade(value) -> str:
+    """'상 (잘함)', ' 하 ', 'A' 같은 값을 상/중/하로 정리 (알 수 없으면 '중')"""
+    text = str(value or "").strip()
+    for grade in GRADES:
+        if text.startswith(grade):
+            return grade
+    return {"a": "상", "high": "상", "b": "중", "medium": "중", "c": "하", "low": "하"}.get(text.lower(), DEFAULT_GRADE)
+
+
+def normalize_quest_status(value) -> str:
+    """'달성 / 미달성', '완전히 달성' 같은 값을 달성/미달성으로 정리"""
+    text = str(value or "")
+    if "미달성" in text or not text.strip():
+        return "미달성"
+    return "달성" if "달성" in text else "미달성"
+
+
+def _as_text_list(value) -> list:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value] if value.strip() else []
+    if isinstance(value, list):
+        return [str(item) for item in value if item is not None and str(item).strip()]
+    return [str(value)]
+
+
+class VoiceAnalysisResult(BaseModel):
+    summary: str = "자연스럽고 편안한 대화를 이어가셨습니다."
+    details: str = ""
+    communication_style: str = "자연스러운 대화"
+    strengths: List[str] = []
+    areas_for_improvement: List[str] = []
+
+    @field_validator("strengths", "areas_for_improvement", mode="before")
+    @classmethod
+    def coerce_text_list(cls, value):
+        return _as_text_list(value)
+
+
+class EvaluationResult(BaseModel):
+    # 빠진 항목도 기본값으로 채우도록 기본값에도 검증 실행
+    grades: dict = Field(default_factory=dict, validate_default=True)
+    score_reasons: dict = Field(default_factory=dict, validate_default=True)
+    improvement_tips: List[str] = []
+
+    @field_validator("grades", mode="before")
+    @classmethod
+    def normalize_grades(cls, value):
+        value = value if isinstance(value, dict) else {}
+        return {item: normalize_grade(value.get(item)) for item in EVALUATION_ITEMS}
+
+    @field_validator("score_reasons", mode="before")
+    @classmethod
+    def fill_score_reasons(cls, value):
+        value = value if isinstance(value, dict) else {}
+        return {item: str(value.get(item) or DEFAULT_SCORE_REASON) for item in EVALUATION_ITEMS}
+
+    @field_validator("improvement_tips", mode="before")
+    @classmethod
+    def coerce_tips(cls, value):
+        return _as_text_list(value)
+
+
+class QuestResult(BaseModel):
+    quest_id: str
+    status: str = "미달성"
+    reason: str = ""
+    suggestion: str = ""
+
+    @field_validator("quest_id", mode="before")
+    @classmethod
+    def coerce_quest_id(cls, value):
+        if value is None or not str(value).strip():
+            raise ValueError("quest_id가 비어 있습니다.")
+        return str(value).strip()
+
+    @field_validator("status", mode="before")
+    @classmethod
+    def normalize_status(cls, value):
+        return normalize_quest_status(value)
+
+    @field_validator("reason", "suggestion", mode="before")
+    @classmethod
+    def coerce_text(cls, value):
+        return "" if value is None else str(value)
+
+
+class QuestCheckResult(BaseModel):
+    completed_quests: List[QuestResult] = []
+
+    @field_validator("completed_quests", mode="before")
+    @classmethod
+    def drop_invalid_quests(cls, value):
+        # 잘못된 항목 하나 때문에 전체를 버리지 않도록 항목별로 검증
+        quests = []
+        for item in value if isinstance(value, list) else []:
+            quest = parse_quest(item)
+            if quest is not None:
+                quests.append(quest)
+        return quests
+
+
+class CheatsheetItem(BaseModel):
+    title: str
+    content: str = ""
+
+
+class Cheatsheet(BaseModel):
+    script: List[CheatsheetItem] = []
+    listening: List[CheatsheetItem] = []
+
+    @field_validator("script", "listening", mode="before")
+    @classmethod
+    def drop_invalid_items(cls, value):
+        items = []
+        for item in value if isinstance(value, list) else []:
+            if isinstance(item, dict) and item.get("title"):
+                items.append({"title": str(item["title"]), "content": str(item.get("content") or "")})
+        return items
+
+
+class CheatsheetResult(BaseModel):
+    cheatsheet: Cheatsheet = Cheatsheet()
+
+    @field_validator("cheatsheet", mode="before")
+    @classmethod
+    def unwrap(cls, value):
+        return value if isinstance(value, dict) else {}
+
+
+def parse_quest(value) -> Optional[dict]:
+    """퀘스트 결과 항목 하나를 검증해 dict로 반환 (quest_id가 없으면 None)"""
+    if not isinstance(value, dict):
+        return None
+    try:
+        return QuestResult.model_validate(value).model_dump()
+    except ValidationError:
+        return None
+
+
+class _Frame:
+    __slots__ = ("kind", "start", "key", "index", "expect_key", "value_start")
+
+    def __init__(self, kind: str, start: int):
+        self.kind = kind
+        self.start = start
+        self.key = None
+        self.index = 0
+        self.expect_key = kind == "object"
+        self.value_start = None
+
+    def component(self):
+        return self.key if self.kind == "object" else self.index
+
+
+class IncrementalJSONParser:
+    """조각으로 들어오는 JSON 텍스트에서 완성된 값을 (경로, 값)으로 꺼내는 파서
+
+    경로는 최상위 객체 기준 키/인덱스 튜플입니다 (예: ("grades", "symptom_location"),
+    ("completed_quests", 0)). max_depth보다 깊은 값은 따로 꺼내지 않습니다.
+    첫 '{' 앞의 텍스트(```json 등)는 무시합니다.
+    """
+
+    def __init__(self, max_depth: int = 3):
+        self.max_depth = max_depth
+        self.buffer = ""
+        self.pos = 0
+        self.stack = []
+        self.started = False
+        self.done = False
+        self.in_string = False
+        self.escape = False
+        self.string_start = None
+
+    def feed(self, text: str) -> list:
+        self.buffer += text
+        events = []
+        buffer = self.buffer
+        while self.pos < len(buffer) and not self.done:
+            ch = buffer[self.pos]
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif ch == "\\":
+                    self.escape = True
+                elif ch == '"':
+                    self.in_string = False
+                    self._string_closed(events)
+            elif not self.started:
+                if ch == "{":
+                    self.started = True
+                    self.stack.append(_Frame("object", self.pos))
+            else:
+                self._structural(ch, events)
+            self.pos += 1
+        return events
+
+    def _string_closed(self, events: list):
+        frame = self.stack[-1]
+        raw = self.buffer[self.string_start:self.pos + 1]
+        if frame.kind == "object" and frame.expect_key:
+            try:
+                frame.key = json.loads(raw, strict=False)
+            except ValueError:
+                frame.key = raw.strip('"')
+        else:
+            self._emit(self.string_start, self.pos + 1, events)
+
+    def _structural(self, ch: str, events: list):
+        frame = self.stack[-1]
+        if ch == '"':
+            self.in_string = True
+            self.string_start = self.pos
+            if not (frame.kind == "object" and frame.expect_key):
+                frame.value_start = self.pos
+        elif ch in "{[":
+            frame.value_start = self.pos
+            self.stack.append(_Frame("object" if ch == "{" else "array", self.pos))
+        elif ch in "}]":
+            self._finish_scalar(frame, events)
+            self.stack.pop()
+            if not self.stack:
+                self.done = True
+                return
+            self._emit(frame.start, self.pos + 1, events)
+        elif ch == ",":
+            self._finish_scalar(frame, events)
+            if frame.kind == "object":
+                frame.expect_key = True
+            else:
+                frame.index += 1
+        elif ch == ":":
+            frame.expect_key = False
+        elif not ch.isspace() and frame.value_start is None:
+            # 숫자/true/false/null 시작
+            frame.value_start = self.pos
+
+    def _finish_scalar(self, frame: _Frame, events: list):
+        if frame.value_start is not None:
+            self._emit(frame.value_start, self.pos, events)
+
+    def _emit(self, start: int, end: int, events: list):
+        frame = self.stack[-1]
+        frame.value_start = None
+        path = tuple(f.component() for f in self.stack)
+        if len(path) > self.max_depth:
+            return
+        try:
+            value = json.loads(self.buffer[start:end], strict=False)
+        except ValueError:
+            return
+        events.append((path, value))
+
+    def closing_suffix(self) -> str:
+        """지금까지의 텍스트를 유효한 JSON으로 닫는 데 필요한 접미사 (잘린 응답 복구용)"""
+        suffix = ""
+        if self.in_string:
+            suffix += '\\"' if self.escape else '"'
+            frame = self.stack[-1]
+            if frame.kind == "object" and frame.expect_key:
+                suffix += ":null"
+        for frame in reversed(self.stack):
+            suffix += "}" if frame.kind == "object" else "]"
+        return suffix
+
+
+def _strip_trailing_commas(text: str) -> str:
+    """문자열 밖의 ',' 뒤에 '}' 또는 ']'가 오면 쉼표를 제거"""
+    result = []
+    in_string = False
+    escape = False
+    for ch in text:
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            result.append(ch)
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in "}]":
+            # 닫는 괄호 앞의 공백과 쉼표 제거
+            while result and result[-1].isspace():
+                result.pop()
+            if result and result[-1] == ",":
+                result.pop()
+        result.append(ch)
+    return "".join(result)
+
+
+def _close_dangling(text: str, parser: IncrementalJSONParser) -> str:
+    """잘린 JSON의 끝에 남은 쉼표/콜론/미완성 값 처리 (닫는 괄호를 붙이기 전)"""
+    frame = parser.stack[-1]
+    if frame.value_start is not None:
+        tail = text[frame.value_start:].strip()
+        try:
+            json.loads(tail)
+        except ValueError:
+            # 'tru', '-' 처럼 중간에 잘린 숫자/리터럴은 null로 대체
+            text = text[:frame.value_start] + "null"
+    stripped = text.rstrip()
+    if stripped.endswith(","):
+        return stripped[:-1]
+    if stripped.endswith(":"):
+        return stripped + "null"
+    return stripped
+
+
+def repair_json(text: str) -> Optional[dict]:
+    """LLM 응답에서 JSON 객체를 꺼내고, 흔한 형식 오류는 로컬에서 고쳐 dict로 반환 (실패 시 None)"""
+    if not text:
+        return None
+    parser = IncrementalJSONParser(max_depth=0)
+    parser.feed(text)
+    if not parser.started:
+        return None
+    start = parser.stack[0].start if parser.stack else text.find("{")
+    if parser.done:
+        candidate = text[start:parser.pos]
+    else:
+        # 응답이 max_tokens 등으로 잘린 경우: 열린 문자열/괄호를 닫음
+        body = text[start:]
+        if not parser.in_string:
+            body = _close_dangling(text, parser)[start:]
+            parser = IncrementalJSONParser(max_depth=0)
+            parser.feed(body)
+        candidate = body + parser.closing_suffix()
+        logger.debug("잘린 JSON 응답 복구: %s자", len(text))
+    for attempt in (candidate, _strip_trailing_commas(candidate)):
+        try:
+            data = json.loads(attempt, strict=False)
+        except ValueError:
+            continue
+        return data if isinstance(data, dict) else None
+    return None
+
+
+def parse_structured(text: str, model: Type[BaseModel]) -> Optional[dict]:
+    """LLM 응답을 복구한 뒤 모델로 검증해 dict로 반환 (JSON 객체를 전혀 찾지 못하면 None)
+
+    모델 검증에 실패한 필드는 제거하고 기본값으로 다시 검증합니다.
+    """
+    data = repair_json(text)
+    if data is None:
+        return None
+    for _ in range(len(model.model_fields) + 1):
+        try:
+            return model.model_validate(data).model_dump()
+        except ValidationError as e:
+            invalid_fields = {error["loc"][0] for error in e.errors() if error["loc"]}
+            if not invalid_fields & set(data):
+                break
+            logger.debug("잘못된 필드를 기본값으로 대체: %s", sorted(invalid_fields))
+            data = {key: value for key, value in data.items() if key not in invalid_fields}
+    return None
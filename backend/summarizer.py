@@ -0,0 +1,134 @@
+"""긴 대화를 위한 누적 요약 (rolling summarization)
+
+오래된 대화 턴은 요약문 하나로 압축하고, 최근 턴만 원문 그대로 프롬프트에 넣어
+대화가 길어져도 프롬프트 크기와 응답 지연이 일정하게 유지되도록 합니다.
+요약 상태는 {"text", "covered_turns", "updated_at"} 형식이며, covered_turns는
+요약문에 반영된 앞쪽 턴(환자 메시지 + 의사 응답 한 쌍)의 개수입니다.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+def session_messages_to_turns(messages: list) -> list:
+    """chat_session.json 메시지 기록을 턴 목록으로 변환"""
+    return [
+        {"user": msg.get("user_message", ""), "doctor": msg.get("doctor_response", "")}
+        for msg in messages
+    ]
+
+
+def evaluation_logs_to_turns(logs: list) -> list:
+    """/api/logs 형식(user_message/bot_response) 로그를 턴 목록으로 변환"""
+    return [
+        {"user": log.get("user_message", ""), "doctor": log.get("bot_response", "")}
+        for log in logs
+    ]
+
+
+def role_messages_to_turns(messages: list) -> list:
+    """role/content 형식 대화를 턴 목록으로 변환 (환자 메시지 기준으로 묶음)"""
+    turns = []
+    for msg in messages:
+        if msg.get("role") == "user":
+            turns.append({"user": msg.get("content", ""), "doctor": ""})
+        elif msg.get("role") == "assistant":
+            if turns and not turns[-1]["doctor"]:
+                turns[-1]["doctor"] = msg.get("content", "")
+            else:
+                turns.append({"user": "", "doctor": msg.get("content", "")})
+    return turns
+
+
+def format_turns(turns: list) -> str:
+    """턴 목록을 '환자: ... / 의사: ...' 형식의 텍스트로 변환"""
+    text = ""
+    for turn in turns:
+        if turn.get("user"):
+            text += f"환자: {turn['user']}\n"
+        if turn.get("doctor"):
+            text += f"의사: {turn['doctor']}\n"
+    return text
+
+
+class ConversationSummarizer:
+    """오래된 턴을 요약하고, 세션별 요약을 백그라운드에서 N턴마다 갱신하는 클래스"""
+
+    def __init__(self, summarize_fn, refresh_every_turns: int = 6, keep_recent_turns: int = 6):
+        # summarize_fn(previous_summary: str, turns: list) -> 새 요약문 (코루틴)
+        self.summarize_fn = summarize_fn
+        self.refresh_every_turns = refresh_every_turns
+        self.keep_recent_turns = keep_recent_turns
+
+        self._inflight = {}
+        self.refreshes = 0
+        self.failures = 0
+
+    def needs_refresh(self, total_turns: int, summary_state: Optional[dict]) -> bool:
+        covered_turns = summary_state.get("covered_turns", 0) if summary_state else 0
+        return total_turns - covered_turns >= self.keep_recent_turns + self.refresh_every_turns
+
+    async def summarize_older(self, turns: list, summary_state: Optional[dict]) -> Optional[dict]:
+        """최근 keep_recent_turns개를 제외한 턴까지 요약에 반영한 새 요약 상태를 반환"""
+        covered_turns = summary_state.get("covered_turns", 0) if summary_state else 0
+        cut = len(turns) - self.keep_recent_turns
+        if cut <= covered_turns:
+            return summary_state
+        previous_text = summary_state.get("text", "") if summary_state else ""
+        text = await self.summarize_fn(previous_text, turns[covered_turns:cut])
+        self.refreshes += 1
+        return {
+            "text": text.strip(),
+            "covered_turns": cut,
+            "updated_at": datetime.now().isoformat(),
+        }
+
+    async def condense(self, turns: list, summary_state: Optional[dict] = None) -> str:
+        """요약 + 최근 턴으로 압축한 대화 텍스트를 반환 (필요하면 그 자리에서 요약 갱신)"""
+        if self.needs_refresh(len(turns), summary_state):
+            try:
+                summary_state = await self.summarize_older(turns, summary_state)
+            except Exception as e:
+                self.failures += 1
+                logger.warning("대화 요약 실패, 전체 대화 사용: %s", e)
+                return format_turns(turns)
+
+        if not summary_state or not summary_state.get("text"):
+            return format_turns(turns)
+
+        recent_turns = turns[summary_state.get("covered_turns", 0):]
+        return (
+            f"[이전 대화 요약]\n{summary_state['text']}\n\n"
+            f"[최근 대화]\n{format_turns(recent_turns)}"
+        )
+
+    def schedule_refresh(self, key, turns: list, summary_state: Optional[dict], on_done):
+        """세션 요약을 백그라운드에서 갱신 (같은 세션의 갱신이 진행 중이면 건너뜀)"""
+        if key in self._inflight:
+            return
+
+        async def refresh():
+            try:
+                new_state = await self.summarize_older(turns, summary_state)
+                if new_state is not summary_state:
+                    on_done(new_state)
+                    logger.info("대화 요약 갱신: %s (%s턴 요약)", key, new_state['covered_turns'])
+            except Exception as e:
+                self.failures += 1
+                logger.warning("대화 요약 갱신 실패: %s - %s", key, e)
+            finally:
+                self._inflight.pop(key, None)
+
+        self._inflight[key] = asyncio.create_task(refresh())
+
+    def stats(self) -> dict:
+        return {
+            "inflight": len(self._inflight),
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "refresh_every_turns": self.refresh_every_turns,
+            "keep_recent_turns": self.keep_recent_turns,
+        }
@@ -0,0 +1,5 @@
+"""백엔드 모듈을 패키지 설치 없이 바로 import할 수 있도록 backend 디렉터리를 경로에 추가"""
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
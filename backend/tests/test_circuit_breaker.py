@@ -0,0 +1,167 @@
+"""circuit_breaker: 회로 상태 전이와 실패 분류 테스트"""
+import pytest
+
+import circuit_breaker
+from circuit_breaker import (
+    STATE_CLOSED,
+    STATE_HALF_OPEN,
+    STATE_OPEN,
+    CircuitBreaker,
+    CircuitBreakers,
+    CircuitOpenError,
+    is_upstream_failure,
+)
+from upstream import UpstreamBusyError
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class StatusError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", fake)
+    return fake
+
+
+def make_breaker(**kwargs) -> CircuitBreaker:
+    options = {"window": 4, "min_calls": 4, "failure_rate": 0.5, "slow_call_seconds": 10.0,
+               "slow_call_rate": 0.75, "open_seconds": 30.0, "half_open_calls": 1}
+    options.update(kwargs)
+    return CircuitBreaker("openai", "chat", **options)
+
+
+def call(breaker: CircuitBreaker, failed: bool = False, duration: float = 0.1):
+    breaker.before_call()
+    breaker.record(failed, duration)
+
+
+def trip(breaker: CircuitBreaker):
+    for failed in (False, False, True, True):
+        call(breaker, failed)
+
+
+def test_stays_closed_until_min_calls(clock):
+    breaker = make_breaker()
+    for _ in range(3):
+        call(breaker, failed=True)
+    assert breaker.state == STATE_CLOSED
+
+
+def test_opens_on_failure_rate_and_rejects(clock):
+    breaker = make_breaker()
+    trip(breaker)
+    assert breaker.state == STATE_OPEN
+    assert breaker.opened == 1
+
+    clock.now += 10
+    with pytest.raises(CircuitOpenError) as excinfo:
+        breaker.before_call()
+    assert excinfo.value.retry_after == pytest.approx(20.0)
+    assert breaker.rejected == 1
+    assert breaker.stats()["retry_after"] == 20.0
+
+
+def test_opens_on_slow_call_rate(clock):
+    breaker = make_breaker()
+    for duration in (0.1, 10.0, 12.0, 15.0):
+        call(breaker, duration=duration)
+    assert breaker.state == STATE_OPEN
+
+
+def test_sliding_window_forgets_old_failures(clock):
+    breaker = make_breaker(window=4, min_calls=4)
+    for failed in (True, False, False, False, False, True):
+        call(breaker, failed)
+    assert breaker.state == STATE_CLOSED
+
+
+def test_half_open_success_closes(clock):
+    breaker = make_breaker()
+    trip(breaker)
+    clock.now += 30
+    breaker.before_call()
+    assert breaker.state == STATE_HALF_OPEN
+    # 확인 호출은 half_open_calls개까지만 통과
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record(False, 0.1)
+    assert breaker.state == STATE_CLOSED
+    assert breaker.stats()["recent_calls"] == 0
+
+
+@pytest.mark.parametrize("failed, duration", [(True, 0.1), (False, 10.0)])
+def test_half_open_failure_or_slow_call_reopens(clock, failed, duration):
+    breaker = make_breaker()
+    trip(breaker)
+    clock.now += 30
+    breaker.before_call()
+    breaker.record(failed, duration)
+    assert breaker.state == STATE_OPEN
+    assert breaker.opened == 2
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_cancelled_half_open_call_returns_its_slot(clock):
+    breaker = make_breaker()
+    trip(breaker)
+    clock.now += 30
+    breaker.before_call()
+    breaker.record_cancelled()
+    breaker.before_call()
+    assert breaker.state == STATE_HALF_OPEN
+
+
+def test_results_started_before_opening_are_ignored(clock):
+    breaker = make_breaker()
+    breaker.before_call()
+    trip(breaker)
+    breaker.record(False, 0.1)
+    assert breaker.state == STATE_OPEN
+    assert breaker.stats()["recent_calls"] == 0
+
+
+@pytest.mark.parametrize("exc, expected", [
+    (StatusError(500), True),
+    (StatusError(503), True),
+    (StatusError(429), True),
+    (StatusError(408), True),
+    (StatusError(400), False),
+    (StatusError(401), False),
+    (TimeoutError(), True),
+    (ConnectionError(), True),
+    (ValueError("bad"), False),
+    (CircuitOpenError("openai", "chat", 5.0), False),
+    (UpstreamBusyError("openai", "대기열이 가득 찼습니다."), False),
+])
+def test_is_upstream_failure(exc, expected):
+    assert is_upstream_failure(exc) is expected
+
+
+def test_exhausted_rate_limit_counts_as_failure():
+    try:
+        try:
+            raise StatusError(429)
+        except StatusError as e:
+            raise UpstreamBusyError("openai", "외부 API 속도 제한에 걸렸습니다.") from e
+    except UpstreamBusyError as busy:
+        assert is_upstream_failure(busy)
+
+
+def test_breakers_are_created_per_endpoint():
+    breakers = CircuitBreakers(window=4)
+    assert breakers.get("openai", "chat") is breakers.get("openai", "chat")
+    assert breakers.get("openai", "chat") is not breakers.get("openai", "tts")
+    assert CircuitBreakers(enabled=False).get("openai", "chat") is None
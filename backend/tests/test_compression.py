@@ -0,0 +1,125 @@
+"""compression: Accept-Encoding 협상과 압축 미들웨어 테스트"""
+import zlib
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from compression import (
+    ENCODING_BROTLI,
+    ENCODING_GZIP,
+    CompressionMiddleware,
+    CompressionStats,
+    StreamCompressor,
+    choose_encoding,
+    parse_accept_encoding,
+)
+
+BOTH = (ENCODING_BROTLI, ENCODING_GZIP)
+
+
+def test_parse_accept_encoding():
+    assert parse_accept_encoding("gzip, br;q=0.8, identity; q=0, x;q=abc") == {
+        "gzip": 1.0, "br": 0.8, "identity": 0.0, "x": 0.0,
+    }
+
+
+@pytest.mark.parametrize("header, available, expected", [
+    ("", BOTH, None),
+    ("gzip, deflate", BOTH, ENCODING_GZIP),
+    ("gzip, br", BOTH, ENCODING_BROTLI),
+    # 같은 q값이면 available 순서 우선
+    ("br;q=0.5, gzip;q=0.5", BOTH, ENCODING_BROTLI),
+    ("br;q=0.5, gzip", BOTH, ENCODING_GZIP),
+    ("BR", BOTH, ENCODING_BROTLI),
+    ("*", BOTH, ENCODING_BROTLI),
+    ("*;q=0.1, br;q=0", BOTH, ENCODING_GZIP),
+    ("gzip;q=0", BOTH, None),
+    ("br", (ENCODING_GZIP,), None),
+    ("identity", BOTH, None),
+])
+def test_choose_encoding(header, available, expected):
+    assert choose_encoding(header, available) == expected
+
+
+def test_stream_compressor_flushes_each_chunk():
+    compressor = StreamCompressor(ENCODING_GZIP, gzip_level=6, brotli_quality=5)
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    # 청크마다 flush되므로 finish 전에도 지금까지의 내용을 풀 수 있어야 함
+    assert decompressor.decompress(compressor.compress(b'{"a": 1}\n')) == b'{"a": 1}\n'
+    assert decompressor.decompress(compressor.compress(b'{"b": 2}\n') + compressor.finish()) == b'{"b": 2}\n'
+
+
+LARGE_JSON = {"items": ["한글 텍스트가 많은 응답입니다."] * 200}
+
+
+def make_client(**kwargs) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/json")
+    async def large_json():
+        return JSONResponse(LARGE_JSON, headers={"ETag": '"v1"'})
+
+    @app.get("/small")
+    async def small():
+        return PlainTextResponse("ok")
+
+    @app.get("/audio")
+    async def audio():
+        return Response(b"\x00" * 4096, media_type="audio/mpeg")
+
+    @app.get("/stream")
+    async def stream():
+        async def lines():
+            for i in range(3):
+                yield f'{{"i": {i}}}\n'.encode()
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    app.add_middleware(CompressionMiddleware, **kwargs)
+    return TestClient(app)
+
+
+def test_middleware_compresses_large_json_with_weak_etag():
+    client = make_client()
+    response = client.get("/json", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert response.headers["etag"] == 'W/"v1"'
+    assert int(response.headers["content-length"]) < len(response.content)
+    assert response.json() == LARGE_JSON
+
+
+def test_middleware_reuses_compressed_body():
+    stats = CompressionStats()
+    client = make_client(stats=stats)
+    first = client.get("/json", headers={"Accept-Encoding": "gzip"})
+    second = client.get("/json", headers={"Accept-Encoding": "gzip"})
+    assert first.json() == second.json() == LARGE_JSON
+    assert (stats.cache_misses, stats.cache_hits) == (1, 1)
+    assert stats.snapshot()["responses"] == {ENCODING_GZIP: 2}
+
+
+@pytest.mark.parametrize("path", ["/small", "/audio"])
+def test_middleware_skips_small_and_binary_responses(path):
+    response = make_client().get(path, headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+
+def test_middleware_skips_without_accept_encoding():
+    response = make_client().get("/json", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.json() == LARGE_JSON
+
+
+def test_middleware_compresses_ndjson_stream():
+    response = make_client().get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.text == '{"i": 0}\n{"i": 1}\n{"i": 2}\n'
+
+
+def test_middleware_uses_brotli_when_available():
+    pytest.importorskip("brotli")
+    response = make_client().get("/json", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["content-encoding"] == ENCODING_BROTLI
@@ -0,0 +1,93 @@
+"""llm_cache: 메모리/디스크 캐시 조회, 만료, 제거 테스트"""
+import os
+
+import pytest
+
+import llm_cache
+from llm_cache import LLMCache, make_cache_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(llm_cache.time, "time", fake)
+    return fake
+
+
+def make_cache(tmp_path, **kwargs) -> LLMCache:
+    options = {"ttl_seconds": 100, "max_memory_entries": 2, "max_disk_entries": 3}
+    options.update(kwargs)
+    return LLMCache(str(tmp_path / "llm"), **options)
+
+
+def test_cache_key_depends_on_all_inputs():
+    messages = [{"role": "user", "content": "안녕하세요"}]
+    key = make_cache_key("analysis", "gpt", messages, {"temperature": 0})
+    assert key == make_cache_key("analysis", "gpt", [dict(messages[0])], {"temperature": 0})
+    assert key != make_cache_key("evaluation", "gpt", messages, {"temperature": 0})
+    assert key != make_cache_key("analysis", "gpt", messages, {"temperature": 1})
+
+
+def test_get_set_and_stats(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    assert cache.get("aa1") is None
+    cache.set("aa1", "응답", endpoint="analysis")
+    assert cache.get("aa1") == "응답"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_disk_hit_survives_restart(tmp_path, clock):
+    make_cache(tmp_path).set("aa1", "응답")
+    cache = make_cache(tmp_path)
+    assert cache.stats()["disk_entries"] == 1
+    assert cache.get("aa1") == "응답"
+    assert cache.stats()["memory_entries"] == 1
+
+
+def test_promoted_entry_keeps_disk_expiry(tmp_path, clock):
+    make_cache(tmp_path).set("aa1", "응답")
+    clock.now += 90
+    cache = make_cache(tmp_path)
+    # 만료 직전에 디스크에서 읽어 메모리로 올려도 원래 만료 시각에 만료됨
+    assert cache.get("aa1") == "응답"
+    clock.now += 10
+    assert cache.get("aa1") is None
+    assert cache.stats()["disk_entries"] == 0
+    assert not os.listdir(os.path.join(cache.cache_dir, "aa"))
+
+
+def test_disk_entries_are_evicted_least_recently_used(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    for index in range(3):
+        clock.now += 1
+        cache.set(f"k{index}", str(index))
+    clock.now += 1
+    cache.get("k0")
+    clock.now += 1
+    cache.set("k3", "3")
+    assert cache.stats()["disk_entries"] == 3
+    assert not os.path.exists(cache._entry_path("k1"))
+    assert os.path.exists(cache._entry_path("k0"))
+
+
+def test_clear_removes_disk_files(tmp_path, clock):
+    cache = make_cache(tmp_path)
+    cache.set("aa1", "응답")
+    cache.clear()
+    assert cache.get("aa1") is None
+    assert not os.path.exists(cache._entry_path("aa1"))
+
+
+def test_disabled_cache_does_nothing(tmp_path):
+    cache = make_cache(tmp_path, enabled=False)
+    cache.set("aa1", "응답")
+    assert cache.get("aa1") is None
+    assert not os.path.exists(cache.cache_dir)
@@ -0,0 +1,145 @@
+"""record_index: 커서 인코딩, 페이지네이션, 참가자별 인덱스 테스트"""
+import os
+
+import pytest
+
+from record_index import InvalidCursorError, RecordIndex, decode_cursor, encode_cursor, paginate
+from serialization import read_json, write_json
+
+
+def sort_key(entry: dict) -> list:
+    return [entry["timestamp"], entry["name"]]
+
+
+def make_entries(count: int) -> list:
+    # 최신순 (timestamp가 큰 것부터), 같은 시각이 섞이도록 2개씩 묶음
+    entries = [{"timestamp": i // 2, "name": f"r{i:02d}"} for i in range(count)]
+    return sorted(entries, key=sort_key, reverse=True)
+
+
+def test_cursor_round_trip():
+    sort_key_value = ["2024-01-01T00:00:00", "기록 1.json", 3]
+    cursor = encode_cursor(sort_key_value)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == sort_key_value
+
+
+@pytest.mark.parametrize("cursor", ["!!!", "bm90IGpzb24", "eyJhIjogMX0", "커서"])
+def test_decode_cursor_rejects_invalid(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
+
+
+def test_paginate_walks_all_entries_without_gaps_or_duplicates():
+    entries = make_entries(7)
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        page, cursor = paginate(entries, sort_key, limit=3, cursor=cursor)
+        seen.extend(page)
+        pages += 1
+        if cursor is None:
+            break
+    assert seen == entries
+    assert pages == 3
+
+
+def test_paginate_without_limit_returns_everything():
+    entries = make_entries(4)
+    assert paginate(entries, sort_key) == (entries, None)
+    assert paginate(entries, sort_key, limit=4) == (entries, None)
+
+
+def test_paginate_cursor_is_stable_when_newer_entries_arrive():
+    entries = make_entries(6)
+    first, cursor = paginate(entries, sort_key, limit=2)
+    newer = [{"timestamp": 99, "name": "new"}] + entries
+    second, _ = paginate(newer, sort_key, limit=2, cursor=cursor)
+    assert second == entries[2:4]
+
+
+def make_index(tmp_path) -> RecordIndex:
+    records_dir = tmp_path / "records"
+    records_dir.mkdir()
+    return RecordIndex(
+        "records",
+        str(tmp_path / "index"),
+        directory_for=lambda participant_id: str(records_dir / participant_id),
+        matches=lambda participant_id, filename: filename.endswith(".json"),
+        describe=lambda filepath: {"timestamp": read_json(filepath)["timestamp"]},
+        sort_key=sort_key,
+    )
+
+
+def write_record(directory: str, name: str, timestamp: int):
+    os.makedirs(directory, exist_ok=True)
+    write_json(os.path.join(directory, name), {"timestamp": timestamp})
+
+
+def test_record_index_pages_and_picks_up_external_files(tmp_path):
+    index = make_index(tmp_path)
+    directory = index.directory_for("P1")
+    assert index.entries("P1") == []
+
+    for i in range(5):
+        write_record(directory, f"r{i}.json", i)
+        index.record("P1", f"r{i}.json")
+    page, cursor, total = index.page("P1", limit=2)
+    assert [entry["name"] for entry in page] == ["r4.json", "r3.json"]
+    assert total == 5
+    page, cursor, _ = index.page("P1", limit=2, cursor=cursor)
+    assert [entry["name"] for entry in page] == ["r2.json", "r1.json"]
+
+    # 앱을 거치지 않고 추가/삭제된 파일도 디렉토리 수정 시각으로 감지
+    write_record(directory, "r9.json", 9)
+    os.remove(os.path.join(directory, "r0.json"))
+    os.utime(directory, ns=(os.stat(directory).st_atime_ns, os.stat(directory).st_mtime_ns + 1_000_000))
+    names = [entry["name"] for entry in index.entries("P1")]
+    assert names == ["r9.json", "r4.json", "r3.json", "r2.json", "r1.json"]
+
+
+def test_record_index_reuses_cache_until_directory_changes(tmp_path):
+    index = make_index(tmp_path)
+    write_record(index.directory_for("P1"), "r0.json", 0)
+    index.entries("P1")
+    hits = index.hits
+    index.entries("P1")
+    assert index.hits == hits + 1
+
+
+def make_shared_index(tmp_path) -> RecordIndex:
+    shared_dir = tmp_path / "data"
+    shared_dir.mkdir()
+    return RecordIndex(
+        "legacy",
+        str(tmp_path / "index"),
+        directory_for=lambda participant_id: str(shared_dir),
+        matches=lambda participant_id, filename: filename.startswith(f"user_data_{participant_id}_"),
+        describe=lambda filepath: {"timestamp": read_json(filepath)["timestamp"]},
+        sort_key=sort_key,
+        shared_directory=True,
+    )
+
+
+def test_shared_directory_index_ignores_other_participants_files(tmp_path):
+    index = make_shared_index(tmp_path)
+    shared_dir = index.directory_for("P1")
+    write_record(shared_dir, "user_data_P1_1.json", 1)
+    write_record(shared_dir, "user_data_P2_1.json", 1)
+    assert [entry["name"] for entry in index.entries("P1")] == ["user_data_P1_1.json"]
+    assert index.rebuilds == 1
+
+    # 다른 참가자의 파일이 추가되어 디렉토리 수정 시각이 바뀌어도 다시 훑지 않음
+    write_record(shared_dir, "user_data_P2_2.json", 2)
+    index.record("P2", "user_data_P2_2.json")
+    rebuilds = index.rebuilds
+    index._cache.clear()
+    assert [entry["name"] for entry in index.entries("P1")] == ["user_data_P1_1.json"]
+    assert index.rebuilds == rebuilds
+
+    # 이 참가자의 새 파일은 record()로 반영
+    write_record(shared_dir, "user_data_P1_2.json", 2)
+    index.record("P1", "user_data_P1_2.json")
+    assert [entry["name"] for entry in index.entries("P1")] == ["user_data_P1_2.json", "user_data_P1_1.json"]
+    assert index.rebuilds == rebuilds
@@ -0,0 +1,55 @@
+"""session_store: 세션 캐시 격리와 경로 정리 테스트"""
+import os
+
+import pytest
+
+import session_store
+from session_store import SessionStore
+
+
+def make_session(*messages) -> dict:
+    return {"sessionId": "s1", "messages": list(messages), "total_messages": len(messages)}
+
+
+def test_load_returns_copy_of_cached_session(tmp_path):
+    store = SessionStore(str(tmp_path))
+    store.save("P1", "s1", make_session({"user_message": "안녕하세요"}))
+
+    loaded = store.load("P1", "s1")
+    loaded["messages"].append({"user_message": "저장 안 된 턴"})
+    loaded["total_messages"] = 2
+
+    assert store.load("P1", "s1") == make_session({"user_message": "안녕하세요"})
+    assert store.hits == 2
+
+
+def test_failed_save_leaves_cache_unchanged(tmp_path, monkeypatch):
+    store = SessionStore(str(tmp_path))
+    store.save("P1", "s1", make_session({"user_message": "첫 턴"}))
+
+    session_data = store.load("P1", "s1")
+    session_data["messages"].append({"user_message": "두 번째 턴"})
+
+    def fail_write(path, obj, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(session_store, "write_json", fail_write)
+    with pytest.raises(OSError):
+        store.save("P1", "s1", session_data)
+
+    assert len(store.load("P1", "s1")["messages"]) == 1
+
+
+def test_saved_session_is_not_changed_by_caller(tmp_path):
+    store = SessionStore(str(tmp_path))
+    session_data = make_session({"user_message": "첫 턴"})
+    store.save("P1", "s1", session_data)
+    session_data["messages"].append({"user_message": "두 번째 턴"})
+    assert len(store.load("P1", "s1")["messages"]) == 1
+
+
+def test_paths_stay_inside_log_dir(tmp_path):
+    store = SessionStore(str(tmp_path))
+    for participant_id in ("../../escape", "a/b", ".."):
+        path = os.path.realpath(store.session_dir(participant_id, "../s1"))
+        assert path.startswith(os.path.realpath(str(tmp_path)) + os.sep)
@@ -0,0 +1,95 @@
+"""structured_output: JSON 복구, 스트리밍 부분 파싱, 스키마 검증 테스트"""
+import pytest
+
+from structured_output import (
+    EvaluationResult,
+    IncrementalJSONParser,
+    QuestCheckResult,
+    parse_structured,
+    repair_json,
+)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"a": 1}', {"a": 1}),
+    # 코드 블록과 앞뒤 설명 무시
+    ('```json\n{"a": 1}\n```', {"a": 1}),
+    ('결과입니다: {"a": {"b": 2}} 이상입니다.', {"a": {"b": 2}}),
+    # 끝 쉼표
+    ('{"a": [1, 2,], "b": 3,}', {"a": [1, 2], "b": 3}),
+    # 문자열 안의 쉼표/괄호는 그대로 유지
+    ('{"a": "x,}", "b": 1,}', {"a": "x,}", "b": 1}),
+    # 잘린 응답
+    ('{"a": "hel', {"a": "hel"}),
+    ('{"a": [1, 2', {"a": [1, 2]}),
+    ('{"a": 1, "b": tru', {"a": 1, "b": None}),
+    ('{"a":', {"a": None}),
+    ('{"a": 1,', {"a": 1}),
+])
+def test_repair_json(text, expected):
+    assert repair_json(text) == expected
+
+
+@pytest.mark.parametrize("text", ["", "JSON이 없습니다", "[1, 2, 3]"])
+def test_repair_json_without_object(text):
+    assert repair_json(text) is None
+
+
+def test_incremental_parser_emits_completed_values_per_chunk():
+    text = '```json\n{"grades": {"x": "상", "y": 3}, "q": [{"id": 1}, true]}\n```'
+    parser = IncrementalJSONParser()
+    events = []
+    for ch in text:
+        events.extend(parser.feed(ch))
+
+    assert events == [
+        (("grades", "x"), "상"),
+        (("grades", "y"), 3),
+        (("grades",), {"x": "상", "y": 3}),
+        (("q", 0, "id"), 1),
+        (("q", 0), {"id": 1}),
+        (("q", 1), True),
+        (("q",), [{"id": 1}, True]),
+    ]
+    assert parser.done
+
+
+def test_incremental_parser_respects_max_depth():
+    parser = IncrementalJSONParser(max_depth=1)
+    events = parser.feed('{"a": {"b": 1}, "c": "d"}')
+    assert events == [(("a",), {"b": 1}), (("c",), "d")]
+
+
+def test_incremental_parser_waits_for_unfinished_scalar():
+    parser = IncrementalJSONParser()
+    assert parser.feed('{"a": 12') == []
+    assert parser.feed('3, "b": "x\\"') == [(("a",), 123)]
+    assert parser.feed('y"}') == [(("b",), 'x"y')]
+
+
+def test_closing_suffix_closes_open_string_and_brackets():
+    parser = IncrementalJSONParser()
+    parser.feed('{"a": [{"b": "c')
+    assert parser.closing_suffix() == '"}]}'
+
+
+def test_parse_structured_normalizes_and_fills_defaults():
+    result = parse_structured(
+        '{"grades": {"symptom_location": "상 (잘함)", "allergy_info": "low"}, "improvement_tips": "팁"}',
+        EvaluationResult,
+    )
+    assert result["grades"]["symptom_location"] == "상"
+    assert result["grades"]["allergy_info"] == "하"
+    assert result["grades"]["emergency_plan"] == "중"
+    assert result["improvement_tips"] == ["팁"]
+    assert set(result["score_reasons"]) == set(result["grades"])
+
+
+def test_parse_structured_drops_invalid_quests():
+    result = parse_structured(
+        '{"completed_quests": [{"quest_id": "q1", "status": "달성"}, {"status": "달성"}, "x"]}',
+        QuestCheckResult,
+    )
+    assert result == {"completed_quests": [
+        {"quest_id": "q1", "status": "달성", "reason": "", "suggestion": ""},
+    ]}
@@ -0,0 +1,208 @@
+"""upstream: 백오프, 재시도, 우선순위 대기열 테스트"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+import upstream
+from upstream import (
+    PRIORITY_BATCH,
+    PRIORITY_CHAT,
+    ProviderLimiter,
+    UpstreamBusyError,
+    UpstreamScheduler,
+    get_retry_after,
+    is_retryable,
+)
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, headers: dict = None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class StatusError(Exception):
+    def __init__(self, status_code: int, headers: dict = None):
+        super().__init__(f"HTTP {status_code}")
+        self.response = FakeResponse(status_code, headers)
+
+
+class FlakyCall:
+    """앞의 errors를 차례로 발생시킨 뒤 "ok"를 반환하는 동기 함수"""
+
+    def __init__(self, *errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "ok"
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """재시도 대기를 실제로 기다리지 않고 기록"""
+    recorded = []
+
+    async def fake_sleep(delay):
+        recorded.append(delay)
+
+    monkeypatch.setattr(upstream.asyncio, "sleep", fake_sleep)
+    return recorded
+
+
+def make_scheduler(**kwargs) -> UpstreamScheduler:
+    scheduler = UpstreamScheduler(**kwargs)
+    scheduler.add_provider("openai", max_concurrency=2, max_queue=2, queue_timeout=1.0)
+    return scheduler
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ({}, None),
+    ({"retry-after": "3"}, 3.0),
+    ({"Retry-After": "1.5"}, 1.5),
+    ({"retry-after": "-2"}, 0.0),
+    ({"retry-after": "soon"}, None),
+])
+def test_get_retry_after(headers, expected):
+    assert get_retry_after(StatusError(429, headers)) == expected
+
+
+def test_get_retry_after_http_date():
+    when = datetime.now(timezone.utc) + timedelta(seconds=30)
+    retry_after = get_retry_after(StatusError(503, {"retry-after": format_datetime(when, usegmt=True)}))
+    assert 28 <= retry_after <= 30
+
+
+@pytest.mark.parametrize("exc, expected", [
+    (StatusError(429), True),
+    (StatusError(503), True),
+    (StatusError(400), False),
+    (TimeoutError(), True),
+    (ConnectionError(), True),
+    (type("ReadTimeout", (Exception,), {})(), True),
+    (ValueError(), False),
+])
+def test_is_retryable(exc, expected):
+    assert is_retryable(exc) is expected
+
+
+def test_backoff_delay_prefers_retry_after_capped_at_max():
+    scheduler = UpstreamScheduler(backoff_base=0.5, backoff_max=20.0)
+    assert scheduler.backoff_delay(0, StatusError(429, {"retry-after": "7"})) == 7.0
+    assert scheduler.backoff_delay(0, StatusError(429, {"retry-after": "120"})) == 20.0
+
+
+def test_backoff_delay_full_jitter_bounds(monkeypatch):
+    scheduler = UpstreamScheduler(backoff_base=0.5, backoff_max=5.0)
+    bounds = []
+    monkeypatch.setattr(upstream.random, "uniform", lambda low, high: bounds.append((low, high)) or high)
+    for attempt in range(6):
+        scheduler.backoff_delay(attempt, StatusError(503))
+    assert bounds == [(0, 0.5), (0, 1.0), (0, 2.0), (0, 4.0), (0, 5.0), (0, 5.0)]
+
+
+def test_call_retries_retryable_errors(sleeps):
+    scheduler = make_scheduler(max_retries=3)
+    fn = FlakyCall(StatusError(503), StatusError(429, {"retry-after": "2"}))
+    assert asyncio.run(scheduler.call("openai", fn)) == "ok"
+    assert fn.calls == 3
+    assert scheduler.retries == 2
+    assert sleeps[1] == 2.0
+    assert scheduler.providers["openai"].active == 0
+
+
+def test_call_does_not_retry_client_errors(sleeps):
+    scheduler = make_scheduler()
+    fn = FlakyCall(StatusError(400))
+    with pytest.raises(StatusError):
+        asyncio.run(scheduler.call("openai", fn))
+    assert fn.calls == 1
+    assert sleeps == []
+
+
+def test_call_turns_exhausted_rate_limit_into_busy_error(sleeps):
+    scheduler = make_scheduler(max_retries=1)
+    fn = FlakyCall(StatusError(429), StatusError(429, {"retry-after": "9"}))
+    with pytest.raises(UpstreamBusyError) as excinfo:
+        asyncio.run(scheduler.call("openai", fn))
+    assert excinfo.value.retry_after == 9.0
+    assert fn.calls == 2
+    assert scheduler.providers["openai"].active == 0
+
+
+def test_call_stops_retrying_when_can_retry_is_false(sleeps):
+    scheduler = make_scheduler()
+    fn = FlakyCall(StatusError(503))
+    with pytest.raises(StatusError):
+        asyncio.run(scheduler.call("openai", fn, can_retry=lambda: False))
+    assert fn.calls == 1
+
+
+def test_limiter_serves_waiters_by_priority():
+    async def scenario():
+        limiter = ProviderLimiter("openai", max_concurrency=1, max_queue=3, queue_timeout=1.0)
+        await limiter.acquire(PRIORITY_BATCH)
+        order = []
+
+        async def waiter(name, priority):
+            await limiter.acquire(priority)
+            order.append(name)
+            limiter.release()
+
+        tasks = [asyncio.create_task(waiter("batch", PRIORITY_BATCH)),
+                 asyncio.create_task(waiter("chat", PRIORITY_CHAT))]
+        await asyncio.sleep(0)
+        assert limiter.queued == 2
+        limiter.release()
+        await asyncio.gather(*tasks)
+        return order, limiter.active
+
+    assert asyncio.run(scenario()) == (["chat", "batch"], 0)
+
+
+def test_limiter_rejects_when_queue_full_and_times_out():
+    async def scenario():
+        limiter = ProviderLimiter("openai", max_concurrency=1, max_queue=1, queue_timeout=0.05)
+        await limiter.acquire(PRIORITY_BATCH)
+        waiting = asyncio.create_task(limiter.acquire(PRIORITY_BATCH))
+        await asyncio.sleep(0)
+        with pytest.raises(UpstreamBusyError):
+            await limiter.acquire(PRIORITY_CHAT)
+        with pytest.raises(UpstreamBusyError):
+            await waiting
+        return limiter.stats()
+
+    stats = asyncio.run(scenario())
+    assert (stats["rejected"], stats["timed_out"], stats["active"]) == (1, 1, 1)
+
+
+def test_queued_call_runs_during_another_calls_backoff():
+    scheduler = UpstreamScheduler(max_retries=1)
+    scheduler.add_provider("openai", max_concurrency=1, max_queue=2, queue_timeout=5.0)
+    events = []
+
+    def throttled():
+        events.append("throttled")
+        if events.count("throttled") == 1:
+            raise StatusError(429, {"retry-after": "0.2"})
+        return "ok"
+
+    def queued():
+        events.append("queued")
+        return "ok"
+
+    async def scenario():
+        first = asyncio.create_task(scheduler.call("openai", throttled))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(scheduler.call("openai", queued, priority=PRIORITY_CHAT))
+        return await asyncio.gather(first, second)
+
+    assert asyncio.run(scenario()) == ["ok", "ok"]
+    # 재시도 대기 중에 반납된 슬롯으로 대기열의 호출이 먼저 실행됨
+    assert events == ["throttled", "queued", "throttled"]
+    assert scheduler.providers["openai"].active == 0
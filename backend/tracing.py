@@ -0,0 +1,164 @@
+"""요청 단위 트레이싱 (span) 과 Chrome Trace Event Format 파일 내보내기
+
+샘플링된 요청마다 Trace 객체를 만들고, 처리 중에 span(...)으로 감싼 구간
+(디렉토리 조회, JSON 읽기/쓰기, 외부 API 호출 등)의 시작/종료 시각을 기록합니다.
+요청이 끝나면 이벤트를 별도 스레드가 traces/trace_YYYYmmdd_HH.json 파일에 추가하며,
+이 파일은 chrome://tracing 또는 Perfetto(ui.perfetto.dev)에서 바로 열 수 있습니다.
+샘플링되지 않은 요청에서 span은 컨텍스트 변수 조회 한 번으로 끝납니다.
+"""
+import contextvars
+import itertools
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+_current_trace = contextvars.ContextVar("current_trace", default=None)
+
+# perf_counter 값을 epoch 기준 시각으로 바꾸기 위한 오프셋
+_EPOCH_OFFSET = time.time() - time.perf_counter()
+
+
+def to_trace_us(perf_time: float) -> int:
+    return int((perf_time + _EPOCH_OFFSET) * 1_000_000)
+
+
+class Trace:
+    """요청 하나에서 기록된 span 목록"""
+
+    def __init__(self, name: str, track_id: int, attrs: dict):
+        self.name = name
+        self.track_id = track_id
+        self.attrs = attrs
+        self.start_time = time.perf_counter()
+        self.events = []
+
+    def add(self, name: str, start_time: float, end_time: float, attrs: Optional[dict] = None):
+        self.events.append({
+            "name": name,
+            "cat": "span",
+            "ph": "X",
+            "ts": to_trace_us(start_time),
+            "dur": max(0, int((end_time - start_time) * 1_000_000)),
+            "pid": os.getpid(),
+            "tid": self.track_id,
+            "args": attrs or {},
+        })
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """현재 요청이 트레이싱 대상이면 with 블록 구간을 span으로 기록"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield
+        return
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, start_time, time.perf_counter(), attrs)
+
+
+def record_span(name: str, start_time: float, end_time: float, **attrs):
+    """이미 측정한 구간(perf_counter 기준)을 span으로 기록"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(name, start_time, end_time, attrs)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+class Tracer:
+    """요청 샘플링, Trace 생성/종료, 파일 내보내기를 담당"""
+
+    def __init__(self, trace_dir: str, sample_rate: float = 0.0, max_queue: int = 1000):
+        self.trace_dir = trace_dir
+        self.sample_rate = sample_rate
+        self.max_queue = max_queue
+
+        self._track_ids = itertools.count(1)
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._writer = None
+        self._writer_lock = threading.Lock()
+
+        self.exported = 0
+        self.dropped = 0
+
+    def start(self, name: str, **attrs):
+        """샘플링되면 Trace를 시작하고 (trace, token)을, 아니면 None을 반환"""
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return None
+        trace = Trace(name, next(self._track_ids), attrs)
+        token = _current_trace.set(trace)
+        return trace, token
+
+    def finish(self, handle, **attrs):
+        """Trace를 종료하고 내보내기 대기열에 추가 (요청 경로에서는 파일에 쓰지 않음)"""
+        if handle is None:
+            return
+        trace, token = handle
+        _current_trace.reset(token)
+        trace.attrs.update(attrs)
+        trace.add(trace.name, trace.start_time, time.perf_counter(), trace.attrs)
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def stats(self) -> dict:
+        return {
+            "sample_rate": self.sample_rate,
+            "trace_dir": self.trace_dir,
+            "pending": self._queue.qsize(),
+            "exported": self.exported,
+            "dropped": self.dropped,
+        }
+
+    def _ensure_writer(self):
+        with self._writer_lock:
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._write_loop, name="trace-writer", daemon=True)
+                self._writer.start()
+
+    def _trace_path(self) -> str:
+        return os.path.join(self.trace_dir, f"trace_{datetime.now().strftime('%Y%m%d_%H')}.json")
+
+    def _write_loop(self):
+        while True:
+            trace = self._queue.get()
+            try:
+                self._write(trace)
+                self.exported += 1
+            except OSError as e:
+                self.dropped += 1
+                logger.warning("트레이스 파일 저장 실패: %s", e)
+
+    def _write(self, trace: Trace):
+        os.makedirs(self.trace_dir, exist_ok=True)
+        trace_filepath = self._trace_path()
+        # JSON Array Format: 닫는 ']'는 생략 가능하므로 이벤트를 한 줄씩 이어 붙임
+        new_file = not os.path.exists(trace_filepath)
+        thread_name = {
+            "name": "thread_name",
+            "ph": "M",
+            "pid": os.getpid(),
+            "tid": trace.track_id,
+            "args": {"name": f"{trace.name} {trace.attrs.get('request_id', '')}".strip()},
+        }
+        with open(trace_filepath, "a", encoding="utf-8") as f:
+            if new_file:
+                f.write("[\n")
+            for event in [thread_name] + trace.events:
+                f.write(json.dumps(event, ensure_ascii=False, default=str) + ",\n")
@@ -0,0 +1,138 @@
+"""채팅 턴 단계별 소요 시간 리포트
+
+logs/<participant_id>/<session_id>/turn_timings.jsonl의 턴별 timings_ms를 모아
+단계별(prompt_build, llm_first_token, llm_total, tts, audio_write, session_persist, total)
+p50/p95/p99를 출력합니다. total은 세션 저장 시간까지 포함합니다.
+이전 형식으로 chat_session.json의 메시지에 저장된 timings_ms도 함께 집계합니다.
+
+사용 예:
+    python turn_timings_report.py
+    python turn_timings_report.py --log-dir logs --participant P001
+    python turn_timings_report.py --json
+"""
+import argparse
+import json
+import math
+import os
+import sys
+
+from session_store import SESSION_FILENAME, TURN_TIMINGS_FILENAME
+
+STAGES = ["prompt_build", "llm_first_token", "llm_total", "tts", "audio_write", "session_persist", "total"]
+
+
+def percentile(sorted_values: list, q: float) -> float:
+    """정렬된 값 목록의 q 분위수 (선형 보간)"""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * q
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    if lower == upper:
+        return sorted_values[lower]
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def iter_session_dirs(log_dir: str, participant_id: str = None):
+    """세션 파일이나 턴 소요 시간 파일이 있는 세션 디렉토리"""
+    participant_ids = [participant_id] if participant_id else sorted(os.listdir(log_dir))
+    for pid in participant_ids:
+        participant_dir = os.path.join(log_dir, pid)
+        if not os.path.isdir(participant_dir):
+            continue
+        for session_id in sorted(os.listdir(participant_dir)):
+            session_dir = os.path.join(participant_dir, session_id)
+            if (os.path.isfile(os.path.join(session_dir, SESSION_FILENAME))
+                    or os.path.isfile(os.path.join(session_dir, TURN_TIMINGS_FILENAME))):
+                yield session_dir
+
+
+def read_turn_timings(session_dir: str) -> list:
+    """세션의 턴별 timings_ms 목록 (turn_timings.jsonl + 이전 형식의 메시지별 기록)"""
+    turn_timings = []
+    session_filepath = os.path.join(session_dir, SESSION_FILENAME)
+    if os.path.isfile(session_filepath):
+        with open(session_filepath, "r", encoding="utf-8") as f:
+            session_data = json.load(f)
+        for message in session_data.get("messages", []):
+            if message.get("timings_ms"):
+                turn_timings.append(message["timings_ms"])
+    timings_filepath = os.path.join(session_dir, TURN_TIMINGS_FILENAME)
+    if os.path.isfile(timings_filepath):
+        with open(timings_filepath, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                if record.get("timings_ms"):
+                    turn_timings.append(record["timings_ms"])
+    return turn_timings
+
+
+def collect_timings(log_dir: str, participant_id: str = None) -> tuple:
+    """단계별 소요 시간 목록과 (세션 수, 턴 수)를 반환"""
+    values = {stage: [] for stage in STAGES}
+    session_count = 0
+    turn_count = 0
+    for session_dir in iter_session_dirs(log_dir, participant_id):
+        try:
+            turn_timings = read_turn_timings(session_dir)
+        except (OSError, ValueError) as e:
+            print(f"세션 기록 읽기 실패: {session_dir} - {e}", file=sys.stderr)
+            continue
+        session_count += 1
+        for timings_ms in turn_timings:
+            turn_count += 1
+            for stage in STAGES:
+                if isinstance(timings_ms.get(stage), (int, float)):
+                    values[stage].append(float(timings_ms[stage]))
+    return values, session_count, turn_count
+
+
+def summarize(values: dict) -> dict:
+    summary = {}
+    for stage, stage_values in values.items():
+        stage_values = sorted(stage_values)
+        summary[stage] = {
+            "count": len(stage_values),
+            "p50": round(percentile(stage_values, 0.50), 1),
+            "p95": round(percentile(stage_values, 0.95), 1),
+            "p99": round(percentile(stage_values, 0.99), 1),
+            "max": round(stage_values[-1], 1) if stage_values else 0.0,
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="채팅 턴 단계별 소요 시간(p50/p95/p99) 리포트")
+    parser.add_argument("--log-dir", default="logs", help="세션 로그 디렉토리 (기본값: logs)")
+    parser.add_argument("--participant", help="특정 참가자 ID만 집계")
+    parser.add_argument("--json", action="store_true", help="JSON으로 출력")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.log_dir):
+        print(f"로그 디렉토리가 없습니다: {args.log_dir}", file=sys.stderr)
+        return 1
+
+    values, session_count, turn_count = collect_timings(args.log_dir, args.participant)
+    summary = summarize(values)
+
+    if args.json:
+        print(json.dumps({
+            "sessions": session_count,
+            "turns": turn_count,
+            "stages": summary,
+        }, ensure_ascii=False, indent=2))
+        return 0
+
+    print(f"세션 {session_count}개, 소요 시간이 기록된 턴 {turn_count}개 (단위: ms)")
+    print(f"{'stage':<18}{'count':>8}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}")
+    for stage in STAGES:
+        row = summary[stage]
+        print(f"{stage:<18}{row['count']:>8}{row['p50']:>10.1f}{row['p95']:>10.1f}{row['p99']:>10.1f}{row['max']:>10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,298 @@
+"""외부 API(OpenAI, ElevenLabs) 호출 스케줄러
+
+제공자별 동시 호출 수를 제한하고, 초과 요청은 우선순위 대기열에서 기다리게 합니다.
+대기열이 가득 차거나 대기 시간이 초과되면 UpstreamBusyError를 발생시키며,
+429/5xx 응답은 Retry-After를 우선으로, 없으면 지터가 있는 지수 백오프로 재시도합니다.
+(재시도를 기다리는 동안은 슬롯을 반납하므로 대기열의 다른 호출이 먼저 실행될 수 있습니다.)
+hedge 정책을 넘기면 응답이 임계값보다 늦을 때 같은 요청을 한 번 더 보내고 먼저 끝난 결과를 사용합니다.
+"""
+import asyncio
+import contextvars
+import functools
+import heapq
+import itertools
+import logging
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# 우선순위 (숫자가 작을수록 먼저 처리)
+PRIORITY_CHAT = 0          # 실시간 채팅 턴, 음성 합성
+PRIORITY_INTERACTIVE = 1   # 채팅 중 퀘스트 체크
+PRIORITY_BATCH = 2         # 평가, 음성 분석, 치트시트 생성
+PRIORITY_SPECULATIVE = 3   # 로그인 시 첫 턴 미리 생성 (버려질 수 있는 작업)
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class UpstreamBusyError(Exception):
+    """외부 API 호출 대기열이 가득 찼거나 대기 시간이 초과된 경우"""
+
+    def __init__(self, provider: str, reason: str, retry_after: float = 1.0):
+        super().__init__(f"{provider}: {reason}")
+        self.provider = provider
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def get_status_code(exc: BaseException) -> Optional[int]:
+    """openai / requests 예외에서 HTTP 상태 코드를 꺼내는 함수"""
+    status_code = getattr(exc, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(exc, "response", None), "status_code", None)
+    return status_code
+
+
+def get_retry_after(exc: BaseException) -> Optional[float]:
+    """예외에 포함된 응답의 Retry-After 헤더(초 또는 HTTP 날짜)를 초 단위로 변환"""
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    if not headers:
+        return None
+    value = headers.get("retry-after") or headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """재시도할 가치가 있는 오류인지 판단 (429, 5xx, 연결/타임아웃 오류)"""
+    status_code = get_status_code(exc)
+    if status_code is not None:
+        return status_code in RETRYABLE_STATUS_CODES
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    name = type(exc).__name__
+    return "Timeout" in name or "Connection" in name
+
+
+def release_when_done(limiter: "ProviderLimiter", on_finished: Optional[Callable[[], None]], future: asyncio.Future):
+    """취소된 호출의 스레드가 끝나면 슬롯을 반납 (결과/예외는 버림)"""
+    if not future.cancelled():
+        future.exception()
+    limiter.abandoned -= 1
+    limiter.release()
+    if on_finished is not None:
+        on_finished()
+
+
+class ProviderLimiter:
+    """우선순위 대기열을 가진 제공자별 동시 실행 제한기"""
+
+    def __init__(self, name: str, max_concurrency: int, max_queue: int, queue_timeout: float):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+
+        self.active = 0
+        self._waiters = []
+        self._counter = itertools.count()
+
+        self.rejected = 0
+        self.timed_out = 0
+        # 호출한 쪽은 취소됐지만 스레드에서 아직 실행 중인 호출 수 (슬롯을 차지함)
+        self.abandoned = 0
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    def has_capacity(self) -> bool:
+        """기다리지 않고 바로 실행할 수 있는 슬롯이 있는지"""
+        return self.active < self.max_concurrency and self.queued == 0
+
+    def utilization(self) -> float:
+        """사용 중인 슬롯 비율 (취소됐지만 스레드가 아직 실행 중인 호출 포함)"""
+        return self.active / self.max_concurrency if self.max_concurrency else 1.0
+
+    async def acquire(self, priority: int):
+        if self.active < self.max_concurrency and self.queued == 0:
+            self.active += 1
+            return
+
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            raise UpstreamBusyError(self.name, "대기열이 가득 찼습니다.", retry_after=self.queue_timeout)
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+        except BaseException as e:
+            # 슬롯을 넘겨받은 직후 취소/타임아웃된 경우 슬롯을 반납
+            if future.done() and not future.cancelled():
+                self.release()
+            if isinstance(e, asyncio.TimeoutError):
+                self.timed_out += 1
+                raise UpstreamBusyError(self.name, "대기 시간이 초과되었습니다.", retry_after=self.queue_timeout)
+            raise
+
+    def release(self):
+        # 다음 대기자에게 슬롯을 그대로 넘김 (active 수는 유지)
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "queued": self.queued,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "abandoned": self.abandoned,
+        }
+
+
+class UpstreamScheduler:
+    """제공자별 동시성 제한, 우선순위 대기열, 429 인식 재시도를 담당하는 스케줄러"""
+
+    def __init__(self, max_retries: int = 3, backoff_base: float = 0.5, backoff_max: float = 20.0):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.providers = {}
+        self.retries = 0
+
+    def add_provider(self, name: str, max_concurrency: int, max_queue: int, queue_timeout: float):
+        self.providers[name] = ProviderLimiter(name, max_concurrency, max_queue, queue_timeout)
+
+    def backoff_delay(self, attempt: int, exc: BaseException) -> float:
+        """Retry-After가 있으면 그 값을, 없으면 full jitter 지수 백오프 값을 반환"""
+        retry_after = get_retry_after(exc)
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def call(self, provider: str, fn, *args, priority: int = PRIORITY_BATCH, hedge=None,
+                   can_retry: Optional[Callable[[], bool]] = None, **kwargs):
+        """동기 함수 fn을 제공자 슬롯을 얻은 뒤 스레드에서 실행 (실패 시 재시도)
+
+        hedge(HedgePolicy)를 넘기면 임계값까지 응답이 없을 때 같은 호출을 한 번 더 실행하고
+        먼저 성공한 결과를 반환합니다. fn은 여러 번 실행되어도 괜찮은(멱등) 호출이어야 합니다.
+        can_retry를 넘기면 재시도 전에 확인하고 False면 재시도하지 않음
+        (스트리밍 조각을 이미 내보내 처음부터 다시 받으면 결과가 중복되는 경우 등)
+        """
+        limiter = self.providers[provider]
+        if hedge is None:
+            return await self._call_with_retries(limiter, priority, fn, args, kwargs, can_retry)
+        return await self._call_hedged(limiter, hedge, priority, fn, args, kwargs)
+
+    async def _call_with_retries(self, limiter: ProviderLimiter, priority: int, fn, args: tuple, kwargs: dict,
+                                 can_retry: Optional[Callable[[], bool]] = None, abandon_hooks: Optional[tuple] = None):
+        """abandon_hooks=(started, finished): 취소됐지만 스레드가 계속 실행될 때와 그 스레드가 끝났을 때 호출"""
+        provider = limiter.name
+        await limiter.acquire(priority)
+        holds_slot = True
+        try:
+            attempt = 0
+            while True:
+                # asyncio.to_thread와 같이 컨텍스트 변수(요청 ID, 트레이스)를 스레드로 전달
+                context = contextvars.copy_context()
+                future = asyncio.get_running_loop().run_in_executor(
+                    None, functools.partial(context.run, fn, *args, **kwargs)
+                )
+                try:
+                    return await asyncio.shield(future)
+                except asyncio.CancelledError:
+                    # 실행 중인 스레드는 멈출 수 없으므로 실제로 끝났을 때 슬롯을 반납 (동시 실행 수 유지)
+                    holds_slot = False
+                    limiter.abandoned += 1
+                    on_finished = None
+                    if abandon_hooks is not None:
+                        abandon_hooks[0]()
+                        on_finished = abandon_hooks[1]
+                    future.add_done_callback(functools.partial(release_when_done, limiter, on_finished))
+                    raise
+                except Exception as e:
+                    if not is_retryable(e) or attempt >= self.max_retries or (can_retry is not None and not can_retry()):
+                        if get_status_code(e) == 429:
+                            # 재시도를 모두 소진한 속도 제한은 클라이언트에게 잠시 후 재시도하도록 안내
+                            raise UpstreamBusyError(
+                                provider, "외부 API 속도 제한에 걸렸습니다.",
+                                retry_after=get_retry_after(e) or self.backoff_max
+                            ) from e
+                        raise
+                    delay = self.backoff_delay(attempt, e)
+                    attempt += 1
+                    self.retries += 1
+                    logger.warning("%s 재시도 %s/%s (%.1f초 후): %s", provider, attempt, self.max_retries, delay, e)
+                    # 기다리는 동안 슬롯을 대기열의 다른 호출에 넘기고, 재시도 전에 같은 우선순위로 다시 얻음
+                    limiter.release()
+                    holds_slot = False
+                    await asyncio.sleep(delay)
+                    await limiter.acquire(priority)
+                    holds_slot = True
+        finally:
+            if holds_slot:
+                limiter.release()
+
+    async def _call_hedged(self, limiter: ProviderLimiter, policy, priority: int, fn, args: tuple, kwargs: dict):
+        """진 요청의 task는 취소하지만 스레드의 외부 API 호출은 끝까지 실행됨 (hedging 모듈 설명 참고)"""
+        async def timed_attempt():
+            start_time = time.perf_counter()
+            result = await self._call_with_retries(
+                limiter, priority, fn, args, kwargs,
+                abandon_hooks=(policy.loser_started, policy.loser_finished)
+            )
+            return result, time.perf_counter() - start_time
+
+        policy.record_call()
+        delay = policy.hedge_delay()
+        start_time = time.perf_counter()
+        primary = asyncio.create_task(timed_attempt())
+        attempts = [primary]
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(attempts, timeout=delay)
+                if not done:
+                    # 대기열이 있거나 슬롯이 거의 찼으면 추가 요청이 다른 호출의 슬롯을 빼앗으므로 헤징하지 않음
+                    if not limiter.has_capacity() or limiter.utilization() >= policy.max_utilization:
+                        policy.record_outcome("skipped_capacity")
+                    elif policy.try_spend():
+                        logger.debug("%s 헤징 요청 (%.0fms 경과)", limiter.name, delay * 1000)
+                        attempts.append(asyncio.create_task(timed_attempt()))
+
+            pending = set(attempts)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = error or task.exception()
+                        continue
+                    result, elapsed = task.result()
+                    policy.observe(elapsed)
+                    if len(attempts) > 1:
+                        policy.record_outcome("primary_won" if task is primary else "hedge_won")
+                        if not primary.done():
+                            # 이긴 요청만 기록하면 임계값이 계속 낮아지므로 진 원 요청은 취소 시점까지의 시간을 기록
+                            policy.observe(time.perf_counter() - start_time)
+                    return result
+            if len(attempts) > 1:
+                policy.record_outcome("both_failed")
+            raise error
+        finally:
+            for task in attempts:
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> dict:
+        return {
+            "retries": self.retries,
+            "providers": {name: limiter.stats() for name, limiter in self.providers.items()},
+        }
@@ -0,0 +1,123 @@
+"""로그인 시점의 첫 진료 턴 예측 생성 (speculative warm-up)
+
+참가자가 로그인하며 증상을 제출하면, 첫 채팅 메시지가 그 증상 설명일 가능성이 높으므로
+의사의 첫 응답을 백그라운드에서 미리 만들어 둡니다. 음성은 결과가 실제로 쓰일 때만 만듭니다.
+첫 채팅 턴의 메시지가 제출된 증상과 충분히 비슷하고 유효 시간 안이면 미리 만든 결과를 바로 쓰고,
+그렇지 않으면 버립니다.
+자유 발화가 증상 설명과 비슷할 때만 적중하므로, 맞지 않으면 LLM 호출 비용만 쓰게 됩니다.
+그래서 기본값은 꺼져 있습니다 (SPECULATIVE_OPENING_ENABLED).
+"""
+import asyncio
+import difflib
+import re
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+def normalize_text(text: str) -> str:
+    """공백/문장부호 차이를 무시하고 비교하기 위한 정규화"""
+    return re.sub(r"[\s\.,!?~·…]+", "", text or "").lower()
+
+
+def is_similar_message(expected: str, actual: str, threshold: float) -> bool:
+    expected_norm = normalize_text(expected)
+    actual_norm = normalize_text(actual)
+    if not expected_norm or not actual_norm:
+        return False
+    if expected_norm == actual_norm:
+        return True
+    return difflib.SequenceMatcher(None, expected_norm, actual_norm).ratio() >= threshold
+
+
+class OpeningTurnCache:
+    """(참가자, 세션)별로 미리 생성한 첫 진료 턴(의사 응답)을 보관하는 캐시
+
+    세션 단위로 보관하므로 같은 참가자의 다른 탭이나 재로그인이 서로의 결과를 가져가거나 덮어쓰지 않습니다.
+    """
+
+    def __init__(self, ttl_seconds: int = 600, similarity_threshold: float = 0.85,
+                 max_entries: int = 200, enabled: bool = False):
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self.max_entries = max_entries
+        self.enabled = enabled
+
+        # (participant_id, session_id) -> {"symptoms", "created_at", "task"}
+        self._entries = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.discarded = 0
+
+    def start(self, participant_id: str, session_id: str, symptoms: str, generate):
+        """generate(symptoms) 코루틴을 백그라운드로 실행해 첫 턴을 미리 생성"""
+        if not self.enabled or not symptoms.strip():
+            return
+        key = (participant_id, session_id)
+        self._discard(key)
+        self._discard_expired()
+        task = asyncio.create_task(generate(symptoms))
+        task.add_done_callback(self._consume_exception)
+        self._entries[key] = {
+            "symptoms": symptoms,
+            "created_at": time.time(),
+            "task": task,
+        }
+        while len(self._entries) > self.max_entries:
+            oldest_key = next(iter(self._entries))
+            self._discard(oldest_key)
+
+    async def take(self, participant_id: str, session_id: str, message: str) -> Optional[dict]:
+        """첫 턴 메시지와 맞는 예측 결과를 꺼냄 (한 번만 사용, 맞지 않으면 버림)"""
+        entry = self._entries.pop((participant_id, session_id), None)
+        if entry is None:
+            return None
+
+        task = entry["task"]
+        expired = time.time() - entry["created_at"] > self.ttl_seconds
+        if expired or not is_similar_message(entry["symptoms"], message, self.similarity_threshold):
+            task.cancel()
+            self.misses += 1
+            return None
+
+        try:
+            # 아직 생성 중이면 처음부터 새로 호출하는 것보다 기다리는 편이 빠름
+            result = await asyncio.shield(task)
+        except Exception:
+            self.misses += 1
+            return None
+        if not result:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "pending": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "discarded": self.discarded,
+        }
+
+    def _discard(self, key: tuple):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            entry["task"].cancel()
+            self.discarded += 1
+
+    def _discard_expired(self):
+        now = time.time()
+        while self._entries:
+            oldest_key, oldest_entry = next(iter(self._entries.items()))
+            if now - oldest_entry["created_at"] <= self.ttl_seconds:
+                break
+            self._discard(oldest_key)
+
+    @staticmethod
+    def _consume_exception(task: asyncio.Task):
+        if not task.cancelled():
+            task.exception()
@@ -48,8 +48,9 @@ const Chat = () => {
     initializeSpeechRecognition();
     scrollToBottom();
     
-    // 페이지 로드 시 새로운 세션 생성
-    const newSessionId = `session_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`;
+    // 로그인 시 정한 세션 ID가 있으면 사용하고(첫 메시지 전송 시 제거), 없으면 새로운 세션 생성
+    const newSessionId = localStorage.getItem('chatSessionId')
+      || `session_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`;
     setSessionId(newSessionId);
     console.log('🆔 페이지 로드 시 새 세션 생성:', newSessionId);
   }, []);
@@ -400,6 +401,9 @@ const Chat = () => {
 
   const generateBotResponse = async (userMessage) => {
     try {
+      // 로그인 시 정한 세션 ID는 이 세션에서만 사용
+      localStorage.removeItem('chatSessionId');
+      
       // 세션 ID가 없으면 새로 생성
       let currentSessionId = sessionId;
       if (!currentSessionId) {
@@ -408,21 +412,12 @@ const Chat = () => {
         console.log('🆔 메시지 전송 시 새 세션 생성:', currentSessionId);
       }
       
-      // 대화 기록 구성 (최근 10개 메시지만 포함)
-      const conversationHistory = messages
-        .filter(msg => msg.sender === 'user' || msg.sender === 'bot')
-        .slice(-10)
-        .map(msg => ({
-          role: msg.sender === 'user' ? 'user' : 'assistant',
-          content: msg.content
-        }));
-      
+      // 대화 기록은 서버가 세션 ID로 관리하므로 새 메시지만 전송
       console.log('🔗 API URL:', `${apiBaseUrl}/api/chat`);
       console.log('📤 전송 데이터:', {
         message: userMessage,
         participantId: localStorage.getItem('participantId') || 'unknown',
-        sessionId: currentSessionId,
-        conversationHistory: conversationHistory
+        sessionId: currentSessionId
       });
       
       const response = await fetch(`${apiBaseUrl}/api/chat`, {
@@ -433,8 +428,7 @@ const Chat = () => {
         body: JSON.stringify({
           message: userMessage,
           participantId: localStorage.getItem('participantId') || 'unknown',
-          sessionId: currentSessionId,
-          conversationHistory: conversationHistory
+          sessionId: currentSessionId
         })
       });
 
@@ -3,6 +3,9 @@ import { useNavigate } from 'react-router-dom';
 import html2canvas from 'html2canvas';
 import './CheatsheetHistory.css';
 
+// 한 번에 불러올 치트시트 개수 (다음 페이지는 '더 보기'로 요청)
+const HISTORY_PAGE_SIZE = 20;
+
 // 영어 제목을 한글로 변환하는 함수
 const translateTitle = (englishTitle) => {
     const titleMap = {
@@ -25,6 +28,9 @@ const CheatsheetHistory = () => {
     const navigate = useNavigate();
     const [loading, setLoading] = useState(true);
     const [cheatsheets, setCheatsheets] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [totalCount, setTotalCount] = useState(0);
+    const [loadingMore, setLoadingMore] = useState(false);
     const [error, setError] = useState(null);
     const [selectedCheatsheet, setSelectedCheatsheet] = useState(null);
     const [completedItems, setCompletedItems] = useState(new Set()); // 완료된 아이템들 추적
@@ -102,9 +108,13 @@ const CheatsheetHistory = () => {
         }
     };
 
-    const loadCheatsheetHistory = async () => {
+    const loadCheatsheetHistory = async (cursor = null) => {
         try {
-            setLoading(true);
+            if (cursor) {
+                setLoadingMore(true);
+            } else {
+                setLoading(true);
+            }
             setError(null);
 
             const participantId = localStorage.getItem('participantId');
@@ -118,7 +128,11 @@ const CheatsheetHistory = () => {
             console.log('🔍 CheatsheetHistory API URL:', apiBaseUrl);
             console.log('🔍 ParticipantId:', participantId);
             
-            const response = await fetchWithTimeout(`${apiBaseUrl}/api/get-cheatsheet-history/${encodeURIComponent(participantId)}`, {
+            const params = new URLSearchParams({ limit: String(HISTORY_PAGE_SIZE) });
+            if (cursor) {
+                params.set('cursor', cursor);
+            }
+            const response = await fetchWithTimeout(`${apiBaseUrl}/api/get-cheatsheet-history/${encodeURIComponent(participantId)}?${params}`, {
                 method: 'GET',
                 headers: getRequestHeaders()
             });
@@ -146,7 +160,10 @@ const CheatsheetHistory = () => {
             console.log('🔍 Response data:', data);
 
             if (data.status === 'success') {
-                setCheatsheets(data.cheatsheets || []);
+                const page = data.cheatsheets || [];
+                setCheatsheets(prev => (cursor ? [...prev, ...page] : page));
+                setNextCursor(data.next_cursor || null);
+                setTotalCount(data.total || page.length);
             } else {
                 setError(`치트시트 히스토리를 불러올 수 없습니다: ${data.error || '알 수 없는 오류'}`);
             }
@@ -171,6 +188,7 @@ const CheatsheetHistory = () => {
             setError(errorMessage);
         } finally {
             setLoading(false);
+            setLoadingMore(false);
         }
     };
 
@@ -382,7 +400,7 @@ const CheatsheetHistory = () => {
                             {error}
                         </div>
                         <div className="error-actions">
-                            <button onClick={loadCheatsheetHistory} className="retry-btn">
+                            <button onClick={() => loadCheatsheetHistory()} className="retry-btn">
                                 🔄 다시 시도
                             </button>
                             <button 
@@ -423,7 +441,7 @@ const CheatsheetHistory = () => {
                     </div>
                 ) : (
                     <div className="history-list">
-                        <h3>총 {cheatsheets.length}개의 치트시트</h3>
+                        <h3>총 {totalCount || cheatsheets.length}개의 치트시트</h3>
                         {cheatsheets.map((cheatsheet, index) => (
                             <div key={index} className="history-item">
                                 <div className="history-info">
@@ -446,6 +464,15 @@ const CheatsheetHistory = () => {
                                 </button>
                             </div>
                         ))}
+                        {nextCursor && (
+                            <button
+                                className="view-btn load-more-btn"
+                                onClick={() => loadCheatsheetHistory(nextCursor)}
+                                disabled={loadingMore}
+                            >
+                                {loadingMore ? '불러오는 중...' : `더 보기 (${cheatsheets.length}/${totalCount})`}
+                            </button>
+                        )}
                     </div>
                 )}
             </div>
@@ -15,6 +15,7 @@ const Feedback = () => {
   const [logsLoaded, setLogsLoaded] = useState(false);
   const [showLogsPopup, setShowLogsPopup] = useState(false);
   const [currentStep, setCurrentStep] = useState(1); // 1: 대화 로그, 2: 체크리스트, 3: 종합 평가
+  const [savedFeedback, setSavedFeedback] = useState(null); // 마지막 대화 이후 저장된 평가/음성 분석
 
   useEffect(() => {
     // 페이지 로드 시 스크롤을 맨 위로 이동
@@ -66,7 +67,8 @@ const Feedback = () => {
         participantId = '연습'; // 테스트용 참가자 ID
       }
       
-      const logsUrl = `${apiBaseUrl}/api/logs?participant_id=${participantId}`;
+      // 대화 로그와 저장된 평가/음성 분석을 세션 번들로 한 번에 조회
+      const logsUrl = `${apiBaseUrl}/api/session-bundle/${encodeURIComponent(participantId)}`;
       
       console.log('🌐 API 요청 URL:', logsUrl);
       
@@ -112,6 +114,11 @@ const Feedback = () => {
         console.log(`✅ ${data.logs.length}개의 대화 로그를 로드했습니다.`);
         console.log('📝 로그 내용:', data.logs);
         setConversationLogs(data.logs);
+        setSavedFeedback(
+          data.evaluation_is_current && data.evaluation && data.voice_analysis
+            ? { evaluation: data.evaluation, voiceAnalysis: data.voice_analysis }
+            : null
+        );
         setLogsLoaded(true);
         setShowLogsPopup(true); // 로그 로드 후 팝업 표시
       } else {
@@ -120,12 +127,14 @@ const Feedback = () => {
         console.log('📊 로그 개수:', data.logs?.length || 0);
         setLogsLoaded(false);
         setConversationLogs([]);
+        setSavedFeedback(null);
         alert('대화 로그가 없습니다.');
       }
     } catch (error) {
       console.error('❌ 대화 로그 로드 오류:', error);
       setLogsLoaded(false);
       setConversationLogs([]);
+      setSavedFeedback(null);
       
       // 사용자 친화적인 오류 메시지
       let userMessage = error.message;
@@ -139,12 +148,35 @@ const Feedback = () => {
     }
   };
 
+  const applyEvaluation = (evaluationResult) => {
+    setEvaluation(evaluationResult);
+    // 평가 데이터를 localStorage에도 저장 (기존 호환성 유지)
+    localStorage.setItem('evaluationData', JSON.stringify(evaluationResult));
+    setShowEvaluation(true);
+    setCurrentStep(2); // 체크리스트 단계로 이동
+    // 스크롤을 맨 위로 이동
+    setTimeout(() => {
+      const contentElement = document.querySelector('.content');
+      if (contentElement) {
+        contentElement.scrollTop = 0;
+      }
+    }, 100);
+  };
+
   const generateFeedback = async () => {
     if (conversationLogs.length === 0) {
       alert('대화 로그가 없습니다. 먼저 대화 로그를 불러와주세요.');
       return;
     }
 
+    // 마지막 대화 이후 저장된 피드백이 있으면 다시 생성하지 않음
+    if (savedFeedback) {
+      setVoiceAnalysis(savedFeedback.voiceAnalysis);
+      setShowPopup(true);
+      applyEvaluation(savedFeedback.evaluation);
+      return;
+    }
+
     setIsGeneratingFeedback(true);
     setShowPopup(true);
 
@@ -210,18 +242,7 @@ const Feedback = () => {
       }
 
       if (evaluationData.status === 'success') {
-        setEvaluation(evaluationData.evaluation);
-        // 평가 데이터를 localStorage에도 저장 (기존 호환성 유지)
-        localStorage.setItem('evaluationData', JSON.stringify(evaluationData.evaluation));
-        setShowEvaluation(true);
-        setCurrentStep(2); // 체크리스트 단계로 이동
-        // 스크롤을 맨 위로 이동
-        setTimeout(() => {
-          const contentElement = document.querySelector('.content');
-          if (contentElement) {
-            contentElement.scrollTop = 0;
-          }
-        }, 100);
+        applyEvaluation(evaluationData.evaluation);
       }
     } catch (error) {
       console.error('피드백 생성 오류:', error);
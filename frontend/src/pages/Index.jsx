@@ -117,6 +117,8 @@ const Index = () => {
       ...formData,
       loginTime: new Date().toISOString()
     };
+    // 첫 채팅 세션 ID를 로그인 시 정해 서버가 첫 턴을 세션 단위로 미리 준비할 수 있게 함
+    const chatSessionId = `session_${Date.now()}_${Math.random().toString(36).substr(2, 9)}`;
 
     try {
       // API 기본 URL 동적 설정
@@ -182,13 +184,14 @@ const Index = () => {
       const response = await fetchWithTimeout(`${apiBaseUrl}/api/save-user-data`, {
         method: 'POST',
         headers: getRequestHeaders(),
-        body: JSON.stringify(userData)
+        body: JSON.stringify({ ...userData, sessionId: chatSessionId })
       });
 
       if (response.ok) {
         // 로컬 스토리지에 저장
         localStorage.setItem('userData', JSON.stringify(userData));
         localStorage.setItem('participantId', userData.participantId);
+        localStorage.setItem('chatSessionId', chatSessionId);
         
         // 가이드라인 페이지로 이동
         navigate('/guideline');
@@ -527,21 +527,12 @@ const Retry = () => {
                 throw new Error('세션 ID가 없습니다.');
             }
             
-            // 대화 기록 구성 (최근 10개 메시지만 포함)
-            const conversationHistory = messages
-                .filter(msg => msg.sender === 'user' || msg.sender === 'bot')
-                .slice(-10)
-                .map(msg => ({
-                    role: msg.sender === 'user' ? 'user' : 'assistant',
-                    content: msg.content
-                }));
-            
+            // 대화 기록은 서버가 세션 ID로 관리하므로 새 메시지만 전송
             console.log('🔗 API URL:', `${apiBaseUrl}/api/chat`);
             console.log('📤 전송 데이터:', {
                 message: userMessage,
                 participantId: localStorage.getItem('participantId') || 'unknown',
-                sessionId: currentSessionId,
-                conversationHistory: conversationHistory
+                sessionId: currentSessionId
             });
             console.log('🆔 현재 세션 ID:', currentSessionId);
             
@@ -551,8 +542,7 @@ const Retry = () => {
                 body: JSON.stringify({
                     message: userMessage,
                     participantId: localStorage.getItem('participantId') || 'unknown',
-                    sessionId: currentSessionId,
-                    conversationHistory: conversationHistory
+                    sessionId: currentSessionId
                 })
             });
 